@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos Perfis de Velocidade dos Detectores
+=================================================
+Para cada perfil de ``detector_profiles`` (``fast``, ``balanced``, ``accurate``), e para o FaceMesh
+na imagem inteira e a detecção em duas etapas (Haarcascade + FaceMesh no recorte), mede:
+- Vazão (imagens/s) e taxa de faces encontradas,
+- Desvio dos marcos em relação ao perfil ``accurate`` (média e p95 da distância 2D por ponto, em
+  pixels, nas imagens em que ambos encontram a face),
+- Deriva das 39 distâncias antropométricas (erro relativo médio) e da predição do modelo denso
+  (diferença média da confiança e fração de classes trocadas).
+
+As imagens do conjunto têm 224 x 224; ``--upscale`` as amplia para simular as fotos de câmera
+enviadas à API, onde a redução da entrada do perfil ``fast`` faz diferença.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_detector_profiles.py [--images 200] [--upscale 4] [pasta ...]
+
+@author: George Flores
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "backend")))
+
+from dense_model import load_dense_model  # noqa: E402
+from detector_profiles import PROFILES  # noqa: E402
+from Face_Mesh_Extractor import detect_face_mesh, detect_face_mesh_cascade  # noqa: E402
+from face_mesh_features import calculate_anthropometric_features  # noqa: E402
+from image_decoding import decode_image_file  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+DEFAULT_FOLDERS = [
+    os.path.join(ROOT, "data", "raw_processed", "processed_no_autistic_3.0"),
+    os.path.join(ROOT, "data", "raw_processed", "processed_with_autistic_3.0"),
+]
+HAARCASCADE = os.path.join(ROOT, "data", "pretrained_models", "haarcascade_frontalface_alt2.xml")
+MODEL = os.path.join(ROOT, "src", "models", "best_model_3.0_layers_2_neurons_32_lr_0.001_epochs_30.h5")
+REFERENCE = "accurate"
+
+
+def load_images(folders: list, count: int, upscale: float) -> list:
+    """Carrega ``count`` imagens de cada pasta (em ordem), opcionalmente ampliadas."""
+    images = []
+    for folder in folders:
+        for image_file in sorted(os.listdir(folder))[:count]:
+            image = decode_image_file(os.path.join(folder, image_file))
+            if upscale != 1:
+                image = cv2.resize(image, None, fx=upscale, fy=upscale, interpolation=cv2.INTER_CUBIC)
+            images.append(image)
+    return images
+
+
+def run_profile(images: list, profile, cascade: bool) -> tuple:
+    """
+    Detecta as malhas de todas as imagens com um perfil, reutilizando um único FaceMesh.
+
+    Returns:
+        tuple: (malhas (N, 468, 3) com NaN nas imagens sem face, segundos).
+    """
+    meshes = np.full((len(images), 468, 3), np.nan)
+    with profile.face_mesh() as face_mesh:
+        # Aquecimento: a primeira chamada inicializa o grafo do MediaPipe
+        detect_face_mesh(images[0], face_mesh=face_mesh, profile=profile)
+        start = time.perf_counter()
+        for i, image in enumerate(images):
+            if cascade:
+                landmarks = detect_face_mesh_cascade(image, HAARCASCADE, face_mesh=face_mesh, profile=profile)
+            else:
+                landmarks = detect_face_mesh(image, face_mesh=face_mesh, profile=profile)
+            if landmarks:
+                meshes[i] = landmarks
+        seconds = time.perf_counter() - start
+    return meshes, seconds
+
+
+def main(argv: list = None) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("folders", nargs="*", default=DEFAULT_FOLDERS)
+    parser.add_argument("--images", type=int, default=200, help="Imagens por pasta.")
+    parser.add_argument("--upscale", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    images = load_images(args.folders, args.images, args.upscale)
+    model = load_dense_model(MODEL)
+    height, width, _ = images[0].shape
+    print(f"{len(images)} imagens {width} x {height}; referência: perfil {REFERENCE}")
+
+    for cascade in (False, True):
+        print(f"\n{'Haarcascade + FaceMesh' if cascade else 'FaceMesh na imagem inteira'}")
+        results = {name: run_profile(images, profile, cascade) for name, profile in PROFILES.items()}
+        reference = results[REFERENCE][0]
+        print(f"{'perfil':>9} {'img/s':>7} {'faces':>6} {'desvio px':>10} {'p95 px':>7} "
+              f"{'features %':>11} {'|Δ conf|':>9} {'classes trocadas':>17}")
+        for name, (meshes, seconds) in results.items():
+            found = ~np.isnan(meshes[:, 0, 0])
+            both = found & ~np.isnan(reference[:, 0, 0])
+            deviation = np.linalg.norm(meshes[both, :, :2] - reference[both, :, :2], axis=2)
+            features = calculate_anthropometric_features(meshes[both])
+            reference_features = calculate_anthropometric_features(reference[both])
+            drift = np.mean(np.abs(features - reference_features) / np.maximum(np.abs(reference_features), 1e-9))
+            confidence = model.predict(features)[:, 0]
+            reference_confidence = model.predict(reference_features)[:, 0]
+            flips = np.mean(np.round(confidence) != np.round(reference_confidence))
+            print(f"{name:>9} {len(images) / seconds:>7.1f} {found.mean():>6.1%} {deviation.mean():>10.2f} "
+                  f"{np.percentile(deviation, 95):>7.2f} {100 * drift:>11.2f} "
+                  f"{np.abs(confidence - reference_confidence).mean():>9.4f} {flips:>17.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Pool de FaceMesh: Memória Compartilhada x Pickle
+=============================================================
+Simula vários clientes simultâneos enviando uploads JPEG de tamanhos diferentes e compara:
+- ``FaceMeshPool.detect_encoded``: decodificação direto no slot de memória compartilhada,
+- ``FaceMeshPool.detect_pickled``: decodificação na thread e envio do quadro por pickle,
+reportando requisições/segundo e latência média por tamanho de imagem.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_face_mesh_pool.py [workers] [clientes]
+
+@author: George Flores
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "backend")))
+
+from face_mesh_pool import FaceMeshPool  # noqa: E402
+from image_decoding import decode_image_bytes  # noqa: E402
+
+TEST_IMAGE = os.path.join(os.path.dirname(__file__), "..", "tests", "test_images", "test_face_valid_2.jpg")
+WIDTHS = [640, 1920, 3840]
+REQUESTS = 40
+
+
+def make_upload(width: int) -> bytes:
+    """
+    Gera um upload JPEG com a largura desejada a partir da foto de teste.
+
+    Args:
+        width (int): Largura da imagem gerada.
+
+    Returns:
+        bytes: Conteúdo do arquivo JPEG.
+    """
+    image = cv2.imread(TEST_IMAGE)
+    height = int(image.shape[0] * width / image.shape[1])
+    image = cv2.resize(image, (width, height), interpolation=cv2.INTER_CUBIC)
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def run_clients(handler, data: bytes, clients: int) -> tuple:
+    """
+    Dispara ``REQUESTS`` requisições com ``clients`` threads simultâneas.
+
+    Args:
+        handler (callable): Função que processa o upload e retorna os marcos.
+        data (bytes): Conteúdo do upload.
+        clients (int): Número de clientes simultâneos.
+
+    Returns:
+        tuple: (requisições/segundo, latência média em ms).
+    """
+    def timed(_):
+        start = time.perf_counter()
+        handler(data)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as threads:
+        latencies = list(threads.map(timed, range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    return REQUESTS / elapsed, 1000 * sum(latencies) / len(latencies)
+
+
+def main(workers: int = 2, clients: int = 4) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        workers (int): Número de processos detectores.
+        clients (int): Número de clientes simultâneos.
+
+    Returns:
+        None
+    """
+    with FaceMeshPool(num_workers=workers) as pool:
+        handlers = {
+            "memória compartilhada": pool.detect_encoded,
+            "pickle": lambda data: pool.detect_pickled(decode_image_bytes(data)),
+        }
+        print(f"{workers} detectores, {clients} clientes simultâneos, {REQUESTS} requisições por caso")
+        print(f"{'largura':>8} {'transporte':>22} {'req/s':>8} {'latência ms':>12}")
+        for width in WIDTHS:
+            data = make_upload(width)
+            for name, handler in handlers.items():
+                run_clients(handler, data, workers)  # aquecimento dos detectores
+                throughput, latency = run_clients(handler, data, clients)
+                print(f"{width:>8} {name:>22} {throughput:>8.1f} {latency:>12.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Modo de Vídeo (Rastreamento do FaceMesh)
+=====================================================
+Gera um vídeo sintético a partir das fotos de ``tests/test_images`` (cada foto vira um trecho
+com pequenos deslocamentos e ruído, simulando um indivíduo diante da câmera) e compara:
+- FaceMesh em modo estático (detecção completa a cada quadro),
+- FaceMesh em modo de rastreamento com suavização (``stream_face_mesh``),
+reportando quadros/segundo e a predição agregada de cada indivíduo.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_face_mesh_stream.py [quadros_por_foto]
+
+@author: George Flores
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from Face_Mesh_Extractor import detect_face_mesh, load_image, mp_face_mesh  # noqa: E402
+from face_mesh_stream import iter_video_frames, predict_stream, stream_face_mesh  # noqa: E402
+
+TEST_IMAGES_FOLDER = os.path.join(os.path.dirname(__file__), "..", "tests", "test_images")
+MODEL_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "src", "models", "best_model_3.0_layers_2_neurons_32_lr_0.001_epochs_30.h5"
+)
+FRAME_SIZE = (640, 480)
+
+
+def synthetic_clip(image_rgb: np.ndarray, num_frames: int, seed: int = 0) -> list:
+    """
+    Cria os quadros de um vídeo sintético a partir de uma foto.
+
+    Args:
+        image_rgb (np.ndarray): Foto RGB.
+        num_frames (int): Número de quadros do trecho.
+        seed (int): Semente do ruído.
+
+    Returns:
+        list: Quadros RGB com tamanho ``FRAME_SIZE``.
+    """
+    rng = np.random.default_rng(seed)
+    base = cv2.resize(image_rgb, FRAME_SIZE, interpolation=cv2.INTER_AREA)
+    frames = []
+    for t in range(num_frames):
+        # Pequeno movimento de cabeça (translação senoidal) e ruído de sensor
+        shift = np.float32([[1, 0, 6 * np.sin(t / 8)], [0, 1, 4 * np.cos(t / 11)]])
+        frame = cv2.warpAffine(base, shift, FRAME_SIZE, borderMode=cv2.BORDER_REFLECT)
+        noise = rng.normal(0, 3, frame.shape)
+        frames.append(np.clip(frame + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def write_video(frames: list, path: str) -> None:
+    """
+    Grava quadros RGB em um arquivo de vídeo MJPG.
+
+    Args:
+        frames (list): Quadros RGB.
+        path (str): Caminho do arquivo de vídeo.
+
+    Returns:
+        None
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, FRAME_SIZE)
+    for frame in frames:
+        writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+    writer.release()
+
+
+def main(frames_per_image: int = 90) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        frames_per_image (int): Número de quadros gerados por foto.
+
+    Returns:
+        None
+    """
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(MODEL_PATH)
+    image_files = sorted(f for f in os.listdir(TEST_IMAGES_FOLDER) if f.endswith((".jpg", ".png", ".jpeg")))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for seed, image_file in enumerate(image_files):
+            frames = synthetic_clip(load_image(os.path.join(TEST_IMAGES_FOLDER, image_file)), frames_per_image, seed)
+            video_path = os.path.join(tmp_dir, f"clip_{seed}.avi")
+            write_video(frames, video_path)
+
+            with mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1) as face_mesh:
+                start = time.perf_counter()
+                static_hits = sum(1 for frame in frames if detect_face_mesh(frame, face_mesh=face_mesh))
+                static_fps = len(frames) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            tracked_hits = sum(1 for _ in stream_face_mesh(frames))
+            tracking_fps = len(frames) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            result = predict_stream(iter_video_frames(video_path), model)
+            video_fps = len(frames) / (time.perf_counter() - start)
+
+            print(f"\n== {image_file}: {len(frames)} quadros ==")
+            print(f"Modo estático: {static_fps:.1f} quadros/s ({static_hits} com face)")
+            print(f"Modo rastreamento: {tracking_fps:.1f} quadros/s ({tracked_hits} com face)")
+            print(f"Vídeo completo (decodificação + rastreamento + predição): {video_fps:.1f} quadros/s")
+            print(f"Predição agregada: {result}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 90)
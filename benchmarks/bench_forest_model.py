@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da Random Forest Achatada
+===================================
+Treina o ``RandomForestClassifier(n_estimators=100, random_state=42)`` do notebook sobre os shards
+informados, achata a floresta com ``flatten_forest`` e compara com ``predict_proba``:
+- Latência de uma consulta (uma requisição ``/predict-autism``) e de um lote de 256 consultas,
+- Memória: bytes dos nós das árvores (scikit-learn x arrays achatados), tamanho do artefato em disco
+  e pico de alocações de uma predição em lote (``tracemalloc``),
+e confere que as probabilidades coincidem.
+
+Sem argumentos, usa os CSVs de distâncias do conjunto 3.0 de ``data/preprocessed_landmark``.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_forest_model.py [face_mesh_no_autism_3.0.csv face_mesh_with_autism_3.0.csv]
+
+@author: George Flores
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "backend")))
+
+from forest_model import flatten_forest, load_forest_model, save_forest_model  # noqa: E402
+from training_data_loader import iter_shard_chunks, list_shards  # noqa: E402
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data", "preprocessed_landmark")
+DEFAULT_SHARDS = [
+    os.path.join(DATA, "face_mesh_distances_no_autism_3.0.csv"),
+    os.path.join(DATA, "face_mesh_distances_with_autism_3.0.csv"),
+]
+
+
+def timed(function, repeat: int) -> float:
+    """Retorna o tempo médio, em segundos, de ``repeat`` chamadas de ``function`` (após um aquecimento)."""
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def peak_allocation(function) -> int:
+    """Retorna o pico de bytes alocados pelo Python e pelo NumPy durante uma chamada."""
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(paths: list) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        paths (list): Shards de treinamento (marcos ou distâncias).
+
+    Returns:
+        None
+    """
+    chunks = [(X, y) for path in list_shards(paths) for X, y, _ in iter_shard_chunks(path)]
+    X = np.concatenate([X for X, _ in chunks])
+    y = np.concatenate([y for _, y in chunks])
+    rng = np.random.default_rng(0)
+    queries = X[rng.choice(len(X), 256)] * rng.normal(1, 0.02, (256, X.shape[1]))
+
+    forest = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)
+    with tempfile.TemporaryDirectory() as folder:
+        forest_path = os.path.join(folder, "random_forest.joblib")
+        flat_path = os.path.join(folder, "random_forest.forest")
+        joblib.dump(forest, forest_path)
+        save_forest_model(flatten_forest(forest), flat_path)
+        model = load_forest_model(flat_path)
+        print(f"{len(X)} amostras, {model.num_trees} árvores, {len(model.feature)} nós, profundidade {model.max_depth}")
+
+        sklearn_bytes = sum(
+            e.tree_.__getstate__()["nodes"].nbytes + e.tree_.value.nbytes for e in forest.estimators_
+        )
+        print(f"{'':>22} {'nós KB':>8} {'disco KB':>9}")
+        print(f"{'scikit-learn':>22} {sklearn_bytes / 1024:>8.0f} {os.path.getsize(forest_path) / 1024:>9.0f}")
+        print(f"{'ForestModel':>22} {model.nbytes() / 1024:>8.0f} {os.path.getsize(flat_path) / 1024:>9.0f}")
+
+        methods = {
+            "predict_proba": lambda q: forest.predict_proba(q)[:, 1],
+            "ForestModel.predict": lambda q: model.predict(q)[:, 0],
+        }
+        reference = methods["predict_proba"](queries)
+        print(f"{'método':>22} {'1 consulta us':>14} {'lote us/consulta':>17} {'pico lote KB':>13} {'igual':>6}")
+        for name, predict in methods.items():
+            single = timed(lambda: predict(queries[:1]), 200)
+            batch = timed(lambda: predict(queries), 10) / len(queries)
+            peak = peak_allocation(lambda: predict(queries))
+            same = np.allclose(predict(queries), reference, atol=1e-6)
+            print(f"{name:>22} {1e6 * single:>14.0f} {1e6 * batch:>17.1f} {peak / 1024:>13.0f} {str(same):>6}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_SHARDS)
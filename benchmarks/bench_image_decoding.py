@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da Decodificação de Uploads
+=====================================
+Compara, para vários tamanhos de upload (JPEG gerado a partir de ``tests/test_images``):
+- O caminho antigo da API: ``Image.open`` + ``convert('RGB')`` + ``np.array``,
+- O decodificador com cópia mínima: ``image_decoding.decode_image_bytes``,
+reportando latência média e pico de memória adicional da decodificação.
+
+O pico de memória é medido pelo aumento do ``VmHWM`` (Linux) em um processo novo por caso, após
+zerar o pico com ``/proc/self/clear_refs``; isso inclui os buffers internos do PIL e do OpenCV,
+invisíveis ao ``tracemalloc``.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_image_decoding.py
+
+@author: George Flores
+"""
+
+import io
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from image_decoding import decode_image_bytes  # noqa: E402
+
+TEST_IMAGE = os.path.join(os.path.dirname(__file__), "..", "tests", "test_images", "test_face_valid_2.jpg")
+# Larguras das imagens geradas (mantendo a proporção da foto original)
+WIDTHS = [640, 1280, 2560, 4000]
+REPEATS = 10
+
+
+def decode_legacy(data: bytes) -> np.ndarray:
+    """
+    Decodifica como a API fazia antes: PIL, conversão para RGB e cópia para NumPy.
+
+    Args:
+        data (bytes): Conteúdo do arquivo JPEG.
+
+    Returns:
+        np.ndarray: Imagem RGB.
+    """
+    image = Image.open(io.BytesIO(data))
+    return np.array(image.convert("RGB"))
+
+
+DECODERS = {"PIL (antigo)": decode_legacy, "cv2.imdecode": decode_image_bytes}
+
+
+def make_upload(width: int) -> bytes:
+    """
+    Gera um upload JPEG com a largura desejada a partir da foto de teste.
+
+    Args:
+        width (int): Largura da imagem gerada.
+
+    Returns:
+        bytes: Conteúdo do arquivo JPEG.
+    """
+    image = cv2.imread(TEST_IMAGE)
+    height = int(image.shape[0] * width / image.shape[1])
+    image = cv2.resize(image, (width, height), interpolation=cv2.INTER_CUBIC)
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def _read_status_kb(field: str) -> int:
+    """
+    Lê um campo de memória (em kB) de ``/proc/self/status``.
+
+    Args:
+        field (str): Nome do campo, por exemplo ``VmHWM`` ou ``VmRSS``.
+
+    Returns:
+        int: Valor do campo em kB.
+    """
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def _measure_peak(decoder_name: str, data: bytes, queue) -> None:
+    """
+    Mede, em um processo novo, o aumento do pico de memória ao decodificar uma vez.
+
+    Args:
+        decoder_name (str): Nome do decodificador em ``DECODERS``.
+        data (bytes): Conteúdo do arquivo.
+        queue (multiprocessing.Queue): Fila para devolver o resultado em MB.
+
+    Returns:
+        None
+    """
+    # Zera o pico de RSS do processo (VmHWM passa a ser o RSS atual)
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+    baseline = _read_status_kb("VmRSS")
+    image = DECODERS[decoder_name](data)
+    peak = _read_status_kb("VmHWM")
+    queue.put(((peak - baseline) / 1024, image.nbytes / 2**20))
+
+
+def measure_peak(decoder_name: str, data: bytes) -> tuple:
+    """
+    Executa ``_measure_peak`` em um processo ``spawn`` isolado.
+
+    Args:
+        decoder_name (str): Nome do decodificador em ``DECODERS``.
+        data (bytes): Conteúdo do arquivo.
+
+    Returns:
+        tuple: (pico adicional em MB, tamanho da imagem decodificada em MB).
+    """
+    context = mp.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure_peak, args=(decoder_name, data, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main() -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Returns:
+        None
+    """
+    print(f"{'largura':>8} {'upload MB':>10} {'imagem MB':>10} {'decodificador':>14} {'latência ms':>12} {'pico MB':>8}")
+    for width in WIDTHS:
+        data = make_upload(width)
+        for name, decoder in DECODERS.items():
+            decoder(data)  # aquecimento
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                decoder(data)
+            latency = (time.perf_counter() - start) / REPEATS * 1000
+            peak, image_mb = measure_peak(name, data)
+            print(f"{width:>8} {len(data) / 2**20:>10.2f} {image_mb:>10.1f} {name:>14} {latency:>12.1f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
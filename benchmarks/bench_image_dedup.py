@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Índice de Deduplicação por Hash Perceptual
+=======================================================
+Sobre todas as imagens de ``data/raw`` e ``data/raw_processed`` (as duas classes), mede:
+- O cálculo dos pHashes com 1 thread e com uma thread por CPU,
+- A busca de duplicatas com ``HashIndex`` (tabela de múltiplos índices) contra a comparação
+  de todos os pares em NumPy (força bruta, quadrática),
+e confere que as duas buscas encontram os mesmos pares.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_image_dedup.py [--max-distance 6]
+
+@author: George Flores
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from image_dedup import HashIndex, hash_images, list_images  # noqa: E402
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+FOLDERS = [
+    "raw/no_autistic", "raw/with_autistic",
+    "raw_processed/processed_no_autistic_2.0", "raw_processed/processed_with_autistic_2.0",
+    "raw_processed/processed_no_autistic_3.0", "raw_processed/processed_with_autistic_3.0",
+]
+
+
+def brute_force_pairs(hashes: np.ndarray, max_distance: int) -> set:
+    """
+    Encontra todos os pares a até ``max_distance`` comparando cada hash com todos os anteriores.
+
+    Args:
+        hashes (np.ndarray): Hashes (N,) em uint64.
+        max_distance (int): Distância de Hamming máxima.
+
+    Returns:
+        set: Pares (i, j), com i < j.
+    """
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1)
+    pairs = set()
+    for j in range(1, len(hashes)):
+        distances = np.count_nonzero(bits[:j] != bits[j], axis=1)
+        pairs.update((int(i), j) for i in np.flatnonzero(distances <= max_distance))
+    return pairs
+
+
+def index_pairs(hashes: list, max_distance: int) -> set:
+    """Encontra os mesmos pares de ``brute_force_pairs`` com ``HashIndex`` (consulta e depois insere)."""
+    index = HashIndex(max_distance)
+    pairs = set()
+    for j, image_hash in enumerate(hashes):
+        pairs.update((i, j) for i, _ in index.query(image_hash))
+        index.add(image_hash, j)
+    return pairs
+
+
+def main(max_distance: int) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        max_distance (int): Distância de Hamming máxima para considerar duplicata.
+
+    Returns:
+        None
+    """
+    paths = [path for folder in FOLDERS for path in list_images(os.path.join(DATA, folder))]
+    print(f"{len(paths)} imagens, {os.cpu_count()} CPUs")
+
+    for workers in sorted({1, os.cpu_count()}):
+        start = time.perf_counter()
+        hashes = hash_images(paths, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"pHash com {workers} thread(s): {elapsed:.2f} s ({1e3 * elapsed / len(paths):.2f} ms por imagem)")
+    hashes = [h for h in hashes if h is not None]
+
+    start = time.perf_counter()
+    indexed = index_pairs(hashes, max_distance)
+    index_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    brute = brute_force_pairs(np.array(hashes, dtype=np.uint64), max_distance)
+    brute_seconds = time.perf_counter() - start
+
+    print(f"{'busca':>22} {'tempo s':>8} {'pares':>8}")
+    print(f"{'HashIndex':>22} {index_seconds:>8.3f} {len(indexed):>8}")
+    print(f"{'força bruta (NumPy)':>22} {brute_seconds:>8.3f} {len(brute):>8}")
+    print(f"Mesmos pares: {indexed == brute}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-distance", type=int, default=6)
+    main(parser.parse_args().max_distance)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Leitura das Imagens: Pastas x Shards Empacotados
+=============================================================
+Empacota as pastas informadas com ``image_shards.pack_images`` e compara, com o cache frio e quente,
+o tempo de leitura de todas as imagens:
+- Pastas: ``os.listdir`` e uma abertura/leitura de arquivo por imagem (como ``process_images_in_folder``),
+- Shards via ``ShardReader.read`` (``mmap``, acesso por índice),
+- Shards via ``ShardReader.iter_records`` (fluxo sequencial bufferizado),
+e, opcionalmente (``--decode``), o tempo incluindo a decodificação para RGB.
+
+O cache frio é obtido com ``posix_fadvise(POSIX_FADV_DONTNEED)`` em cada arquivo, que descarta as
+páginas do cache do sistema sem exigir privilégios de administrador (apenas Linux). Em um disco
+local os ganhos são menores que em sistemas de arquivos de rede, onde cada abertura de arquivo
+custa uma ida e volta ao servidor.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_image_shards.py [--decode] [pasta ...]
+
+@author: George Flores
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from image_decoding import decode_image_bytes  # noqa: E402
+from image_shards import IMAGE_EXTENSIONS, ShardReader, pack_images  # noqa: E402
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data", "raw_processed")
+DEFAULT_FOLDERS = [
+    os.path.join(DATA, "processed_no_autistic_3.0"),
+    os.path.join(DATA, "processed_with_autistic_3.0"),
+]
+
+
+def drop_cache(paths: list) -> None:
+    """Descarta do cache do sistema as páginas dos arquivos informados."""
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def read_folders(folders: list, decode: bool) -> int:
+    """Lê todas as imagens das pastas, uma abertura de arquivo por imagem."""
+    total = 0
+    for folder in folders:
+        for image_file in os.listdir(folder):
+            if image_file.lower().endswith(IMAGE_EXTENSIONS):
+                with open(os.path.join(folder, image_file), "rb") as file:
+                    data = file.read()
+                total += len(data)
+                if decode:
+                    decode_image_bytes(data)
+    return total
+
+
+def read_shards_mmap(shard_dir: str, decode: bool) -> int:
+    """Lê todos os registros por índice, via ``mmap``."""
+    total = 0
+    with ShardReader(shard_dir) as reader:
+        for record in reader.records():
+            data = reader.read(record)
+            total += len(data)
+            if decode:
+                decode_image_bytes(data)
+    return total
+
+
+def read_shards_stream(shard_dir: str, decode: bool) -> int:
+    """Lê todos os registros em fluxo sequencial."""
+    total = 0
+    with ShardReader(shard_dir) as reader:
+        for _, data in reader.iter_records():
+            total += len(data)
+            if decode:
+                decode_image_bytes(data)
+    return total
+
+
+def main(argv: list = None) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("folders", nargs="*", default=DEFAULT_FOLDERS)
+    parser.add_argument("--decode", action="store_true", help="Inclui a decodificação para RGB.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as shard_dir:
+        start = time.perf_counter()
+        index = pack_images({folder: label for label, folder in enumerate(args.folders)}, shard_dir)
+        pack_seconds = time.perf_counter() - start
+        images = len(index["records"]["name"])
+        print(f"{images} imagens empacotadas em {len(index['shards'])} shards em {pack_seconds:.2f} s")
+
+        image_paths = [
+            os.path.join(folder, f) for folder in args.folders
+            for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+        shard_paths = [os.path.join(shard_dir, shard) for shard in index["shards"]]
+        methods = {
+            "pastas (arquivo a arquivo)": (lambda: read_folders(args.folders, args.decode), image_paths),
+            "shards (mmap por índice)": (lambda: read_shards_mmap(shard_dir, args.decode), shard_paths),
+            "shards (fluxo sequencial)": (lambda: read_shards_stream(shard_dir, args.decode), shard_paths),
+        }
+
+        print(f"{'método':>28} {'frio s':>8} {'frio img/s':>11} {'quente s':>9} {'quente img/s':>13} {'MB':>6}")
+        for name, (read, paths) in methods.items():
+            cold = []
+            for _ in range(args.repeat):
+                drop_cache(paths)
+                start = time.perf_counter()
+                total = read()
+                cold.append(time.perf_counter() - start)
+            read()
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                read()
+            warm = (time.perf_counter() - start) / args.repeat
+            cold = min(cold)
+            print(f"{name:>28} {cold:>8.3f} {images / cold:>11.0f} {warm:>9.3f} {images / warm:>13.0f} "
+                  f"{total / 2**20:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
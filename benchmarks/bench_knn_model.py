@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Classificador KNN Servido por Árvore Mapeada em Memória
+====================================================================
+Exporta modelos KNN (``BallTree`` e ``KDTree``) a partir dos shards informados e compara, para
+uma consulta (uma requisição ``/predict-autism``) e para um lote de 256 consultas:
+- ``KNNModel.predict`` com o artefato mapeado em memória,
+- ``KNeighborsClassifier.predict_proba`` em um ``Pipeline`` com ``StandardScaler`` (notebook),
+- Força bruta em NumPy (todas as distâncias),
+além do tempo de carregamento do artefato com e sem mapeamento em memória.
+
+Sem argumentos, usa os CSVs de distâncias do conjunto 3.0 de ``data/preprocessed_landmark``.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_knn_model.py [face_mesh_no_autism_3.0.csv face_mesh_with_autism_3.0.csv]
+
+@author: George Flores
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "backend")))
+
+from knn_model import build_knn_model, load_knn_model, save_knn_model  # noqa: E402
+from training_data_loader import iter_shard_chunks, list_shards  # noqa: E402
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data", "preprocessed_landmark")
+DEFAULT_SHARDS = [
+    os.path.join(DATA, "face_mesh_distances_no_autism_3.0.csv"),
+    os.path.join(DATA, "face_mesh_distances_with_autism_3.0.csv"),
+]
+N_NEIGHBORS = 15
+
+
+def timed(function, repeat: int) -> float:
+    """Retorna o tempo médio, em segundos, de ``repeat`` chamadas de ``function`` (após um aquecimento)."""
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def brute_force(X: np.ndarray, y: np.ndarray, k: int):
+    """Retorna uma função que vota entre os ``k`` vizinhos calculando todas as distâncias."""
+    mean, scale = X.mean(axis=0), X.std(axis=0)
+    data = ((X - mean) / scale).astype(np.float32)
+    norms = (data ** 2).sum(axis=1)
+
+    def predict(queries):
+        q = ((queries - mean) / scale).astype(np.float32)
+        distances = norms - 2 * q @ data.T
+        return y[np.argpartition(distances, k, axis=1)[:, :k]].mean(axis=1)
+
+    return predict
+
+
+def main(paths: list) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        paths (list): Shards de treinamento (marcos ou distâncias).
+
+    Returns:
+        None
+    """
+    chunks = [(X, y) for path in list_shards(paths) for X, y, _ in iter_shard_chunks(path)]
+    X = np.concatenate([X for X, _ in chunks]).astype(np.float64)
+    y = np.concatenate([y for _, y in chunks])
+    rng = np.random.default_rng(0)
+    queries = X[rng.choice(len(X), 256)] * rng.normal(1, 0.02, (256, X.shape[1]))
+    print(f"{len(X)} amostras de treinamento, {X.shape[1]} features, k={N_NEIGHBORS}")
+
+    pipeline = make_pipeline(StandardScaler(), KNeighborsClassifier(N_NEIGHBORS)).fit(X, y)
+    methods = {"KNeighborsClassifier": lambda q: pipeline.predict_proba(q)[:, 1]}
+    methods["força bruta (NumPy)"] = brute_force(X, y, N_NEIGHBORS)
+
+    with tempfile.TemporaryDirectory() as folder:
+        for algorithm in ("ball_tree", "kd_tree"):
+            path = os.path.join(folder, f"{algorithm}.knn")
+            save_knn_model(build_knn_model(X, y, N_NEIGHBORS, algorithm=algorithm), path)
+            mapped = timed(lambda: load_knn_model(path), 20)
+            in_memory = timed(lambda: load_knn_model(path, mmap=False), 20)
+            print(f"{algorithm}: {os.path.getsize(path) / 1024:.0f} KB, carga mapeada {1e3 * mapped:.2f} ms, "
+                  f"em memória {1e3 * in_memory:.2f} ms")
+            methods[f"KNNModel {algorithm}"] = load_knn_model(path).predict
+
+        reference = methods["KNeighborsClassifier"](queries)
+        print(f"{'método':>24} {'1 consulta us':>14} {'lote us/consulta':>17} {'igual ao sklearn':>17}")
+        for name, predict in methods.items():
+            single = timed(lambda: predict(queries[:1]), 500)
+            batch = timed(lambda: predict(queries), 20) / len(queries)
+            same = np.allclose(np.ravel(predict(queries)), reference)
+            print(f"{name:>24} {1e6 * single:>14.0f} {1e6 * batch:>17.1f} {str(same):>17}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_SHARDS)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Aumento de Dados Vetorizado das Malhas Faciais
+===========================================================
+Mede a vazão (malhas/s) de ``LandmarkAugmenter`` em lotes de tamanhos diferentes:
+- Apenas o aumento (espelhamento, rotações, escala e ruído),
+- Aumento + cálculo das 39 distâncias (o que o ``ShardedDataset`` faz a cada bloco),
+- Referência: o mesmo aumento aplicado malha a malha (lotes de 1), como um laço por amostra faria.
+
+Para comparação, o FaceMesh processa cerca de 200 imagens 224 x 224 por segundo neste hardware
+(``bench_detector_profiles.py``): aumentar as imagens e extrair os marcos de novo limitaria o
+treinamento a essa vazão.
+
+Sem argumentos, usa malhas sintéticas geradas a partir do gabarito com pose, escala e ruído aleatórios.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_landmark_augmentation.py [face_mesh_no_autism_3.0.csv face_mesh_with_autism_3.0.csv]
+
+@author: George Flores
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from bench_mesh_alignment import load_meshes  # noqa: E402
+from face_mesh_alignment import load_template  # noqa: E402
+from face_mesh_features import calculate_anthropometric_features  # noqa: E402
+from landmark_augmentation import LandmarkAugmenter  # noqa: E402
+
+BATCH_SIZES = [1, 32, 256, 4096]
+LOOP_SAMPLES = 500
+
+
+def throughput(function, meshes: np.ndarray, batch_size: int) -> float:
+    """Aplica ``function`` a todas as malhas, em lotes de ``batch_size``, e retorna malhas/s."""
+    function(meshes[:batch_size])  # aquecimento
+    start = time.perf_counter()
+    for begin in range(0, len(meshes), batch_size):
+        function(meshes[begin:begin + batch_size])
+    return len(meshes) / (time.perf_counter() - start)
+
+
+def main(argv: list = None) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        argv (list, opcional): Caminhos dos CSVs de marcos. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    paths = sys.argv[1:] if argv is None else argv
+    meshes = load_meshes(paths, load_template()).astype(np.float32)
+    meshes = meshes[~np.isnan(meshes).any(axis=(1, 2))]
+    augmenter = LandmarkAugmenter(seed=0)
+    print(f"{len(meshes)} malhas ({'CSV' if paths else 'sintéticas'})")
+
+    baseline = throughput(augmenter.augment, meshes[:LOOP_SAMPLES], 1)
+    print(f"\nMalha a malha: {baseline:,.0f} malhas/s (aumento)")
+    print(f"Features sem aumento, lote inteiro: "
+          f"{throughput(calculate_anthropometric_features, meshes, len(meshes)):,.0f} malhas/s")
+
+    print(f"\n{'lote':>6} {'aumento/s':>12} {'aumento+features/s':>20} {'ganho':>7}")
+    for batch_size in BATCH_SIZES:
+        samples = meshes[:LOOP_SAMPLES] if batch_size == 1 else meshes
+        augment = throughput(augmenter.augment, samples, batch_size)
+        features = throughput(augmenter.features, samples, batch_size)
+        print(f"{batch_size:>6} {augment:>12,.0f} {features:>20,.0f} {augment / baseline:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
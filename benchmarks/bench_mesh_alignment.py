@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da Normalização de Pose por Procrustes em Lote
+========================================================
+Sobre os CSVs de marcos do conjunto 3.0 (gerados por ``process_images_in_folder`` a partir de
+``data/raw_processed/*_3.0``), compara:
+- ``align_meshes`` em lote (uma SVD em lote para todas as amostras),
+- ``align_meshes`` chamado amostra a amostra (custo por requisição na API),
+- ``scipy.spatial.procrustes`` amostra a amostra (referência),
+e mede o efeito nas 39 distâncias: correlação média com o tamanho da face e coeficiente de
+variação, antes e depois do alinhamento.
+
+Sem argumentos, usa malhas sintéticas geradas a partir do gabarito com pose, escala e ruído aleatórios.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_mesh_alignment.py [face_mesh_no_autism_3.0.csv face_mesh_with_autism_3.0.csv]
+
+@author: George Flores
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.spatial import procrustes
+from scipy.spatial.transform import Rotation
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from face_mesh_alignment import align_meshes, load_template  # noqa: E402
+from face_mesh_features import calculate_anthropometric_features  # noqa: E402
+from feature_discovery import load_face_mesh_csv  # noqa: E402
+
+Z_SCALE = 224.0  # largura dos recortes do conjunto 3.0
+SYNTHETIC_SAMPLES = 2516
+
+
+def load_meshes(paths: list, template: np.ndarray) -> np.ndarray:
+    """
+    Carrega as malhas dos CSVs ou gera malhas sintéticas a partir do gabarito.
+
+    Args:
+        paths (list): Caminhos dos CSVs (pode ser vazio).
+        template (np.ndarray): Gabarito (468, 3).
+
+    Returns:
+        np.ndarray: Malhas (N, 468, 3) com Z normalizado, como no MediaPipe.
+    """
+    if paths:
+        return np.concatenate([load_face_mesh_csv(path)[0] for path in paths]).astype(np.float64)
+    rng = np.random.default_rng(0)
+    rotations = Rotation.from_euler("xyz", rng.normal(0, 10, (SYNTHETIC_SAMPLES, 3)), degrees=True).as_matrix()
+    scales = rng.uniform(40, 90, (SYNTHETIC_SAMPLES, 1, 1))
+    meshes = scales * np.einsum("kd,ned->nke", template, rotations) + 112
+    meshes += rng.normal(0, 0.5, meshes.shape)
+    meshes[..., 2] /= Z_SCALE
+    return meshes
+
+
+def timed(function, repeat: int = 1) -> float:
+    """Retorna o tempo médio, em segundos, de ``repeat`` chamadas de ``function``."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def size_dependence(features: np.ndarray, size: np.ndarray) -> tuple:
+    """
+    Mede a dependência das features em relação ao tamanho da face.
+
+    Args:
+        features (np.ndarray): Features (N, 39).
+        size (np.ndarray): Tamanho do centróide de cada malha original (N,).
+
+    Returns:
+        tuple: (|correlação| média com o tamanho, coeficiente de variação médio).
+    """
+    correlation = [abs(np.corrcoef(column, size)[0, 1]) for column in features.T]
+    variation = features.std(axis=0) / features.mean(axis=0)
+    return float(np.mean(correlation)), float(np.mean(variation))
+
+
+def main(paths: list) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        paths (list): Caminhos dos CSVs de marcos.
+
+    Returns:
+        None
+    """
+    template = load_template()
+    meshes = load_meshes(paths, template)
+    pixels = meshes.copy()
+    pixels[..., 2] *= Z_SCALE
+    print(f"{len(meshes)} malhas {'dos CSVs' if paths else 'sintéticas'}")
+
+    batch = timed(lambda: align_meshes(meshes, template, z_scale=Z_SCALE), repeat=5)
+    sample = 200
+    single = timed(lambda: [align_meshes(mesh, template, z_scale=Z_SCALE) for mesh in meshes[:sample]]) / sample
+    reference = timed(lambda: [procrustes(template, mesh) for mesh in pixels[:sample]]) / sample
+
+    print(f"{'método':>30} {'total ms':>10} {'por malha us':>13}")
+    print(f"{'align_meshes em lote':>30} {1000 * batch:>10.1f} {1e6 * batch / len(meshes):>13.1f}")
+    print(f"{'align_meshes por amostra':>30} {1000 * single * len(meshes):>10.1f} {1e6 * single:>13.1f}")
+    print(f"{'scipy procrustes por amostra':>30} {1000 * reference * len(meshes):>10.1f} {1e6 * reference:>13.1f}")
+
+    centered = pixels - pixels.mean(axis=1, keepdims=True)
+    size = np.sqrt((centered ** 2).sum(axis=(1, 2)) / pixels.shape[1])
+    raw = size_dependence(calculate_anthropometric_features(pixels), size)
+    aligned = size_dependence(
+        calculate_anthropometric_features(align_meshes(meshes, template, z_scale=Z_SCALE)), size
+    )
+    print(f"{'distâncias':>12} {'|corr| com tamanho':>19} {'CV médio':>9}")
+    print(f"{'em pixels':>12} {raw[0]:>19.3f} {raw[1]:>9.3f}")
+    print(f"{'alinhadas':>12} {aligned[0]:>19.3f} {aligned[1]:>9.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da Avaliação de Modelos com Bootstrap Vetorizado
+==========================================================
+Compara, para vários tamanhos do conjunto de teste e números de modelos candidatos:
+- ``bootstrap_metrics`` (todas as reamostragens e modelos em operações de array),
+- Um laço Python por reamostragem e por modelo com ``sklearn.metrics.roc_auc_score`` e
+  ``accuracy_score`` (o que um notebook faria), medido em parte das reamostragens e extrapolado,
+e confere que as AUCs das duas abordagens são iguais nas mesmas reamostragens.
+
+As predições são sintéticas (modelos com separações diferentes e empates, como os da floresta e do
+KNN, que produzem frações de votos).
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_model_evaluation.py [--bootstrap 2000]
+
+@author: George Flores
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from model_evaluation import bootstrap_metrics, bootstrap_weights  # noqa: E402
+
+SIZES = [(500, 4), (5000, 4), (500, 16)]
+LOOP_RESAMPLES = 100
+
+
+def synthetic_predictions(num_samples: int, num_models: int, rng: np.random.Generator) -> tuple:
+    """Gera classes e predições (M, N) de modelos com separações crescentes; metade com empates."""
+    y_true = rng.integers(0, 2, num_samples)
+    separation = np.linspace(0, 2, num_models)[:, None]
+    scores = 1 / (1 + np.exp(-(rng.normal(size=(num_models, num_samples)) + separation * (y_true - 0.5))))
+    scores[::2] = np.round(scores[::2] * 15) / 15  # frações de votos, como KNN com 15 vizinhos
+    return y_true, scores
+
+
+def sklearn_loop(y_true: np.ndarray, scores: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Calcula AUC e acurácia reamostragem a reamostragem; retorna as AUCs (B, M)."""
+    auc = np.empty((len(weights), len(scores)))
+    for b, counts in enumerate(weights):
+        rows = np.repeat(np.arange(len(y_true)), counts.astype(int))
+        for m, model_scores in enumerate(scores):
+            auc[b, m] = roc_auc_score(y_true[rows], model_scores[rows])
+            accuracy_score(y_true[rows], model_scores[rows] >= 0.5)
+    return auc
+
+
+def main(argv: list = None) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bootstrap", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    print(f"{args.bootstrap} reamostragens; laço sklearn medido em {LOOP_RESAMPLES} e extrapolado")
+    print(f"{'amostras':>9} {'modelos':>8} {'vetorizado s':>13} {'laço sklearn s':>15} {'ganho':>7} {'|Δ AUC| máx':>12}")
+    for num_samples, num_models in SIZES:
+        y_true, scores = synthetic_predictions(num_samples, num_models, rng)
+        start = time.perf_counter()
+        bootstrap_metrics(y_true, scores, args.bootstrap)
+        vectorized = time.perf_counter() - start
+
+        # Mesmas reamostragens (mesma semente e bloco) nas duas abordagens
+        weights = bootstrap_weights(y_true, LOOP_RESAMPLES, np.random.default_rng(0))
+        start = time.perf_counter()
+        expected = sklearn_loop(y_true, scores, weights)
+        loop = (time.perf_counter() - start) * args.bootstrap / LOOP_RESAMPLES
+        result = bootstrap_metrics(y_true, scores, LOOP_RESAMPLES, chunk_size=LOOP_RESAMPLES)["auc"]
+        print(f"{num_samples:>9} {num_models:>8} {vectorized:>13.2f} {loop:>15.1f} {loop / vectorized:>6.0f}x "
+              f"{np.abs(result - expected).max():>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da Troca a Quente de Modelos
+======================================
+Simula clientes contínuos chamando ``ModelRegistry.select`` + ``predict`` enquanto uma nova versão
+do modelo é publicada no diretório observado (cópia para nome temporário + ``os.replace``), e
+reporta as latências p50/p99/máxima antes, durante e depois da troca, além de erros.
+
+O modelo novo é gerado a partir do modelo da API com pesos perturbados, para ter o mesmo número
+de features (39).
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_model_registry.py [clientes] [segundos_por_fase]
+
+@author: George Flores
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "backend")))
+
+from model_registry import ModelRegistry, wait_for_swap  # noqa: E402
+from prediction_cache import model_artifact_version  # noqa: E402
+
+MODEL_NAME = "best_model_3.0_layers_2_neurons_32_lr_0.001_epochs_30"
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "src", "models", MODEL_NAME + ".h5")
+
+
+def percentiles(latencies: list) -> str:
+    """Formata p50, p99 e máximo de uma lista de latências em segundos."""
+    if not latencies:
+        return f"{'-':>8} {'-':>8} {'-':>8}"
+    values = 1000 * np.asarray(latencies)
+    return f"{np.percentile(values, 50):>8.2f} {np.percentile(values, 99):>8.2f} {values.max():>8.2f}"
+
+
+def main(clients: int = 4, phase_seconds: float = 3.0) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        clients (int): Número de clientes simultâneos.
+        phase_seconds (float): Duração das fases antes e depois da troca.
+
+    Returns:
+        None
+    """
+    model_dir = tempfile.mkdtemp()
+    try:
+        shutil.copy(MODEL_PATH, model_dir)
+        registry = ModelRegistry(
+            model_dir, loader=tf.keras.models.load_model, version_of=model_artifact_version,
+            default_model=MODEL_NAME,
+        )
+        registry.start_watching(poll_interval=0.2)
+
+        # Versão candidata com pesos perturbados, salva fora do diretório observado
+        candidate = tf.keras.models.load_model(MODEL_PATH)
+        rng = np.random.default_rng(0)
+        candidate.set_weights([w + rng.normal(0, 0.01, w.shape) for w in candidate.get_weights()])
+        staging = os.path.join(tempfile.mkdtemp(), "staging.h5")
+        candidate.save(staging)
+
+        phase = ["antes"]
+        results = {"antes": [], "durante": [], "depois": []}
+        served = {}
+        errors = []
+        stop = threading.Event()
+        features = rng.uniform(0, 100, size=(1, 39))
+
+        def client():
+            while not stop.is_set():
+                current = phase[0]
+                start = time.perf_counter()
+                try:
+                    selected = registry.select()
+                    selected.model.predict(features, verbose=0)
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                results[current].append(time.perf_counter() - start)
+                served[selected.artifact_version] = served.get(selected.artifact_version, 0) + 1
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+
+        time.sleep(phase_seconds)
+        phase[0] = "durante"
+        swaps = registry.swaps
+        # O modelo novo substitui atomicamente o artefato da versão padrão
+        os.replace(staging, os.path.join(model_dir, MODEL_NAME + ".h5"))
+        swapped = wait_for_swap(registry, swaps)
+        phase[0] = "depois"
+        time.sleep(phase_seconds)
+
+        stop.set()
+        for thread in threads:
+            thread.join()
+        registry.stop_watching()
+
+        print(f"{clients} clientes simultâneos, troca {'concluída' if swapped else 'NÃO concluída'}")
+        print(f"{'fase':>8} {'predições':>10} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8}")
+        for name, latencies in results.items():
+            print(f"{name:>8} {len(latencies):>10} {percentiles(latencies)}")
+        print(f"Erros: {len(errors)}")
+        for artifact_version, count in served.items():
+            print(f"{count:>10} predições com {artifact_version}")
+    finally:
+        shutil.rmtree(model_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(*(cast(arg) for cast, arg in zip((int, float), sys.argv[1:3])))
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Memória do Servidor Pre-fork
+=========================================
+Sobe ``prefork_server.py`` com e sem pré-carregamento (``--no-preload`` importa a API em cada
+trabalhador, como N cópias independentes), aquece todos os trabalhadores com requisições de
+extração e predição e compara o RSS e o PSS (memória realmente ocupada, com as páginas
+compartilhadas divididas entre os processos) de cada trabalhador.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_prefork_memory.py [trabalhadores]
+
+@author: George Flores
+"""
+
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "backend")))
+
+from prefork_server import process_memory  # noqa: E402
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..", "src", "backend")
+TEST_IMAGE = os.path.join(os.path.dirname(__file__), "..", "tests", "test_images", "test_face_valid_2.jpg")
+PORT = 5077
+URL = f"http://127.0.0.1:{PORT}"
+
+
+def wait_ready(timeout: float = 120.0) -> None:
+    """Aguarda até que o servidor responda em ``/stats``."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{URL}/stats", timeout=timeout)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.5)
+    raise TimeoutError("O servidor não respondeu a tempo.")
+
+
+def warm_up(workers: int) -> set:
+    """
+    Envia requisições simultâneas até que todos os trabalhadores tenham atendido extração e predição.
+
+    Args:
+        workers (int): Número de trabalhadores do servidor.
+
+    Returns:
+        set: PIDs dos trabalhadores que atenderam.
+    """
+    with open(TEST_IMAGE, "rb") as f:
+        image = f.read()
+
+    def request(_):
+        mesh = requests.post(f"{URL}/extract-face-mesh", files={"image": image}).json()["faceMesh"]
+        requests.post(f"{URL}/predict-autism", json={"faceMesh": mesh})
+        return requests.get(f"{URL}/stats").json()["worker"]["pid"]
+
+    with ThreadPoolExecutor(2 * workers) as threads:
+        return set(threads.map(request, range(8 * workers)))
+
+
+def measure(workers: int, preload: bool) -> list:
+    """
+    Sobe o servidor em um modo, aquece os trabalhadores e mede a memória de cada um.
+
+    Args:
+        workers (int): Número de trabalhadores.
+        preload (bool): Se True, usa o pré-carregamento no processo pai.
+
+    Returns:
+        list: Memória (``process_memory``) do pai seguida da de cada trabalhador.
+    """
+    command = [sys.executable, "prefork_server.py", "--workers", str(workers), "--port", str(PORT),
+               "--report-interval", "0"]
+    if not preload:
+        command.append("--no-preload")
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready()
+        served = warm_up(workers)
+        with open(f"/proc/{server.pid}/task/{server.pid}/children") as f:
+            children = [int(pid) for pid in f.read().split()]
+        print(f"  {len(served)} de {len(children)} trabalhadores atenderam o aquecimento")
+        return [process_memory(server.pid)] + [process_memory(pid) for pid in children]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(workers: int = 4) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        workers (int): Número de trabalhadores.
+
+    Returns:
+        None
+    """
+    print(f"{'modo':>14} {'RSS/trab. MB':>13} {'PSS/trab. MB':>13} {'privada/trab. MB':>17} {'PSS total MB':>13}")
+    for preload in (False, True):
+        memories = measure(workers, preload)
+        parent, children = memories[0], memories[1:]
+        total_pss = parent["pssMb"] + sum(m["pssMb"] for m in children)
+        mean = {key: sum(m[key] for m in children) / len(children) for key in ("rssMb", "pssMb", "privateMb")}
+        name = "pre-fork" if preload else "independente"
+        print(f"{name:>14} {mean['rssMb']:>13.1f} {mean['pssMb']:>13.1f} {mean['privateMb']:>17.1f} {total_pss:>13.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Perfilamento Amostrado por Requisição
+==================================================
+Mede o custo do ``RequestProfiler`` em um app Flask com uma rota parecida com ``/extract-face-mesh``
+seguida de ``/predict-autism`` (processamento de imagem no OpenCV, que libera o GIL como o MediaPipe,
+features de um lote de malhas e um laço em Python), com o perfilamento desligado e perfilando 1 a
+cada 100, 1 a cada 10 e todas as requisições. As configurações são alternadas em rodadas para
+reduzir o efeito de ruído da máquina.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_request_profiler.py [rodadas]
+
+@author: George Flores
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from flask import Flask, jsonify
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "backend")))
+
+from face_mesh_features import calculate_anthropometric_features  # noqa: E402
+from request_profiler import RequestProfiler  # noqa: E402
+
+RNG = np.random.default_rng(0)
+IMAGE = RNG.integers(0, 255, (1024, 1024, 3), dtype=np.uint8)
+MESHES = RNG.uniform(0, 224, (128, 468, 3))
+SAMPLE_RATES = (0, 100, 10, 1)
+
+
+def create_app(profiler: RequestProfiler) -> Flask:
+    """Cria o app de teste com a rota ``/work`` e o perfilador instalado."""
+    app = Flask(__name__)
+
+    @app.route("/work")
+    def work():
+        image = cv2.GaussianBlur(IMAGE, (31, 31), 0)
+        features = calculate_anthropometric_features(MESHES)
+        total = float(image.mean())
+        for row in features.tolist():
+            total += sum(value * value for value in row)
+        return jsonify({"total": total})
+
+    profiler.install(app)
+    return app
+
+
+def main(rounds: int, requests_per_round: int = 25) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        rounds (int): Número de rodadas (cada rodada executa todas as configurações).
+        requests_per_round (int): Requisições por configuração em cada rodada.
+
+    Returns:
+        None
+    """
+    with tempfile.TemporaryDirectory() as root:
+        folders = {rate: os.path.join(root, str(rate)) for rate in SAMPLE_RATES}
+        clients = {
+            rate: create_app(RequestProfiler(folders[rate], sample_rate=rate, max_files=10 ** 6)).test_client()
+            for rate in SAMPLE_RATES
+        }
+        latencies = {rate: [] for rate in SAMPLE_RATES}
+        for client in clients.values():
+            client.get("/work")
+        for _ in range(rounds):
+            for rate, client in clients.items():
+                for _ in range(requests_per_round):
+                    start = time.perf_counter()
+                    client.get("/work")
+                    latencies[rate].append(1000 * (time.perf_counter() - start))
+
+        baseline = np.mean(latencies[0])
+        print(f"{'configuração':>14} {'média ms':>9} {'p50 ms':>7} {'p99 ms':>7} {'custo':>7} {'arquivos':>9}")
+        for rate in SAMPLE_RATES:
+            values = latencies[rate]
+            files = len(os.listdir(folders[rate])) if os.path.isdir(folders[rate]) else 0
+            name = "desligado" if rate == 0 else f"1 a cada {rate}"
+            print(f"{name:>14} {np.mean(values):>9.2f} {np.percentile(values, 50):>7.2f} "
+                  f"{np.percentile(values, 99):>7.2f} {100 * (np.mean(values) / baseline - 1):>6.1f}% {files:>9}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 12)
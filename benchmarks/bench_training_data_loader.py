@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Carregamento de Dados de Treinamento Fora da Memória
+=================================================================
+Gera shards CSV sintéticos de distâncias (replicando os CSVs do conjunto 3.0 com ruído) e compara:
+- O fluxo do notebook: ``pd.read_csv`` de tudo, ``concat``, ``StandardScaler`` e lotes em memória,
+- ``ShardedDataset`` lendo em blocos, com e sem a thread de pré-carregamento,
+medindo o pico de memória alocada (tracemalloc) e a vazão em amostras por segundo, e uma época de
+``model.fit`` em cada caso.
+
+Uso (a partir da pasta ``benchmarks``):
+    python bench_training_data_loader.py [linhas_totais]
+
+@author: George Flores
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from feature_ranking import NON_FEATURE_COLUMNS  # noqa: E402
+from feature_statistics import FeatureStatistics  # noqa: E402
+from training_data_loader import ShardedDataset, build_model, train_streaming  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "preprocessed_landmark")
+SOURCES = ["face_mesh_distances_no_autism_3.0.csv", "face_mesh_distances_with_autism_3.0.csv"]
+NUM_SHARDS = 8
+
+
+def write_shards(folder: str, total_rows: int) -> list:
+    """
+    Escreve ``NUM_SHARDS`` shards, metade de cada classe, replicando os CSVs de origem com ruído.
+
+    Args:
+        folder (str): Pasta de saída.
+        total_rows (int): Número total de linhas.
+
+    Returns:
+        list: Caminhos dos shards.
+    """
+    rng = np.random.default_rng(0)
+    paths = []
+    for index in range(NUM_SHARDS):
+        source = pd.read_csv(os.path.join(DATA_DIR, SOURCES[index % 2])).dropna()
+        shard = source.sample(total_rows // NUM_SHARDS, replace=True, random_state=index).reset_index(drop=True)
+        features = [c for c in shard.columns if c not in NON_FEATURE_COLUMNS]
+        shard[features] *= rng.normal(1.0, 0.02, (len(shard), len(features)))
+        paths.append(os.path.join(folder, f"shard_{index}.csv"))
+        shard.to_csv(paths[-1], index=False)
+    return paths
+
+
+def measure(function) -> tuple:
+    """Executa ``function`` e retorna (resultado, segundos, pico de memória alocada em MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def in_memory_batches(paths: list, batch_size: int = 32) -> int:
+    """Fluxo do notebook: carrega tudo, padroniza e percorre os lotes em memória."""
+    data = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True).dropna()
+    features = [c for c in data.columns if c not in NON_FEATURE_COLUMNS]
+    X = StandardScaler().fit_transform(data[features]).astype(np.float32)
+    y = data["class"].to_numpy()
+    order = np.random.default_rng(0).permutation(len(y))
+    X, y = X[order], y[order]
+    return sum(len(y[start:start + batch_size]) for start in range(0, len(y), batch_size))
+
+
+def streaming_statistics(paths: list) -> int:
+    """Ajusta a padronização do ``ShardedDataset`` (uma passada pelos shards)."""
+    dataset = ShardedDataset(paths)
+    dataset.fit_statistics()
+    return dataset.num_samples
+
+
+def streaming_batches(paths: list, statistics: FeatureStatistics, prefetch_batches: int) -> int:
+    """Percorre uma época do ``ShardedDataset`` já padronizado."""
+    dataset = ShardedDataset(paths, statistics=statistics, prefetch_batches=prefetch_batches)
+    if prefetch_batches:
+        return sum(len(y) for _, y in dataset.epoch(0))
+    return sum(len(y) for _, y in dataset._batches(0))
+
+
+def main(total_rows: int) -> None:
+    """
+    Executa o benchmark e imprime o relatório.
+
+    Args:
+        total_rows (int): Número total de linhas dos shards sintéticos.
+
+    Returns:
+        None
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_shards(folder, total_rows)
+        size = sum(os.path.getsize(path) for path in paths) / 2 ** 20
+        print(f"{NUM_SHARDS} shards, {total_rows} linhas, {size:.0f} MB em disco")
+
+        statistics = ShardedDataset(paths).fit_statistics()
+        print(f"{'passada pelos dados':>34} {'tempo s':>8} {'amostras/s':>11} {'pico MB':>8}")
+        cases = [
+            ("em memória (carga + época)", lambda: in_memory_batches(paths)),
+            ("em blocos, ajuste da padronização", lambda: streaming_statistics(paths)),
+            ("em blocos, época sem thread", lambda: streaming_batches(paths, statistics, 0)),
+            ("em blocos, época com thread", lambda: streaming_batches(paths, statistics, 8)),
+        ]
+        for name, function in cases:
+            count, elapsed, peak = measure(function)
+            print(f"{name:>34} {elapsed:>8.2f} {count / elapsed:>11.0f} {peak:>8.1f}")
+
+        train = ShardedDataset(paths, batch_size=256, statistics=statistics)
+        model = build_model(statistics.num_features)
+        history = train_streaming(model, train, epochs=2)
+        print(f"model.fit em blocos (lotes de 256): {history.history['samples_per_second'][-1]:.0f} amostras/s")
+
+        data = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True).dropna()
+        X = statistics.transform(data[[c for c in data.columns if c not in NON_FEATURE_COLUMNS]].to_numpy())
+        model = build_model(X.shape[1])
+        model.fit(X, data["class"].to_numpy(), batch_size=256, epochs=1, verbose=0)
+        start = time.perf_counter()
+        model.fit(X, data["class"].to_numpy(), batch_size=256, epochs=1, verbose=0)
+        print(f"model.fit em memória (lotes de 256): {len(X) / (time.perf_counter() - start):.0f} amostras/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400000)
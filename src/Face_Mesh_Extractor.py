@@ -14,6 +14,7 @@ Criado em: Sexta-feira, dia 27 de Setembro de 2024
 @author: George Flores
 """
 
+import argparse
 import os
 import cv2
 import mediapipe as mp
@@ -22,8 +23,16 @@ import numpy as np
 import matplotlib.pyplot as plt
 from tqdm import tqdm
 
-# Inicializa a solução Face Mesh do MediaPipe
+from detector_profiles import NUM_LANDMARKS, get_profile
+from feature_extraction import detect_faces
+from image_decoding import decode_image_file
+from image_dedup import HashIndex, perceptual_hash
+from image_shards import ShardReader, is_shard_dir
+from memory_profiling import StageMemoryTracker, format_report, save_report
+
+# Inicializa as soluções Face Mesh e Face Detection do MediaPipe
 mp_face_mesh = mp.solutions.face_mesh
+mp_face_detection = mp.solutions.face_detection
 
 def load_image(image_path: str, debug: bool = False) -> np.ndarray:
     """
@@ -39,43 +48,305 @@ def load_image(image_path: str, debug: bool = False) -> np.ndarray:
     Raises:
         FileNotFoundError: Se o arquivo da imagem não for encontrado.
     """
-    if os.path.exists(image_path):
-        if debug:
-            print(f"Imagem {image_path} carregada com sucesso.")
-        image = cv2.imread(image_path)
-        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    else:
-        raise FileNotFoundError(f"Imagem não encontrada: {image_path}")
+    # Mesmo decodificador dos uploads da API: um único buffer, orientação EXIF e RGB no lugar
+    image = decode_image_file(image_path)
+    if debug:
+        print(f"Imagem {image_path} carregada com sucesso.")
+    return image
+
+
+def landmarks_from_results(
+    results, width: int, height: int, offset_x: int = 0, offset_y: int = 0, z_scale: float = 1.0
+) -> list:
+    """
+    Converte o resultado do MediaPipe FaceMesh em uma lista de marcos (x, y, z) em pixels.
 
+    Apenas os 468 pontos da malha são mantidos (com ``refine_landmarks``, o FaceMesh acrescenta
+    10 pontos das íris).
 
-def detect_face_mesh(image_rgb: np.ndarray, debug: bool = False) -> list:
+    Args:
+        results: Resultado retornado por ``FaceMesh.process``.
+        width (int): Largura da imagem (ou recorte) processada.
+        height (int): Altura da imagem (ou recorte) processada.
+        offset_x (int): Deslocamento horizontal do recorte na imagem completa.
+        offset_y (int): Deslocamento vertical do recorte na imagem completa.
+        z_scale (float): Fator para reescalar Z para a largura da imagem completa.
+
+    Returns:
+        list: Lista de marcos faciais 3D, onde cada conjunto contém as coordenadas (x, y, z).
+    """
+    landmarks_3d = []
+    if results.multi_face_landmarks:
+        for face_landmarks in results.multi_face_landmarks:
+            for lm in face_landmarks.landmark[:NUM_LANDMARKS]:
+                # Converte as coordenadas de normalizadas para pixel
+                x = int(lm.x * width) + offset_x
+                y = int(lm.y * height) + offset_y
+                z = lm.z * z_scale  # Z permanece em valor normalizado
+                landmarks_3d.append((x, y, z))
+    return landmarks_3d
+
+
+def detect_face_mesh(image_rgb: np.ndarray, debug: bool = False, face_mesh=None, profile=None) -> list:
     """
     Detecta marcos faciais 3D usando o MediaPipe FaceMesh.
 
     Args:
         image_rgb (np.ndarray): Imagem RGB carregada.
         debug (bool): Se True, exibe informações de debug.
+        face_mesh (mp_face_mesh.FaceMesh, opcional): Instância já criada do FaceMesh
+            para ser reutilizada (criada com ``DetectorProfile.face_mesh`` do mesmo perfil).
+            Se None, uma nova instância é criada para a chamada.
+        profile (str | DetectorProfile, opcional): Perfil de velocidade (ver ``detector_profiles``).
+            Padrão: ``balanced``.
 
     Returns:
         list: Lista de marcos faciais 3D, onde cada conjunto contém as coordenadas (x, y, z).
     """
-    with mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1) as face_mesh:
-        results = face_mesh.process(image_rgb)
-        landmarks_3d = []
-        if results.multi_face_landmarks:
-            for face_landmarks in results.multi_face_landmarks:
-                for lm in face_landmarks.landmark:
-                    # Converte as coordenadas de normalizadas para pixel
-                    height, width, _ = image_rgb.shape
-                    x = int(lm.x * width)
-                    y = int(lm.y * height)
-                    z = lm.z  # Z permanece em valor normalizado
-                    landmarks_3d.append((x, y, z))
-
-        if debug and len(landmarks_3d) > 0:
-            print(f"{len(landmarks_3d)} marcos faciais detectados em 3D.")
-        
-        return landmarks_3d
+    detector = get_profile(profile)
+    height, width, _ = image_rgb.shape
+    # Os marcos são normalizados: a imagem reduzida pelo perfil é convertida com as dimensões originais
+    image_input = detector.resize(image_rgb)
+    if face_mesh is None:
+        with detector.face_mesh() as face_mesh:
+            results = face_mesh.process(image_input)
+    else:
+        results = face_mesh.process(image_input)
+
+    landmarks_3d = landmarks_from_results(results, width, height)
+
+    if debug and len(landmarks_3d) > 0:
+        print(f"{len(landmarks_3d)} marcos faciais detectados em 3D.")
+
+    return landmarks_3d
+
+
+def detect_face_roi(
+    image_rgb: np.ndarray,
+    haarcascade: str,
+    detection_width: int = 320,
+    padding: float = 0.25,
+    min_face_fraction: float = 0.2,
+    debug: bool = False,
+    scale_factor: float = 1.1,
+    min_neighbors: int = 3,
+) -> tuple:
+    """
+    Localiza a face com o Haarcascade em baixa resolução e retorna uma região de interesse com margem.
+
+    A imagem é convertida para escala de cinza e reduzida para ``detection_width`` pixels de
+    largura antes da detecção, o que torna esta etapa muito mais barata que o FaceMesh.
+
+    Args:
+        image_rgb (np.ndarray): Imagem RGB carregada.
+        haarcascade (str): Caminho do classificador Haarcascade.
+        detection_width (int): Largura máxima usada na detecção. Imagens menores não são reduzidas.
+        padding (float): Margem adicionada em cada lado da face, como fração do seu tamanho.
+        min_face_fraction (float): Tamanho mínimo da face como fração do menor lado da imagem.
+            Descartar escalas pequenas é o que torna o ``detectMultiScale`` barato.
+        debug (bool): Se True, exibe informações de debug.
+        scale_factor (float): ``scaleFactor`` do ``detectMultiScale``.
+        min_neighbors (int): ``minNeighbors`` do ``detectMultiScale``.
+
+    Returns:
+        tuple: Coordenadas (x0, y0, x1, y1) da região na imagem completa, ou None se nenhuma
+        face for encontrada.
+
+    Raises:
+        FileNotFoundError: Se o classificador Haarcascade não for encontrado.
+    """
+    height, width, _ = image_rgb.shape
+    scale = min(1.0, detection_width / width)
+
+    image_gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+    if scale < 1.0:
+        image_gray = cv2.resize(image_gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    min_side = int(min(image_gray.shape) * min_face_fraction)
+    faces = detect_faces(
+        image_gray, haarcascade, debug=debug, scale_factor=scale_factor, min_neighbors=min_neighbors,
+        min_size=(min_side, min_side),
+    )
+    if len(faces) == 0:
+        return None
+
+    # Mantém apenas a maior face, coerente com max_num_faces=1 no FaceMesh
+    fx, fy, fw, fh = max(faces, key=lambda f: f[2] * f[3]) / scale
+    pad_x, pad_y = fw * padding, fh * padding
+    x0 = max(0, int(fx - pad_x))
+    y0 = max(0, int(fy - pad_y))
+    x1 = min(width, int(fx + fw + pad_x))
+    y1 = min(height, int(fy + fh + pad_y))
+
+    if debug:
+        print(f"Região de interesse da face: {(x0, y0, x1, y1)}")
+
+    return x0, y0, x1, y1
+
+
+def detect_face_mesh_cascade(
+    image_rgb: np.ndarray,
+    haarcascade: str,
+    detection_width: int = None,
+    padding: float = 0.25,
+    min_face_fraction: float = 0.2,
+    debug: bool = False,
+    face_mesh=None,
+    profile=None,
+) -> list:
+    """
+    Detecta marcos faciais 3D em duas etapas: Haarcascade para localizar a face e FaceMesh no recorte.
+
+    Imagens sem face detectada pelo Haarcascade são rejeitadas antes da etapa cara (FaceMesh).
+    Os marcos são mapeados de volta para as coordenadas da imagem completa, e Z é reescalado
+    para a largura da imagem completa, mantendo o mesmo formato de ``detect_face_mesh``.
+
+    Args:
+        image_rgb (np.ndarray): Imagem RGB carregada.
+        haarcascade (str): Caminho do classificador Haarcascade.
+        detection_width (int, opcional): Largura máxima usada na detecção do Haarcascade.
+            Padrão: a do perfil (320 no ``balanced``).
+        padding (float): Margem adicionada em cada lado da face, como fração do seu tamanho.
+        min_face_fraction (float): Tamanho mínimo da face como fração do menor lado da imagem.
+        debug (bool): Se True, exibe informações de debug.
+        face_mesh (mp_face_mesh.FaceMesh, opcional): Instância já criada do FaceMesh para reutilizar.
+        profile (str | DetectorProfile, opcional): Perfil de velocidade, que define os parâmetros do
+            Haarcascade e do FaceMesh (ver ``detector_profiles``). Padrão: ``balanced``.
+
+    Returns:
+        list: Lista de marcos faciais 3D (x, y, z) na imagem completa, ou lista vazia se a
+        imagem for rejeitada ou o FaceMesh não encontrar a face no recorte.
+    """
+    detector = get_profile(profile)
+    roi = detect_face_roi(
+        image_rgb, haarcascade, detection_width or detector.haar_detection_width, padding, min_face_fraction,
+        debug=debug, scale_factor=detector.haar_scale_factor, min_neighbors=detector.haar_min_neighbors,
+    )
+    if roi is None:
+        if debug:
+            print("Nenhuma face encontrada pelo Haarcascade. Imagem rejeitada antes do FaceMesh.")
+        return []
+
+    x0, y0, x1, y1 = roi
+    crop = np.ascontiguousarray(image_rgb[y0:y1, x0:x1])
+    crop_height, crop_width, _ = crop.shape
+
+    if face_mesh is None:
+        with detector.face_mesh() as face_mesh:
+            results = face_mesh.process(detector.resize(crop))
+    else:
+        results = face_mesh.process(detector.resize(crop))
+
+    landmarks_3d = landmarks_from_results(
+        results, crop_width, crop_height, offset_x=x0, offset_y=y0,
+        z_scale=crop_width / image_rgb.shape[1],
+    )
+
+    if debug and len(landmarks_3d) > 0:
+        print(f"{len(landmarks_3d)} marcos faciais detectados em 3D no recorte {roi}.")
+
+    return landmarks_3d
+
+
+def _box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """
+    Calcula a interseção sobre união entre uma caixa e um conjunto de caixas (x0, y0, x1, y1).
+
+    Args:
+        box (np.ndarray): Caixa de referência.
+        boxes (np.ndarray): Caixas com formato (N, 4).
+
+    Returns:
+        np.ndarray: Valores de IoU com formato (N,).
+    """
+    x0 = np.maximum(box[0], boxes[:, 0])
+    y0 = np.maximum(box[1], boxes[:, 1])
+    x1 = np.minimum(box[2], boxes[:, 2])
+    y1 = np.minimum(box[3], boxes[:, 3])
+    intersection = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return intersection / np.maximum(area + areas - intersection, 1e-9)
+
+
+def detect_face_meshes(
+    image_rgb: np.ndarray,
+    max_num_faces: int = 10,
+    debug: bool = False,
+    face_mesh=None,
+    face_detection=None,
+    profile=None,
+) -> tuple:
+    """
+    Detecta os marcos faciais 3D de todas as faces de uma imagem em uma única passada do FaceMesh.
+
+    O FaceMesh não retorna uma pontuação por face; a confiança de cada face vem do
+    MediaPipe Face Detection, associado à malha pela maior sobreposição (IoU) entre caixas.
+
+    Args:
+        image_rgb (np.ndarray): Imagem RGB carregada.
+        max_num_faces (int): Número máximo de faces detectadas.
+        debug (bool): Se True, exibe informações de debug.
+        face_mesh (mp_face_mesh.FaceMesh, opcional): Instância já criada do FaceMesh, que deve ter
+            sido criada com ``max_num_faces`` suficiente.
+        face_detection (mp_face_detection.FaceDetection, opcional): Instância já criada do Face Detection.
+        profile (str | DetectorProfile, opcional): Perfil de velocidade do FaceMesh (ver
+            ``detector_profiles``). Padrão: ``balanced``.
+
+    Returns:
+        tuple: Três arrays:
+            - marcos faciais com formato (F, 468, 3), em pixels para X e Y e Z normalizado,
+            - caixas delimitadoras (F, 4) no formato (x0, y0, x1, y1),
+            - confiança da detecção (F,), NaN quando nenhuma detecção corresponde à malha.
+    """
+    detector = get_profile(profile)
+    height, width, _ = image_rgb.shape
+    image_input = detector.resize(image_rgb)
+    if face_mesh is None:
+        with detector.face_mesh(max_num_faces) as face_mesh:
+            results = face_mesh.process(image_input)
+    else:
+        results = face_mesh.process(image_input)
+
+    if not results.multi_face_landmarks:
+        return np.empty((0, 468, 3)), np.empty((0, 4)), np.empty(0)
+
+    meshes = np.array([
+        [(lm.x, lm.y, lm.z) for lm in face_landmarks.landmark[:NUM_LANDMARKS]]
+        for face_landmarks in results.multi_face_landmarks
+    ])
+    # Converte as coordenadas de normalizadas para pixel (mesma truncagem de int())
+    meshes[..., 0] = np.trunc(meshes[..., 0] * width)
+    meshes[..., 1] = np.trunc(meshes[..., 1] * height)
+    boxes = np.concatenate([meshes[..., :2].min(axis=1), meshes[..., :2].max(axis=1)], axis=1)
+
+    if face_detection is None:
+        with mp_face_detection.FaceDetection(model_selection=1) as face_detection:
+            detections = face_detection.process(image_rgb).detections or []
+    else:
+        detections = face_detection.process(image_rgb).detections or []
+
+    confidences = np.full(len(meshes), np.nan)
+    if detections:
+        detection_boxes = np.array([
+            (
+                d.location_data.relative_bounding_box.xmin * width,
+                d.location_data.relative_bounding_box.ymin * height,
+                (d.location_data.relative_bounding_box.xmin + d.location_data.relative_bounding_box.width) * width,
+                (d.location_data.relative_bounding_box.ymin + d.location_data.relative_bounding_box.height) * height,
+            )
+            for d in detections
+        ])
+        scores = np.array([d.score[0] for d in detections])
+        for i, box in enumerate(boxes):
+            iou = _box_iou(box, detection_boxes)
+            if iou.max() > 0:
+                confidences[i] = scores[iou.argmax()]
+
+    if debug:
+        print(f"{len(meshes)} faces detectadas com confiança {confidences}.")
+
+    return meshes, boxes, confidences
 
 
 def plot_landmarks(image: np.ndarray, landmarks: list, debug: bool = False) -> None:
@@ -190,57 +461,169 @@ def save_landmarks_to_csv(landmarks: list, image_num: int, class_label: int, out
             print(f"Adicionado marcos faciais da imagem {image_num} ao arquivo {output_file}.")
 
 
-def process_images_in_folder(
-    folder_path: str, output_csv: str, class_label: int, debug: bool = False
+def save_face_meshes_to_csv(
+    meshes: np.ndarray, image_num: int, class_label: int, output_file: str, debug: bool = False
 ) -> None:
     """
-    Processa todas as imagens em uma pasta, detectando marcos faciais 3D,
-    e salvando os resultados em um único CSV.
+    Salva os marcos faciais de todas as faces de uma imagem em um arquivo CSV, uma linha por face.
+
+    As colunas seguem ``save_landmarks_to_csv`` com a coluna adicional ``face``, que identifica
+    a face dentro da imagem.
 
     Args:
-        folder_path (str): Caminho da pasta contendo as imagens.
-        output_csv (str): Caminho do arquivo CSV onde os marcos faciais serão salvos.
-        class_label (int): Rótulo da classe para a imagem (0 para sem autismo, 1 para com autismo).
+        meshes (np.ndarray): Marcos faciais com formato (F, 468, 3).
+        image_num (int): Número da imagem atual.
+        class_label (int): Rótulo da classe para a imagem.
+        output_file (str): Nome do arquivo CSV onde os marcos serão salvos.
         debug (bool): Se True, exibe informações de debug.
 
     Returns:
         None
     """
-    image_files = [
-        f for f in os.listdir(folder_path) if f.endswith((".jpg", ".png", ".jpeg"))
-    ]
-
-    for i, image_file in enumerate(tqdm(image_files, desc=f"Processando {class_label}")):
-        image_path = os.path.join(folder_path, image_file)
-        if debug:
-            print(f"\nProcessando imagem {i + 1}: {image_file}")
-
-        try:
-            # Carregar a imagem
-            image_rgb = load_image(image_path, debug=debug)
-            image_rgb_main_landmarks = load_image(image_path, debug=debug)
-
-            # Detectar marcos faciais
-            landmarks = detect_face_mesh(image_rgb, debug=debug)
+    num_faces, num_landmarks, _ = meshes.shape
+    columns = ["amostra", "face", "class"]
+    for i in range(num_landmarks):
+        columns.extend([f"X{i}", f"Y{i}", f"Z{i}"])
 
-            if len(landmarks) == 0:
-                if debug:
-                    print(f"Nenhuma face detectada em {image_file}. Pulando para a próxima imagem.")
-                continue
+    df = pd.DataFrame(meshes.reshape(num_faces, -1), columns=columns[3:])
+    df.insert(0, "class", class_label)
+    df.insert(0, "face", np.arange(num_faces))
+    df.insert(0, "amostra", image_num)
 
-            if i < 5:
-                # Plotar os landmarks
-                plot_landmarks(image_rgb, landmarks, debug=debug)
-                plot_main_landmarks(image_rgb_main_landmarks, pd.Series(landmarks), debug=debug)
+    header = not os.path.exists(output_file)
+    df.to_csv(output_file, mode="w" if header else "a", header=header, index=False)
+    if debug:
+        print(f"Salvos os marcos faciais de {num_faces} faces da imagem {image_num} em {output_file}.")
 
-            # Salvar os marcos em um CSV
-            save_landmarks_to_csv(landmarks, i + 1, class_label, output_csv, debug=debug)
 
-        except FileNotFoundError as e:
-            print(f"Arquivo não encontrado: {e}")
+def process_images_in_folder(
+    folder_path: str, output_csv: str, class_label: int, debug: bool = False,
+    haarcascade: str = None, max_num_faces: int = 1, memory_report: str = None,
+    trace_allocations: bool = True,
+    dedup_index: HashIndex = None,
+    profile: str = None,
+) -> None:
+    """
+    Processa todas as imagens em uma pasta, detectando marcos faciais 3D,
+    e salvando os resultados em um único CSV.
 
+    Args:
+        folder_path (str): Caminho da pasta contendo as imagens, ou de uma pasta de shards
+            empacotados (ver ``image_shards``), da qual são lidas as imagens com o rótulo ``class_label``.
+        output_csv (str): Caminho do arquivo CSV onde os marcos faciais serão salvos.
+        class_label (int): Rótulo da classe para a imagem (0 para sem autismo, 1 para com autismo).
+        debug (bool): Se True, exibe informações de debug.
+        haarcascade (str, opcional): Caminho do classificador Haarcascade. Se informado, usa a
+            detecção em duas etapas (``detect_face_mesh_cascade``) em vez do FaceMesh na imagem inteira.
+        max_num_faces (int): Se maior que 1, extrai todas as faces de cada imagem com
+            ``detect_face_meshes`` e salva uma linha por face com ``save_face_meshes_to_csv``.
+        memory_report (str, opcional): Caminho de um relatório JSON de memória por etapa
+            (decodificação, detecção, plotagem e escrita; ver ``memory_profiling``). Se informado,
+            mede cada etapa e imprime o resumo ao final.
+        trace_allocations (bool): Se False, o relatório de memória mede só RSS e tempo, sem o custo
+            do ``tracemalloc`` (indicado para execuções longas).
+        dedup_index (HashIndex, opcional): Índice de hashes perceptuais (ver ``image_dedup``).
+            Se informado, imagens repetidas ou quase repetidas de outras já indexadas são puladas;
+            use o mesmo índice nas pastas das duas classes para detectar duplicatas entre classes.
+        profile (str, opcional): Perfil de velocidade dos detectores (``fast``, ``balanced`` ou
+            ``accurate``; ver ``detector_profiles``). Padrão: ``balanced``.
 
-def main():
+    Returns:
+        None
+    """
+    # Um único FaceMesh do perfil para a pasta inteira (modo de imagem estática: sem rastreamento)
+    detector = get_profile(profile)
+    face_mesh = detector.face_mesh(max_num_faces)
+
+    # O FaceMesh e o leitor de shards são fechados mesmo se uma exceção interromper a pasta
+    shard_reader = None
+    try:
+        if is_shard_dir(folder_path):
+            # Shards empacotados (ver image_shards): apenas os registros desta classe, em ordem de leitura
+            shard_reader = ShardReader(folder_path)
+            records = shard_reader.records(label=class_label)
+            image_files = [shard_reader.names[record] for record in records]
+        else:
+            image_files = [
+                f for f in os.listdir(folder_path) if f.endswith((".jpg", ".png", ".jpeg"))
+            ]
+        tracker = StageMemoryTracker(
+            enabled=memory_report is not None, trace_allocations=trace_allocations
+        ).start()
+
+        for i, image_file in enumerate(tqdm(image_files, desc=f"Processando {class_label}")):
+            image_path = os.path.join(folder_path, image_file)
+            if debug:
+                print(f"\nProcessando imagem {i + 1}: {image_file}")
+
+            try:
+                # Carregar a imagem (uma única decodificação; a cópia para os marcos principais só é
+                # feita nas imagens plotadas)
+                with tracker.stage("decode"):
+                    if shard_reader is not None:
+                        image_rgb = shard_reader.decode(records[i], debug=debug)
+                    else:
+                        image_rgb = load_image(image_path, debug=debug)
+
+                if dedup_index is not None:
+                    with tracker.stage("dedup"):
+                        duplicate = dedup_index.check_duplicate(
+                            perceptual_hash(image_rgb), image_path, class_label, debug=debug
+                        )
+                    if duplicate:
+                        continue
+
+                if max_num_faces > 1:
+                    with tracker.stage("detection"):
+                        meshes, _, _ = detect_face_meshes(
+                            image_rgb, max_num_faces, debug=debug, face_mesh=face_mesh, profile=detector
+                        )
+                    if len(meshes) > 0:
+                        with tracker.stage("writing"):
+                            save_face_meshes_to_csv(meshes, i + 1, class_label, output_csv, debug=debug)
+                    elif debug:
+                        print(f"Nenhuma face detectada em {image_file}. Pulando para a próxima imagem.")
+                    continue
+
+                # Detectar marcos faciais
+                with tracker.stage("detection"):
+                    if haarcascade is not None:
+                        landmarks = detect_face_mesh_cascade(
+                            image_rgb, haarcascade, debug=debug, face_mesh=face_mesh, profile=detector
+                        )
+                    else:
+                        landmarks = detect_face_mesh(image_rgb, debug=debug, face_mesh=face_mesh, profile=detector)
+
+                if len(landmarks) == 0:
+                    if debug:
+                        print(f"Nenhuma face detectada em {image_file}. Pulando para a próxima imagem.")
+                    continue
+
+                if i < 5:
+                    # Plotar os landmarks
+                    with tracker.stage("plotting"):
+                        image_rgb_main_landmarks = image_rgb.copy()
+                        plot_landmarks(image_rgb, landmarks, debug=debug)
+                        plot_main_landmarks(image_rgb_main_landmarks, pd.Series(landmarks), debug=debug)
+
+                # Salvar os marcos em um CSV
+                with tracker.stage("writing"):
+                    save_landmarks_to_csv(landmarks, i + 1, class_label, output_csv, debug=debug)
+
+            except FileNotFoundError as e:
+                print(f"Arquivo não encontrado: {e}")
+    finally:
+        face_mesh.close()
+        if shard_reader is not None:
+            shard_reader.close()
+
+    if memory_report is not None:
+        report = tracker.stop()
+        save_report(report, memory_report)
+        print(format_report(report))
+
+
+def main(argv: list = None):
     """
     Função principal que orquestra o processo de detecção de faces e marcos faciais 3D.
 
@@ -248,9 +631,19 @@ def main():
     - Define pastas com imagens e processa as imagens para obter os marcos faciais em 3D.
     - Os resultados são salvos em arquivos CSV.
     
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv``.
+
     Returns:
         None
     """
+    parser = argparse.ArgumentParser(description="Extrai os marcos faciais 3D do FaceMesh das duas classes.")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Pula imagens repetidas ou quase repetidas (pHash) e acusa duplicatas entre classes.")
+    parser.add_argument("--dedup-distance", type=int, default=6,
+                        help="Maior distância de Hamming considerada duplicata (com --dedup).")
+    args = parser.parse_args(argv)
+
     # Caminho para os arquivos de saída
     output_folder = "../data/preprocessed_landmark"
     os.makedirs(output_folder, exist_ok=True)
@@ -262,11 +655,15 @@ def main():
     if os.path.isfile(output_csv_no_autism): 
         os.remove(output_csv_no_autism)
 
+    # Índice compartilhado pelas duas classes (opcional): pula imagens repetidas e acusa duplicatas entre classes
+    dedup_index = HashIndex(max_distance=args.dedup_distance) if args.dedup else None
+
     process_images_in_folder(
         folder_path_no_autism,
         output_csv_no_autism,
         class_label=0,
         debug=False,
+        dedup_index=dedup_index,
     )
 
     # Processar imagens de with_autism
@@ -281,6 +678,7 @@ def main():
         output_csv_with_autism,
         class_label=1,
         debug=False,
+        dedup_index=dedup_index,
     )
 
 
@@ -18,6 +18,8 @@ import numpy as np
 import os
 from scipy.spatial import distance
 
+from face_mesh_alignment import align_landmark_dataframe, load_template
+
 def load_csv(file_path: str) -> pd.DataFrame:
     """
     Carrega um arquivo CSV em um DataFrame.
@@ -185,7 +187,8 @@ def calculate_distances_3d(df: pd.DataFrame, debug: bool = False) -> pd.DataFram
 
     return pd.DataFrame(results_list)
 
-def main(input_csv_no_autism: str, input_csv_with_autism: str, output_csv_no_autism: str, output_csv_with_autism: str) -> None:
+def main(input_csv_no_autism: str, input_csv_with_autism: str, output_csv_no_autism: str, output_csv_with_autism: str,
+         template_path: str = None, z_scale: float = 224.0) -> None:
     """
     Função principal que orquestra o cálculo das distâncias para ambos os grupos.
 
@@ -194,6 +197,9 @@ def main(input_csv_no_autism: str, input_csv_with_autism: str, output_csv_no_aut
         input_csv_with_autism (str): Caminho do arquivo CSV contendo dados com autismo.
         output_csv_no_autism (str): Caminho do arquivo CSV onde os resultados sem autismo serão salvos.
         output_csv_with_autism (str): Caminho do arquivo CSV onde os resultados com autismo serão salvos.
+        template_path (str, opcional): Gabarito canônico (ver ``face_mesh_alignment``). Se informado,
+            as malhas são alinhadas por Procrustes antes do cálculo das distâncias.
+        z_scale (float): Largura das imagens, usada para converter o Z normalizado no alinhamento.
 
     Returns:
         None
@@ -205,6 +211,12 @@ def main(input_csv_no_autism: str, input_csv_with_autism: str, output_csv_no_aut
     df_no_autism = load_csv(input_csv_no_autism)
     df_with_autism = load_csv(input_csv_with_autism)
 
+    # Normalizar tamanho e pose das malhas, se houver gabarito
+    if template_path is not None:
+        template = load_template(template_path)
+        df_no_autism = align_landmark_dataframe(df_no_autism, template, z_scale=z_scale)
+        df_with_autism = align_landmark_dataframe(df_with_autism, template, z_scale=z_scale)
+
     # Calcular as distâncias para cada grupo
     results_no_autism = calculate_distances_3d(df_no_autism)
     results_with_autism = calculate_distances_3d(df_with_autism)
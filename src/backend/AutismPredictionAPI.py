@@ -2,32 +2,102 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import numpy as np
 import tensorflow as tf  # Para carregar o modelo
-from sklearn.preprocessing import StandardScaler
 import cv2
 import mediapipe as mp
-from PIL import Image
-import io
+import os
+import sys
+import threading
+
+# Permite importar os módulos compartilhados de src/ (extração e features)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Face_Mesh_Extractor import detect_face_meshes
+from detector_profiles import NUM_LANDMARKS, get_profile
+from face_mesh_features import FEATURE_NAMES, calculate_anthropometric_features, landmarks_to_array
+from face_mesh_alignment import align_meshes_for_features, load_template
+from feature_statistics import load_statistics
+from image_decoding import decode_image_file, decode_image_upload
+from face_mesh_pool import FaceMeshPool
+from prediction_cache import PredictionCache, mesh_key, model_artifact_version
+from model_registry import SELF_CONTAINED_MODELS, ModelRegistry, artifact_loader, parse_splits
+from dense_model import load_dense_model
+from prefork_server import process_memory
+from request_profiler import RequestProfiler
+from batch_jobs import BatchJobManager
 
 app = Flask(__name__)
 # Configurar CORS para permitir requisições do frontend em http://localhost:5173
 CORS(app, resources={r"/*": {"origins": "http://localhost:5173"}})
 
+# Perfilamento amostrado (PROFILE_SAMPLE_RATE=N perfila 1 a cada N requisições; 0 desliga). Pode ser
+# alterado em execução por /admin/profiling (protegido por ADMIN_TOKEN ou restrito a localhost).
+request_profiler = RequestProfiler(
+    output_dir=os.environ.get('PROFILE_DIR', 'profiles'),
+    sample_rate=int(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+    interval=float(os.environ.get('PROFILE_INTERVAL', 0.005)),
+    admin_token=os.environ.get('ADMIN_TOKEN'),
+).install(app)
+
 # Inicializa a solução Face Mesh do MediaPipe
 mp_face_mesh = mp.solutions.face_mesh
+mp_face_detection = mp.solutions.face_detection
+
+# Pool opcional de processos do FaceMesh com memória compartilhada (FACE_MESH_WORKERS > 0).
+# É criado apenas por serve(), chamado pelo ponto de entrada leve serve_api.py: os processos detectores
+# reimportam o script principal.
+face_mesh_pool = None
+
+# Perfil de velocidade dos detectores (DETECTOR_PROFILE=fast, balanced ou accurate; ver
+# detector_profiles.py). Cada requisição de extração pode escolher outro no campo 'detectorProfile'.
+detector_profile = get_profile(os.environ.get('DETECTOR_PROFILE'))
+
+# Limite do campo 'maxFaces' de /extract-face-meshes: cada valor distinto mantém um FaceMesh por thread
+max_faces_limit = int(os.environ.get('MAX_FACES', 20))
+
+# FaceMesh (e Face Detection) reaproveitado por thread, por perfil e por número máximo de faces: criar
+# o grafo do MediaPipe a cada requisição custa mais que a própria inferência. Após um fork (servidor pre-fork), as instâncias herdadas não são usadas, pois
+# as threads internas do MediaPipe não sobrevivem ao fork; cada processo cria as suas sob demanda.
+face_mesh_state = threading.local()
+stale_face_mesh_states = []
+
+def reset_face_mesh_state():
+    global face_mesh_state
+    # Mantém a referência: destruir no filho um grafo criado no pai tentaria encerrar threads inexistentes
+    stale_face_mesh_states.append(face_mesh_state)
+    face_mesh_state = threading.local()
+
+os.register_at_fork(after_in_child=reset_face_mesh_state)
 
-def detect_face_mesh(image_rgb):
-    with mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1) as face_mesh:
-        results = face_mesh.process(image_rgb)
-        landmarks_3d = []
-        if results.multi_face_landmarks:
-            for face_landmarks in results.multi_face_landmarks:
-                for lm in face_landmarks.landmark:
-                    height, width, _ = image_rgb.shape
-                    x = int(lm.x * width)
-                    y = int(lm.y * height)
-                    z = lm.z
-                    landmarks_3d.append((x, y, z))
-        return landmarks_3d
+def get_face_mesh(profile=detector_profile, max_num_faces=1):
+    face_meshes = getattr(face_mesh_state, 'face_meshes', None)
+    if face_meshes is None:
+        face_meshes = face_mesh_state.face_meshes = {}
+    face_mesh = face_meshes.get((profile.name, max_num_faces))
+    if face_mesh is None:
+        face_mesh = profile.face_mesh(max_num_faces)
+        face_meshes[(profile.name, max_num_faces)] = face_mesh
+    return face_mesh
+
+def get_face_detection():
+    # O Face Detection (confiança de cada face em /extract-face-meshes) não depende do perfil
+    face_detection = getattr(face_mesh_state, 'face_detection', None)
+    if face_detection is None:
+        face_detection = face_mesh_state.face_detection = mp_face_detection.FaceDetection(model_selection=1)
+    return face_detection
+
+def detect_face_mesh(image_rgb, profile=detector_profile):
+    # O perfil pode reduzir a imagem; os marcos normalizados são convertidos com as dimensões originais
+    results = get_face_mesh(profile).process(profile.resize(image_rgb))
+    landmarks_3d = []
+    if results.multi_face_landmarks:
+        for face_landmarks in results.multi_face_landmarks:
+            for lm in face_landmarks.landmark[:NUM_LANDMARKS]:
+                height, width, _ = image_rgb.shape
+                x = int(lm.x * width)
+                y = int(lm.y * height)
+                z = lm.z
+                landmarks_3d.append((x, y, z))
+    return landmarks_3d
 
 @app.route('/extract-face-mesh', methods=['POST'])
 def extract_face_mesh():
@@ -35,17 +105,67 @@ def extract_face_mesh():
         return jsonify({"success": False, "message": "Nenhuma imagem foi enviada."}), 400
 
     image_file = request.files['image']
-
     try:
-        image = Image.open(image_file.stream)
-        image_rgb = np.array(image.convert('RGB'))
+        profile = get_profile(request.form.get('detectorProfile', detector_profile.name))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
 
-        landmarks_3d = detect_face_mesh(image_rgb)
+    try:
+        if face_mesh_pool is not None and profile is detector_profile:
+            # Decodifica direto em um slot de memória compartilhada e envia só o descritor ao detector
+            landmarks_3d, (_, image_width) = face_mesh_pool.detect_encoded(image_file.stream.read(), with_shape=True)
+        else:
+            # Decodifica direto do corpo da requisição para RGB (uma única cópia, com orientação EXIF)
+            image_rgb = decode_image_upload(image_file)
+            image_width = image_rgb.shape[1]
+            landmarks_3d = detect_face_mesh(image_rgb, profile)
 
         if len(landmarks_3d) == 0:
             return jsonify({"success": False, "message": "Nenhuma face foi detectada."})
 
-        return jsonify({"success": True, "faceMesh": landmarks_3d})
+        # A largura da imagem volta em /predict-autism como escala do Z normalizado
+        return jsonify({"success": True, "faceMesh": landmarks_3d, "imageWidth": image_width})
+
+    except Exception as e:
+        print(f"Erro ao processar a imagem: {e}")
+        return jsonify({"success": False, "message": "Erro ao processar a imagem."}), 500
+
+
+@app.route('/extract-face-meshes', methods=['POST'])
+def extract_face_meshes():
+    # Extrai todas as faces da imagem em uma única passada do FaceMesh (fotos em grupo)
+    if 'image' not in request.files:
+        return jsonify({"success": False, "message": "Nenhuma imagem foi enviada."}), 400
+
+    image_file = request.files['image']
+    max_faces = request.form.get('maxFaces', '10')
+    max_faces = int(max_faces) if max_faces.strip().isdigit() else 0
+    if not 1 <= max_faces <= max_faces_limit:
+        return jsonify({"success": False, "message": f"maxFaces deve ser um inteiro entre 1 e {max_faces_limit}."}), 400
+    try:
+        profile = get_profile(request.form.get('detectorProfile', detector_profile.name))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    try:
+        # Decodifica direto do corpo da requisição para RGB (uma única cópia, com orientação EXIF)
+        image_rgb = decode_image_upload(image_file)
+
+        meshes, boxes, confidences = detect_face_meshes(
+            image_rgb, max_num_faces=max_faces, profile=profile,
+            face_mesh=get_face_mesh(profile, max_faces), face_detection=get_face_detection(),
+        )
+
+        if len(meshes) == 0:
+            return jsonify({"success": False, "message": "Nenhuma face foi detectada."})
+
+        return jsonify({
+            "success": True,
+            "faceMeshes": meshes.tolist(),
+            "boxes": boxes.tolist(),
+            "confidences": [None if np.isnan(c) else float(c) for c in confidences],
+            "imageWidth": image_rgb.shape[1]
+        })
 
     except Exception as e:
         print(f"Erro ao processar a imagem: {e}")
@@ -60,128 +180,225 @@ def calculate_euclidean_distance(point1, point2):
 def calculate_anthropometric_distances(face_landmarks):
     # Vale lembrar que, na API os numeros dos pontos são -1 a menos do que no codigo .py padrão, no outro código, usa-se Xi para identificar o np.array.
     # Aqui, , aqui tem-se as posições começando em 0.
-    # Tamanhos da face
-    face_width_ref1 = np.array(face_landmarks[126])
-    face_width_ref2 = np.array(face_landmarks[355])
-    
-    # Parte Superior do rosto
-    trichion = np.array(face_landmarks[9])
-    glabella = np.array(face_landmarks[8])
-    frontozygomaticus_left = np.array(face_landmarks[299])
-    frontozygomaticus_right = np.array(face_landmarks[69])
-    
-    # Olhos
-    endo_canthus_left = np.array(face_landmarks[132])
-    endo_canthus_right = np.array(face_landmarks[361])
-    exo_canthus_left = np.array(face_landmarks[262])
-    exo_canthus_right = np.array(face_landmarks[32])
-    
-    # Nariz
-    upper_philtrum = np.array(face_landmarks[18])
-    alare_left = np.array(face_landmarks[293])
-    alare_right = np.array(face_landmarks[63])
-    
-    # Labios
-    lower_philtrum = np.array(face_landmarks[0])
-    christa_philtri_left = np.array(face_landmarks[266])
-    christa_philtri_right = np.array(face_landmarks[36])
-    cheilion_left = np.array(face_landmarks[60])
-    cheilion_right = np.array(face_landmarks[290])
-    
-    # Queixo
-    pogonion = np.array(face_landmarks[198])
-    menton = np.array(face_landmarks[151])
-
-    # Cálculos das distâncias antropométricas
-    distances = {
-        "upper_facial_height": calculate_euclidean_distance(trichion, glabella),
-        "middle_facial_height": calculate_euclidean_distance(glabella, menton),
-        "intercanthal_width": calculate_euclidean_distance(endo_canthus_left, endo_canthus_right),
-        "biocular_width": calculate_euclidean_distance(exo_canthus_left, exo_canthus_right),
-        "nasal_width": calculate_euclidean_distance(alare_left, alare_right),
-        "mouth_width": calculate_euclidean_distance(cheilion_left, cheilion_right),
-        "philtrum_height": calculate_euclidean_distance(upper_philtrum, lower_philtrum),
-        
-        # Distâncias sugeridas por artigos
-        "eye_left_width": calculate_euclidean_distance(exo_canthus_left, endo_canthus_left),
-        "eye_right_width": calculate_euclidean_distance(endo_canthus_right, exo_canthus_right),
-        "endo_canthus_glabella_left": calculate_euclidean_distance(endo_canthus_left, glabella),
-        "endo_canthus_glabella_right": calculate_euclidean_distance(glabella, endo_canthus_right),
-        "exo_canthus_christa_philtri_left": calculate_euclidean_distance(christa_philtri_left, exo_canthus_left),
-        "exo_canthus_christa_philtri_right": calculate_euclidean_distance(exo_canthus_right, christa_philtri_right),
-        "alare_left_lower_philtrum": calculate_euclidean_distance(alare_left, lower_philtrum),
-        "glabella_alare_right": calculate_euclidean_distance(glabella, alare_right),
-        "glabella_christa_philtri_left": calculate_euclidean_distance(glabella, christa_philtri_left),
-        "glabella_lower_philtrum": calculate_euclidean_distance(glabella, lower_philtrum),
-        "glabella_christa_philtri_right": calculate_euclidean_distance(glabella, christa_philtri_right),
-        "christa_philtri_right_alare_left": calculate_euclidean_distance(alare_left, christa_philtri_right),
-        "christa_philtri_right_cheilion_left": calculate_euclidean_distance(cheilion_left, christa_philtri_right),
-        "christa_philtri_left_cheilion_right": calculate_euclidean_distance(christa_philtri_left, cheilion_right),
-        "christa_philtri_left_lower_philtrum": calculate_euclidean_distance(lower_philtrum, christa_philtri_left),
-        "cheilion_left_lower_philtrum": calculate_euclidean_distance(cheilion_left, lower_philtrum),
-        "cheilion_left_christa_philtri_right": calculate_euclidean_distance(cheilion_left, christa_philtri_right),
-        "cheilion_left_cheilion_right": calculate_euclidean_distance(cheilion_left, cheilion_right),
-        "cheilion_left_pogonion": calculate_euclidean_distance(cheilion_left, pogonion),
-        "cheilion_right_lower_philtrum": calculate_euclidean_distance(cheilion_right, lower_philtrum),
-        "cheilion_right_christa_philtri_right": calculate_euclidean_distance(cheilion_right, christa_philtri_right),
-        "frontozygomaticus_endo_cantus_left": calculate_euclidean_distance(frontozygomaticus_left, exo_canthus_left),
-        "frontozygomaticus_left_alare_right": calculate_euclidean_distance(frontozygomaticus_left, alare_right),
-        "frontozygomaticus_left_cheilion_right": calculate_euclidean_distance(frontozygomaticus_left, cheilion_right),
-        "frontozygomaticus_endo_cantus_right": calculate_euclidean_distance(frontozygomaticus_right, endo_canthus_right),
-        "frontozygomaticus_right_cheilion_left": calculate_euclidean_distance(frontozygomaticus_right, cheilion_left),
-        "face_height": calculate_euclidean_distance(trichion, menton),
-        "face_width": calculate_euclidean_distance(face_width_ref2, face_width_ref1),
-        # Adicionando mais quatro features para alcançar 39
-        "lower_face_height": calculate_euclidean_distance(menton, pogonion),
-        "eye_to_mouth_left": calculate_euclidean_distance(exo_canthus_left, cheilion_left),
-        "eye_to_mouth_right": calculate_euclidean_distance(exo_canthus_right, cheilion_right),
-        "nose_to_menton": calculate_euclidean_distance(upper_philtrum, menton)
-    }
-
-    return distances
+    # Os índices e a ordem das 39 distâncias ficam em face_mesh_features (versão vetorizada).
+    features = calculate_anthropometric_features(face_landmarks)[0]
+    return dict(zip(FEATURE_NAMES, features))
 
 # Função para preparar os dados para o modelo
 def prepare_data_for_model(anthropometric_data):
     features = np.array(list(anthropometric_data.values())).reshape(1, -1)
 
-    # Normalizar os dados
-    #scaler = StandardScaler()
-    #features_scaled = scaler.fit_transform(features)
-
-    #return features_scaled
-    return features
+    # Normalizar os dados com as estatísticas salvas no treinamento (se configuradas)
+    return standardize(features)
     
-# Carregar o modelo salvo
-model_path = '../models/best_model_3.0_layers_2_neurons_32_lr_0.001_epochs_30.h5'
-model = tf.keras.models.load_model(model_path)
+# Carregadores de modelo: 'numpy' lê os pesos densos sem o runtime do TensorFlow e pode ser
+# compartilhado entre processos criados por fork (ver prefork_server.py)
+# Artefatos .knn (knn_model.py) e .forest (forest_model.py) têm carregadores próprios e são servidos
+# ao lado dos modelos densos (ver model_registry.artifact_loader)
+MODEL_LOADERS = {'keras': tf.keras.models.load_model, 'numpy': load_dense_model}
+
+# Registro de modelos: carrega todas as versões de MODEL_DIR e troca a quente as que mudarem no disco
+model_registry = ModelRegistry(
+    os.environ.get('MODEL_DIR', '../models'),
+    loader=artifact_loader(MODEL_LOADERS[os.environ.get('MODEL_LOADER', 'keras')]),
+    version_of=model_artifact_version,
+    default_model=os.environ.get('DEFAULT_MODEL', 'best_model_3.0_layers_2_neurons_32_lr_0.001_epochs_30'),
+    splits=parse_splits(os.environ.get('MODEL_SPLITS')),
+)
+model_registry.start_watching()
+
+# Cache de features e predições por hash da malha facial (o frontend reenvia o mesmo faceMesh).
+# A chave inclui a versão do artefato, então um modelo trocado não reaproveita predições antigas.
+prediction_cache = PredictionCache()
+
+# Normalização de pose opcional (MESH_ALIGNMENT=2d ou 3d): alinha as malhas ao gabarito canônico
+# antes das distâncias. Só deve ser usada com modelos treinados sobre malhas alinhadas; o modelo
+# padrão foi treinado com distâncias em pixels. O Z normalizado do MediaPipe é convertido para pixels
+# pela largura da imagem ('imageWidth', devolvido pelas rotas de extração); MESH_Z_SCALE é usado
+# quando a requisição não a informa.
+mesh_alignment = os.environ.get('MESH_ALIGNMENT', '').lower()
+mesh_template = load_template() if mesh_alignment else None
+mesh_z_scale = float(os.environ.get('MESH_Z_SCALE', 224))
+
+# Padronização opcional (FEATURE_STATISTICS=caminho do JSON de feature_statistics.py): aplica as
+# mesmas estatísticas salvas no treinamento. O modelo padrão foi treinado sem padronização.
+feature_statistics_path = os.environ.get('FEATURE_STATISTICS')
+feature_statistics = (
+    load_statistics(feature_statistics_path, num_features=len(FEATURE_NAMES)) if feature_statistics_path else None
+)
+
+def standardize(features):
+    if feature_statistics is None:
+        return features
+    return feature_statistics.transform(features)
+
+def normalize_pose(landmarks, z_scale=None):
+    if mesh_template is None:
+        return landmarks
+    dims = 2 if mesh_alignment == '2d' else 3
+    # Em 2D o Z volta como terceira coluna, na escala do alinhamento, como nos CSVs alinhados do treinamento
+    z_scale = mesh_z_scale if z_scale is None else z_scale
+    return align_meshes_for_features(landmarks, mesh_template, dims=dims, z_scale=z_scale)
+
+def parse_image_widths(value, num_faces):
+    # Largura da imagem de cada face (um número para todas ou uma lista), usada como escala do Z
+    if value is None:
+        return np.full(num_faces, mesh_z_scale)
+    try:
+        widths = np.broadcast_to(np.asarray(value, dtype=np.float64), (num_faces,)).copy()
+    except (TypeError, ValueError):
+        raise ValueError("Formato incorreto de imageWidth.") from None
+    if not np.all(np.isfinite(widths) & (widths > 0)):
+        raise ValueError("imageWidth deve ser positivo.")
+    return widths
+
+def predict_meshes(landmarks, selected, z_scale=None):
+    z_scale = np.full(len(landmarks), mesh_z_scale) if z_scale is None else np.asarray(z_scale, dtype=np.float64)
+    # Busca no cache as faces já avaliadas com esta versão do modelo (e, com alinhamento, com a
+    # mesma escala do Z, que muda as features)
+    versions = [
+        f"{selected.artifact_version}@{z:g}" if mesh_alignment else selected.artifact_version
+        for z in z_scale
+    ]
+    keys = [prediction_cache.key(mesh, version) for mesh, version in zip(landmarks, versions)]
+    cached = [prediction_cache.get(key) for key in keys]
+    missing = [i for i, entry in enumerate(cached) if entry is None]
+
+    if missing:
+        # Calcular as distâncias antropométricas das faces restantes de uma vez
+        features = calculate_anthropometric_features(normalize_pose(landmarks[missing], z_scale[missing]))
+
+        if features.shape[1] != 39:
+            raise ValueError("Número incorreto de features calculadas.")
+
+        # Fazer a predição
+        inputs = features if isinstance(selected.model, SELF_CONTAINED_MODELS) else standardize(features)
+        missing_predictions = selected.model.predict(inputs)[:, 0]
+        for i, face_features, face_prediction in zip(missing, features, missing_predictions):
+            cached[i] = (face_features, float(face_prediction))
+            prediction_cache.put(keys[i], face_features, float(face_prediction))
+
+    return np.array([entry[1] for entry in cached])
 
 @app.route('/predict-autism', methods=['POST'])
 def predict_autism():
     data = request.get_json()
 
-    if 'faceMesh' not in data:
+    # Aceita uma face ('faceMesh') ou um lote de faces ('faceMeshes'), avaliadas em uma única chamada
+    if 'faceMeshes' in data:
+        face_landmarks = data['faceMeshes']
+    elif 'faceMesh' in data:
+        face_landmarks = data['faceMesh']
+    else:
         return jsonify({"success": False, "message": "Os dados de faceMesh não foram enviados."}), 400
 
-    face_landmarks = data['faceMesh']
+    try:
+        landmarks = landmarks_to_array(face_landmarks)
+    except ValueError:
+        return jsonify({"success": False, "message": "Formato incorreto dos dados de faceMesh."}), 400
+    try:
+        z_scale = parse_image_widths(data.get('imageWidth'), len(landmarks))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
 
-    # Calcular as distâncias antropométricas
-    anthropometric_distances = calculate_anthropometric_distances(face_landmarks)
-    
-    if len(anthropometric_distances) != 39:
-        return jsonify({"success": False, "message": "Número incorreto de features calculadas."}), 400
+    # Escolhe a versão do modelo pelo cabeçalho ou pela divisão percentual (estável por malha)
+    try:
+        selected = model_registry.select(
+            request.headers.get('X-Model-Version'), routing_key=mesh_key(landmarks[0], '')
+        )
+    except KeyError:
+        return jsonify({"success": False, "message": "Versão de modelo não encontrada."}), 400
 
-    # Preparar os dados para o modelo
-    features = prepare_data_for_model(anthropometric_distances)
-    
-    # Fazer a predição
-    prediction = model.predict(features)
-    predicted_class = int(np.round(prediction[0][0]))  # 0 ou 1
+    try:
+        prediction = predict_meshes(landmarks, selected, z_scale)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    predicted_classes = np.round(prediction).astype(int)  # 0 ou 1
+
+    if 'faceMeshes' in data:
+        return jsonify({
+            "success": True,
+            "predictions": predicted_classes.tolist(),
+            "confidences": prediction.astype(float).tolist(),
+            "modelVersion": selected.name
+        })
+
+    return jsonify({
+        "success": True,
+        "prediction": int(predicted_classes[0]),
+        "confidence": float(prediction[0]),
+        "modelVersion": selected.name
+    })
+
+# Trabalhos em lote (POST /batch-jobs com um .zip/.tar de imagens): cada thread do pool detecta com
+# o seu FaceMesh e avalia as faces do bloco em uma única chamada do modelo
+def score_batch_images(paths, model_version):
+    results, meshes = [], []
+    for path in paths:
+        try:
+            image_rgb = decode_image_file(path)
+            landmarks_3d = detect_face_mesh(image_rgb)
+        except Exception as e:
+            results.append({"face_detected": False, "error": f"Erro ao processar a imagem: {e}"})
+            continue
+        results.append({"face_detected": len(landmarks_3d) > 0})
+        if landmarks_3d:
+            meshes.append((len(results) - 1, landmarks_3d, image_rgb.shape[1]))
+
+    if meshes:
+        landmarks = landmarks_to_array([mesh for _, mesh, _ in meshes])
+        selected = model_registry.select(model_version, routing_key=mesh_key(landmarks[0], ''))
+        prediction = predict_meshes(landmarks, selected, [width for _, _, width in meshes])
+        for (i, _, _), confidence in zip(meshes, prediction):
+            results[i].update(prediction=int(round(confidence)), confidence=float(confidence),
+                              model_version=selected.name)
+    return results
 
+batch_jobs = BatchJobManager(
+    score_batch_images,
+    db_path=os.environ.get('BATCH_JOBS_DB', 'batch_jobs.db'),
+    upload_dir=os.environ.get('BATCH_UPLOAD_DIR', 'batch_uploads'),
+    workers=int(os.environ.get('BATCH_WORKERS', 2)),
+).install(app)
+
+@app.route('/stats', methods=['GET'])
+def stats():
     return jsonify({
         "success": True,
-        "prediction": predicted_class,
-        "confidence": float(prediction[0][0])
+        "models": model_registry.versions(),
+        "defaultModel": model_registry.default_model,
+        "modelSplits": model_registry.splits,
+        "modelSwaps": model_registry.swaps,
+        "detectorProfile": detector_profile.as_dict(),
+        "meshAlignment": mesh_alignment or None,
+        "featureStatistics": feature_statistics_path,
+        "profiling": request_profiler.status(),
+        "predictionCache": prediction_cache.stats(),
+        "worker": {"pid": os.getpid(), **process_memory(os.getpid())}
     })
 
+def serve(host='0.0.0.0', port=5000, debug=True):
+    """
+    Inicia o servidor de desenvolvimento do Flask, com o pool do FaceMesh se FACE_MESH_WORKERS > 0.
+
+    Com debug=True, o recarregador do Flask executa o script no monitor e no processo filho que atende as
+    requisições (WERKZEUG_RUN_MAIN=true); o pool só é criado no filho, para não iniciar os detectores duas vezes.
+    Com o pool, o script principal deve ser o serve_api.py, que os detectores (spawn) reimportam sem custo.
+    """
+    global face_mesh_pool
+    face_mesh_workers = int(os.environ.get('FACE_MESH_WORKERS', 0))
+    if face_mesh_workers > 0 and (not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        face_mesh_pool = FaceMeshPool(num_workers=face_mesh_workers, profile=detector_profile.name)
+    try:
+        app.run(host=host, port=port, debug=debug)
+    finally:
+        if face_mesh_pool is not None:
+            face_mesh_pool.close()
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)   
+    if int(os.environ.get('FACE_MESH_WORKERS', 0)) > 0:
+        # Os detectores reimportariam este script inteiro (TensorFlow, modelos, threads): reinicia pelo ponto
+        # de entrada leve
+        entry_point = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serve_api.py')
+        os.execv(sys.executable, [sys.executable, entry_point])
+    serve()
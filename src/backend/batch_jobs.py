@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+"""
+Trabalhos em Lote para Arquivos Compactados de Imagens
+======================================================
+``/extract-face-mesh`` atende um arquivo por requisição, de forma síncrona. Clínicas que enviam
+centenas de fotos de uma vez usam a API de trabalhos em lote deste módulo:
+- ``POST /batch-jobs`` recebe um ``.zip`` ou ``.tar`` (``.tar.gz``) de imagens no campo ``archive``,
+  extrai as imagens para disco e responde imediatamente com o id do trabalho (HTTP 202),
+- Um pool local de threads processa as imagens em blocos, a partir de uma fila em memória,
+- ``GET /batch-jobs/<id>`` informa o estado e o progresso,
+- ``GET /batch-jobs/<id>/results`` transmite as predições por imagem (uma linha JSON por imagem)
+  à medida que ficam prontas.
+
+Trabalhos, imagens pendentes e resultados ficam em SQLite, sem serviços externos. A fila é local
+ao processo: cada trabalho pertence ao processo que o recebeu (coluna ``owner``, o PID). Quando o
+pool de um processo inicia, ele assume os trabalhos inacabados cujo dono não existe mais (servidor
+reiniciado ou trabalhador do servidor pre-fork que morreu) com uma troca atômica do dono no SQLite,
+e só então recoloca na fila as imagens ainda sem resultado; assim, cada trabalho é retomado por um
+único processo, mesmo com todos os trabalhadores atendendo consultas de estado.
+
+@author: George Flores
+"""
+
+import json
+import os
+import queue
+import shutil
+import sqlite3
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from contextlib import closing
+
+from flask import Response, jsonify, request, stream_with_context
+
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    model_version TEXT,
+    owner INTEGER,
+    total INTEGER NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS images (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    image TEXT NOT NULL,
+    face_detected INTEGER NOT NULL,
+    prediction INTEGER,
+    confidence REAL,
+    model_version TEXT,
+    error TEXT NOT NULL,
+    UNIQUE (job_id, seq)
+);
+"""
+
+
+def extract_archive(archive_path: str, destination: str, max_images: int = 2000, max_bytes: int = 512 << 20) -> list:
+    """
+    Extrai as imagens de um arquivo ``.zip`` ou ``.tar`` (compactado ou não).
+
+    Os nomes do arquivo compactado nunca viram caminhos: cada imagem é gravada como
+    ``destination/NNNNN.ext``, o que impede a escrita fora da pasta (``../``, caminhos absolutos,
+    links simbólicos). Pastas, arquivos ocultos e extensões que não são de imagem são ignorados.
+
+    Args:
+        archive_path (str): Caminho do arquivo compactado.
+        destination (str): Pasta onde as imagens são gravadas.
+        max_images (int): Número máximo de imagens aceitas.
+        max_bytes (int): Tamanho máximo, descompactado, da soma das imagens.
+
+    Returns:
+        list: Pares (nome da imagem no arquivo, caminho gravado), na ordem do arquivo.
+
+    Raises:
+        ValueError: Se o arquivo não for zip/tar, não tiver imagens ou exceder os limites.
+    """
+    if zipfile.is_zipfile(archive_path):
+        archive = zipfile.ZipFile(archive_path)
+        members = [(info.filename, info) for info in archive.infolist() if not info.is_dir()]
+        open_member = archive.open
+    elif tarfile.is_tarfile(archive_path):
+        archive = tarfile.open(archive_path)
+        members = [(info.name, info) for info in archive.getmembers() if info.isfile()]
+        open_member = archive.extractfile
+    else:
+        raise ValueError("O arquivo enviado não é um .zip nem um .tar válido.")
+
+    os.makedirs(destination, exist_ok=True)
+    images, written = [], 0
+    with archive:
+        for name, info in members:
+            basename = name.replace("\\", "/").rsplit("/", 1)[-1]
+            extension = os.path.splitext(basename)[1].lower()
+            if extension not in IMAGE_EXTENSIONS or basename.startswith(".") or "__MACOSX/" in name:
+                continue
+            if len(images) >= max_images:
+                raise ValueError(f"O arquivo tem mais de {max_images} imagens.")
+            path = os.path.join(destination, f"{len(images):05d}{extension}")
+            with open_member(info) as source, open(path, "wb") as target:
+                # Conta os bytes realmente lidos: o tamanho declarado no cabeçalho pode ser falso
+                while chunk := source.read(1 << 20):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise ValueError(f"As imagens descompactadas excedem {max_bytes >> 20} MB.")
+                    target.write(chunk)
+            images.append((name, path))
+    if not images:
+        raise ValueError("Nenhuma imagem foi encontrada no arquivo.")
+    return images
+
+
+def _process_alive(pid: int) -> bool:
+    """
+    Indica se um processo local ainda existe.
+
+    No Windows, ``os.kill(pid, 0)`` enviaria CTRL_C_EVENT; como lá a API roda em um único processo,
+    o processo é considerado terminado.
+    """
+    if pid == os.getpid():
+        return True
+    if sys.platform == "win32":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BatchJobManager:
+    """
+    Fila local e pool de threads de trabalhos em lote, com estado em SQLite.
+
+    Args:
+        score_images (callable): Recebe ``(caminhos, versão do modelo ou None)`` e retorna, para cada
+            imagem, um dict com ``face_detected``, ``prediction``, ``confidence``, ``model_version``
+            e ``error``.
+        db_path (str): Banco SQLite dos trabalhos e resultados.
+        upload_dir (str): Pasta das imagens extraídas (apagadas após a pontuação).
+        workers (int): Threads de processamento.
+        chunk_size (int): Imagens pontuadas por chamada de ``score_images``.
+        max_images (int): Número máximo de imagens por trabalho.
+        max_bytes (int): Tamanho máximo, descompactado, das imagens de um trabalho.
+        poll_interval (float): Intervalo, em segundos, da consulta de novos resultados na transmissão.
+    """
+
+    def __init__(
+        self,
+        score_images,
+        db_path: str = "batch_jobs.db",
+        upload_dir: str = "batch_uploads",
+        workers: int = 2,
+        chunk_size: int = 4,
+        max_images: int = 2000,
+        max_bytes: int = 512 << 20,
+        poll_interval: float = 0.5,
+    ):
+        self.score_images = score_images
+        self.db_path = db_path
+        self.upload_dir = upload_dir
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_images = max_images
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self._queue = queue.Queue()
+        self._threads = []
+        self._started = False
+        self._lock = threading.Lock()
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            # Bancos criados antes da coluna do dono: os trabalhos sem dono são assumidos na retomada
+            if "owner" not in [column["name"] for column in connection.execute("PRAGMA table_info(jobs)")]:
+                connection.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Uma conexão por operação: o sqlite3 não compartilha conexões entre threads
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def start(self) -> "BatchJobManager":
+        """
+        Inicia as threads de processamento e retoma os trabalhos inacabados sem dono vivo.
+
+        É chamado sob demanda pelos endpoints, de modo que as threads só existem no processo que
+        atende requisições (e não no pai de um fork ou no monitor do recarregador do Flask).
+
+        Returns:
+            BatchJobManager: A própria instância.
+        """
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+            for job in self._claim_orphaned_jobs():
+                self._enqueue(job["id"], job["model_version"])
+            for _ in range(self.workers):
+                thread = threading.Thread(target=self._work, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Encerra as threads após os blocos já enfileirados."""
+        with self._lock:
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+            self._started = False
+
+    def _claim_orphaned_jobs(self) -> list:
+        """
+        Assume os trabalhos inacabados cujo dono terminou (ou que já eram deste PID, de uma execução anterior).
+
+        A troca do dono é condicionada ao dono lido, então, se vários processos iniciarem juntos, só
+        um deles assume cada trabalho.
+
+        Returns:
+            list: Trabalhos assumidos (``id`` e ``model_version``), do mais antigo ao mais novo.
+        """
+        pid = os.getpid()
+        claimed = []
+        with closing(self._connect()) as connection:
+            pending = connection.execute(
+                "SELECT id, model_version, owner FROM jobs WHERE status IN ('queued', 'running') ORDER BY created"
+            ).fetchall()
+            for job in pending:
+                if job["owner"] is not None and job["owner"] != pid and _process_alive(job["owner"]):
+                    continue
+                with connection:
+                    updated = connection.execute(
+                        "UPDATE jobs SET owner = ? WHERE id = ? AND owner IS ?", (pid, job["id"], job["owner"])
+                    ).rowcount
+                if updated:
+                    claimed.append(job)
+        return claimed
+
+    def _enqueue(self, job_id: str, model_version: str) -> None:
+        with closing(self._connect()) as connection:
+            # Só o dono do trabalho processa as suas imagens
+            owner = connection.execute("SELECT owner FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if owner is None or owner["owner"] != os.getpid():
+                return
+            rows = connection.execute(
+                "SELECT seq, name, path FROM images WHERE job_id = ? AND seq NOT IN "
+                "(SELECT seq FROM results WHERE job_id = ?) ORDER BY seq",
+                (job_id, job_id),
+            ).fetchall()
+        for start in range(0, len(rows), self.chunk_size):
+            self._queue.put((job_id, model_version, [tuple(row) for row in rows[start:start + self.chunk_size]]))
+
+    def submit(self, archive_path: str, model_version: str = None) -> dict:
+        """
+        Cria um trabalho a partir de um arquivo compactado e o coloca na fila.
+
+        Args:
+            archive_path (str): Caminho do ``.zip``/``.tar`` recebido.
+            model_version (str, opcional): Versão do modelo (como em ``X-Model-Version``).
+
+        Returns:
+            dict: Estado do trabalho criado (ver ``status``).
+
+        Raises:
+            ValueError: Se o arquivo for inválido (ver ``extract_archive``).
+        """
+        self.start()
+        job_id = uuid.uuid4().hex
+        folder = os.path.join(self.upload_dir, job_id)
+        try:
+            images = extract_archive(archive_path, folder, self.max_images, self.max_bytes)
+        except Exception:
+            shutil.rmtree(folder, ignore_errors=True)
+            raise
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO jobs (id, status, model_version, owner, total, created) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, model_version, os.getpid(), len(images), time.time()),
+            )
+            connection.executemany(
+                "INSERT INTO images (job_id, seq, name, path) VALUES (?, ?, ?, ?)",
+                [(job_id, seq, name, path) for seq, (name, path) in enumerate(images)],
+            )
+        self._enqueue(job_id, model_version)
+        return self.status(job_id)
+
+    def _work(self) -> None:
+        while (item := self._queue.get()) is not None:
+            job_id, model_version, rows = item
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    "UPDATE jobs SET status = 'running', started = ? WHERE id = ? AND status = 'queued'",
+                    (time.time(), job_id),
+                )
+            try:
+                results = self.score_images([path for _, _, path in rows], model_version)
+            except Exception as e:
+                # Uma falha do bloco (por exemplo, versão de modelo removida) é registrada por imagem
+                error = f"{type(e).__name__}: {e}"
+                results = [{"face_detected": False, "error": error} for _ in rows]
+            try:
+                self._record(job_id, rows, results)
+            except Exception as e:
+                # A thread continua: as imagens sem resultado voltam para a fila na próxima retomada
+                print(f"Erro ao registrar os resultados do trabalho {job_id}: {e}")
+
+    def _record(self, job_id: str, rows: list, results: list) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO results (job_id, seq, image, face_detected, prediction, confidence, "
+                "model_version, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, seq, name, int(bool(result.get("face_detected"))), result.get("prediction"),
+                     result.get("confidence"), result.get("model_version"), result.get("error") or "")
+                    for (seq, name, _), result in zip(rows, results)
+                ],
+            )
+            finished = connection.execute(
+                "UPDATE jobs SET status = 'done', finished = ? WHERE id = ? AND status != 'done' "
+                "AND total = (SELECT COUNT(*) FROM results WHERE job_id = ?)",
+                (time.time(), job_id, job_id),
+            ).rowcount
+        # Só a thread que concluiu o trabalho apaga a pasta; as demais apagam apenas as suas imagens
+        if finished:
+            shutil.rmtree(os.path.dirname(rows[0][2]), ignore_errors=True)
+            return
+        for _, _, path in rows:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def status(self, job_id: str) -> dict:
+        """
+        Estado e progresso de um trabalho.
+
+        Args:
+            job_id (str): Id do trabalho.
+
+        Returns:
+            dict: ``jobId``, ``status`` (queued, running ou done), ``total``, ``processed``, ``faces``,
+            ``errors``, ``modelVersion`` e horários; None se o trabalho não existir.
+        """
+        with closing(self._connect()) as connection:
+            job = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(face_detected), 0), COALESCE(SUM(error != ''), 0) "
+                "FROM results WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        return {
+            "jobId": job["id"],
+            "status": job["status"],
+            "total": job["total"],
+            "processed": counts[0],
+            "faces": counts[1],
+            "errors": counts[2],
+            "modelVersion": job["model_version"],
+            "created": job["created"],
+            "started": job["started"],
+            "finished": job["finished"],
+        }
+
+    def results(self, job_id: str, after: int = 0) -> list:
+        """
+        Resultados de um trabalho concluídos após o cursor ``after``, na ordem de conclusão.
+
+        Args:
+            job_id (str): Id do trabalho.
+            after (int): Cursor (``cursor`` do último resultado já lido; 0 para o início).
+
+        Returns:
+            list: Dicts com ``cursor``, ``image``, ``faceDetected``, ``prediction``, ``confidence``,
+            ``modelVersion`` e ``error``.
+        """
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT * FROM results WHERE job_id = ? AND id > ? ORDER BY id", (job_id, after)
+            ).fetchall()
+        return [
+            {
+                "cursor": row["id"],
+                "image": row["image"],
+                "faceDetected": bool(row["face_detected"]),
+                "prediction": row["prediction"],
+                "confidence": row["confidence"],
+                "modelVersion": row["model_version"],
+                "error": row["error"] or None,
+            }
+            for row in rows
+        ]
+
+    def stream_results(self, job_id: str, after: int = 0, follow: bool = True):
+        """
+        Gera os resultados de um trabalho como linhas JSON, aguardando os novos até sua conclusão.
+
+        Args:
+            job_id (str): Id do trabalho.
+            after (int): Cursor a partir do qual transmitir (permite retomar uma transmissão).
+            follow (bool): Se False, transmite apenas os resultados já prontos.
+
+        Yields:
+            str: Uma linha JSON por imagem.
+        """
+        while True:
+            # Lê o estado antes dos resultados: se já estava concluído, nenhum resultado novo pode surgir
+            done = self.status(job_id)["status"] == "done"
+            rows = self.results(job_id, after)
+            for row in rows:
+                yield json.dumps(row) + "\n"
+            if rows:
+                after = rows[-1]["cursor"]
+            if done or not follow:
+                return
+            time.sleep(self.poll_interval)
+
+    def _submit_route(self):
+        if "archive" not in request.files:
+            return jsonify({"success": False, "message": "Nenhum arquivo compactado foi enviado."}), 400
+        os.makedirs(self.upload_dir, exist_ok=True)
+        # O arquivo é fechado antes de ser reaberto pelo nome (o Windows não permite abri-lo duas vezes)
+        descriptor, upload_path = tempfile.mkstemp(dir=self.upload_dir, suffix=".upload")
+        try:
+            with os.fdopen(descriptor, "wb") as upload:
+                request.files["archive"].save(upload)
+            job = self.submit(upload_path, request.headers.get("X-Model-Version"))
+        except (ValueError, zipfile.BadZipFile, tarfile.TarError) as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        finally:
+            os.remove(upload_path)
+        return jsonify({"success": True, **job}), 202
+
+    def _status_route(self, job_id):
+        self.start()
+        job = self.status(job_id)
+        if job is None:
+            return jsonify({"success": False, "message": "Trabalho não encontrado."}), 404
+        return jsonify({"success": True, **job})
+
+    def _results_route(self, job_id):
+        self.start()
+        if self.status(job_id) is None:
+            return jsonify({"success": False, "message": "Trabalho não encontrado."}), 404
+        after = request.args.get("after", 0, type=int)
+        follow = request.args.get("follow", "true").lower() != "false"
+        return Response(
+            stream_with_context(self.stream_results(job_id, after, follow)), mimetype="application/x-ndjson"
+        )
+
+    def install(self, app) -> "BatchJobManager":
+        """
+        Registra os endpoints de trabalhos em lote no app.
+
+        - ``POST /batch-jobs``: campo ``archive`` (``.zip``/``.tar``) e cabeçalho opcional
+          ``X-Model-Version``; responde 202 com o estado do trabalho,
+        - ``GET /batch-jobs/<id>``: estado e progresso,
+        - ``GET /batch-jobs/<id>/results?after=<cursor>&follow=false``: resultados em NDJSON.
+
+        Args:
+            app (Flask): Aplicação Flask.
+
+        Returns:
+            BatchJobManager: A própria instância.
+        """
+        app.add_url_rule("/batch-jobs", "batch_jobs_submit", self._submit_route, methods=["POST"])
+        app.add_url_rule("/batch-jobs/<job_id>", "batch_jobs_status", self._status_route, methods=["GET"])
+        app.add_url_rule("/batch-jobs/<job_id>/results", "batch_jobs_results", self._results_route, methods=["GET"])
+        return self
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Inferência em NumPy para Modelos Keras Densos
+=============================================
+Este módulo lê um artefato Keras ``.h5`` (``Sequential`` com camadas ``Dense``) diretamente com
+``h5py`` e faz a predição em NumPy, sem inicializar o runtime do TensorFlow:
+- Os pesos ficam em arrays NumPy somente leitura, que nunca são escritos após o carregamento,
+- Por isso podem ser carregados uma única vez em um processo pai e compartilhados por cópia na
+  escrita (copy-on-write) entre os processos filhos criados por ``fork``,
+- A predição segue a mesma interface de ``model.predict`` usada pela API.
+
+Um modelo carregado com ``tf.keras.models.load_model`` não pode ser compartilhado assim: as
+threads internas do TensorFlow não sobrevivem ao ``fork`` e a predição trava no processo filho.
+
+@author: George Flores
+"""
+
+import json
+
+import h5py
+import numpy as np
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    """Sigmoide numericamente estável (sem overflow de ``exp`` para entradas muito negativas)."""
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    """Softmax sobre o último eixo, subtraindo o máximo para estabilidade."""
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+# Camadas sem efeito na inferência
+PASSTHROUGH_LAYERS = ("InputLayer", "Dropout")
+
+
+class DenseModel:
+    """
+    Rede densa (sequência de ``Dense``) avaliada em NumPy.
+
+    Args:
+        layers (list): Lista de (kernel, bias, nome da ativação) de cada camada ``Dense``.
+    """
+
+    def __init__(self, layers: list):
+        self.layers = []
+        for kernel, bias, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Ativação não suportada: {activation}")
+            kernel = np.ascontiguousarray(kernel, dtype=np.float32)
+            bias = np.ascontiguousarray(bias, dtype=np.float32)
+            # Somente leitura: as páginas dos pesos nunca são tocadas e continuam compartilhadas
+            kernel.flags.writeable = False
+            bias.flags.writeable = False
+            self.layers.append((kernel, bias, activation))
+        self.num_features = self.layers[0][0].shape[0]
+
+    def predict(self, x, verbose: int = 0) -> np.ndarray:
+        """
+        Calcula a saída da rede, com a mesma interface de ``model.predict`` do Keras.
+
+        Args:
+            x (np.ndarray): Features com formato (N, número de features).
+            verbose (int): Ignorado; mantido por compatibilidade com o Keras.
+
+        Returns:
+            np.ndarray: Saída com formato (N, unidades da última camada), em float32.
+
+        Raises:
+            ValueError: Se o número de features não corresponder à entrada do modelo.
+        """
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim != 2 or x.shape[1] != self.num_features:
+            raise ValueError(f"Entrada com formato {x.shape}; esperado (N, {self.num_features}).")
+        for kernel, bias, activation in self.layers:
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
+
+    def nbytes(self) -> int:
+        """Retorna o tamanho, em bytes, dos pesos do modelo."""
+        return sum(kernel.nbytes + bias.nbytes for kernel, bias, _ in self.layers)
+
+
+def _layer_weights(group: h5py.Group) -> dict:
+    """
+    Busca os datasets ``kernel`` e ``bias`` de uma camada em qualquer nível do grupo.
+
+    O Keras 2 grava ``<camada>/<camada>/kernel:0`` e o Keras 3 grava
+    ``<camada>/<modelo>/<camada>/kernel``.
+
+    Args:
+        group (h5py.Group): Grupo da camada em ``model_weights``.
+
+    Returns:
+        dict: ``{"kernel": array, "bias": array}`` com os datasets encontrados.
+    """
+    weights = {}
+
+    def visit(name, obj):
+        if isinstance(obj, h5py.Dataset):
+            weights[name.rsplit("/", 1)[-1].split(":")[0]] = obj[()]
+
+    group.visititems(visit)
+    return weights
+
+
+def load_dense_model(model_path: str, debug: bool = False) -> DenseModel:
+    """
+    Carrega um artefato Keras ``.h5`` de camadas densas sem usar o TensorFlow.
+
+    Args:
+        model_path (str): Caminho do arquivo ``.h5``.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        DenseModel: Modelo pronto para predição.
+
+    Raises:
+        ValueError: Se o artefato não for um ``Sequential`` composto apenas de camadas densas.
+    """
+    with h5py.File(model_path, "r") as f:
+        config = json.loads(f.attrs["model_config"])
+        if config["class_name"] != "Sequential":
+            raise ValueError(f"Modelo não sequencial: {config['class_name']}")
+
+        layers = []
+        for layer in config["config"]["layers"]:
+            if layer["class_name"] in PASSTHROUGH_LAYERS:
+                continue
+            if layer["class_name"] != "Dense":
+                raise ValueError(f"Camada não suportada: {layer['class_name']}")
+            layer_config = layer["config"]
+            weights = _layer_weights(f["model_weights"][layer_config["name"]])
+            bias = weights.get("bias", np.zeros(layer_config["units"], dtype=np.float32))
+            layers.append((weights["kernel"], bias, layer_config["activation"]))
+
+    model = DenseModel(layers)
+    if debug:
+        print(f"Modelo {model_path} carregado em NumPy: {len(layers)} camadas, {model.nbytes()} bytes.")
+    return model
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de Processos do FaceMesh com Memória Compartilhada
+=======================================================
+Este módulo tira o FaceMesh da thread da requisição sem pagar o custo de serializar (pickle)
+imagens de vários megabytes para outros processos:
+- Os quadros decodificados são escritos em slots de um anel de ``multiprocessing.shared_memory``,
+- Apenas o descritor do slot (índice, altura, largura) é enviado aos processos detectores,
+- O resultado 468 x 3 volta pela mesma memória compartilhada,
+- Cada slot é devolvido ao anel assim que o resultado é lido.
+
+Cada processo detector mantém sua própria instância do FaceMesh, criada uma única vez com os
+parâmetros do perfil de velocidade do pool (ver ``detector_profiles``).
+
+@author: George Flores
+"""
+
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from detector_profiles import NUM_LANDMARKS, get_profile
+from image_decoding import decode_image_bytes
+
+RESULT_BYTES = NUM_LANDMARKS * 3 * np.dtype(np.float64).itemsize
+
+# Estado de cada processo detector, criado em _init_worker
+_worker_shm = None
+_worker_face_mesh = None
+_worker_profile = None
+_worker_slot_bytes = 0
+
+
+def _init_worker(shm_name: str, slot_bytes: int, profile: str = None) -> None:
+    """
+    Inicializa um processo detector: conecta à memória compartilhada e cria o FaceMesh.
+
+    Args:
+        shm_name (str): Nome do bloco de memória compartilhada.
+        slot_bytes (int): Tamanho, em bytes, da área de imagem de cada slot.
+        profile (str, opcional): Perfil de velocidade do FaceMesh. Padrão: ``balanced``.
+
+    Returns:
+        None
+    """
+    global _worker_shm, _worker_face_mesh, _worker_profile, _worker_slot_bytes
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_slot_bytes = slot_bytes
+    _worker_profile = get_profile(profile)
+    _worker_face_mesh = _worker_profile.face_mesh()
+
+
+def _slot_offset(slot: int) -> int:
+    """Retorna o deslocamento, em bytes, do início de um slot no bloco compartilhado."""
+    return slot * (_worker_slot_bytes + RESULT_BYTES)
+
+
+def _write_landmarks(results, width: int, height: int, out: np.ndarray) -> int:
+    """
+    Escreve os marcos do FaceMesh em pixels (mesma conversão de ``detect_face_mesh``) em ``out``.
+
+    Args:
+        results: Resultado retornado por ``FaceMesh.process``.
+        width (int): Largura da imagem.
+        height (int): Altura da imagem.
+        out (np.ndarray): Array (468, 3) de destino.
+
+    Returns:
+        int: Número de marcos escritos (0 se nenhuma face foi detectada).
+    """
+    if not results.multi_face_landmarks:
+        return 0
+    landmarks = results.multi_face_landmarks[0].landmark[:NUM_LANDMARKS]
+    out[:] = [(int(lm.x * width), int(lm.y * height), lm.z) for lm in landmarks]
+    return len(landmarks)
+
+
+def _detect_slot(slot: int, height: int, width: int) -> int:
+    """
+    Executa o FaceMesh sobre o quadro de um slot e escreve o resultado no mesmo slot.
+
+    Args:
+        slot (int): Índice do slot.
+        height (int): Altura do quadro.
+        width (int): Largura do quadro.
+
+    Returns:
+        int: Número de marcos detectados.
+    """
+    offset = _slot_offset(slot)
+    image = np.ndarray((height, width, 3), dtype=np.uint8, buffer=_worker_shm.buf, offset=offset)
+    result = np.ndarray(
+        (NUM_LANDMARKS, 3), dtype=np.float64, buffer=_worker_shm.buf, offset=offset + _worker_slot_bytes
+    )
+    # Os marcos são normalizados: a imagem reduzida pelo perfil é convertida com as dimensões originais
+    return _write_landmarks(_worker_face_mesh.process(_worker_profile.resize(image)), width, height, result)
+
+
+def _detect_array(image_rgb: np.ndarray) -> np.ndarray:
+    """
+    Executa o FaceMesh sobre um quadro recebido por pickle (quadros maiores que o slot).
+
+    Args:
+        image_rgb (np.ndarray): Imagem RGB.
+
+    Returns:
+        np.ndarray: Marcos (468, 3), ou array vazio se nenhuma face foi detectada.
+    """
+    height, width, _ = image_rgb.shape
+    result = np.empty((NUM_LANDMARKS, 3))
+    count = _write_landmarks(_worker_face_mesh.process(_worker_profile.resize(image_rgb)), width, height, result)
+    return result[:count]
+
+
+class FaceMeshPool:
+    """
+    Pool de processos detectores alimentado por um anel de slots de memória compartilhada.
+
+    Cada slot reserva espaço para um quadro RGB de até ``max_frame_shape`` seguido do resultado
+    468 x 3 em float64. Os slots livres ficam em uma fila segura entre threads, de modo que
+    várias requisições do Flask podem usar o pool ao mesmo tempo; se todos estiverem ocupados,
+    a requisição espera a liberação de um slot.
+
+    Args:
+        num_workers (int): Número de processos detectores.
+        num_slots (int, opcional): Número de slots do anel. Padrão: ``2 * num_workers``.
+        max_frame_shape (tuple): Maior (altura, largura) aceita em um slot. Quadros maiores são
+            enviados por pickle.
+        start_method (str): Método de início dos processos. O padrão é ``spawn``: um ``fork``
+            depois que o MediaPipe/TensorFlow já criou suas threads corrompe o heap dos detectores.
+            Com ``spawn`` o script principal é reimportado nos detectores, então o pool deve ser
+            criado dentro de ``if __name__ == '__main__'`` de um script leve (na API, ``serve_api.py``).
+        profile (str, opcional): Perfil de velocidade do FaceMesh dos detectores (ver
+            ``detector_profiles``). Padrão: ``balanced``.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 2,
+        num_slots: int = None,
+        max_frame_shape: tuple = (2160, 3840),
+        start_method: str = "spawn",
+        profile: str = None,
+    ):
+        self.num_slots = num_slots or 2 * num_workers
+        self.max_frame_shape = tuple(max_frame_shape)
+        self._slot_bytes = max_frame_shape[0] * max_frame_shape[1] * 3
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self.num_slots * (self._slot_bytes + RESULT_BYTES)
+        )
+        self._free_slots = queue.Queue()
+        for slot in range(self.num_slots):
+            self._free_slots.put(slot)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(self._shm.name, self._slot_bytes, profile),
+        )
+
+    def _offset(self, slot: int) -> int:
+        """Retorna o deslocamento, em bytes, do início de um slot no bloco compartilhado."""
+        return slot * (self._slot_bytes + RESULT_BYTES)
+
+    def _slot_image(self, slot: int, shape: tuple) -> np.ndarray:
+        """Retorna a visão uint8 da área de imagem de um slot com o formato pedido."""
+        return np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf, offset=self._offset(slot))
+
+    def _fits(self, shape: tuple) -> bool:
+        """Indica se um quadro com o formato dado cabe em um slot."""
+        return shape[0] * shape[1] * 3 <= self._slot_bytes
+
+    def _run_slot(self, slot: int, height: int, width: int) -> list:
+        """
+        Envia o descritor do slot a um detector e lê o resultado da memória compartilhada.
+
+        Args:
+            slot (int): Índice do slot (já preenchido com o quadro).
+            height (int): Altura do quadro.
+            width (int): Largura do quadro.
+
+        Returns:
+            list: Marcos faciais 3D (x, y, z), no mesmo formato de ``detect_face_mesh``.
+        """
+        count = self._executor.submit(_detect_slot, slot, height, width).result()
+        result = np.ndarray(
+            (NUM_LANDMARKS, 3), dtype=np.float64, buffer=self._shm.buf,
+            offset=self._offset(slot) + self._slot_bytes,
+        )
+        return [(int(x), int(y), float(z)) for x, y, z in result[:count]]
+
+    def detect(self, image_rgb: np.ndarray) -> list:
+        """
+        Detecta os marcos faciais de um quadro RGB já decodificado.
+
+        Args:
+            image_rgb (np.ndarray): Imagem RGB.
+
+        Returns:
+            list: Marcos faciais 3D (x, y, z), no mesmo formato de ``detect_face_mesh``.
+        """
+        height, width, _ = image_rgb.shape
+        if not self._fits(image_rgb.shape):
+            return self.detect_pickled(image_rgb)
+
+        slot = self._free_slots.get()
+        try:
+            self._slot_image(slot, image_rgb.shape)[:] = image_rgb
+            return self._run_slot(slot, height, width)
+        finally:
+            self._free_slots.put(slot)
+
+    def detect_pickled(self, image_rgb: np.ndarray) -> list:
+        """
+        Detecta os marcos faciais enviando o quadro inteiro por pickle ao processo detector.
+
+        Usado para quadros maiores que o slot e como referência de comparação no benchmark.
+
+        Args:
+            image_rgb (np.ndarray): Imagem RGB.
+
+        Returns:
+            list: Marcos faciais 3D (x, y, z), no mesmo formato de ``detect_face_mesh``.
+        """
+        landmarks = self._executor.submit(_detect_array, image_rgb).result()
+        return [(int(x), int(y), float(z)) for x, y, z in landmarks]
+
+    def detect_encoded(self, data: bytes, with_shape: bool = False):
+        """
+        Decodifica uma imagem diretamente em um slot livre e detecta seus marcos faciais.
+
+        A conversão BGR para RGB do decodificador escreve direto na memória compartilhada,
+        então o quadro não é copiado nem serializado para chegar ao processo detector.
+
+        Args:
+            data (bytes): Conteúdo do arquivo da imagem (corpo do upload).
+            with_shape (bool): Se True, devolve também a (altura, largura) da imagem decodificada.
+
+        Returns:
+            list: Marcos faciais 3D (x, y, z), no mesmo formato de ``detect_face_mesh``, ou a tupla
+            (marcos, (altura, largura)) se ``with_shape`` for True.
+
+        Raises:
+            ValueError: Se o conteúdo não puder ser decodificado como imagem.
+        """
+        slot = self._free_slots.get()
+        try:
+            oversized = []
+
+            def allocate(shape):
+                if self._fits(shape):
+                    return self._slot_image(slot, shape)
+                oversized.append(True)
+                return np.empty(shape, dtype=np.uint8)
+
+            image_rgb = decode_image_bytes(data, allocate=allocate)
+            height, width, _ = image_rgb.shape
+            landmarks = self.detect(image_rgb) if oversized else self._run_slot(slot, height, width)
+            return (landmarks, (height, width)) if with_shape else landmarks
+        finally:
+            self._free_slots.put(slot)
+
+    def close(self) -> None:
+        """
+        Encerra os processos detectores e libera a memória compartilhada.
+
+        Returns:
+            None
+        """
+        self._executor.shutdown(wait=True)
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
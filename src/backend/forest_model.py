@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Inferência Vetorizada de Random Forest com Árvores Achatadas
+============================================================
+O ``RandomForestClassifier(n_estimators=100)`` do notebook não tinha como ser servido pela API.
+Este módulo:
+- Achata todas as árvores da floresta em arrays NumPy contíguos e compartilhados por todas elas
+  (feature, limiar, primeiro filho e probabilidade da classe 1 de cada nó), com os nós de cada
+  árvore em largura, de modo que os dois filhos de um nó sejam vizinhos, e salva esses arrays em
+  um artefato ``.forest``,
+- Avalia um lote de amostras percorrendo todas as árvores ao mesmo tempo: a cada passo, todos os
+  pares (amostra, árvore) ainda ativos descem um nível com ``filho + (x > limiar)``, só com
+  operações de indexação em NumPy. As folhas apontam para si mesmas com limiar infinito, e os
+  pares que chegam a uma folha saem do conjunto ativo,
+- Segue a interface de ``model.predict`` usada pela API e não depende do scikit-learn na carga.
+
+O ``predict_proba`` do scikit-learn percorre árvore por árvore, com o custo de despacho das threads
+do ``joblib`` a cada chamada, o que domina a latência de requisições com uma única face.
+
+Uso (a partir da pasta ``src/backend``):
+    python forest_model.py face_mesh_no_autism_3.0.csv face_mesh_with_autism_3.0.csv --output ../models/random_forest_3.0.forest
+
+@author: George Flores
+"""
+
+import argparse
+import os
+import sys
+
+import joblib
+import numpy as np
+
+FOREST_EXTENSION = ".forest"
+
+
+class ForestModel:
+    """
+    Floresta de árvores de decisão binárias avaliada em lote sobre arrays achatados.
+
+    Os nós de todas as árvores ficam em arrays únicos; ``roots`` indica o nó raiz de cada árvore.
+    O filho direito de um nó é sempre ``child + 1``. Nas folhas, ``child`` aponta para o próprio
+    nó e o limiar é infinito.
+
+    Args:
+        feature (np.ndarray): Feature comparada em cada nó (int32).
+        threshold (np.ndarray): Limiar de cada nó; a amostra desce à esquerda se ``x <= limiar`` (float64).
+        child (np.ndarray): Índice global do filho esquerdo de cada nó (int32).
+        value (np.ndarray): Probabilidade da classe 1 em cada nó (float32; usada nas folhas).
+        roots (np.ndarray): Índice do nó raiz de cada árvore (int32).
+        max_depth (int): Maior profundidade entre as árvores.
+        num_features (int): Número de features de entrada.
+        feature_names (list, opcional): Nomes das features, na ordem das colunas.
+        validation_fraction (float, opcional): Fração de validação do ``ShardedDataset`` excluída do
+            treinamento; None se as linhas de treinamento forem desconhecidas.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        child: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        num_features: int,
+        feature_names: list = None,
+        validation_fraction: float = None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.child = child
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.num_features = num_features
+        self.feature_names = feature_names
+        self.validation_fraction = validation_fraction
+
+    @property
+    def num_trees(self) -> int:
+        """Número de árvores."""
+        return len(self.roots)
+
+    def apply(self, x) -> np.ndarray:
+        """
+        Encontra a folha de cada amostra em cada árvore.
+
+        Args:
+            x (np.ndarray): Features com formato (N, número de features).
+
+        Returns:
+            np.ndarray: Índices globais das folhas, com formato (N, número de árvores).
+
+        Raises:
+            ValueError: Se o número de features não corresponder à entrada do modelo.
+        """
+        # Como no scikit-learn: as features são convertidas para float32 antes da comparação
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim != 2 or x.shape[1] != self.num_features:
+            raise ValueError(f"Entrada com formato {x.shape}; esperado (N, {self.num_features}).")
+        num_samples = len(x)
+        x = x.astype(np.float64).ravel()
+        node = np.tile(np.asarray(self.roots), num_samples)
+        offsets = np.repeat(np.arange(num_samples) * self.num_features, self.num_trees)
+
+        # Pares (amostra, árvore) que ainda não chegaram a uma folha
+        active = np.arange(node.size)
+        current = node
+        while active.size:
+            following = self.child[current] + (x[offsets + self.feature[current]] > self.threshold[current])
+            moving = following != current
+            node[active] = following
+            active, current, offsets = active[moving], following[moving], offsets[moving]
+        return node.reshape(num_samples, self.num_trees)
+
+    def predict(self, x, verbose: int = 0) -> np.ndarray:
+        """
+        Calcula a probabilidade da classe 1 (média das árvores), com a interface de ``model.predict`` do Keras.
+
+        Args:
+            x (np.ndarray): Features com formato (N, número de features).
+            verbose (int): Ignorado; mantido por compatibilidade com o Keras.
+
+        Returns:
+            np.ndarray: Probabilidades com formato (N, 1), em float32.
+        """
+        return self.value[self.apply(x)].mean(axis=1, dtype=np.float64).astype(np.float32)[:, None]
+
+    def nbytes(self) -> int:
+        """Retorna o tamanho, em bytes, dos arrays dos nós."""
+        arrays = (self.feature, self.threshold, self.child, self.value, self.roots)
+        return sum(np.asarray(a).nbytes for a in arrays)
+
+
+def flatten_forest(forest, feature_names: list = None, validation_fraction: float = None) -> ForestModel:
+    """
+    Achata um ``RandomForestClassifier`` binário treinado em arrays contíguos.
+
+    Args:
+        forest (RandomForestClassifier): Floresta treinada com as classes 0 e 1.
+        feature_names (list, opcional): Nomes das features.
+        validation_fraction (float, opcional): Fração de validação excluída do treinamento (ver ``ForestModel``).
+
+    Returns:
+        ForestModel: Floresta achatada.
+
+    Raises:
+        ValueError: Se a floresta não for um classificador binário.
+    """
+    if len(forest.classes_) != 2:
+        raise ValueError(f"Esperado um classificador binário; classes: {list(forest.classes_)}")
+    features, thresholds, children, values, roots = [], [], [], [], []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        # Ordem em largura: os filhos de cada nó interno ficam em posições consecutivas
+        order = [0]
+        for node in order:
+            if tree.children_left[node] >= 0:
+                order += [tree.children_left[node], tree.children_right[node]]
+        order = np.asarray(order)
+        position = np.empty_like(order)
+        position[order] = np.arange(len(order))
+
+        leaf = tree.children_left[order] < 0
+        roots.append(offset)
+        features.append(np.where(leaf, 0, tree.feature[order]))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold[order]))
+        first_child = position[np.maximum(tree.children_left[order], 0)]
+        children.append(np.where(leaf, np.arange(len(order)), first_child) + offset)
+        counts = tree.value[order, 0, :]
+        values.append(counts[:, 1] / counts.sum(axis=1))
+        offset += len(order)
+
+    return ForestModel(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        child=np.concatenate(children).astype(np.int32),
+        value=np.concatenate(values).astype(np.float32),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=max(estimator.tree_.max_depth for estimator in forest.estimators_),
+        num_features=forest.n_features_in_,
+        feature_names=feature_names,
+        validation_fraction=validation_fraction,
+    )
+
+
+def save_forest_model(model: ForestModel, path: str) -> None:
+    """
+    Salva a floresta achatada em um artefato ``.forest`` sem compressão (mapeável em memória).
+
+    O arquivo é escrito ao lado e renomeado, para que o registro de modelos nunca veja um arquivo pela metade.
+
+    Args:
+        model (ForestModel): Floresta achatada.
+        path (str): Caminho do artefato.
+
+    Returns:
+        None
+    """
+    artifact = {
+        "feature": model.feature,
+        "threshold": model.threshold,
+        "child": model.child,
+        "value": model.value,
+        "roots": model.roots,
+        "max_depth": model.max_depth,
+        "num_features": model.num_features,
+        "feature_names": model.feature_names,
+        "validation_fraction": model.validation_fraction,
+    }
+    temporary = f"{path}.tmp"
+    joblib.dump(artifact, temporary)
+    os.replace(temporary, path)
+
+
+def load_forest_model(model_path: str, mmap: bool = True, debug: bool = False) -> ForestModel:
+    """
+    Carrega um artefato ``.forest``, com os arrays dos nós mapeados em memória.
+
+    Args:
+        model_path (str): Caminho do artefato.
+        mmap (bool): Se False, lê os arrays inteiros para a memória do processo.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        ForestModel: Floresta pronta para predição.
+    """
+    model = ForestModel(**joblib.load(model_path, mmap_mode="r" if mmap else None))
+    if debug:
+        print(f"Floresta {model_path} carregada: {model.num_trees} árvores, {len(model.feature)} nós, "
+              f"profundidade {model.max_depth}, {model.nbytes()} bytes.")
+    return model
+
+
+def main(argv: list = None) -> None:
+    """
+    Treina (ou lê) um ``RandomForestClassifier``, achata e exporta a floresta para a API.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Exporta uma Random Forest achatada para a API.")
+    parser.add_argument("shards", nargs="*", help="CSVs de marcos ou de distâncias, pastas ou padrões glob.")
+    parser.add_argument("--output", default=f"../models/random_forest_3.0{FOREST_EXTENSION}")
+    parser.add_argument("--sklearn-model", help="Floresta já treinada, salva com joblib (em vez dos shards).")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--validation-fraction", type=float, default=0.2,
+                        help="Fração de validação do ShardedDataset deixada fora do treinamento (0 usa todas as linhas).")
+    args = parser.parse_args(argv)
+
+    if args.sklearn_model:
+        # As linhas de treinamento de uma floresta externa são desconhecidas
+        forest = joblib.load(args.sklearn_model)
+        feature_names = list(getattr(forest, "feature_names_in_", [])) or None
+        validation_fraction = None
+    elif args.shards:
+        # Os leitores de shards ficam em src/
+        sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+        from sklearn.ensemble import RandomForestClassifier
+        from training_data_loader import ShardedDataset, list_shards, shard_feature_names
+
+        # Só as linhas de treino: a validação do ShardedDataset fica para o model_evaluation
+        paths = list_shards(args.shards)
+        batches = list(ShardedDataset(paths, batch_size=65536, subset="train",
+                                      validation_fraction=args.validation_fraction, shuffle=False).epoch())
+        forest = RandomForestClassifier(n_estimators=args.n_estimators, random_state=args.random_state)
+        forest.fit(np.concatenate([X for X, _ in batches]), np.concatenate([y for _, y in batches]))
+        feature_names = shard_feature_names(paths[0])
+        validation_fraction = args.validation_fraction
+    else:
+        parser.error("Informe os shards de treinamento ou --sklearn-model.")
+
+    model = flatten_forest(forest, feature_names, validation_fraction)
+    save_forest_model(model, args.output)
+    print(f"Floresta com {model.num_trees} árvores, {len(model.feature)} nós e profundidade "
+          f"{model.max_depth} ({model.nbytes() / 1024:.0f} KB) salva em {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
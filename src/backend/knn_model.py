@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+Classificador KNN Servido por Árvore Persistida e Mapeada em Memória
+====================================================================
+Os melhores modelos KNN do notebook (``GridSearchCV`` sobre ``KNeighborsClassifier`` com as
+distâncias do conjunto 3.0) não podiam ser servidos pela API, que só conhecia o modelo Keras.
+Este módulo:
+- Na exportação, padroniza as features de treinamento, constrói uma ``BallTree`` (ou ``KDTree``)
+  do scikit-learn e salva árvore, rótulos e estatísticas em um artefato ``.knn`` sem compressão,
+- Na inicialização, carrega o artefato com ``joblib.load(mmap_mode="r")``: os arrays da árvore ficam
+  mapeados em memória, carregam em milissegundos e são compartilhados pelo cache de páginas entre
+  os processos do servidor pre-fork,
+- Responde com a fração de votos dos vizinhos para a classe 1 (ponderada pela distância, se
+  configurado), na mesma interface de ``model.predict`` usada pela API, em lote.
+
+A consulta usa ``tree.query`` diretamente, sem o ``KNeighborsClassifier.predict_proba``, cujas
+validações custam cerca de 1 ms por chamada. Como o artefato já contém a padronização do
+treinamento, a API não deve aplicar ``FEATURE_STATISTICS`` aos modelos KNN.
+
+Uso (a partir da pasta ``src/backend``):
+    python knn_model.py face_mesh_no_autism_3.0.csv face_mesh_with_autism_3.0.csv --output ../models/knn_3.0.knn --search
+
+@author: George Flores
+"""
+
+import argparse
+import os
+import sys
+
+import joblib
+import numpy as np
+from sklearn.neighbors import BallTree, KDTree
+
+KNN_EXTENSION = ".knn"
+TREES = {"ball_tree": BallTree, "kd_tree": KDTree}
+
+# Grade de hiperparâmetros do notebook (autism_condition_classification.ipynb)
+PARAM_GRID = {"n_neighbors": range(1, 31), "weights": ["uniform", "distance"], "metric": ["euclidean", "manhattan"]}
+
+
+class KNNModel:
+    """
+    Classificador KNN binário sobre uma árvore de vizinhos já construída.
+
+    Args:
+        tree (BallTree | KDTree): Árvore construída sobre as features padronizadas de treinamento.
+        labels (np.ndarray): Classe (0 ou 1) de cada amostra de treinamento, na ordem de construção.
+        n_neighbors (int): Número de vizinhos consultados.
+        weights (str): ``"uniform"`` ou ``"distance"`` (votos ponderados pelo inverso da distância).
+        mean (np.ndarray, opcional): Média de cada feature, usada na padronização das consultas.
+        scale (np.ndarray, opcional): Desvio padrão de cada feature.
+        feature_names (list, opcional): Nomes das features, na ordem das colunas.
+        validation_fraction (float, opcional): Fração de validação do ``ShardedDataset`` excluída do
+            treinamento; None se as linhas de treinamento forem desconhecidas.
+    """
+
+    def __init__(
+        self,
+        tree,
+        labels: np.ndarray,
+        n_neighbors: int = 5,
+        weights: str = "uniform",
+        mean: np.ndarray = None,
+        scale: np.ndarray = None,
+        feature_names: list = None,
+        validation_fraction: float = None,
+    ):
+        if weights not in ("uniform", "distance"):
+            raise ValueError(f"Pesos não suportados: {weights}")
+        self.tree = tree
+        self.labels = labels
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.num_features = tree.data.shape[1]
+        self.mean = np.zeros(self.num_features) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = np.ones(self.num_features) if scale is None else np.asarray(scale, dtype=np.float64)
+        self.feature_names = feature_names
+        self.validation_fraction = validation_fraction
+
+    def kneighbors(self, x) -> tuple:
+        """
+        Busca os vizinhos mais próximos de cada consulta.
+
+        Args:
+            x (np.ndarray): Features sem padronização, com formato (N, número de features).
+
+        Returns:
+            tuple: (distâncias (N, k), índices das amostras de treinamento (N, k)).
+
+        Raises:
+            ValueError: Se o número de features não corresponder ao do treinamento.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim != 2 or x.shape[1] != self.num_features:
+            raise ValueError(f"Entrada com formato {x.shape}; esperado (N, {self.num_features}).")
+        return self.tree.query((x - self.mean) / self.scale, k=self.n_neighbors)
+
+    def predict(self, x, verbose: int = 0) -> np.ndarray:
+        """
+        Calcula a fração de votos para a classe 1, com a mesma interface de ``model.predict`` do Keras.
+
+        Args:
+            x (np.ndarray): Features com formato (N, número de features).
+            verbose (int): Ignorado; mantido por compatibilidade com o Keras.
+
+        Returns:
+            np.ndarray: Probabilidades da classe 1 com formato (N, 1), em float32.
+        """
+        distances, indices = self.kneighbors(x)
+        votes = np.asarray(self.labels)[indices].astype(np.float64)
+        if self.weights == "uniform":
+            probability = votes.mean(axis=1)
+        else:
+            # Como no scikit-learn: se houver vizinhos à distância zero, só eles votam
+            exact = distances == 0
+            with np.errstate(divide="ignore"):
+                weights = np.where(exact.any(axis=1, keepdims=True), exact, 1.0 / distances)
+            probability = (weights * votes).sum(axis=1) / weights.sum(axis=1)
+        return probability.astype(np.float32)[:, None]
+
+    def nbytes(self) -> int:
+        """Retorna o tamanho, em bytes, dos arrays da árvore e dos rótulos."""
+        return sum(np.asarray(a).nbytes for a in self.tree.get_arrays()) + np.asarray(self.labels).nbytes
+
+
+def build_knn_model(
+    X,
+    y,
+    n_neighbors: int = 5,
+    weights: str = "uniform",
+    metric: str = "euclidean",
+    algorithm: str = "ball_tree",
+    leaf_size: int = 40,
+    standardize: bool = True,
+    feature_names: list = None,
+    validation_fraction: float = None,
+) -> KNNModel:
+    """
+    Padroniza as features de treinamento e constrói a árvore de vizinhos.
+
+    Args:
+        X (np.ndarray): Features de treinamento (N, F).
+        y (np.ndarray): Classes (N,), 0 ou 1.
+        n_neighbors (int): Número de vizinhos.
+        weights (str): ``"uniform"`` ou ``"distance"``.
+        metric (str): Métrica da árvore (por exemplo, ``"euclidean"`` ou ``"manhattan"``).
+        algorithm (str): ``"ball_tree"`` ou ``"kd_tree"``.
+        leaf_size (int): Número de amostras por folha da árvore.
+        standardize (bool): Se True, padroniza as features (média 0 e desvio 1), como no notebook.
+        feature_names (list, opcional): Nomes das features.
+        validation_fraction (float, opcional): Fração de validação excluída de ``X`` (ver ``KNNModel``).
+
+    Returns:
+        KNNModel: Modelo pronto para predição.
+
+    Raises:
+        ValueError: Se ``algorithm`` não for suportado.
+    """
+    if algorithm not in TREES:
+        raise ValueError(f"Algoritmo não suportado: {algorithm}")
+    X = np.asarray(X, dtype=np.float64)
+    mean = X.mean(axis=0) if standardize else np.zeros(X.shape[1])
+    scale = X.std(axis=0) if standardize else np.ones(X.shape[1])
+    scale = np.where(scale > 0, scale, 1.0)
+    tree = TREES[algorithm]((X - mean) / scale, leaf_size=leaf_size, metric=metric)
+    labels = np.asarray(y, dtype=np.int8)
+    return KNNModel(tree, labels, n_neighbors, weights, mean, scale, feature_names, validation_fraction)
+
+
+def save_knn_model(model: KNNModel, path: str) -> None:
+    """
+    Salva o modelo em um artefato ``.knn`` sem compressão (necessário para o mapeamento em memória).
+
+    O arquivo é escrito ao lado e renomeado, para que processos com a versão anterior mapeada e o
+    registro de modelos nunca vejam um arquivo pela metade.
+
+    Args:
+        model (KNNModel): Modelo a salvar.
+        path (str): Caminho do artefato.
+
+    Returns:
+        None
+    """
+    artifact = {
+        "tree": model.tree,
+        "labels": np.asarray(model.labels),
+        "n_neighbors": model.n_neighbors,
+        "weights": model.weights,
+        "mean": model.mean,
+        "scale": model.scale,
+        "feature_names": model.feature_names,
+        "validation_fraction": model.validation_fraction,
+    }
+    temporary = f"{path}.tmp"
+    joblib.dump(artifact, temporary)
+    os.replace(temporary, path)
+
+
+def load_knn_model(model_path: str, mmap: bool = True, debug: bool = False) -> KNNModel:
+    """
+    Carrega um artefato ``.knn``, com os arrays da árvore mapeados em memória.
+
+    Args:
+        model_path (str): Caminho do artefato.
+        mmap (bool): Se False, lê os arrays inteiros para a memória do processo.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        KNNModel: Modelo pronto para predição.
+    """
+    artifact = joblib.load(model_path, mmap_mode="r" if mmap else None)
+    model = KNNModel(
+        artifact["tree"], artifact["labels"], artifact["n_neighbors"], artifact["weights"],
+        artifact["mean"], artifact["scale"], artifact["feature_names"], artifact.get("validation_fraction"),
+    )
+    if debug:
+        print(f"Modelo KNN {model_path} carregado: {len(model.labels)} amostras, k={model.n_neighbors}, "
+              f"{model.nbytes()} bytes {'mapeados' if mmap else 'em memória'}.")
+    return model
+
+
+def search_knn_params(X, y, cv: int = 10, param_grid: dict = None, debug: bool = False) -> dict:
+    """
+    Busca os hiperparâmetros com ``GridSearchCV``, como no notebook, sobre as features padronizadas.
+
+    Args:
+        X (np.ndarray): Features de treinamento (N, F).
+        y (np.ndarray): Classes (N,).
+        cv (int): Número de dobras da validação cruzada.
+        param_grid (dict, opcional): Grade de hiperparâmetros. Padrão: ``PARAM_GRID``.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        dict: Melhores ``n_neighbors``, ``weights`` e ``metric``.
+    """
+    from sklearn.model_selection import GridSearchCV
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    grid = {f"kneighborsclassifier__{name}": values for name, values in (param_grid or PARAM_GRID).items()}
+    search = GridSearchCV(make_pipeline(StandardScaler(), KNeighborsClassifier()), grid, cv=cv, scoring="accuracy")
+    search.fit(X, y)
+    best = {name.split("__")[1]: value for name, value in search.best_params_.items()}
+    if debug:
+        print(f"Melhores parâmetros: {best} (acurácia média {search.best_score_:.4f})")
+    return best
+
+
+def main(argv: list = None) -> None:
+    """
+    Exporta um modelo KNN a partir de shards de treinamento (ver ``training_data_loader``).
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    # Os leitores de shards ficam em src/
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from training_data_loader import ShardedDataset, list_shards, shard_feature_names
+
+    parser = argparse.ArgumentParser(description="Exporta um classificador KNN para a API.")
+    parser.add_argument("shards", nargs="+", help="CSVs de marcos ou de distâncias, pastas ou padrões glob.")
+    parser.add_argument("--output", default=f"../models/knn_3.0{KNN_EXTENSION}")
+    parser.add_argument("--n-neighbors", type=int, default=5)
+    parser.add_argument("--weights", choices=["uniform", "distance"], default="uniform")
+    parser.add_argument("--metric", default="euclidean")
+    parser.add_argument("--algorithm", choices=sorted(TREES), default="ball_tree")
+    parser.add_argument("--leaf-size", type=int, default=40)
+    parser.add_argument("--search", action="store_true", help="Escolhe k, pesos e métrica com GridSearchCV.")
+    parser.add_argument("--validation-fraction", type=float, default=0.2,
+                        help="Fração de validação do ShardedDataset deixada fora do treinamento (0 usa todas as linhas).")
+    args = parser.parse_args(argv)
+
+    # Só as linhas de treino: a validação do ShardedDataset fica para o model_evaluation
+    paths = list_shards(args.shards)
+    batches = list(ShardedDataset(paths, batch_size=65536, subset="train",
+                                  validation_fraction=args.validation_fraction, shuffle=False).epoch())
+    X = np.concatenate([X for X, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+    params = {"n_neighbors": args.n_neighbors, "weights": args.weights, "metric": args.metric}
+    if args.search:
+        params = search_knn_params(X, y, debug=True)
+
+    model = build_knn_model(
+        X, y, algorithm=args.algorithm, leaf_size=args.leaf_size,
+        feature_names=shard_feature_names(paths[0]), validation_fraction=args.validation_fraction, **params,
+    )
+    save_knn_model(model, args.output)
+    print(f"Modelo KNN com {len(y)} amostras ({params}) salvo em {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
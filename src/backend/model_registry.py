@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+Registro de Modelos com Troca a Quente
+======================================
+Este módulo mantém várias versões do modelo carregadas ao mesmo tempo para a API:
+- Carrega todos os artefatos (``.h5``/``.keras``, ``.knn`` de ``knn_model`` e ``.forest`` de
+  ``forest_model``) de um diretório observado,
+- Encaminha cada requisição para uma versão pelo cabeçalho ``X-Model-Version`` ou por divisão
+  percentual (determinística pela chave da requisição, para que reenvios caiam na mesma versão),
+- Observa o diretório em uma thread de fundo e troca atomicamente os modelos novos ou alterados,
+  sem derrubar requisições em andamento nem reiniciar o processo.
+
+A troca é feita substituindo, sob um lock, o dicionário imutável de versões carregadas. Uma
+requisição em andamento continua usando a referência do modelo que obteve, e o modelo novo só é
+publicado depois de carregado e aquecido (uma predição de teste), o que evita picos de latência.
+
+@author: George Flores
+"""
+
+import atexit
+import hashlib
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+from forest_model import FOREST_EXTENSION, ForestModel, load_forest_model
+from knn_model import KNN_EXTENSION, KNNModel, load_knn_model
+
+MODEL_EXTENSIONS = (".h5", ".keras", KNN_EXTENSION, FOREST_EXTENSION)
+
+# Artefatos com carregador próprio, mapeados em memória
+ARTIFACT_LOADERS = {KNN_EXTENSION: load_knn_model, FOREST_EXTENSION: load_forest_model}
+
+# Modelos que recebem as distâncias sem FEATURE_STATISTICS: o KNN já contém a padronização do
+# treinamento e a floresta foi treinada com as distâncias originais
+SELF_CONTAINED_MODELS = (KNNModel, ForestModel)
+
+
+class LoadedModel:
+    """
+    Versão de modelo carregada e pronta para uso.
+
+    Args:
+        name (str): Nome da versão (nome do arquivo sem extensão).
+        path (str): Caminho do artefato.
+        artifact_version (str): Identificador do artefato (ver ``model_artifact_version``).
+        model: Modelo Keras carregado.
+    """
+
+    def __init__(self, name: str, path: str, artifact_version: str, model):
+        self.name = name
+        self.path = path
+        self.artifact_version = artifact_version
+        self.model = model
+
+
+class ModelRegistry:
+    """
+    Registro de versões de modelo com roteamento e troca a quente a partir de um diretório.
+
+    Args:
+        model_dir (str): Diretório observado com os artefatos dos modelos.
+        loader (callable): Função que carrega um artefato (por exemplo, ``tf.keras.models.load_model``).
+        version_of (callable): Função que retorna a versão de um artefato a partir do caminho.
+        default_model (str, opcional): Versão usada quando não há cabeçalho nem divisão configurada.
+            Se None, usa a primeira versão em ordem alfabética.
+        splits (dict, opcional): Pesos da divisão percentual por versão, por exemplo
+            ``{"modelo_a": 90, "modelo_b": 10}``.
+        num_features (int): Número de features usado na predição de aquecimento.
+        debug (bool): Se True, exibe informações de debug.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        loader,
+        version_of,
+        default_model: str = None,
+        splits: dict = None,
+        num_features: int = 39,
+        debug: bool = False,
+    ):
+        self.model_dir = model_dir
+        self.default_model = default_model
+        self.splits = dict(splits or {})
+        self.debug = debug
+        self._loader = loader
+        self._version_of = version_of
+        self._num_features = num_features
+        self._models = {}
+        self._pending = {}
+        self._failed = {}
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self.swaps = 0
+
+        self.refresh(require_stable=False)
+        if not self._models:
+            raise FileNotFoundError(f"Nenhum modelo encontrado em: {model_dir}")
+
+    def _scan(self) -> dict:
+        """
+        Lista os artefatos do diretório observado.
+
+        Returns:
+            dict: Nome da versão -> (caminho, versão do artefato).
+        """
+        artifacts = {}
+        for file_name in sorted(os.listdir(self.model_dir)):
+            if file_name.endswith(MODEL_EXTENSIONS):
+                path = os.path.join(self.model_dir, file_name)
+                try:
+                    artifacts[os.path.splitext(file_name)[0]] = (path, self._version_of(path))
+                except FileNotFoundError:
+                    continue  # removido durante a listagem
+        return artifacts
+
+    def _load(self, name: str, path: str, artifact_version: str) -> LoadedModel:
+        """
+        Carrega e aquece um artefato fora do lock de troca.
+
+        Args:
+            name (str): Nome da versão.
+            path (str): Caminho do artefato.
+            artifact_version (str): Versão do artefato.
+
+        Returns:
+            LoadedModel: Versão carregada e aquecida.
+        """
+        model = self._loader(path)
+        # Predição de aquecimento: a primeira chamada constrói o grafo e seria lenta na requisição.
+        # Também rejeita artefatos incompatíveis com as features da API (por exemplo, modelos do
+        # notebook treinados com outro conjunto de distâncias).
+        model.predict(np.zeros((1, self._num_features)), verbose=0)
+        if self.debug:
+            print(f"Modelo {name} carregado ({artifact_version}).")
+        return LoadedModel(name, path, artifact_version, model)
+
+    def refresh(self, require_stable: bool = True) -> bool:
+        """
+        Sincroniza as versões carregadas com o diretório observado.
+
+        Um artefato novo ou alterado só é carregado quando a sua versão (tamanho e data) se repete
+        em duas verificações seguidas, para não carregar um arquivo ainda sendo copiado.
+
+        Args:
+            require_stable (bool): Se False, carrega imediatamente (usado na inicialização).
+
+        Returns:
+            bool: True se o conjunto de versões publicado mudou.
+        """
+        current = self._models
+        artifacts = self._scan()
+        loaded = {}
+        for name, (path, artifact_version) in artifacts.items():
+            previous = current.get(name)
+            if previous is not None and previous.artifact_version == artifact_version:
+                continue
+            if self._failed.get(name) == artifact_version:
+                continue  # só tenta novamente quando o arquivo mudar
+            if require_stable and self._pending.get(name) != artifact_version:
+                self._pending[name] = artifact_version
+                continue
+            try:
+                loaded[name] = self._load(name, path, artifact_version)
+            except Exception as e:
+                self._failed[name] = artifact_version
+                print(f"Erro ao carregar o modelo {path}: {e}")
+            self._pending.pop(name, None)
+
+        removed = set(current) - set(artifacts)
+        if not loaded and not removed:
+            return False
+
+        with self._swap_lock:
+            models = {name: entry for name, entry in self._models.items() if name not in removed}
+            models.update(loaded)
+            self._models = models  # publicação atômica do novo conjunto de versões
+            self.swaps += 1
+
+        if self.debug:
+            print(f"Modelos publicados: {sorted(self._models)}")
+        return True
+
+    def start_watching(self, poll_interval: float = 2.0) -> None:
+        """
+        Inicia a thread de fundo que observa o diretório de modelos.
+
+        Args:
+            poll_interval (float): Intervalo, em segundos, entre verificações.
+
+        Returns:
+            None
+        """
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(poll_interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Erro ao observar o diretório de modelos: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+        # Evita encerrar o interpretador com um carregamento do TensorFlow em andamento
+        atexit.register(self.stop_watching)
+
+    def stop_watching(self) -> None:
+        """
+        Para a thread de observação do diretório.
+
+        Returns:
+            None
+        """
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        self._stop.clear()
+
+    def select(self, requested: str = None, routing_key: str = None) -> LoadedModel:
+        """
+        Escolhe a versão do modelo para uma requisição.
+
+        Ordem de prioridade: versão pedida explicitamente (cabeçalho), divisão percentual
+        configurada e, por fim, a versão padrão.
+
+        Args:
+            requested (str, opcional): Versão pedida pelo cliente.
+            routing_key (str, opcional): Chave estável da requisição (por exemplo, o hash da malha),
+                usada para que a divisão percentual seja determinística.
+
+        Returns:
+            LoadedModel: Versão escolhida.
+
+        Raises:
+            KeyError: Se a versão pedida não estiver carregada.
+        """
+        models = self._models  # leitura única do conjunto publicado
+        if requested:
+            if requested not in models:
+                raise KeyError(f"Versão de modelo não carregada: {requested}")
+            return models[requested]
+
+        weights = {name: weight for name, weight in self.splits.items() if name in models and weight > 0}
+        if weights:
+            total = sum(weights.values())
+            if routing_key is not None:
+                point = int(hashlib.md5(routing_key.encode()).hexdigest(), 16) % 10000 / 10000 * total
+            else:
+                point = random.random() * total
+            for name, weight in weights.items():
+                point -= weight
+                if point < 0:
+                    return models[name]
+            return models[name]
+
+        if self.default_model in models:
+            return models[self.default_model]
+        return models[sorted(models)[0]]
+
+    def versions(self) -> dict:
+        """
+        Retorna as versões carregadas e seus artefatos.
+
+        Returns:
+            dict: Nome da versão -> versão do artefato.
+        """
+        return {name: entry.artifact_version for name, entry in sorted(self._models.items())}
+
+
+def parse_splits(value: str) -> dict:
+    """
+    Converte a configuração de divisão percentual ``"modelo_a:90,modelo_b:10"`` em dicionário.
+
+    Args:
+        value (str): Texto da configuração (por exemplo, a variável de ambiente ``MODEL_SPLITS``).
+
+    Returns:
+        dict: Nome da versão -> peso.
+    """
+    splits = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        name, _, weight = item.rpartition(":")
+        splits[name] = float(weight)
+    return splits
+
+
+def artifact_loader(default_loader):
+    """
+    Cria um carregador que escolhe a função pela extensão do artefato.
+
+    Args:
+        default_loader (callable): Carregador dos modelos densos (``.h5``/``.keras``).
+
+    Returns:
+        callable: Função que recebe o caminho do artefato e retorna o modelo carregado.
+    """
+    def load(path):
+        return ARTIFACT_LOADERS.get(os.path.splitext(path)[1], default_loader)(path)
+
+    return load
+
+
+def wait_for_swap(registry: ModelRegistry, swaps: int, timeout: float = 30.0) -> bool:
+    """
+    Aguarda até que o registro publique uma nova troca de modelos.
+
+    Args:
+        registry (ModelRegistry): Registro observado.
+        swaps (int): Número de trocas já conhecido.
+        timeout (float): Tempo máximo de espera, em segundos.
+
+    Returns:
+        bool: True se a troca ocorreu dentro do tempo.
+    """
+    deadline = time.monotonic() + timeout
+    while registry.swaps <= swaps and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return registry.swaps > swaps
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de Features e Predições por Hash da Malha Facial
+======================================================
+O frontend reenvia o mesmo ``faceMesh`` para ``/predict-autism`` (o efeito de ``Processing.tsx``
+roda novamente quando o estado de navegação muda). Este módulo evita recalcular as 39 distâncias
+e a passada do modelo Keras nesses casos:
+- A chave é o hash dos marcos quantizados somado à versão do artefato do modelo,
+- O cache é LRU e limitado em número de entradas,
+- A versão do modelo vem dos metadados do arquivo, então uma troca do artefato invalida o cache,
+- Acertos e falhas são contabilizados para o endpoint de estatísticas.
+
+@author: George Flores
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def model_artifact_version(model_path: str) -> str:
+    """
+    Identifica a versão de um artefato de modelo pelos seus metadados (nome, tamanho e data).
+
+    Usa apenas ``os.stat``, barato o suficiente para ser verificado a cada requisição.
+
+    Args:
+        model_path (str): Caminho do arquivo do modelo.
+
+    Returns:
+        str: Identificador da versão do artefato.
+    """
+    stat = os.stat(model_path)
+    return f"{os.path.basename(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def mesh_key(landmarks: np.ndarray, model_version: str, decimals: int = 4) -> str:
+    """
+    Calcula a chave do cache para uma malha facial.
+
+    Os marcos são arredondados para ``decimals`` casas, de modo que diferenças de serialização
+    JSON (por exemplo, ``1`` e ``1.0``, ou ``-0.0`` e ``0.0``) geram a mesma chave.
+
+    Args:
+        landmarks (np.ndarray): Marcos faciais (468, 3) de uma face.
+        model_version (str): Versão do artefato do modelo.
+        decimals (int): Casas decimais mantidas na quantização.
+
+    Returns:
+        str: Hash hexadecimal da malha quantizada e da versão do modelo.
+    """
+    # Somar 0.0 normaliza -0.0 para 0.0, que têm bytes diferentes
+    quantized = np.round(np.asarray(landmarks, dtype=np.float64), decimals) + 0.0
+    digest = hashlib.blake2b(quantized.tobytes(), digest_size=16)
+    digest.update(model_version.encode())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Cache LRU, seguro entre threads, de features e predições por malha facial.
+
+    Args:
+        max_entries (int): Número máximo de entradas mantidas.
+        decimals (int): Casas decimais mantidas na quantização dos marcos.
+    """
+
+    def __init__(self, max_entries: int = 4096, decimals: int = 4):
+        self.max_entries = max_entries
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, landmarks: np.ndarray, model_version: str) -> str:
+        """Calcula a chave do cache para uma malha facial (ver ``mesh_key``)."""
+        return mesh_key(landmarks, model_version, self.decimals)
+
+    def get(self, key: str):
+        """
+        Busca uma entrada e a marca como usada mais recentemente.
+
+        Args:
+            key (str): Chave calculada por ``key``.
+
+        Returns:
+            tuple: (features, predição), ou None se a chave não estiver no cache.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, features: np.ndarray, prediction: float) -> None:
+        """
+        Armazena as features e a predição de uma malha, descartando a entrada menos usada se cheio.
+
+        Args:
+            key (str): Chave calculada por ``key``.
+            features (np.ndarray): Vetor de 39 features.
+            prediction (float): Saída do modelo.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._entries[key] = (features, prediction)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove todas as entradas (usado quando o artefato do modelo muda).
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Retorna as estatísticas do cache.
+
+        Returns:
+            dict: Entradas, capacidade, acertos, falhas e taxa de acerto.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRatio": self.hits / lookups if lookups else 0.0,
+            }
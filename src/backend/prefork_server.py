@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor Pre-fork da API com Memória Compartilhada por Cópia na Escrita
+=======================================================================
+Lançador de produção para ``AutismPredictionAPI`` que, em vez de subir N cópias independentes
+(cada uma importando TensorFlow, MediaPipe e OpenCV e carregando os modelos):
+- Importa a API e carrega os modelos uma única vez no processo pai,
+- Abre o socket de escuta no pai e cria N processos trabalhadores com ``os.fork``, que
+  compartilham essas páginas de memória por cópia na escrita (copy-on-write),
+- Reinicia, em cada trabalhador, o estado que não sobrevive ao ``fork`` (observador de modelos e
+  instâncias do FaceMesh, criadas sob demanda por processo),
+- Recria trabalhadores que terminarem e reporta periodicamente a memória (RSS, PSS, compartilhada
+  e privada) de cada trabalhador, para dimensionar quantos cabem em um nó.
+
+Os modelos são carregados com ``dense_model.load_dense_model`` (``MODEL_LOADER=numpy``): um modelo
+carregado pelo TensorFlow no pai trava a predição nos filhos, pois as threads internas do runtime
+não sobrevivem ao ``fork``. Apenas importar o TensorFlow e o MediaPipe no pai é seguro.
+
+Uso (a partir da pasta ``src/backend``):
+    python prefork_server.py [--workers N] [--port 5000] [--report-interval 30] [--no-preload]
+
+@author: George Flores
+"""
+
+import argparse
+import os
+import signal
+import sys
+import time
+
+MEMORY_FIELDS = {
+    "Rss": "rssMb",
+    "Pss": "pssMb",
+    "Shared_Clean": "sharedMb",
+    "Shared_Dirty": "sharedMb",
+    "Private_Clean": "privateMb",
+    "Private_Dirty": "privateMb",
+}
+
+
+def process_memory(pid: int) -> dict:
+    """
+    Lê o uso de memória de um processo em ``/proc/<pid>/smaps_rollup`` (Linux).
+
+    O PSS divide cada página compartilhada entre os processos que a usam, então a soma do PSS dos
+    trabalhadores é a memória realmente ocupada no nó; o RSS conta as páginas compartilhadas em
+    todos eles.
+
+    Args:
+        pid (int): Identificador do processo.
+
+    Returns:
+        dict: ``rssMb``, ``pssMb``, ``sharedMb`` e ``privateMb``, ou vazio se indisponível.
+    """
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                field, _, value = line.partition(":")
+                if field in MEMORY_FIELDS:
+                    key = MEMORY_FIELDS[field]
+                    memory[key] = memory.get(key, 0.0) + int(value.split()[0]) / 1024
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        return {}
+    return {key: round(value, 1) for key, value in memory.items()}
+
+
+def memory_report(workers: dict) -> str:
+    """
+    Monta a tabela de memória dos trabalhadores.
+
+    Args:
+        workers (dict): PID -> índice do trabalhador.
+
+    Returns:
+        str: Tabela com RSS, PSS, memória compartilhada e privada por trabalhador, e o total de PSS.
+    """
+    lines = [f"{'trabalhador':>11} {'pid':>8} {'RSS MB':>9} {'PSS MB':>9} {'compart. MB':>12} {'privada MB':>11}"]
+    total_pss = 0.0
+    for pid, index in sorted(workers.items(), key=lambda item: item[1]):
+        memory = process_memory(pid)
+        if not memory:
+            continue
+        total_pss += memory["pssMb"]
+        lines.append(
+            f"{index:>11} {pid:>8} {memory['rssMb']:>9.1f} {memory['pssMb']:>9.1f} "
+            f"{memory['sharedMb']:>12.1f} {memory['privateMb']:>11.1f}"
+        )
+    lines.append(f"PSS total dos trabalhadores: {total_pss:.1f} MB")
+    return "\n".join(lines)
+
+
+def load_api(preload: bool = True):
+    """
+    Importa a API com o carregador de modelos seguro para ``fork``.
+
+    Args:
+        preload (bool): Se True, a API é importada no pai, antes do ``fork``.
+
+    Returns:
+        module: Módulo ``AutismPredictionAPI``.
+
+    Raises:
+        ValueError: Se ``MODEL_LOADER=keras`` for pedido com pré-carregamento.
+    """
+    os.environ.setdefault("MODEL_LOADER", "numpy")
+    if preload and os.environ["MODEL_LOADER"] != "numpy":
+        raise ValueError("Com pré-carregamento, os modelos devem ser carregados com MODEL_LOADER=numpy.")
+
+    import AutismPredictionAPI
+
+    return AutismPredictionAPI
+
+
+def run_worker(server, preload: bool, debug: bool = False) -> None:
+    """
+    Executa um processo trabalhador sobre o socket de escuta herdado do pai.
+
+    Args:
+        server: Servidor WSGI do Werkzeug criado no pai (``make_server``).
+        preload (bool): Se False, a API é importada aqui, depois do ``fork``.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        None
+    """
+    # O pai encerra os trabalhadores com SIGTERM; o Ctrl+C do terminal vai só para o pai
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    api = load_api(preload)
+    server.app = api.app
+    # A thread observadora do pai não existe no filho: cada trabalhador inicia a sua
+    api.model_registry.start_watching()
+
+    if debug:
+        print(f"Trabalhador {os.getpid()} pronto.")
+    server.serve_forever()
+
+
+def serve(
+    host: str = "0.0.0.0",
+    port: int = 5000,
+    workers: int = None,
+    preload: bool = True,
+    report_interval: float = 30.0,
+    debug: bool = False,
+) -> None:
+    """
+    Inicia o processo pai: pré-carrega a API, cria os trabalhadores e os supervisiona.
+
+    Args:
+        host (str): Endereço de escuta.
+        port (int): Porta de escuta.
+        workers (int, opcional): Número de trabalhadores. Padrão: número de CPUs.
+        preload (bool): Se True, importa a API e carrega os modelos antes do ``fork``.
+        report_interval (float): Intervalo, em segundos, entre relatórios de memória (0 desativa).
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        None
+    """
+    from werkzeug.serving import make_server
+
+    workers = workers or os.cpu_count()
+    app = None
+    if preload:
+        api = load_api(preload)
+        # Nenhuma thread pode estar carregando um modelo no momento do fork
+        api.model_registry.stop_watching()
+        app = api.app
+
+    # O socket é aberto no pai e herdado pelos trabalhadores, que aceitam conexões dele
+    server = make_server(host, port, app)
+    # Não bloqueante: quando vários trabalhadores acordam para a mesma conexão, os que
+    # perderem a disputa voltam a esperar em vez de ficarem presos no accept
+    server.socket.setblocking(False)
+    print(f"Servidor pre-fork em http://{host}:{port} com {workers} trabalhadores (pid {os.getpid()}).")
+
+    children = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(server, preload, debug=debug)
+            finally:
+                os._exit(1)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(workers):
+        spawn(index)
+
+    next_report = time.monotonic() + report_interval
+    while not stopping:
+        time.sleep(0.5)
+        # Recria os trabalhadores que terminaram
+        while children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            index = children.pop(pid, None)
+            if index is not None and not stopping:
+                print(f"Trabalhador {index} (pid {pid}) terminou com status {status}; recriando.")
+                spawn(index)
+        if report_interval and time.monotonic() >= next_report:
+            print(memory_report(children), flush=True)
+            next_report = time.monotonic() + report_interval
+
+    for pid in children:
+        os.kill(pid, signal.SIGTERM)
+    for pid in children:
+        os.waitpid(pid, 0)
+    server.server_close()
+
+
+def main(argv: list = None) -> None:
+    """
+    Lê os argumentos da linha de comando e inicia o servidor.
+
+    Args:
+        argv (list, opcional): Argumentos. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Servidor pre-fork da API de predição de autismo.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("API_WORKERS", 0)) or None)
+    parser.add_argument("--report-interval", type=float, default=30.0)
+    parser.add_argument("--no-preload", dest="preload", action="store_false")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    serve(args.host, args.port, args.workers, args.preload, args.report_interval, args.debug)
+
+
+if __name__ == "__main__":
+    main()
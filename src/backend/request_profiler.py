@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Perfilamento Amostrado por Requisição com Pilhas para Flamegraph
+================================================================
+Quando ``/extract-face-mesh`` ou ``/predict-autism`` ficam lentos, só existe o ``print`` do erro.
+Este módulo perfila 1 a cada N requisições com um perfilador estatístico de baixo custo:
+- Uma thread amostra a pilha da thread da requisição a intervalos fixos (``sys._current_frames``),
+  sem instrumentar chamadas, então o custo não depende do número de funções executadas,
+- As amostras são salvas no formato de pilhas colapsadas (``raiz;...;folha contagem``), lido por
+  ``flamegraph.pl``, speedscope e similares, em arquivos nomeados com a rota, a latência e o status,
+- O perfilamento é ligado, desligado e reconfigurado em tempo de execução pelo endpoint
+  administrativo ``/admin/profiling``, sem reiniciar o servidor.
+
+O perfilamento é de tempo de parede: esperas (E/S, locks, TensorFlow) aparecem na pilha em que
+ocorreram. Em código Python que não libera o GIL, a thread de amostragem só roda a cada
+``sys.getswitchinterval()`` (5 ms por padrão), então esse é o intervalo efetivo mínimo. No servidor pre-fork, cada worker tem a sua configuração; o endpoint informa o PID.
+
+@author: George Flores
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, jsonify, request
+
+
+def frame_label(frame) -> str:
+    """Identifica a função de um frame por nome, arquivo e linha de definição."""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Amostra periodicamente a pilha de uma thread e conta as pilhas iguais.
+
+    Args:
+        thread_id (int): Identificador da thread amostrada (``threading.get_ident()``).
+        interval (float): Intervalo entre amostras, em segundos.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            # Descarta a amostra tirada enquanto a própria requisição já encerrava o perfilamento
+            if stack and not self._stop.is_set():
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> "StackSampler":
+        """Inicia a amostragem em segundo plano."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        """
+        Encerra a amostragem.
+
+        Returns:
+            Counter: Pilha colapsada (``raiz;...;folha``) -> número de amostras.
+        """
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+def write_collapsed_stacks(stacks: Counter, path: str) -> None:
+    """
+    Salva as pilhas no formato colapsado (uma pilha e a sua contagem por linha).
+
+    Args:
+        stacks (Counter): Pilhas e contagens (ver ``StackSampler.stop``).
+        path (str): Caminho do arquivo ``.folded``.
+
+    Returns:
+        None
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        for stack, count in stacks.most_common():
+            file.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """
+    Perfila 1 a cada ``sample_rate`` requisições de um app Flask.
+
+    Args:
+        output_dir (str): Pasta dos arquivos de pilhas.
+        sample_rate (int): Perfila uma a cada ``sample_rate`` requisições (0 desliga).
+        interval (float): Intervalo entre amostras da pilha, em segundos.
+        max_files (int): Número máximo de arquivos mantidos (os mais antigos são apagados).
+        admin_token (str, opcional): Token exigido no cabeçalho ``X-Admin-Token`` do endpoint
+            administrativo. Sem token, o endpoint só aceita requisições locais.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        sample_rate: int = 0,
+        interval: float = 0.005,
+        max_files: int = 200,
+        admin_token: str = None,
+    ):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_files = max_files
+        self.admin_token = admin_token
+        self.profiled = 0
+        self.recent = []
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> int:
+        """
+        Decide, de forma determinística e segura entre threads, se a requisição atual é perfilada.
+
+        Returns:
+            int: Número de sequência da requisição, se perfilada; senão 0.
+        """
+        sample_rate = self.sample_rate
+        if sample_rate <= 0:
+            return 0
+        index = next(self._counter)
+        return index if index % sample_rate == 0 else 0
+
+    def configure(self, sample_rate: int = None, interval: float = None) -> dict:
+        """
+        Altera a configuração em tempo de execução.
+
+        Args:
+            sample_rate (int, opcional): Nova taxa (0 desliga).
+            interval (float, opcional): Novo intervalo entre amostras, em segundos.
+
+        Returns:
+            dict: Configuração atual (ver ``status``).
+
+        Raises:
+            ValueError: Se os valores forem inválidos.
+        """
+        if sample_rate is not None:
+            if int(sample_rate) < 0:
+                raise ValueError("sampleRate deve ser maior ou igual a 0.")
+            self.sample_rate = int(sample_rate)
+        if interval is not None:
+            if not 0.0001 <= float(interval) <= 1.0:
+                raise ValueError("interval deve estar entre 0,0001 e 1 segundo.")
+            self.interval = float(interval)
+        return self.status()
+
+    def status(self) -> dict:
+        """Retorna a configuração e os últimos arquivos gerados."""
+        with self._lock:
+            recent = list(self.recent[-10:])
+        return {
+            "pid": os.getpid(),
+            "enabled": self.sample_rate > 0,
+            "sampleRate": self.sample_rate,
+            "interval": self.interval,
+            "outputDir": os.path.abspath(self.output_dir),
+            "profiled": self.profiled,
+            "recent": recent,
+        }
+
+    def _save(self, stacks: Counter, route: str, latency_ms: float, status_code: int, index: int) -> str:
+        """Salva as pilhas de uma requisição e apaga os arquivos excedentes."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = "{}_{}_{:.0f}ms_{}_{}-{}.folded".format(
+            time.strftime("%Y%m%d-%H%M%S"), route.strip("/").replace("/", "-") or "root",
+            latency_ms, status_code, os.getpid(), index,
+        )
+        path = os.path.join(self.output_dir, name)
+        write_collapsed_stacks(stacks, path)
+        with self._lock:
+            self.profiled += 1
+            self.recent.append(name)
+            expired = self.recent[:-self.max_files] if len(self.recent) > self.max_files else []
+            del self.recent[:len(expired)]
+        for old in expired:
+            try:
+                os.remove(os.path.join(self.output_dir, old))
+            except OSError:
+                pass
+        return path
+
+    def _before_request(self):
+        if request.path.startswith("/admin/"):
+            return
+        index = self.should_sample()
+        if not index:
+            return
+        g.profile_index = index
+        g.profile_sampler = StackSampler(threading.get_ident(), self.interval).start()
+        g.profile_start = time.perf_counter()
+
+    def _after_request(self, response):
+        sampler = g.pop("profile_sampler", None)
+        if sampler is not None:
+            latency_ms = 1000 * (time.perf_counter() - g.pop("profile_start"))
+            index = g.pop("profile_index")
+            stacks = sampler.stop()
+            # Requisições mais curtas que o intervalo de amostragem não geram arquivo
+            if stacks:
+                try:
+                    path = self._save(stacks, request.path, latency_ms, response.status_code, index)
+                    response.headers["X-Profile-File"] = os.path.basename(path)
+                except OSError as e:
+                    # Uma falha do perfilamento nunca deve derrubar a requisição
+                    print(f"Erro ao salvar o perfil da requisição: {e}")
+        return response
+
+    def _teardown_request(self, error=None):
+        # Garante que a thread de amostragem termine mesmo se o after_request não rodar
+        sampler = g.pop("profile_sampler", None)
+        if sampler is not None:
+            sampler.stop()
+
+    def _authorized(self) -> bool:
+        if self.admin_token:
+            return request.headers.get("X-Admin-Token") == self.admin_token
+        return request.remote_addr in ("127.0.0.1", "::1")
+
+    def _admin(self):
+        if not self._authorized():
+            return jsonify({"success": False, "message": "Acesso não autorizado."}), 403
+        if request.method == "POST":
+            data = request.get_json(silent=True) or {}
+            sample_rate = data.get("sampleRate")
+            if data.get("enabled") is False:
+                sample_rate = 0
+            try:
+                self.configure(sample_rate=sample_rate, interval=data.get("interval"))
+            except (TypeError, ValueError) as e:
+                return jsonify({"success": False, "message": str(e)}), 400
+        return jsonify({"success": True, **self.status()})
+
+    def install(self, app) -> "RequestProfiler":
+        """
+        Registra os ganchos de requisição e o endpoint ``/admin/profiling`` no app.
+
+        ``GET /admin/profiling`` retorna a configuração; ``POST`` com ``{"sampleRate": N}``,
+        ``{"interval": s}`` ou ``{"enabled": false}`` a altera.
+
+        Args:
+            app (Flask): Aplicação Flask.
+
+        Returns:
+            RequestProfiler: A própria instância.
+        """
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule("/admin/profiling", "admin_profiling", self._admin, methods=["GET", "POST"])
+        return self
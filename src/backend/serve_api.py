@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+Ponto de Entrada Leve da API
+============================
+Os detectores do ``FaceMeshPool`` são iniciados com ``spawn``, que reimporta o script principal
+(como ``__mp_main__``) em cada processo detector. Se o script principal fosse
+``AutismPredictionAPI.py``, cada detector importaria de novo o TensorFlow, carregaria todos os
+modelos com a thread de observação do registro, abriria o banco dos trabalhos em lote e criaria o
+perfilador. Este módulo é o script principal do servidor de desenvolvimento: reimportado pelos
+detectores, ele só define ``main``; a API é importada apenas no processo que atende as requisições.
+
+Uso (a partir da pasta ``src/backend``):
+    FACE_MESH_WORKERS=2 python serve_api.py
+
+@author: George Flores
+"""
+
+
+def main() -> None:
+    """
+    Importa a API e inicia o servidor de desenvolvimento do Flask (ver ``AutismPredictionAPI.serve``).
+
+    Returns:
+        None
+    """
+    import AutismPredictionAPI
+
+    AutismPredictionAPI.serve()
+
+
+if __name__ == "__main__":
+    main()
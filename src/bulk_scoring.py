@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""
+Pontuação em Lote de Diretórios de Imagens, com Retomada
+========================================================
+Hoje as predições só saem uma foto por vez, pela interface React e duas chamadas HTTP. Este
+módulo pontua uma árvore de diretórios inteira, offline, com o mesmo código da extração e da API:
+- Decodificação e FaceMesh (``Face_Mesh_Extractor``) em um pool de processos, cada um com a sua
+  instância do FaceMesh,
+- Distâncias (``face_mesh_features``), normalização de pose e padronização opcionais e o modelo
+  carregado como na API (``model_registry.artifact_loader``: ``.h5`` em NumPy, ``.knn``, ``.forest``),
+  avaliados em lote no processo principal,
+- Resultados gravados a cada ``flush_every`` imagens em partes colunares (HDF5 ou Parquet), cada
+  uma escrita em arquivo temporário e renomeada. As partes são o próprio checkpoint: uma execução
+  interrompida retoma pulando as imagens já gravadas,
+- Progresso e vazão (imagens/s) exibidos a cada parte.
+
+Uso (a partir da pasta ``src``):
+    python bulk_scoring.py ../data/raw pontuacoes --workers 4
+    python bulk_scoring.py ../data/raw pontuacoes --workers 4   # retoma de onde parou
+
+@author: George Flores
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import h5py
+import mediapipe as mp
+import numpy as np
+import pandas as pd
+
+from Face_Mesh_Extractor import detect_face_mesh, load_image
+from face_mesh_alignment import align_meshes_for_features, load_template
+from face_mesh_features import FEATURE_NAMES, calculate_anthropometric_features
+from feature_statistics import load_statistics
+
+# O carregamento dos modelos é o mesmo da API, em src/backend
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from dense_model import load_dense_model  # noqa: E402
+from model_registry import SELF_CONTAINED_MODELS, artifact_loader  # noqa: E402
+from prediction_cache import model_artifact_version  # noqa: E402
+
+# Inicializa a solução Face Mesh do MediaPipe
+mp_face_mesh = mp.solutions.face_mesh
+
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg")
+DEFAULT_MODEL = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "models", "best_model_3.0_layers_2_neurons_32_lr_0.001_epochs_30.h5"
+)
+PART_EXTENSIONS = {"hdf5": ".h5", "parquet": ".parquet"}
+RUN_FILE = "run.json"
+
+# FaceMesh de cada processo detector, criado em _init_worker (ou sob demanda, sem pool)
+_worker_face_mesh = None
+
+
+def list_images(root: str) -> list:
+    """
+    Lista as imagens de uma árvore de diretórios, em ordem, com caminhos relativos a ``root``.
+
+    Args:
+        root (str): Diretório raiz.
+
+    Returns:
+        list: Caminhos relativos das imagens.
+    """
+    images = []
+    for folder, subfolders, files in os.walk(root):
+        subfolders.sort()
+        images += [
+            os.path.relpath(os.path.join(folder, f), root) for f in sorted(files) if f.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+    return images
+
+
+def _init_worker() -> None:
+    """Cria o FaceMesh do processo detector, reaproveitado por todas as imagens."""
+    global _worker_face_mesh
+    _worker_face_mesh = mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1)
+
+
+def detect_image(image_path: str) -> tuple:
+    """
+    Decodifica uma imagem e detecta a malha facial.
+
+    Erros de leitura não interrompem a execução: são devolvidos e gravados junto às predições.
+
+    Args:
+        image_path (str): Caminho da imagem.
+
+    Returns:
+        tuple: (marcos (468, 3) ou None se não houver face, largura da imagem em pixels (0 se não
+        lida), mensagem de erro ou ``""``).
+    """
+    if _worker_face_mesh is None:
+        _init_worker()
+    try:
+        image_rgb = load_image(image_path)
+        landmarks = detect_face_mesh(image_rgb, face_mesh=_worker_face_mesh)
+    except Exception as e:
+        return None, 0, f"{type(e).__name__}: {e}"
+    return (np.asarray(landmarks, dtype=np.float64) if len(landmarks) > 0 else None), image_rgb.shape[1], ""
+
+
+class BatchScorer:
+    """
+    Calcula as features e as predições de um lote de malhas, como a API.
+
+    Args:
+        model_path (str): Artefato do modelo (``.h5``/``.keras`` avaliado em NumPy, ``.knn`` ou ``.forest``).
+        statistics_path (str, opcional): Estatísticas de padronização (``feature_statistics``), ignoradas
+            pelos modelos que já contêm a sua (KNN) ou que não usam padronização (floresta).
+        alignment (str, opcional): ``"2d"`` ou ``"3d"`` para alinhar as malhas ao gabarito.
+        z_scale (float): Escala do Z normalizado do MediaPipe usada no alinhamento quando ``score`` não
+            recebe a largura de cada imagem.
+    """
+
+    def __init__(self, model_path: str, statistics_path: str = None, alignment: str = None, z_scale: float = 224.0):
+        self.model = artifact_loader(load_dense_model)(model_path)
+        self.model_version = model_artifact_version(model_path)
+        self.statistics = None
+        if statistics_path and not isinstance(self.model, SELF_CONTAINED_MODELS):
+            self.statistics = load_statistics(statistics_path, num_features=len(FEATURE_NAMES))
+        self.alignment = alignment
+        self.template = load_template() if alignment else None
+        self.z_scale = z_scale
+
+    def score(self, meshes: np.ndarray, z_scale=None) -> tuple:
+        """
+        Avalia um lote de malhas.
+
+        Args:
+            meshes (np.ndarray): Malhas (N, 468, 3).
+            z_scale (float | np.ndarray, opcional): Largura de cada imagem (N,), que converte o Z no
+                alinhamento, como a ``imageWidth`` da API. Padrão: ``self.z_scale``.
+
+        Returns:
+            tuple: (features (N, 39) em float32, probabilidades da classe 1 (N,) em float32).
+        """
+        if self.template is not None:
+            dims = 2 if self.alignment == "2d" else 3
+            z_scale = self.z_scale if z_scale is None else np.asarray(z_scale, dtype=np.float64)
+            meshes = align_meshes_for_features(meshes, self.template, dims=dims, z_scale=z_scale)
+        features = calculate_anthropometric_features(meshes)
+        inputs = self.statistics.transform(features) if self.statistics is not None else features
+        return features.astype(np.float32), np.asarray(self.model.predict(inputs))[:, 0].astype(np.float32)
+
+
+def write_part(path: str, columns: dict, features: np.ndarray = None) -> None:
+    """
+    Grava uma parte colunar, em arquivo temporário renomeado ao final.
+
+    Args:
+        path (str): Caminho da parte (``.h5`` ou ``.parquet``).
+        columns (dict): Nome da coluna -> array (uma linha por imagem).
+        features (np.ndarray, opcional): Features (N, 39), com NaN nas imagens sem face.
+
+    Returns:
+        None
+    """
+    temporary = f"{path}.tmp"
+    if path.endswith(".parquet"):
+        frame = pd.DataFrame(columns)
+        if features is not None:
+            frame = pd.concat([frame, pd.DataFrame(features, columns=FEATURE_NAMES)], axis=1)
+        # Requer o pyarrow (dependência opcional)
+        frame.to_parquet(temporary, index=False)
+    else:
+        with h5py.File(temporary, "w") as file:
+            for name, values in columns.items():
+                values = np.asarray(values)
+                if values.dtype.kind in "UO":
+                    file.create_dataset(name, data=values.astype(object), dtype=h5py.string_dtype())
+                else:
+                    file.create_dataset(name, data=values)
+            if features is not None:
+                file.create_dataset("features", data=features, compression="gzip")
+                file["features"].attrs["names"] = FEATURE_NAMES
+    os.replace(temporary, path)
+
+
+def read_part(path: str) -> pd.DataFrame:
+    """Lê uma parte gravada por ``write_part``."""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    with h5py.File(path, "r") as file:
+        frame = pd.DataFrame({
+            name: file[name].asstr()[()] if h5py.check_string_dtype(file[name].dtype) else file[name][()]
+            for name in file if name != "features"
+        })
+        if "features" in file:
+            frame = pd.concat([frame, pd.DataFrame(file["features"][()], columns=FEATURE_NAMES)], axis=1)
+    return frame
+
+
+def list_parts(output_dir: str) -> list:
+    """Lista as partes concluídas de uma pasta de saída, em ordem."""
+    if not os.path.isdir(output_dir):
+        return []
+    return [
+        os.path.join(output_dir, f) for f in sorted(os.listdir(output_dir))
+        if f.startswith("part-") and f.endswith(tuple(PART_EXTENSIONS.values()))
+    ]
+
+
+def load_scores(output_dir: str) -> pd.DataFrame:
+    """
+    Junta todas as partes de uma pasta de saída.
+
+    Args:
+        output_dir (str): Pasta de saída de ``score_directory``.
+
+    Returns:
+        pd.DataFrame: Uma linha por imagem (``image``, ``face_detected``, ``prediction``,
+        ``confidence``, ``error`` e, se gravadas, as 39 features).
+    """
+    parts = [read_part(path) for path in list_parts(output_dir)]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+def score_directory(
+    root: str,
+    output_dir: str,
+    model_path: str = DEFAULT_MODEL,
+    workers: int = 1,
+    flush_every: int = 256,
+    statistics_path: str = None,
+    alignment: str = None,
+    save_features: bool = False,
+    output_format: str = "hdf5",
+    debug: bool = False,
+) -> dict:
+    """
+    Pontua todas as imagens de uma árvore de diretórios, retomando execuções interrompidas.
+
+    Args:
+        root (str): Diretório raiz das imagens.
+        output_dir (str): Pasta das partes de saída (e do checkpoint).
+        model_path (str): Artefato do modelo.
+        workers (int): Processos detectores (1 detecta no processo atual).
+        flush_every (int): Imagens por parte gravada.
+        statistics_path (str, opcional): Estatísticas de padronização (ver ``BatchScorer``).
+        alignment (str, opcional): ``"2d"`` ou ``"3d"`` para alinhar as malhas.
+        save_features (bool): Se True, grava também as 39 features de cada imagem.
+        output_format (str): ``"hdf5"`` ou ``"parquet"`` (requer o pyarrow).
+        debug (bool): Se True, exibe o progresso a cada parte.
+
+    Returns:
+        dict: Resumo (imagens pontuadas e puladas, faces, erros, segundos, imagens/s e partes).
+
+    Raises:
+        ValueError: Se a pasta de saída tiver sido criada com outro modelo ou outra raiz.
+    """
+    scorer = BatchScorer(model_path, statistics_path, alignment)
+    os.makedirs(output_dir, exist_ok=True)
+    run = {"root": os.path.abspath(root), "model": scorer.model_version, "alignment": alignment,
+           "statistics": statistics_path}
+    if alignment:
+        # O Z é convertido pela largura de cada imagem, como na API
+        run["z_scale"] = "image_width"
+    run_path = os.path.join(output_dir, RUN_FILE)
+    if os.path.exists(run_path):
+        with open(run_path, encoding="utf-8") as file:
+            previous = json.load(file)
+        if previous != run:
+            raise ValueError(f"{output_dir} foi criada com outra configuração: {previous}. Use outra pasta de saída.")
+    else:
+        with open(run_path, "w", encoding="utf-8") as file:
+            json.dump(run, file, indent=2)
+
+    parts = list_parts(output_dir)
+    done = set()
+    for path in parts:
+        done.update(read_part(path)["image"])
+    images = [image for image in list_images(root) if image not in done]
+    summary = {"images": 0, "skipped": len(done), "faces": 0, "errors": 0, "parts": len(parts)}
+    if debug:
+        print(f"{len(images)} imagens a pontuar ({len(done)} já pontuadas).")
+
+    buffer = []
+    start = time.perf_counter()
+
+    def flush():
+        names = [name for name, _, _, _ in buffer]
+        found = [i for i, (_, landmarks, _, _) in enumerate(buffer) if landmarks is not None]
+        confidence = np.full(len(buffer), np.nan, dtype=np.float32)
+        features = np.full((len(buffer), len(FEATURE_NAMES)), np.nan, dtype=np.float32)
+        if found:
+            features[found], confidence[found] = scorer.score(
+                np.stack([buffer[i][1] for i in found]), [buffer[i][2] for i in found]
+            )
+        columns = {
+            "image": np.array(names, dtype=object),
+            "face_detected": np.array([landmarks is not None for _, landmarks, _, _ in buffer]),
+            "prediction": np.where(np.isnan(confidence), -1, np.round(confidence)).astype(np.int8),
+            "confidence": confidence,
+            "error": np.array([error for _, _, _, error in buffer], dtype=object),
+        }
+        extension = PART_EXTENSIONS[output_format]
+        write_part(os.path.join(output_dir, f"part-{summary['parts']:05d}{extension}"), columns,
+                   features if save_features else None)
+        summary["parts"] += 1
+        summary["images"] += len(buffer)
+        summary["faces"] += len(found)
+        summary["errors"] += sum(bool(error) for _, _, _, error in buffer)
+        buffer.clear()
+        if debug:
+            elapsed = time.perf_counter() - start
+            print(f"{summary['images']}/{len(images)} imagens, {summary['images'] / elapsed:.1f} imagens/s")
+
+    paths = [os.path.join(root, image) for image in images]
+    executor = None
+    if workers > 1:
+        # spawn: os processos filhos não herdam o estado (TensorFlow, MediaPipe) do processo pai
+        context = multiprocessing.get_context("spawn")
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker)
+        results = executor.map(detect_image, paths, chunksize=4)
+    else:
+        results = map(detect_image, paths)
+
+    try:
+        for image, (landmarks, width, error) in zip(images, results):
+            buffer.append((image, landmarks, width, error))
+            if len(buffer) >= flush_every:
+                flush()
+    finally:
+        # Em uma interrupção, grava o que já foi detectado; o restante é retomado na próxima execução
+        if buffer:
+            flush()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["images_per_second"] = summary["images"] / summary["seconds"] if summary["seconds"] > 0 else 0.0
+    return summary
+
+
+def main(argv: list = None) -> None:
+    """
+    Pontua um diretório de imagens pela linha de comando.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Pontua todas as imagens de um diretório.")
+    parser.add_argument("root", help="Diretório raiz das imagens (percorrido recursivamente).")
+    parser.add_argument("output_dir", help="Pasta das partes de saída; reutilize-a para retomar.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--flush-every", type=int, default=256)
+    parser.add_argument("--statistics", help="JSON de feature_statistics.py.")
+    parser.add_argument("--alignment", choices=["2d", "3d"])
+    parser.add_argument("--save-features", action="store_true")
+    parser.add_argument("--format", choices=sorted(PART_EXTENSIONS), default="hdf5")
+    args = parser.parse_args(argv)
+
+    summary = score_directory(
+        args.root, args.output_dir, args.model, args.workers, args.flush_every, args.statistics,
+        args.alignment, args.save_features, args.format, debug=True,
+    )
+    print(f"{summary['images']} imagens pontuadas ({summary['skipped']} retomadas), {summary['faces']} faces, "
+          f"{summary['errors']} erros, {summary['images_per_second']:.1f} imagens/s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Perfis de Velocidade dos Detectores de Face
+===========================================
+O FaceMesh sempre rodava com os mesmos parâmetros e o Haarcascade com os padrões do
+``detectMultiScale``, sem medida do quanto de precisão se troca por velocidade. Este módulo define
+perfis nomeados, usados pela API (``DETECTOR_PROFILE`` ou campo ``detectorProfile``), pelos
+extratores (``process_images_in_folder``) e pelo pool de processos do FaceMesh:
+- ``fast``: FaceMesh sobre a imagem reduzida a 480 pixels de largura e Haarcascade em resolução
+  menor e com passos de escala maiores,
+- ``balanced``: os parâmetros usados até aqui (imagem inteira, sem refinamento), o padrão,
+- ``accurate``: ``refine_landmarks`` (modelo com atenção nos olhos e lábios) e Haarcascade com
+  passos de escala menores e mais vizinhos; é a referência do benchmark de perfis.
+
+O MediaPipe já reduz internamente a entrada dos seus modelos (192 e 128 pixels), então só uma
+redução forte antes do FaceMesh compensa o custo do ``cv2.resize``: em fotos de 2016 x 2688, 960
+pixels de largura foi mais lento que a imagem inteira, e 480 pixels, cerca de 1/3 mais rápido, com
+desvio médio dos marcos abaixo de 0,1% da largura da imagem. Só o ``fast`` reduz a imagem;
+em imagens com até 480 pixels de largura, ele é igual ao ``balanced`` no FaceMesh.
+
+Os marcos são sempre devolvidos nas coordenadas da imagem original e limitados aos 468 pontos
+da malha (o refinamento acrescenta 10 pontos das íris, não usados nas features).
+
+O impacto de cada perfil na precisão é medido por ``benchmarks/bench_detector_profiles.py``.
+
+@author: George Flores
+"""
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+# Inicializa a solução Face Mesh do MediaPipe
+mp_face_mesh = mp.solutions.face_mesh
+
+NUM_LANDMARKS = 468
+DEFAULT_PROFILE = "balanced"
+
+
+class DetectorProfile:
+    """
+    Parâmetros do FaceMesh e do Haarcascade de um perfil de velocidade.
+
+    Args:
+        name (str): Nome do perfil.
+        max_width (int, opcional): Largura máxima da imagem entregue ao FaceMesh. Imagens maiores
+            são reduzidas (mantendo a proporção). None usa a imagem inteira.
+        refine_landmarks (bool): Usa o modelo de marcos refinado do FaceMesh.
+        min_detection_confidence (float): Confiança mínima da detecção de face do FaceMesh.
+        haar_scale_factor (float): ``scaleFactor`` do ``detectMultiScale``.
+        haar_min_neighbors (int): ``minNeighbors`` do ``detectMultiScale``.
+        haar_detection_width (int): Largura máxima da imagem na detecção do Haarcascade.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_width: int = None,
+        refine_landmarks: bool = False,
+        min_detection_confidence: float = 0.5,
+        haar_scale_factor: float = 1.1,
+        haar_min_neighbors: int = 3,
+        haar_detection_width: int = 320,
+    ):
+        self.name = name
+        self.max_width = max_width
+        self.refine_landmarks = refine_landmarks
+        self.min_detection_confidence = min_detection_confidence
+        self.haar_scale_factor = haar_scale_factor
+        self.haar_min_neighbors = haar_min_neighbors
+        self.haar_detection_width = haar_detection_width
+
+    def face_mesh(self, max_num_faces: int = 1):
+        """
+        Cria uma instância do FaceMesh com os parâmetros do perfil.
+
+        Args:
+            max_num_faces (int): Número máximo de faces detectadas.
+
+        Returns:
+            mp_face_mesh.FaceMesh: Instância para imagens estáticas (reutilizável entre imagens).
+        """
+        return mp_face_mesh.FaceMesh(
+            static_image_mode=True,
+            max_num_faces=max_num_faces,
+            refine_landmarks=self.refine_landmarks,
+            min_detection_confidence=self.min_detection_confidence,
+        )
+
+    def resize(self, image_rgb: np.ndarray) -> np.ndarray:
+        """
+        Reduz a imagem para a largura máxima do perfil (sem cópia se já for menor).
+
+        Os marcos do FaceMesh são normalizados, então podem ser convertidos para pixels com as
+        dimensões da imagem original.
+
+        Args:
+            image_rgb (np.ndarray): Imagem RGB.
+
+        Returns:
+            np.ndarray: Imagem RGB contígua com largura de no máximo ``max_width``.
+        """
+        height, width, _ = image_rgb.shape
+        if self.max_width is None or width <= self.max_width:
+            return image_rgb
+        scale = self.max_width / width
+        # Bilinear, como o redimensionamento interno do MediaPipe; INTER_AREA custa mais que o próprio FaceMesh
+        size = (self.max_width, max(1, round(height * scale)))
+        return cv2.resize(image_rgb, size, interpolation=cv2.INTER_LINEAR)
+
+    def as_dict(self) -> dict:
+        """Parâmetros do perfil, para relatórios e para o endpoint de estatísticas."""
+        return dict(vars(self))
+
+
+PROFILES = {
+    "fast": DetectorProfile(
+        "fast", max_width=480, haar_scale_factor=1.3, haar_min_neighbors=3, haar_detection_width=240
+    ),
+    "balanced": DetectorProfile("balanced"),
+    "accurate": DetectorProfile(
+        "accurate", refine_landmarks=True, haar_scale_factor=1.05, haar_min_neighbors=5, haar_detection_width=480
+    ),
+}
+
+
+def get_profile(profile=None) -> DetectorProfile:
+    """
+    Resolve um perfil pelo nome.
+
+    Args:
+        profile (str | DetectorProfile, opcional): Nome do perfil ou o próprio perfil.
+            None retorna o perfil padrão (``balanced``).
+
+    Returns:
+        DetectorProfile: O perfil.
+
+    Raises:
+        ValueError: Se o nome não corresponder a um perfil.
+    """
+    if isinstance(profile, DetectorProfile):
+        return profile
+    name = (profile or DEFAULT_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Perfil de detector desconhecido: {profile}. Opções: {', '.join(PROFILES)}.")
+    return PROFILES[name]
@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+"""
+Extração Distribuída com Concessões em Diretório Compartilhado
+==============================================================
+``Face_Mesh_Extractor.main`` extrai todas as imagens em uma única máquina. Este módulo divide a
+extração entre qualquer número de processos ou máquinas que compartilhem um sistema de arquivos:
+- ``init`` lista as imagens de cada classe e grava um manifesto com lotes numerados,
+- Cada ``worker`` reivindica um lote criando ``leases/<lote>.lease`` com ``O_CREAT | O_EXCL``
+  (só um processo consegue criar o arquivo), renova a concessão (data de modificação) a cada imagem
+  e grava o resultado em ``shards/<lote>.csv`` por escrita em arquivo temporário e ``os.replace``,
+- Concessões sem renovação há mais de ``lease_seconds`` (worker que caiu) são recuperadas: o
+  arquivo antigo é renomeado, o que só um dos processos concorrentes consegue fazer,
+- ``merge`` junta os shards concluídos nos CSVs finais de cada classe, no mesmo formato de
+  ``process_images_in_folder``.
+
+As concessões apenas evitam trabalho repetido: cada lote tem um único shard, substituído de forma
+atômica, então um lote processado duas vezes (por exemplo, por um worker lento cuja concessão
+expirou) não duplica linhas. A expiração compara a data de modificação do arquivo com o relógio
+local; em sistemas de arquivos de rede, use ``lease_seconds`` bem maior que a diferença entre relógios.
+
+Uso (a partir da pasta ``src``):
+    python distributed_extraction.py init trabalho 0:../data/raw_processed/processed_no_autistic_3.0 1:../data/raw_processed/processed_with_autistic_3.0
+    python distributed_extraction.py worker trabalho          # em cada processo ou máquina
+    python distributed_extraction.py merge trabalho 0:face_mesh_no_autism_3.0.csv 1:face_mesh_with_autism_3.0.csv
+
+@author: George Flores
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+
+import mediapipe as mp
+import pandas as pd
+
+from Face_Mesh_Extractor import detect_face_mesh, load_image
+
+# Inicializa a solução Face Mesh do MediaPipe
+mp_face_mesh = mp.solutions.face_mesh
+
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg")
+MANIFEST = "manifest.json"
+
+
+def _write_atomic(path: str, write) -> None:
+    """Escreve um arquivo ao lado, com ``write(caminho_temporário)``, e o renomeia para ``path``."""
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        write(temporary)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def _paths(work_dir: str, batch_id: str) -> tuple:
+    """Retorna os caminhos da concessão, do shard e do marcador de conclusão de um lote."""
+    return (
+        os.path.join(work_dir, "leases", f"{batch_id}.lease"),
+        os.path.join(work_dir, "shards", f"{batch_id}.csv"),
+        os.path.join(work_dir, "done", f"{batch_id}.json"),
+    )
+
+
+def init_work_dir(work_dir: str, folders: dict, batch_size: int = 64, debug: bool = False) -> dict:
+    """
+    Cria o diretório de trabalho e o manifesto com os lotes de imagens.
+
+    As imagens de cada pasta são ordenadas e numeradas a partir de 1 (coluna ``amostra``), como em
+    ``process_images_in_folder``. Os caminhos são gravados como absolutos, então todas as máquinas
+    devem ver as imagens no mesmo caminho.
+
+    Args:
+        work_dir (str): Diretório de trabalho compartilhado.
+        folders (dict): Pasta -> classe.
+        batch_size (int): Número de imagens por lote.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        dict: Manifesto criado.
+
+    Raises:
+        FileExistsError: Se o diretório já tiver um manifesto.
+    """
+    if os.path.exists(os.path.join(work_dir, MANIFEST)):
+        raise FileExistsError(f"Já existe um manifesto em {work_dir}.")
+    for name in ("leases", "shards", "done"):
+        os.makedirs(os.path.join(work_dir, name), exist_ok=True)
+
+    batches = []
+    for folder, class_label in folders.items():
+        files = sorted(f for f in os.listdir(folder) if f.endswith(IMAGE_EXTENSIONS))
+        images = [[i + 1, os.path.abspath(os.path.join(folder, f))] for i, f in enumerate(files)]
+        for start in range(0, len(images), batch_size):
+            batches.append({
+                "id": f"{class_label}-{start // batch_size:05d}",
+                "class": class_label,
+                "images": images[start:start + batch_size],
+            })
+    manifest = {"created": time.time(), "batch_size": batch_size, "batches": batches}
+
+    def write(path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+
+    _write_atomic(os.path.join(work_dir, MANIFEST), write)
+    if debug:
+        print(f"Manifesto com {len(batches)} lotes criado em {work_dir}.")
+    return manifest
+
+
+def load_manifest(work_dir: str) -> dict:
+    """
+    Carrega o manifesto do diretório de trabalho.
+
+    Raises:
+        FileNotFoundError: Se o diretório não tiver sido inicializado com ``init_work_dir``.
+    """
+    with open(os.path.join(work_dir, MANIFEST), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def read_lease(lease_path: str) -> dict:
+    """Lê uma concessão; retorna None se ela não existir ou ainda estiver sendo escrita."""
+    try:
+        with open(lease_path, encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def lease_expired(lease_path: str, lease_seconds: float) -> bool:
+    """Retorna True se a concessão não for renovada há mais de ``lease_seconds``."""
+    try:
+        return time.time() - os.stat(lease_path).st_mtime > lease_seconds
+    except FileNotFoundError:
+        return False
+
+
+def try_claim(lease_path: str, worker_id: str, lease_seconds: float) -> bool:
+    """
+    Tenta reivindicar um lote, recuperando a concessão se ela tiver expirado.
+
+    Args:
+        lease_path (str): Caminho da concessão do lote.
+        worker_id (str): Identificador do worker.
+        lease_seconds (float): Tempo sem renovação após o qual a concessão expira.
+
+    Returns:
+        bool: True se o lote foi reivindicado por este worker.
+    """
+    try:
+        fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        if not lease_expired(lease_path, lease_seconds):
+            return False
+        expired = read_lease(lease_path)
+        # Só um dos workers concorrentes consegue renomear a concessão expirada
+        stale = f"{lease_path}.{worker_id}.stale"
+        try:
+            os.rename(lease_path, stale)
+        except FileNotFoundError:
+            return False
+        if read_lease(stale) != expired:
+            # Outro worker recuperou a concessão entre a verificação e a renomeação: devolve a dele
+            try:
+                os.link(stale, lease_path)
+            except FileExistsError:
+                pass
+            os.remove(stale)
+            return False
+        os.remove(stale)
+        try:
+            fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        json.dump({"worker": worker_id, "host": socket.gethostname(), "pid": os.getpid(), "claimed": time.time()}, file)
+    return True
+
+
+def renew_lease(lease_path: str, worker_id: str) -> bool:
+    """
+    Renova a concessão (atualiza a data de modificação), se ela ainda pertencer ao worker.
+
+    Returns:
+        bool: False se a concessão foi perdida (expirou e foi recuperada por outro worker).
+    """
+    lease = read_lease(lease_path)
+    if lease is None or lease["worker"] != worker_id:
+        return False
+    os.utime(lease_path)
+    return True
+
+
+def release_lease(lease_path: str, worker_id: str) -> None:
+    """Remove a concessão, se ela ainda pertencer ao worker."""
+    lease = read_lease(lease_path)
+    if lease is not None and lease["worker"] == worker_id:
+        try:
+            os.remove(lease_path)
+        except FileNotFoundError:
+            pass
+
+
+def extract_batch(batch: dict, face_mesh, renew=None, debug: bool = False) -> tuple:
+    """
+    Extrai os marcos faciais das imagens de um lote.
+
+    Args:
+        batch (dict): Lote do manifesto.
+        face_mesh (mp_face_mesh.FaceMesh): Instância do FaceMesh reutilizada entre as imagens.
+        renew (callable, opcional): Chamado após cada imagem; se retornar False, a extração é abandonada.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        tuple: (pd.DataFrame com ``amostra``, ``class`` e X0, Y0, Z0, ..., ou None se abandonado;
+        número de imagens sem face ou ilegíveis).
+    """
+    rows, failed = [], 0
+    for sample, image_path in batch["images"]:
+        try:
+            landmarks = detect_face_mesh(load_image(image_path, debug=debug), debug=debug, face_mesh=face_mesh)
+        except FileNotFoundError as e:
+            print(f"Arquivo não encontrado: {e}")
+            landmarks = []
+        if len(landmarks) == 0:
+            failed += 1
+        else:
+            rows.append([sample, batch["class"]] + [value for point in landmarks for value in point])
+        if renew is not None and not renew():
+            return None, failed
+
+    columns = ["amostra", "class"] + [f"{axis}{i}" for i in range(468) for axis in "XYZ"]
+    return pd.DataFrame(rows, columns=columns), failed
+
+
+def run_worker(
+    work_dir: str,
+    worker_id: str = None,
+    lease_seconds: float = 300.0,
+    poll_interval: float = 5.0,
+    wait: bool = True,
+    max_batches: int = None,
+    debug: bool = False,
+) -> int:
+    """
+    Processa lotes até que todos estejam concluídos.
+
+    Args:
+        work_dir (str): Diretório de trabalho compartilhado.
+        worker_id (str, opcional): Identificador do worker. Padrão: máquina, PID e um sufixo aleatório.
+        lease_seconds (float): Tempo sem renovação após o qual uma concessão é considerada abandonada.
+        poll_interval (float): Espera entre verificações quando os lotes restantes estão com outros workers.
+        wait (bool): Se False, termina quando não houver lote livre, em vez de esperar pelos outros workers.
+        max_batches (int, opcional): Número máximo de lotes processados por este worker.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        int: Número de lotes concluídos por este worker.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    batches = load_manifest(work_dir)["batches"]
+    completed = 0
+
+    with mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1) as face_mesh:
+        while max_batches is None or completed < max_batches:
+            pending = [b for b in batches if not os.path.exists(_paths(work_dir, b["id"])[2])]
+            if not pending:
+                break
+            batch = next((b for b in pending if try_claim(_paths(work_dir, b["id"])[0], worker_id, lease_seconds)), None)
+            if batch is None:
+                if not wait:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            lease_path, shard_path, done_path = _paths(work_dir, batch["id"])
+            if os.path.exists(done_path):
+                # Concluído por outro worker entre a listagem e a reivindicação
+                release_lease(lease_path, worker_id)
+                continue
+            start = time.perf_counter()
+            shard, failed = extract_batch(batch, face_mesh, lambda: renew_lease(lease_path, worker_id), debug=debug)
+            if shard is None:
+                print(f"{worker_id}: concessão do lote {batch['id']} perdida; abandonando.")
+                continue
+
+            _write_atomic(shard_path, lambda path: shard.to_csv(path, index=False))
+            summary = {
+                "worker": worker_id, "images": len(batch["images"]), "faces": len(shard),
+                "failed": failed, "seconds": time.perf_counter() - start, "finished": time.time(),
+            }
+
+            def write(path):
+                with open(path, "w", encoding="utf-8") as file:
+                    json.dump(summary, file)
+
+            _write_atomic(done_path, write)
+            release_lease(lease_path, worker_id)
+            completed += 1
+            if debug:
+                print(f"{worker_id}: lote {batch['id']} concluído ({len(shard)} faces em {summary['seconds']:.1f} s).")
+    return completed
+
+
+def extraction_status(work_dir: str, lease_seconds: float = 300.0) -> dict:
+    """
+    Resume o andamento da extração.
+
+    Args:
+        work_dir (str): Diretório de trabalho compartilhado.
+        lease_seconds (float): Tempo de expiração das concessões.
+
+    Returns:
+        dict: Contagem de lotes concluídos, em andamento, com concessão expirada e pendentes,
+        e o número de faces extraídas.
+    """
+    status = {"batches": 0, "done": 0, "leased": 0, "expired": 0, "pending": 0, "faces": 0}
+    for batch in load_manifest(work_dir)["batches"]:
+        lease_path, _, done_path = _paths(work_dir, batch["id"])
+        status["batches"] += 1
+        if os.path.exists(done_path):
+            status["done"] += 1
+            with open(done_path, encoding="utf-8") as file:
+                status["faces"] += json.load(file)["faces"]
+        elif os.path.exists(lease_path):
+            status["expired" if lease_expired(lease_path, lease_seconds) else "leased"] += 1
+        else:
+            status["pending"] += 1
+    return status
+
+
+def merge_shards(work_dir: str, outputs: dict, allow_partial: bool = False, debug: bool = False) -> dict:
+    """
+    Junta os shards concluídos em um CSV por classe, ordenado pela coluna ``amostra``.
+
+    Args:
+        work_dir (str): Diretório de trabalho compartilhado.
+        outputs (dict): Classe -> caminho do CSV final.
+        allow_partial (bool): Se True, junta mesmo com lotes pendentes.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        dict: Classe -> número de linhas gravadas.
+
+    Raises:
+        RuntimeError: Se houver lotes não concluídos e ``allow_partial`` for False.
+    """
+    batches = load_manifest(work_dir)["batches"]
+    missing = [b["id"] for b in batches if not os.path.exists(_paths(work_dir, b["id"])[2])]
+    if missing and not allow_partial:
+        raise RuntimeError(f"{len(missing)} lotes não concluídos, por exemplo {missing[:3]}.")
+
+    counts = {}
+    for class_label, output_csv in outputs.items():
+        shards = [
+            pd.read_csv(_paths(work_dir, b["id"])[1])
+            for b in batches
+            if b["class"] == class_label and b["id"] not in missing
+        ]
+        merged = pd.concat(shards, ignore_index=True).sort_values("amostra") if shards else pd.DataFrame()
+        _write_atomic(output_csv, lambda path: merged.to_csv(path, index=False))
+        counts[class_label] = len(merged)
+        if debug:
+            print(f"Classe {class_label}: {len(merged)} faces em {output_csv}.")
+    return counts
+
+
+def run_local(work_dir: str, workers: int = 2, lease_seconds: float = 300.0, poll_interval: float = 1.0) -> list:
+    """
+    Executa vários workers em processos locais (spawn) contra o mesmo diretório de trabalho.
+
+    Args:
+        work_dir (str): Diretório de trabalho.
+        workers (int): Número de processos.
+        lease_seconds (float): Tempo de expiração das concessões.
+        poll_interval (float): Espera entre verificações dos workers ociosos.
+
+    Returns:
+        list: Código de saída de cada processo.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(work_dir, None, lease_seconds, poll_interval))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return [process.exitcode for process in processes]
+
+
+def _parse_mapping(specs: list, key_is_class: bool) -> dict:
+    """Converte argumentos ``classe:caminho`` em um dicionário."""
+    mapping = {}
+    for spec in specs:
+        label, _, path = spec.partition(":")
+        if key_is_class:
+            mapping[int(label)] = path
+        else:
+            mapping[path] = int(label)
+    return mapping
+
+
+def main(argv: list = None) -> None:
+    """
+    Interface de linha de comando: ``init``, ``worker``, ``local``, ``status`` e ``merge``.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Extração distribuída de malhas faciais.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    init = commands.add_parser("init", help="Cria o manifesto de lotes.")
+    init.add_argument("work_dir")
+    init.add_argument("folders", nargs="+", help="Pastas no formato classe:pasta.")
+    init.add_argument("--batch-size", type=int, default=64)
+    for name in ("worker", "local", "status"):
+        command = commands.add_parser(name)
+        command.add_argument("work_dir")
+        command.add_argument("--lease-seconds", type=float, default=300.0)
+    commands.choices["worker"].add_argument("--worker-id")
+    commands.choices["worker"].add_argument("--no-wait", action="store_true")
+    commands.choices["local"].add_argument("--workers", type=int, default=os.cpu_count())
+    merge = commands.add_parser("merge", help="Junta os shards nos CSVs finais.")
+    merge.add_argument("work_dir")
+    merge.add_argument("outputs", nargs="+", help="CSVs finais no formato classe:arquivo.")
+    merge.add_argument("--allow-partial", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "init":
+        init_work_dir(args.work_dir, _parse_mapping(args.folders, key_is_class=False), args.batch_size, debug=True)
+    elif args.command == "worker":
+        completed = run_worker(args.work_dir, args.worker_id, args.lease_seconds, wait=not args.no_wait, debug=True)
+        print(f"{completed} lotes concluídos por este worker.")
+    elif args.command == "local":
+        print(f"Códigos de saída: {run_local(args.work_dir, args.workers, args.lease_seconds)}")
+    elif args.command == "status":
+        print(extraction_status(args.work_dir, args.lease_seconds))
+    else:
+        merge_shards(args.work_dir, _parse_mapping(args.outputs, key_is_class=True), args.allow_partial, debug=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Normalização de Pose das Malhas Faciais por Procrustes em Lote
+==============================================================
+As distâncias de ``calculate_distances_3d`` são medidas em pixels, então variam com o tamanho da
+face na imagem e com a pose da cabeça. Este módulo alinha cada malha 468 x 3 a um gabarito
+canônico por Procrustes de similaridade (translação, rotação e escala):
+- Resolve todas as amostras de uma vez, com uma SVD em lote das matrizes 3 x 3 de covariância,
+- Ajusta o gabarito canônico pela média de Procrustes generalizada do conjunto de dados,
+- Serve tanto ao pipeline offline (DataFrames de marcos) quanto à API, por requisição.
+
+As malhas alinhadas ficam na escala do gabarito (tamanho do centróide igual a 1), então as
+distâncias passam a ser relativas ao tamanho da face.
+
+O Z do MediaPipe é normalizado (aproximadamente na escala de X dividido pela largura da imagem),
+enquanto X e Y estão em pixels; ``z_scale`` converte Z para pixels (a largura da imagem) antes do
+alinhamento em 3D.
+
+@author: George Flores
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from face_mesh_features import NUM_LANDMARKS
+
+# Gabarito ajustado sobre as malhas do conjunto 3.0 (recortes 224 x 224, z_scale=224)
+DEFAULT_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "face_mesh_template.npy")
+
+
+def _normalize_shape(shape: np.ndarray) -> np.ndarray:
+    """Centraliza uma forma (K, D) e a escala para tamanho do centróide igual a 1."""
+    shape = shape - shape.mean(axis=0)
+    return shape / np.sqrt((shape ** 2).sum() / len(shape))
+
+
+def _prepare(meshes: np.ndarray, dims: int, z_scale) -> np.ndarray:
+    """
+    Converte as malhas para (N, K, dims) em float64, com Z reescalado.
+
+    Args:
+        meshes (np.ndarray): Malhas (N, 468, 3) ou uma malha (468, 3).
+        dims (int): Dimensões usadas (2 ou 3).
+        z_scale (float | np.ndarray): Fator de Z, escalar ou por amostra (N,).
+
+    Returns:
+        np.ndarray: Malhas (N, K, dims).
+    """
+    meshes = np.array(meshes, dtype=np.float64, ndmin=3)[..., :dims]
+    if dims == 3:
+        meshes[..., 2] *= np.reshape(z_scale, (-1, 1))
+    return meshes
+
+
+def align_meshes(
+    meshes: np.ndarray,
+    template: np.ndarray,
+    dims: int = 3,
+    z_scale=1.0,
+    allow_scale: bool = True,
+    debug: bool = False,
+) -> np.ndarray:
+    """
+    Alinha malhas faciais a um gabarito por Procrustes de similaridade, todas de uma vez.
+
+    Para cada malha centralizada X, com o gabarito Y, calcula a SVD de ``H = X^T Y``
+    (``H = U S V^T``). A rotação é ``R = U D V^T``, com ``D`` corrigindo reflexões, e a escala é
+    ``traço(S D) / ||X||^2``. As SVDs 3 x 3 de todas as amostras são calculadas em lote.
+
+    Args:
+        meshes (np.ndarray): Malhas (N, 468, 3) ou uma malha (468, 3), como em ``landmarks_to_array``.
+        template (np.ndarray): Gabarito (468, 3) ou (468, 2) (ver ``fit_template``).
+        dims (int): 3 para alinhar em 3D ou 2 para alinhar apenas X e Y (sem depender da escala de Z).
+        z_scale (float | np.ndarray): Fator aplicado ao Z antes do alinhamento (escalar ou (N,)).
+        allow_scale (bool): Se False, aplica apenas translação e rotação.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        np.ndarray: Malhas alinhadas (N, 468, dims), na escala do gabarito.
+    """
+    X = _prepare(meshes, dims, z_scale)
+    Y = _normalize_shape(np.asarray(template, dtype=np.float64)[:, :dims])
+    X = X - X.mean(axis=1, keepdims=True)
+
+    H = np.einsum("nkd,ke->nde", X, Y)
+    U, S, Vt = np.linalg.svd(H)
+    # Corrige reflexões: a última direção singular recebe o sinal do determinante
+    signs = np.ones((len(X), dims))
+    signs[:, -1] = np.sign(np.linalg.det(U @ Vt))
+    R = (U * signs[:, None, :]) @ Vt
+
+    aligned = X @ R
+    if allow_scale:
+        scale = (S * signs).sum(axis=1) / np.einsum("nkd,nkd->n", X, X)
+        aligned *= scale[:, None, None]
+
+    if debug:
+        residual = np.sqrt(((aligned - Y) ** 2).sum(axis=(1, 2)) / NUM_LANDMARKS)
+        print(f"{len(X)} malhas alinhadas; resíduo RMS médio: {residual.mean():.4f}.")
+
+    return aligned
+
+
+def align_meshes_for_features(
+    meshes: np.ndarray, template: np.ndarray, dims: int = 3, z_scale=1.0, debug: bool = False
+) -> np.ndarray:
+    """
+    Alinha malhas faciais e devolve sempre 468 x 3, o formato de ``calculate_anthropometric_features``.
+
+    Em 3D é o próprio ``align_meshes``. Em 2D, X e Y são alinhados e o Z, convertido por ``z_scale``
+    e centralizado, recebe só a escala de similaridade do alinhamento (sem rotação), para ficar na
+    mesma unidade do gabarito que X e Y. É o formato das colunas gravadas por ``align_landmark_dataframe``
+    (os modelos treinados sobre CSVs alinhados em 2D recebem as mesmas distâncias na API e na
+    pontuação em lote).
+
+    Args:
+        meshes (np.ndarray): Malhas (N, 468, 3) ou uma malha (468, 3).
+        template (np.ndarray): Gabarito (468, 3) ou (468, 2).
+        dims (int): Dimensões usadas no alinhamento (2 ou 3).
+        z_scale (float | np.ndarray): Fator que converte o Z para a unidade de X e Y (escalar ou (N,)).
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        np.ndarray: Malhas (N, 468, 3).
+    """
+    aligned = align_meshes(meshes, template, dims=dims, z_scale=z_scale, debug=debug)
+    if dims == 3:
+        return aligned
+    original = _prepare(meshes, 3, z_scale)
+    original -= original.mean(axis=1, keepdims=True)
+    # A rotação preserva normas: a escala é a razão entre os tamanhos de X e Y alinhados e originais
+    scale = np.sqrt(
+        np.einsum("nkd,nkd->n", aligned, aligned) / np.einsum("nkd,nkd->n", original[..., :2], original[..., :2])
+    )
+    return np.concatenate([aligned, original[..., 2:] * scale[:, None, None]], axis=2)
+
+
+def fit_template(
+    meshes: np.ndarray,
+    dims: int = 3,
+    z_scale=1.0,
+    iterations: int = 20,
+    tolerance: float = 1e-7,
+    debug: bool = False,
+) -> np.ndarray:
+    """
+    Ajusta o gabarito canônico pela média de Procrustes generalizada.
+
+    Args:
+        meshes (np.ndarray): Malhas (N, 468, 3) do conjunto de referência.
+        dims (int): Dimensões usadas (2 ou 3).
+        z_scale (float | np.ndarray): Fator aplicado ao Z (ver ``align_meshes``).
+        iterations (int): Número máximo de iterações.
+        tolerance (float): Variação RMS do gabarito abaixo da qual o ajuste para.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        np.ndarray: Gabarito (468, dims) centralizado, com tamanho do centróide igual a 1.
+    """
+    X = _prepare(meshes, dims, z_scale)
+    template = _normalize_shape(X[0])
+    for iteration in range(iterations):
+        mean = _normalize_shape(align_meshes(X, template, dims=dims).mean(axis=0))
+        # Mantém a orientação do gabarito anterior para a média não girar entre iterações
+        mean = align_meshes(mean, template, dims=dims)[0]
+        change = np.sqrt(((mean - template) ** 2).mean())
+        template = mean
+        if change < tolerance:
+            break
+
+    if debug:
+        print(f"Gabarito ajustado em {iteration + 1} iterações (variação {change:.2e}).")
+
+    return template
+
+
+def load_template(template_path: str = DEFAULT_TEMPLATE_PATH) -> np.ndarray:
+    """
+    Carrega um gabarito salvo com ``np.save``.
+
+    Args:
+        template_path (str): Caminho do arquivo ``.npy``.
+
+    Returns:
+        np.ndarray: Gabarito (468, D).
+
+    Raises:
+        FileNotFoundError: Se o arquivo não for encontrado.
+    """
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"Gabarito não encontrado: {template_path}")
+    return np.load(template_path)
+
+
+def align_landmark_dataframe(
+    df: pd.DataFrame, template: np.ndarray, dims: int = 3, z_scale=1.0, debug: bool = False
+) -> pd.DataFrame:
+    """
+    Alinha as malhas de um DataFrame de marcos (formato de ``save_landmarks_to_csv``).
+
+    O resultado mantém as mesmas colunas, então pode ser usado diretamente em
+    ``calculate_distances_3d``.
+
+    Args:
+        df (pd.DataFrame): DataFrame com as colunas ``X0``, ``Y0``, ``Z0``, ..., ``Z467``.
+        template (np.ndarray): Gabarito (ver ``fit_template``).
+        dims (int): Dimensões usadas no alinhamento (2 ou 3).
+        z_scale (float | np.ndarray): Fator aplicado ao Z (ver ``align_meshes``).
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        pd.DataFrame: Cópia do DataFrame com as coordenadas alinhadas.
+    """
+    columns = [f"{axis}{i}" for i in range(NUM_LANDMARKS) for axis in ("X", "Y", "Z")]
+    meshes = df[columns].to_numpy(dtype=np.float64).reshape(-1, NUM_LANDMARKS, 3)
+    aligned = align_meshes_for_features(meshes, template, dims=dims, z_scale=z_scale, debug=debug)
+
+    result = df.copy()
+    result[columns] = aligned.reshape(len(df), -1)
+    return result
+
+
+def main(argv: list = None) -> None:
+    """
+    Alinha CSVs de marcos ao gabarito (ajustando-o antes, se pedido) e salva os resultados.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Normaliza a pose das malhas faciais por Procrustes.")
+    parser.add_argument("input_csv", nargs="+", help="CSVs de marcos (formato de save_landmarks_to_csv).")
+    parser.add_argument("--suffix", default="_aligned", help="Sufixo dos CSVs de saída.")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE_PATH)
+    parser.add_argument("--fit-template", action="store_true", help="Ajusta e salva o gabarito com os CSVs.")
+    parser.add_argument("--dims", type=int, choices=(2, 3), default=3)
+    parser.add_argument("--z-scale", type=float, default=224.0, help="Largura das imagens dos CSVs.")
+    args = parser.parse_args(argv)
+
+    frames = [pd.read_csv(path) for path in args.input_csv]
+    if args.fit_template:
+        columns = [f"{axis}{i}" for i in range(NUM_LANDMARKS) for axis in ("X", "Y", "Z")]
+        meshes = np.concatenate([df[columns].to_numpy(dtype=np.float64) for df in frames])
+        template = fit_template(meshes.reshape(-1, NUM_LANDMARKS, 3), args.dims, args.z_scale, debug=True)
+        np.save(args.template, template)
+        print(f"Gabarito salvo em {args.template}.")
+    else:
+        template = load_template(args.template)
+
+    for path, df in zip(args.input_csv, frames):
+        output = os.path.splitext(path)[0] + args.suffix + ".csv"
+        align_landmark_dataframe(df, template, args.dims, args.z_scale, debug=True).to_csv(output, index=False)
+        print(f"Malhas alinhadas salvas em {output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Motor Vetorizado de Medidas Antropométricas do Face Mesh
+========================================================
+Este módulo fornece funcionalidades para:
+- Converter marcos faciais do MediaPipe (listas ou arrays) em tensores F x 468 x 3,
+- Calcular, em uma única operação vetorizada, as 39 distâncias antropométricas usadas
+  pelo modelo servido na API para todas as faces de um lote.
+
+Os índices e a ordem das features são os mesmos de ``calculate_anthropometric_distances``
+em ``backend/AutismPredictionAPI.py`` (índices começando em 0, distâncias em 3D).
+
+@author: George Flores
+"""
+
+import numpy as np
+
+# Número de marcos faciais do MediaPipe FaceMesh (sem refine_landmarks)
+NUM_LANDMARKS = 468
+
+# Marcos faciais principais (índices do array, começando em 0)
+LANDMARKS = {
+    "face_width_ref1": 126,
+    "face_width_ref2": 355,
+    "trichion": 9,
+    "glabella": 8,
+    "frontozygomaticus_left": 299,
+    "frontozygomaticus_right": 69,
+    "endo_canthus_left": 132,
+    "endo_canthus_right": 361,
+    "exo_canthus_left": 262,
+    "exo_canthus_right": 32,
+    "upper_philtrum": 18,
+    "alare_left": 293,
+    "alare_right": 63,
+    "lower_philtrum": 0,
+    "christa_philtri_left": 266,
+    "christa_philtri_right": 36,
+    "cheilion_left": 60,
+    "cheilion_right": 290,
+    "pogonion": 198,
+    "menton": 151,
+}
+
+# Distâncias antropométricas na ordem esperada pelo modelo: (nome, marco 1, marco 2)
+DISTANCES = [
+    ("upper_facial_height", "trichion", "glabella"),
+    ("middle_facial_height", "glabella", "menton"),
+    ("intercanthal_width", "endo_canthus_left", "endo_canthus_right"),
+    ("biocular_width", "exo_canthus_left", "exo_canthus_right"),
+    ("nasal_width", "alare_left", "alare_right"),
+    ("mouth_width", "cheilion_left", "cheilion_right"),
+    ("philtrum_height", "upper_philtrum", "lower_philtrum"),
+    # Distâncias sugeridas por artigos
+    ("eye_left_width", "exo_canthus_left", "endo_canthus_left"),
+    ("eye_right_width", "endo_canthus_right", "exo_canthus_right"),
+    ("endo_canthus_glabella_left", "endo_canthus_left", "glabella"),
+    ("endo_canthus_glabella_right", "glabella", "endo_canthus_right"),
+    ("exo_canthus_christa_philtri_left", "christa_philtri_left", "exo_canthus_left"),
+    ("exo_canthus_christa_philtri_right", "exo_canthus_right", "christa_philtri_right"),
+    ("alare_left_lower_philtrum", "alare_left", "lower_philtrum"),
+    ("glabella_alare_right", "glabella", "alare_right"),
+    ("glabella_christa_philtri_left", "glabella", "christa_philtri_left"),
+    ("glabella_lower_philtrum", "glabella", "lower_philtrum"),
+    ("glabella_christa_philtri_right", "glabella", "christa_philtri_right"),
+    ("christa_philtri_right_alare_left", "alare_left", "christa_philtri_right"),
+    ("christa_philtri_right_cheilion_left", "cheilion_left", "christa_philtri_right"),
+    ("christa_philtri_left_cheilion_right", "christa_philtri_left", "cheilion_right"),
+    ("christa_philtri_left_lower_philtrum", "lower_philtrum", "christa_philtri_left"),
+    ("cheilion_left_lower_philtrum", "cheilion_left", "lower_philtrum"),
+    ("cheilion_left_christa_philtri_right", "cheilion_left", "christa_philtri_right"),
+    ("cheilion_left_cheilion_right", "cheilion_left", "cheilion_right"),
+    ("cheilion_left_pogonion", "cheilion_left", "pogonion"),
+    ("cheilion_right_lower_philtrum", "cheilion_right", "lower_philtrum"),
+    ("cheilion_right_christa_philtri_right", "cheilion_right", "christa_philtri_right"),
+    ("frontozygomaticus_endo_cantus_left", "frontozygomaticus_left", "exo_canthus_left"),
+    ("frontozygomaticus_left_alare_right", "frontozygomaticus_left", "alare_right"),
+    ("frontozygomaticus_left_cheilion_right", "frontozygomaticus_left", "cheilion_right"),
+    ("frontozygomaticus_endo_cantus_right", "frontozygomaticus_right", "endo_canthus_right"),
+    ("frontozygomaticus_right_cheilion_left", "frontozygomaticus_right", "cheilion_left"),
+    ("face_height", "trichion", "menton"),
+    ("face_width", "face_width_ref2", "face_width_ref1"),
+    # Adicionando mais quatro features para alcançar 39
+    ("lower_face_height", "menton", "pogonion"),
+    ("eye_to_mouth_left", "exo_canthus_left", "cheilion_left"),
+    ("eye_to_mouth_right", "exo_canthus_right", "cheilion_right"),
+    ("nose_to_menton", "upper_philtrum", "menton"),
+]
+
+FEATURE_NAMES = [name for name, _, _ in DISTANCES]
+INDEX_A = np.array([LANDMARKS[a] for _, a, _ in DISTANCES])
+INDEX_B = np.array([LANDMARKS[b] for _, _, b in DISTANCES])
+
+
+def landmarks_to_array(face_landmarks) -> np.ndarray:
+    """
+    Converte marcos faciais de uma ou mais faces em um array F x 468 x 3.
+
+    Args:
+        face_landmarks: Lista de 468 pontos (x, y, z) de uma face, lista de faces, ou
+            array com formato (468, 3) ou (F, 468, 3).
+
+    Returns:
+        np.ndarray: Array float64 com formato (F, 468, 3).
+
+    Raises:
+        ValueError: Se o formato dos marcos não for compatível com o FaceMesh.
+    """
+    landmarks = np.asarray(face_landmarks, dtype=np.float64)
+    if landmarks.ndim == 2:
+        landmarks = landmarks[np.newaxis]
+    if landmarks.ndim != 3 or landmarks.shape[1:] != (NUM_LANDMARKS, 3):
+        raise ValueError(f"Formato de marcos faciais inválido: {landmarks.shape}")
+    return landmarks
+
+
+def calculate_anthropometric_features(landmarks: np.ndarray) -> np.ndarray:
+    """
+    Calcula as 39 distâncias antropométricas 3D para um lote de faces.
+
+    Args:
+        landmarks (np.ndarray): Marcos faciais com formato (F, 468, 3) ou (468, 3).
+
+    Returns:
+        np.ndarray: Matriz (F, 39) com as distâncias na ordem de ``FEATURE_NAMES``.
+    """
+    landmarks = landmarks_to_array(landmarks)
+    return np.linalg.norm(landmarks[:, INDEX_A] - landmarks[:, INDEX_B], axis=-1)
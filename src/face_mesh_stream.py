@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Extração de Face Mesh em Vídeo e Webcam
+=======================================
+Este módulo utiliza o MediaPipe FaceMesh em modo de rastreamento (``static_image_mode=False``) para:
+- Ler quadros de um arquivo de vídeo, da webcam ou de qualquer iterador de quadros,
+- Suavizar temporalmente os marcos faciais 3D entre quadros,
+- Agregar as medidas antropométricas de todos os quadros em um único vetor robusto por indivíduo,
+- Gerar uma predição a partir desse vetor.
+
+No modo de rastreamento, o detector de faces só é executado quando a face é perdida; nos demais
+quadros o FaceMesh reaproveita a região do quadro anterior, o que é bem mais barato que a
+detecção completa por quadro feita em ``detect_face_mesh``.
+
+@author: George Flores
+"""
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from Face_Mesh_Extractor import landmarks_from_results
+from face_mesh_features import calculate_anthropometric_features
+
+# Inicializa a solução Face Mesh do MediaPipe
+mp_face_mesh = mp.solutions.face_mesh
+
+
+def iter_video_frames(source, debug: bool = False):
+    """
+    Lê os quadros de um arquivo de vídeo ou webcam e os retorna em RGB.
+
+    Args:
+        source (str | int): Caminho do arquivo de vídeo ou índice da webcam.
+        debug (bool): Se True, exibe informações de debug.
+
+    Yields:
+        np.ndarray: Quadro RGB.
+
+    Raises:
+        FileNotFoundError: Se o vídeo ou a webcam não puderem ser abertos.
+    """
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise FileNotFoundError(f"Vídeo não encontrado: {source}")
+
+    try:
+        frame_count = 0
+        while True:
+            ok, frame_bgr = capture.read()
+            if not ok:
+                break
+            frame_count += 1
+            yield cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    finally:
+        capture.release()
+        if debug:
+            print(f"{frame_count} quadros lidos de {source}.")
+
+
+def stream_face_mesh(
+    frames,
+    smoothing: float = 0.5,
+    min_detection_confidence: float = 0.5,
+    min_tracking_confidence: float = 0.5,
+    debug: bool = False,
+):
+    """
+    Detecta e rastreia os marcos faciais 3D quadro a quadro, com suavização exponencial.
+
+    A suavização é uma média móvel exponencial sobre o array 468 x 3:
+    ``suavizado = smoothing * anterior + (1 - smoothing) * atual``. Ela é reiniciada sempre que
+    a face é perdida, para não misturar marcos de faces diferentes.
+
+    Args:
+        frames: Iterador de quadros RGB (por exemplo, ``iter_video_frames``).
+        smoothing (float): Peso do quadro anterior, entre 0 (sem suavização) e 1.
+        min_detection_confidence (float): Confiança mínima da detecção da face.
+        min_tracking_confidence (float): Confiança mínima do rastreamento antes de detectar novamente.
+        debug (bool): Se True, exibe informações de debug.
+
+    Yields:
+        tuple: (índice do quadro, marcos suavizados com formato (468, 3)) para cada quadro com face.
+    """
+    smoothed = None
+    with mp_face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence,
+    ) as face_mesh:
+        for frame_index, frame_rgb in enumerate(frames):
+            height, width, _ = frame_rgb.shape
+            results = face_mesh.process(frame_rgb)
+            landmarks = landmarks_from_results(results, width, height)
+
+            if len(landmarks) == 0:
+                if debug:
+                    print(f"Face perdida no quadro {frame_index}.")
+                smoothed = None
+                continue
+
+            current = np.asarray(landmarks, dtype=np.float64)
+            if smoothed is None:
+                smoothed = current
+            else:
+                smoothed = smoothing * smoothed + (1.0 - smoothing) * current
+
+            yield frame_index, smoothed
+
+
+def aggregate_stream_features(landmark_stream, debug: bool = False) -> tuple:
+    """
+    Agrega as medidas antropométricas de todos os quadros em um vetor robusto por indivíduo.
+
+    Usa a mediana por feature, que é pouco sensível a quadros com piscadas, borrão de
+    movimento ou falhas pontuais de rastreamento.
+
+    Args:
+        landmark_stream: Iterador de (índice do quadro, marcos 468 x 3), como ``stream_face_mesh``.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        tuple: (vetor de features (39,), matriz de features por quadro (Q, 39)), ou
+        (None, matriz vazia) se nenhum quadro tiver face.
+    """
+    meshes = [landmarks for _, landmarks in landmark_stream]
+    if len(meshes) == 0:
+        return None, np.empty((0, 39))
+
+    # Calcula as features de todos os quadros em uma única operação vetorizada
+    per_frame = calculate_anthropometric_features(np.stack(meshes))
+    features = np.median(per_frame, axis=0)
+
+    if debug:
+        print(f"Features agregadas de {len(per_frame)} quadros.")
+
+    return features, per_frame
+
+
+def predict_stream(frames, model, smoothing: float = 0.5, debug: bool = False) -> dict:
+    """
+    Gera a predição de um indivíduo a partir de um vídeo ou iterador de quadros.
+
+    Args:
+        frames: Iterador de quadros RGB.
+        model: Modelo Keras carregado (mesmo usado pela API).
+        smoothing (float): Peso do quadro anterior na suavização dos marcos.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        dict: Com as chaves ``success``, ``frames_with_face``, ``prediction`` e ``confidence``.
+    """
+    features, per_frame = aggregate_stream_features(
+        stream_face_mesh(frames, smoothing=smoothing, debug=debug), debug=debug
+    )
+    if features is None:
+        return {"success": False, "frames_with_face": 0}
+
+    prediction = float(model.predict(features.reshape(1, -1), verbose=0)[0][0])
+    return {
+        "success": True,
+        "frames_with_face": len(per_frame),
+        "prediction": int(np.round(prediction)),
+        "confidence": prediction,
+    }
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Exploração de Todas as Distâncias entre Marcos do Face Mesh
+===========================================================
+As 39 distâncias de ``calculate_distances_3d`` cobrem uma fração mínima das 468 x 467 / 2 = 109.278
+distâncias possíveis da malha. Este módulo fornece uma ferramenta de descoberta de features que:
+- Calcula todas as distâncias entre pares de marcos para o conjunto de dados inteiro, em blocos de
+  pares e de amostras com memória limitada (opcionalmente em float16 e em várias threads),
+- Acumula, bloco a bloco, as estatísticas de separação entre classes de cada par (médias e
+  variâncias combinadas pelo método de Chan), sem materializar a matriz N x 109.278,
+- Gera uma lista ordenada de features candidatas (d de Cohen, t de Welch e escore de Fisher).
+
+Uso:
+    python feature_discovery.py face_mesh_no_autism.csv face_mesh_with_autism.csv --output ranking.csv
+
+@author: George Flores
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from face_mesh_features import DISTANCES, LANDMARKS, NUM_LANDMARKS
+
+
+def load_face_mesh_csv(file_path: str, debug: bool = False) -> tuple:
+    """
+    Carrega um CSV de marcos do Face Mesh (formato de ``save_landmarks_to_csv``) em um tensor.
+
+    Args:
+        file_path (str): Caminho do CSV com as colunas ``amostra``, ``class``, ``X0``, ``Y0``, ``Z0``, ...
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        tuple: (marcos (N, 468, 3) em float32, rótulos (N,) em int).
+    """
+    columns = [f"{axis}{i}" for i in range(NUM_LANDMARKS) for axis in ("X", "Y", "Z")]
+    df = pd.read_csv(file_path, usecols=["class"] + columns)
+    meshes = df[columns].to_numpy(dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+    labels = df["class"].to_numpy(dtype=int)
+
+    if debug:
+        print(f"{len(meshes)} malhas carregadas de {file_path}.")
+
+    return meshes, labels
+
+
+# Marcos com o mesmo índice na API e nos CSVs
+SAME_INDEX_LANDMARKS = ("lower_philtrum",)
+
+
+def known_feature_pairs() -> dict:
+    """
+    Mapeia os pares de marcos das 39 features atuais para os seus nomes.
+
+    Os CSVs usam os índices do MediaPipe nas colunas (``X127``), enquanto ``face_mesh_features``
+    usa os índices da API, que são 1 a menos (ver ``calculate_anthropometric_distances``). A exceção
+    é ``lower_philtrum``, que é o marco 0 nos dois padrões (coluna ``X0``).
+
+    Returns:
+        dict: (índice a, índice b) com a < b, nos índices dos CSVs -> nome da feature.
+    """
+    csv_index = {
+        landmark: index if landmark in SAME_INDEX_LANDMARKS else index + 1
+        for landmark, index in LANDMARKS.items()
+    }
+    pairs = {}
+    for name, point_a, point_b in DISTANCES:
+        pairs.setdefault(tuple(sorted((csv_index[point_a], csv_index[point_b]))), name)
+    return pairs
+
+
+def scale_meshes(meshes: np.ndarray, reference: tuple) -> np.ndarray:
+    """
+    Divide cada malha pela distância entre dois marcos de referência (por exemplo, a largura da face).
+
+    Torna as distâncias independentes do tamanho da face na imagem e mantém os valores perto de 1,
+    o que também permite calcular os blocos em float16 sem perder precisão relativa.
+
+    Args:
+        meshes (np.ndarray): Marcos (N, 468, D).
+        reference (tuple): Índices (a, b) dos marcos de referência.
+
+    Returns:
+        np.ndarray: Marcos escalados, no mesmo tipo de ``meshes``.
+    """
+    scale = np.linalg.norm(meshes[:, reference[0]] - meshes[:, reference[1]], axis=-1)
+    scale[scale == 0] = 1.0
+    return meshes / scale[:, None, None].astype(meshes.dtype)
+
+
+def _merge_moments(count: np.ndarray, mean: np.ndarray, m2: np.ndarray, chunk: np.ndarray, c: int) -> None:
+    """
+    Combina (método de Chan) as médias e somas de quadrados de um bloco da classe ``c``.
+
+    Args:
+        count (np.ndarray): Amostras acumuladas por classe (2,).
+        mean (np.ndarray): Médias acumuladas (2, P), atualizadas no lugar.
+        m2 (np.ndarray): Somas dos quadrados dos desvios (2, P), atualizadas no lugar.
+        chunk (np.ndarray): Distâncias do bloco (P, R), todas da classe ``c``.
+        c (int): Índice da classe.
+
+    Returns:
+        None
+    """
+    n_b = chunk.shape[1]
+    mean_b = chunk.sum(axis=1, dtype=np.float64) / n_b
+    m2_b = np.einsum("pr,pr->p", chunk, chunk, dtype=np.float64) - n_b * mean_b ** 2
+    n_a = count[c]
+    n = n_a + n_b
+    delta = mean_b - mean[c]
+    mean[c] += delta * (n_b / n)
+    m2[c] += m2_b + delta ** 2 * (n_a * n_b / n)
+    count[c] = n
+
+
+def pair_chunk_moments(
+    coordinates: np.ndarray,
+    class_bounds: list,
+    index_a: np.ndarray,
+    index_b: np.ndarray,
+    chunk_rows: int = 1024,
+) -> tuple:
+    """
+    Calcula, bloco de amostras a bloco, as médias e variâncias por classe de um bloco de pares.
+
+    As coordenadas ficam no formato (D, 468, N), com as amostras ordenadas por classe: a seleção
+    dos marcos de um par percorre as amostras de forma contígua e cada classe é uma fatia, sem
+    cópias por máscara. A memória usada é proporcional a ``chunk_rows * len(index_a)``,
+    independente do número de amostras.
+
+    Args:
+        coordinates (np.ndarray): Coordenadas (D, 468, N) ordenadas por classe (float32 ou float16).
+        class_bounds (list): Intervalos [início, fim) das amostras de cada classe.
+        index_a (np.ndarray): Primeiro marco de cada par (P,).
+        index_b (np.ndarray): Segundo marco de cada par (P,).
+        chunk_rows (int): Número de amostras por bloco.
+
+    Returns:
+        tuple: (contagem por classe (2,), médias (2, P), somas dos quadrados dos desvios (2, P)).
+    """
+    count = np.zeros(2, dtype=np.int64)
+    mean = np.zeros((2, len(index_a)))
+    m2 = np.zeros((2, len(index_a)))
+    for c, (lower, upper) in enumerate(class_bounds):
+        for start in range(lower, upper, chunk_rows):
+            rows = coordinates[:, :, start:min(start + chunk_rows, upper)]
+            # Diferenças calculadas em float32 mesmo com coordenadas armazenadas em float16
+            squared = np.zeros((len(index_a), rows.shape[2]), dtype=np.float32)
+            for axis in rows:
+                diff = axis[index_a].astype(np.float32, copy=False)
+                diff -= axis[index_b]
+                squared += diff * diff
+            _merge_moments(count, mean, m2, np.sqrt(squared, out=squared), c)
+    return count, mean, m2
+
+
+def rank_pair_distances(
+    meshes: np.ndarray,
+    labels: np.ndarray,
+    dims: int = 2,
+    chunk_pairs: int = 4096,
+    chunk_rows: int = 1024,
+    dtype=np.float32,
+    workers: int = 1,
+    reference: tuple = None,
+    top_k: int = None,
+    debug: bool = False,
+) -> pd.DataFrame:
+    """
+    Ordena todas as distâncias entre pares de marcos pela separação entre as classes.
+
+    Args:
+        meshes (np.ndarray): Marcos (N, 468, 3).
+        labels (np.ndarray): Rótulos (N,): 0 para sem autismo e 1 para com autismo.
+        dims (int): Coordenadas usadas: 2 (X, Y, como nos CSVs de distâncias do treinamento) ou 3.
+        chunk_pairs (int): Número de pares por bloco (unidade de trabalho de cada thread).
+        chunk_rows (int): Número de amostras por bloco.
+        dtype: Tipo de armazenamento das coordenadas. ``np.float16`` reduz pela metade a memória
+            e a banda das coordenadas (as diferenças são calculadas em float32); use junto com
+            ``reference`` para manter as coordenadas perto de 1.
+        workers (int): Número de threads (o NumPy libera o GIL nas operações dos blocos).
+        reference (tuple, opcional): Marcos (a, b) usados para escalar cada malha (ver ``scale_meshes``).
+        top_k (int, opcional): Número de candidatos retornados. Se None, retorna todos os pares.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        pd.DataFrame: Pares ordenados por |d de Cohen|, com as médias por classe, o t de Welch,
+        o escore de Fisher e o nome da feature atual correspondente (se houver).
+    """
+    start_time = time.perf_counter()
+    meshes = np.asarray(meshes, dtype=np.float32)[:, :, :dims]
+    if reference is not None:
+        meshes = scale_meshes(meshes, reference)
+
+    # Amostras ordenadas por classe e coordenadas no formato (D, 468, N)
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind="stable")
+    n0 = int((labels == 0).sum())
+    class_bounds = [(0, n0), (n0, len(labels))]
+    coordinates = np.ascontiguousarray(meshes[order].transpose(2, 1, 0), dtype=dtype)
+
+    index_a, index_b = np.triu_indices(coordinates.shape[1], k=1)
+    num_pairs = len(index_a)
+    count = np.zeros(2, dtype=np.int64)
+    mean = np.empty((2, num_pairs))
+    m2 = np.empty((2, num_pairs))
+
+    def process(start):
+        stop = start + chunk_pairs
+        chunk_count, mean[:, start:stop], m2[:, start:stop] = pair_chunk_moments(
+            coordinates, class_bounds, index_a[start:stop], index_b[start:stop], chunk_rows
+        )
+        return chunk_count
+
+    with ThreadPoolExecutor(max(1, workers)) as executor:
+        for chunk_count in executor.map(process, range(0, num_pairs, chunk_pairs)):
+            count = chunk_count  # igual para todos os blocos: todas as amostras têm todos os pares
+
+    n0, n1 = count
+    var = np.maximum(m2, 0.0) / np.maximum(count - 1, 1)[:, None]
+    difference = mean[1] - mean[0]
+    pooled = np.sqrt(((n0 - 1) * var[0] + (n1 - 1) * var[1]) / max(n0 + n1 - 2, 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cohen_d = np.where(pooled > 0, difference / pooled, 0.0)
+        welch_t = np.where(pooled > 0, difference / np.sqrt(var[0] / n0 + var[1] / n1), 0.0)
+        fisher = np.where(pooled > 0, difference ** 2 / (var[0] + var[1]), 0.0)
+
+    order = np.argsort(-np.abs(cohen_d), kind="stable")
+    if top_k is not None:
+        order = order[:top_k]
+
+    known = known_feature_pairs()
+    ranking = pd.DataFrame({
+        "rank": np.arange(1, len(order) + 1),
+        "landmark_a": index_a[order],
+        "landmark_b": index_b[order],
+        "feature": [known.get((a, b), "") for a, b in zip(index_a[order], index_b[order])],
+        "mean_no_autism": mean[0, order],
+        "mean_with_autism": mean[1, order],
+        "cohen_d": cohen_d[order],
+        "welch_t": welch_t[order],
+        "fisher_score": fisher[order],
+    })
+
+    if debug:
+        print(
+            f"{num_pairs} pares x {n0 + n1} amostras em {time.perf_counter() - start_time:.1f} s "
+            f"({workers} threads, {np.dtype(dtype).name})."
+        )
+
+    return ranking
+
+
+def main(argv: list = None) -> None:
+    """
+    Lê os CSVs de marcos, ordena todas as distâncias e salva a lista de candidatos.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Ordena todas as distâncias entre marcos do Face Mesh.")
+    parser.add_argument("input_csv", nargs="+", help="CSVs de marcos (formato de save_landmarks_to_csv).")
+    parser.add_argument("--output", default="pair_distance_ranking.csv")
+    parser.add_argument("--top", type=int, default=500)
+    parser.add_argument("--dims", type=int, choices=(2, 3), default=2)
+    parser.add_argument("--chunk-pairs", type=int, default=4096)
+    parser.add_argument("--chunk-rows", type=int, default=1024)
+    parser.add_argument("--float16", action="store_true")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--scale-by-face-width", action="store_true")
+    args = parser.parse_args(argv)
+
+    loaded = [load_face_mesh_csv(path, debug=True) for path in args.input_csv]
+    meshes = np.concatenate([m for m, _ in loaded])
+    labels = np.concatenate([l for _, l in loaded])
+
+    # Largura da face nos índices dos CSVs (X127 e X356, como em calculate_distances_3d)
+    reference = (127, 356) if args.scale_by_face_width else None
+    ranking = rank_pair_distances(
+        meshes, labels, dims=args.dims, chunk_pairs=args.chunk_pairs, chunk_rows=args.chunk_rows,
+        dtype=np.float16 if args.float16 else np.float32, workers=args.workers,
+        reference=reference, top_k=None, debug=True,
+    )
+
+    current = ranking[ranking["feature"] != ""]
+    print(f"Melhor feature atual: {current.iloc[0]['feature']} (posição {current.iloc[0]['rank']}).")
+    print(f"Candidatos novos entre os {args.top} primeiros: {(ranking['feature'][:args.top] == '').sum()}.")
+    print(ranking.head(10).to_string(index=False))
+
+    ranking.head(args.top).to_csv(args.output, index=False)
+    print(f"Lista de candidatos salva em {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,8 +15,10 @@ Criado em: Sexta-feira, dia 27 de Setembro de 2024
 """
 
 
+import argparse
 import os
 import urllib.request as urlreq
+from functools import lru_cache
 
 import cv2
 import numpy as np
@@ -24,6 +26,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from tqdm import tqdm
 
+from detector_profiles import get_profile
+from image_dedup import HashIndex, perceptual_hash
+from image_shards import ShardReader, is_shard_dir
+from memory_profiling import StageMemoryTracker, format_report, save_report
+
 
 def download_file(url: str, filename: str, debug: bool = False) -> None:
     """
@@ -69,13 +76,40 @@ def load_image(image_path: str, debug: bool = False) -> np.ndarray:
         if debug:
             print(f"Imagem {image_path} carregada com sucesso.")
         image = cv2.imread(image_path)
-        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Converte no próprio array lido, sem alocar uma segunda imagem
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
     else:
         raise FileNotFoundError(f"Imagem não encontrada: {image_path}")
 
 
+@lru_cache(maxsize=None)
+def load_cascade_classifier(haarcascade: str) -> cv2.CascadeClassifier:
+    """
+    Carrega (uma única vez por caminho) um classificador Haarcascade.
+
+    Args:
+        haarcascade (str): Caminho do classificador Haarcascade.
+
+    Returns:
+        cv2.CascadeClassifier: Classificador carregado e reutilizável.
+
+    Raises:
+        FileNotFoundError: Se o classificador Haarcascade não for encontrado.
+    """
+
+    if not os.path.exists(haarcascade):
+        raise FileNotFoundError(f"Classificador de faces não encontrado: {haarcascade}")
+
+    return cv2.CascadeClassifier(haarcascade)
+
+
 def detect_faces(
-    image_gray: np.ndarray, haarcascade: str, debug: bool = False
+    image_gray: np.ndarray,
+    haarcascade: str,
+    debug: bool = False,
+    scale_factor: float = 1.1,
+    min_neighbors: int = 3,
+    min_size: tuple = None,
 ) -> np.ndarray:
     """
     Detecta faces em uma imagem em escala de cinza.
@@ -84,6 +118,9 @@ def detect_faces(
         image_gray (np.ndarray): Imagem em escala de cinza.
         haarcascade (str): Caminho do classificador Haarcascade.
         debug (bool): Se True, exibe informações de debug.
+        scale_factor (float): Fator de redução da imagem entre escalas do ``detectMultiScale``.
+        min_neighbors (int): Número mínimo de vizinhos para aceitar uma detecção.
+        min_size (tuple, opcional): Tamanho mínimo (largura, altura) da face em pixels.
 
     Returns:
         np.ndarray: Coordenadas das faces detectadas no formato (x, y, largura, altura).
@@ -92,11 +129,13 @@ def detect_faces(
         FileNotFoundError: Se o classificador Haarcascade não for encontrado.
     """
 
-    if not os.path.exists(haarcascade):
-        raise FileNotFoundError(f"Classificador de faces não encontrado: {haarcascade}")
-
-    detector = cv2.CascadeClassifier(haarcascade)
-    faces = detector.detectMultiScale(image_gray)
+    detector = load_cascade_classifier(haarcascade)
+    faces = detector.detectMultiScale(
+        image_gray,
+        scaleFactor=scale_factor,
+        minNeighbors=min_neighbors,
+        minSize=min_size or (0, 0),
+    )
 
     if debug:
         print(f"Faces detectadas: {faces}")
@@ -233,18 +272,34 @@ def process_images_in_folder(
     output_csv: str,
     class_label: int,
     debug: bool = False,
+    memory_report: str = None,
+    trace_allocations: bool = True,
+    dedup_index: HashIndex = None,
+    profile: str = None,
 ) -> None:
     """
     Processa todas as imagens em uma pasta, detectando faces e marcos faciais,
     e salvando os resultados em um único CSV.
 
     Args:
-        folder_path (str): Caminho da pasta contendo as imagens.
+        folder_path (str): Caminho da pasta contendo as imagens, ou de uma pasta de shards
+            empacotados (ver ``image_shards``), da qual são lidas as imagens com o rótulo ``class_label``.
         haarcascade (str): Caminho do classificador Haarcascade.
         lbf_model (str): Caminho do modelo de detecção de marcos faciais.
         output_csv (str): Caminho do arquivo CSV onde os marcos faciais serão salvos.
         class_label (int): Rótulo da classe para a imagem (0 para sem autismo, 1 para com autismo).
         debug (bool): Se True, exibe informações de debug.
+        memory_report (str, opcional): Caminho de um relatório JSON de memória por etapa
+            (decodificação, detecção, plotagem e escrita; ver ``memory_profiling``). Se informado,
+            mede cada etapa e imprime o resumo ao final.
+        trace_allocations (bool): Se False, o relatório de memória mede só RSS e tempo, sem o custo
+            do ``tracemalloc`` (indicado para execuções longas).
+        dedup_index (HashIndex, opcional): Índice de hashes perceptuais (ver ``image_dedup``).
+            Se informado, imagens repetidas ou quase repetidas de outras já indexadas são puladas;
+            use o mesmo índice nas pastas das duas classes para detectar duplicatas entre classes.
+        profile (str, opcional): Perfil de velocidade, que define ``scaleFactor`` e ``minNeighbors`` do
+            Haarcascade (``fast``, ``balanced`` ou ``accurate``; ver ``detector_profiles``).
+            Padrão: ``balanced``, os valores usados até aqui.
 
     Returns:
         None
@@ -259,51 +314,91 @@ def process_images_in_folder(
     if not os.path.exists(lbf_model):
         raise FileNotFoundError(f"Modelo de marcos faciais não encontrado: {lbf_model}")
 
+    detector = get_profile(profile)
     landmark_detector = cv2.face.createFacemarkLBF()
     landmark_detector.loadModel(lbf_model)
 
-    image_files = [
-        f for f in os.listdir(folder_path) if f.endswith((".jpg", ".png", ".jpeg"))
-    ]
-
-    for i, image_file in enumerate(
-        tqdm(image_files, desc=f"Processando {class_label}")
-    ):
-        image_path = os.path.join(folder_path, image_file)
-        if debug:
-            print(f"\nProcessando imagem {i + 1}: {image_file}")
-
-        try:
-            # Carregar a imagem
-            image_rgb = load_image(image_path, debug=debug)
-            image_gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
-
-            # Detectar faces
-            faces = detect_faces(image_gray, haarcascade, debug=debug)
-
-            if len(faces) == 0:
-                if debug:
-                    print(
-                        f"Nenhuma face detectada em {image_file}. Pulando para a próxima imagem."
+    # O leitor de shards é fechado mesmo se uma exceção interromper a pasta
+    shard_reader = None
+    try:
+        if is_shard_dir(folder_path):
+            # Shards empacotados (ver image_shards): apenas os registros desta classe, em ordem de leitura
+            shard_reader = ShardReader(folder_path)
+            records = shard_reader.records(label=class_label)
+            image_files = [shard_reader.names[record] for record in records]
+        else:
+            image_files = [
+                f for f in os.listdir(folder_path) if f.endswith((".jpg", ".png", ".jpeg"))
+            ]
+        tracker = StageMemoryTracker(
+            enabled=memory_report is not None, trace_allocations=trace_allocations
+        ).start()
+
+        for i, image_file in enumerate(
+            tqdm(image_files, desc=f"Processando {class_label}")
+        ):
+            image_path = os.path.join(folder_path, image_file)
+            if debug:
+                print(f"\nProcessando imagem {i + 1}: {image_file}")
+
+            try:
+                # Carregar a imagem
+                with tracker.stage("decode"):
+                    if shard_reader is not None:
+                        image_rgb = shard_reader.decode(records[i], debug=debug)
+                    else:
+                        image_rgb = load_image(image_path, debug=debug)
+                    image_gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+
+                if dedup_index is not None:
+                    with tracker.stage("dedup"):
+                        duplicate = dedup_index.check_duplicate(
+                            perceptual_hash(image_gray), image_path, class_label, debug=debug
+                        )
+                    if duplicate:
+                        continue
+
+                # Detectar faces
+                with tracker.stage("detection"):
+                    faces = detect_faces(
+                        image_gray, haarcascade, debug=debug,
+                        scale_factor=detector.haar_scale_factor, min_neighbors=detector.haar_min_neighbors,
                     )
-                continue
-
-            # Detectar marcos faciais
-            landmarks = detect_landmarks(image_gray, faces, landmark_detector, debug=debug)
 
-            # Plotar os landmarks
-            plot_landmarks(image_rgb, landmarks, debug=debug)
+                if len(faces) == 0:
+                    if debug:
+                        print(
+                            f"Nenhuma face detectada em {image_file}. Pulando para a próxima imagem."
+                        )
+                    continue
+
+                # Detectar marcos faciais
+                with tracker.stage("detection"):
+                    landmarks = detect_landmarks(image_gray, faces, landmark_detector, debug=debug)
+
+                # Plotar os landmarks
+                with tracker.stage("plotting"):
+                    plot_landmarks(image_rgb, landmarks, debug=debug)
+
+                # Salvar os marcos em um CSV
+                with tracker.stage("writing"):
+                    save_landmarks_to_csv(
+                        landmarks, i + 1, class_label, output_csv, debug=debug
+                    )
 
-            # Salvar os marcos em um CSV
-            save_landmarks_to_csv(
-                landmarks, i + 1, class_label, output_csv, debug=debug
-            )
+            except FileNotFoundError as e:
+                print(f"Arquivo não encontrado: {e}")
+    finally:
+        if shard_reader is not None:
+            shard_reader.close()
 
-        except FileNotFoundError as e:
-            print(f"Arquivo não encontrado: {e}")
+    if memory_report is not None:
+        report = tracker.stop()
+        save_report(report, memory_report)
+        print(format_report(report))
 
 
-def main():
+def main(argv: list = None):
     """
     Função principal que orquestra o processo de detecção de faces e marcos faciais.
 
@@ -318,9 +413,19 @@ def main():
     
     As imagens são processadas usando as funções auxiliares definidas neste módulo.
 
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv``.
+
     Returns:
         None
     """
+    parser = argparse.ArgumentParser(description="Extrai os marcos faciais (Haarcascade + LBF) das duas classes.")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Pula imagens repetidas ou quase repetidas (pHash) e acusa duplicatas entre classes.")
+    parser.add_argument("--dedup-distance", type=int, default=6,
+                        help="Maior distância de Hamming considerada duplicata (com --dedup).")
+    args = parser.parse_args(argv)
+
 
     # URLs para os arquivos de detecção
     haarcascade_url = "https://raw.githubusercontent.com/opencv/opencv/master/data/" \
@@ -352,6 +457,9 @@ def main():
     if os.path.isfile(output_csv_no_autism): 
         os.remove(output_csv_no_autism)
     
+    # Índice compartilhado pelas duas classes (opcional): pula imagens repetidas e acusa duplicatas entre classes
+    dedup_index = HashIndex(max_distance=args.dedup_distance) if args.dedup else None
+
     process_images_in_folder(
         folder_path_no_autism,
         haarcascade,
@@ -359,6 +467,7 @@ def main():
         output_csv_no_autism,
         class_label=0,
         debug=False,
+        dedup_index=dedup_index,
     )
 
     # Processar imagens de with_autism
@@ -375,6 +484,7 @@ def main():
         output_csv_with_autism,
         class_label=1,
         debug=False,
+        dedup_index=dedup_index,
     )
 
 
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Ordenação Vetorizada de Features por Relevância para a Classe
+=============================================================
+O notebook de classificação ordena as features com ``data_total_cleaned.corr()['class']``, que
+recalcula a matriz de correlação inteira (todas contra todas) a cada execução, e depois escolhe
+as features manualmente. Este módulo calcula, para todas as colunas de uma vez:
+- A correlação ponto-bisserial com a classe (igual a ``corr()['class']``),
+- A informação mútua com a classe, em faixas de mesma frequência,
+- A AUC univariada (probabilidade de uma amostra com autismo ter valor maior),
+e permite atualizações incrementais conforme novas linhas chegam, pois só mantém momentos por
+classe (combinados pelo método de Chan) e histogramas com faixas fixas.
+
+A ordenação é salva em CSV e lida por ``select_features`` para escolher as features do treinamento.
+
+Uso:
+    python feature_ranking.py distances_no_autism.csv distances_with_autism.csv --output ranking.csv
+
+@author: George Flores
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Colunas que não são features nos CSVs de distâncias
+NON_FEATURE_COLUMNS = ("samples", "amostra", "class")
+
+RANKING_METRICS = ("auc", "point_biserial", "mutual_information")
+
+
+class FeatureRanker:
+    """
+    Estatísticas incrementais de relevância de cada feature para uma classe binária.
+
+    As faixas dos histogramas são fixadas pelos quantis do primeiro lote (as faixas das pontas
+    são abertas, então valores fora do intervalo inicial continuam contados). Com o conjunto
+    inteiro no primeiro lote, a AUC calculada pelos histogramas difere da exata em menos de
+    cerca de ``1 / bins``.
+
+    Args:
+        feature_names (list): Nomes das features, na ordem das colunas.
+        bins (int): Número de faixas dos histogramas usados na AUC.
+        mi_bins (int): Número de faixas usadas na informação mútua (divisor de ``bins``).
+    """
+
+    def __init__(self, feature_names: list, bins: int = 256, mi_bins: int = 16):
+        if bins % mi_bins != 0:
+            raise ValueError("bins deve ser múltiplo de mi_bins.")
+        self.feature_names = list(feature_names)
+        self.bins = bins
+        self.mi_bins = mi_bins
+        num_features = len(self.feature_names)
+        self.count = np.zeros((2, num_features))
+        self.mean = np.zeros((2, num_features))
+        self.m2 = np.zeros((2, num_features))
+        self.histogram = np.zeros((2, num_features, bins))
+        self.edges = None
+
+    def _bin_indices(self, X: np.ndarray, chunk_rows: int = 1024) -> np.ndarray:
+        """
+        Calcula a faixa de cada valor, comparando todas as colunas com as suas bordas de uma vez.
+
+        Args:
+            X (np.ndarray): Valores (N, F).
+            chunk_rows (int): Linhas por bloco (limita a memória da comparação N x F x bins).
+
+        Returns:
+            np.ndarray: Índices das faixas (N, F).
+        """
+        indices = np.empty(X.shape, dtype=np.int64)
+        for start in range(0, len(X), chunk_rows):
+            chunk = X[start:start + chunk_rows, :, None]
+            indices[start:start + chunk_rows] = (chunk > self.edges[None]).sum(axis=-1)
+        return indices
+
+    def update(self, X, y) -> "FeatureRanker":
+        """
+        Acrescenta um lote de linhas às estatísticas.
+
+        Args:
+            X (np.ndarray | pd.DataFrame): Features (N, F). Valores NaN são ignorados por coluna.
+            y (np.ndarray | pd.Series): Classes (N,) com valores 0 e 1.
+
+        Returns:
+            FeatureRanker: A própria instância, para encadear chamadas.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y).astype(int)
+        if self.edges is None:
+            # Bordas internas de faixas de mesma frequência, fixadas no primeiro lote
+            quantiles = np.linspace(0, 1, self.bins + 1)[1:-1]
+            self.edges = np.nanquantile(X, quantiles, axis=0).T  # (F, bins - 1)
+
+        valid = ~np.isnan(X)
+        indices = self._bin_indices(np.where(valid, X, -np.inf))
+        num_features = X.shape[1]
+        for c in (0, 1):
+            rows = X[y == c]
+            valid_c = valid[y == c]
+            n_b = valid_c.sum(axis=0)
+            if not n_b.any():
+                continue
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean_b = np.where(n_b > 0, np.nansum(rows, axis=0) / n_b, 0.0)
+            m2_b = np.nansum((rows - mean_b) ** 2, axis=0)
+
+            # Combinação de Chan dos momentos acumulados com os do lote
+            n_a = self.count[c]
+            n = n_a + n_b
+            delta = mean_b - self.mean[c]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.mean[c] += np.where(n > 0, delta * n_b / n, 0.0)
+                self.m2[c] += m2_b + np.where(n > 0, delta ** 2 * n_a * n_b / n, 0.0)
+            self.count[c] = n
+
+            # Histograma de todas as colunas em um único bincount
+            columns = np.broadcast_to(np.arange(num_features), valid_c.shape)[valid_c]
+            flat = columns * self.bins + indices[y == c][valid_c]
+            self.histogram[c] += np.bincount(flat, minlength=num_features * self.bins).reshape(
+                num_features, self.bins
+            )
+        return self
+
+    def point_biserial(self) -> np.ndarray:
+        """
+        Calcula a correlação ponto-bisserial (Pearson com a classe 0/1) de cada feature.
+
+        Returns:
+            np.ndarray: Correlações (F,), no mesmo sentido de ``corr()['class']``.
+        """
+        n0, n1 = self.count
+        n = n0 + n1
+        difference = self.mean[1] - self.mean[0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            total_var = (self.m2[0] + self.m2[1] + difference ** 2 * n0 * n1 / n) / n
+            r = difference * np.sqrt(n0 * n1) / n / np.sqrt(total_var)
+        return np.nan_to_num(r)
+
+    def mutual_information(self) -> np.ndarray:
+        """
+        Calcula a informação mútua (em nats) entre cada feature discretizada e a classe.
+
+        Returns:
+            np.ndarray: Informação mútua (F,).
+        """
+        joint = self.histogram.reshape(2, -1, self.mi_bins, self.bins // self.mi_bins).sum(axis=-1)
+        total = joint.sum(axis=(0, 2), keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p_joint = joint / total
+            p_class = p_joint.sum(axis=2, keepdims=True)
+            p_bin = p_joint.sum(axis=0, keepdims=True)
+            terms = np.where(p_joint > 0, p_joint * np.log(p_joint / (p_class * p_bin)), 0.0)
+        return terms.sum(axis=(0, 2))
+
+    def auc(self) -> np.ndarray:
+        """
+        Calcula a AUC univariada de cada feature a partir dos histogramas por classe.
+
+        Returns:
+            np.ndarray: AUC (F,); acima de 0,5 quando valores maiores indicam a classe 1.
+        """
+        h0, h1 = self.histogram
+        below0 = np.cumsum(h0, axis=1) - h0  # amostras da classe 0 em faixas abaixo
+        with np.errstate(invalid="ignore", divide="ignore"):
+            auc = (h1 * (below0 + 0.5 * h0)).sum(axis=1) / (h0.sum(axis=1) * h1.sum(axis=1))
+        return np.nan_to_num(auc, nan=0.5)
+
+    def ranking(self, by: str = "auc") -> pd.DataFrame:
+        """
+        Monta a ordenação das features.
+
+        Args:
+            by (str): Métrica usada na ordenação: ``auc`` (por |AUC - 0,5|), ``point_biserial``
+                (por |r|) ou ``mutual_information``.
+
+        Returns:
+            pd.DataFrame: Colunas ``rank``, ``feature``, ``point_biserial``, ``mutual_information`` e
+            ``auc``, da feature mais para a menos relevante.
+        """
+        if by not in RANKING_METRICS:
+            raise ValueError(f"Métrica desconhecida: {by}")
+        ranking = pd.DataFrame({
+            "feature": self.feature_names,
+            "point_biserial": self.point_biserial(),
+            "mutual_information": self.mutual_information(),
+            "auc": self.auc(),
+        })
+        score = ranking[by] if by == "mutual_information" else (ranking[by] - (0.5 if by == "auc" else 0)).abs()
+        ranking = ranking.iloc[np.argsort(-score.to_numpy(), kind="stable")].reset_index(drop=True)
+        ranking.insert(0, "rank", np.arange(1, len(ranking) + 1))
+        return ranking
+
+
+def rank_features(data: pd.DataFrame, by: str = "auc", bins: int = 256, mi_bins: int = 16) -> pd.DataFrame:
+    """
+    Ordena todas as features de um DataFrame de distâncias em relação à coluna ``class``.
+
+    Args:
+        data (pd.DataFrame): Dados com a coluna ``class`` e as colunas de features.
+        by (str): Métrica usada na ordenação (ver ``FeatureRanker.ranking``).
+        bins (int): Número de faixas dos histogramas usados na AUC.
+        mi_bins (int): Número de faixas usadas na informação mútua.
+
+    Returns:
+        pd.DataFrame: Ordenação das features.
+    """
+    feature_names = [c for c in data.columns if c not in NON_FEATURE_COLUMNS]
+    ranker = FeatureRanker(feature_names, bins=bins, mi_bins=mi_bins)
+    return ranker.update(data[feature_names], data["class"]).ranking(by=by)
+
+
+def select_features(ranking, top_k: int = None, min_auc_distance: float = 0.0) -> list:
+    """
+    Escolhe as features para o treinamento a partir de uma ordenação.
+
+    Args:
+        ranking (pd.DataFrame | str): Ordenação ou caminho do CSV salvo por este módulo.
+        top_k (int, opcional): Número máximo de features. Se None, usa todas as que passarem no filtro.
+        min_auc_distance (float): Distância mínima de |AUC - 0,5| para manter a feature.
+
+    Returns:
+        list: Nomes das features, da mais para a menos relevante.
+    """
+    if isinstance(ranking, str):
+        ranking = pd.read_csv(ranking)
+    selected = ranking[(ranking["auc"] - 0.5).abs() >= min_auc_distance]
+    return selected["feature"].head(top_k).tolist()
+
+
+def main(argv: list = None) -> None:
+    """
+    Lê os CSVs de distâncias, ordena as features e salva a ordenação.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Ordena as features de distância pela relevância para a classe.")
+    parser.add_argument("input_csv", nargs="+", help="CSVs de distâncias com a coluna 'class'.")
+    parser.add_argument("--output", default="feature_ranking.csv")
+    parser.add_argument("--by", choices=RANKING_METRICS, default="auc")
+    args = parser.parse_args(argv)
+
+    data = pd.concat([pd.read_csv(path) for path in args.input_csv], ignore_index=True)
+    ranking = rank_features(data, by=args.by)
+    print(ranking.to_string(index=False))
+    ranking.to_csv(args.output, index=False)
+    print(f"Ordenação salva em {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Estatísticas de Padronização Incrementais e Persistidas
+=======================================================
+Nos notebooks, a padronização é recalculada do zero com ``StandardScaler.fit_transform`` a cada
+célula e nunca é salva, então a API não tem como aplicar a mesma padronização do treinamento.
+Este módulo mantém, por feature, a contagem, a média e a soma dos quadrados dos desvios (M2):
+- Atualizadas bloco a bloco (Welford em blocos, com a combinação paralela de Chan),
+- Combináveis entre resultados parciais de vários processos (``merge``),
+- Salvas em JSON e carregadas tanto pelo treinamento (``training_data_loader``) quanto pela API.
+
+Como o arquivo guarda M2 e não apenas a variância, novas amostras são acrescentadas às estatísticas
+salvas sem passar de novo pelo conjunto de dados inteiro.
+
+Uso:
+    python feature_statistics.py shards/*.csv --output feature_statistics.json --workers 4
+    python feature_statistics.py novas_amostras.csv --output feature_statistics.json --update
+
+@author: George Flores
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+class FeatureStatistics:
+    """
+    Contagem, média e M2 de cada feature, atualizados incrementalmente.
+
+    Valores NaN são ignorados por feature, então cada feature tem a sua própria contagem.
+
+    Args:
+        feature_names (list, opcional): Nomes das features, na ordem das colunas.
+        num_features (int, opcional): Número de features (se ``feature_names`` não for informado).
+    """
+
+    def __init__(self, feature_names: list = None, num_features: int = None):
+        if feature_names is None and num_features is None:
+            raise ValueError("Informe feature_names ou num_features.")
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        size = len(self.feature_names) if feature_names is not None else num_features
+        self.count = np.zeros(size)
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    @property
+    def num_features(self) -> int:
+        """Número de features."""
+        return len(self.count)
+
+    def _combine(self, count_b: np.ndarray, mean_b: np.ndarray, m2_b: np.ndarray) -> None:
+        """Combina momentos (contagem, média, M2) com os acumulados, pelo método de Chan."""
+        count_a = self.count
+        count = count_a + count_b
+        delta = mean_b - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = self.mean + np.where(count > 0, delta * count_b / count, 0.0)
+            self.m2 = self.m2 + m2_b + np.where(count > 0, delta ** 2 * count_a * count_b / count, 0.0)
+        self.count = count
+
+    def update(self, X) -> "FeatureStatistics":
+        """
+        Acrescenta um bloco de amostras.
+
+        Args:
+            X (np.ndarray | pd.DataFrame): Features (N, F) ou uma amostra (F,).
+
+        Returns:
+            FeatureStatistics: A própria instância, para encadear chamadas.
+
+        Raises:
+            ValueError: Se o número de features for diferente do esperado.
+        """
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        if X.shape[1] != self.num_features:
+            raise ValueError(f"Esperadas {self.num_features} features, recebidas {X.shape[1]}.")
+        count_b = (~np.isnan(X)).sum(axis=0)
+        if not count_b.any():
+            return self
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(count_b > 0, np.nansum(X, axis=0) / count_b, 0.0)
+        m2_b = np.nansum((X - mean_b) ** 2, axis=0)
+        self._combine(count_b, mean_b, m2_b)
+        return self
+
+    def merge(self, other: "FeatureStatistics") -> "FeatureStatistics":
+        """
+        Combina as estatísticas de outro processo ou shard com as desta instância.
+
+        Args:
+            other (FeatureStatistics): Estatísticas das mesmas features.
+
+        Returns:
+            FeatureStatistics: A própria instância.
+
+        Raises:
+            ValueError: Se as features forem diferentes.
+        """
+        if other.num_features != self.num_features or (
+            self.feature_names and other.feature_names and self.feature_names != other.feature_names
+        ):
+            raise ValueError("As estatísticas combinadas devem ter as mesmas features.")
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Variância populacional de cada feature (a mesma do ``StandardScaler``)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self.m2 / self.count, 0.0)
+
+    @property
+    def scale(self) -> np.ndarray:
+        """Desvio padrão de cada feature, com 1 no lugar de desvios nulos (como no ``StandardScaler``)."""
+        scale = np.sqrt(self.variance)
+        return np.where(scale > np.finfo(np.float64).eps * np.maximum(np.abs(self.mean), 1.0), scale, 1.0)
+
+    def transform(self, X) -> np.ndarray:
+        """
+        Padroniza features com as estatísticas acumuladas.
+
+        Args:
+            X (np.ndarray): Features (N, F).
+
+        Returns:
+            np.ndarray: Features padronizadas, em float32.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        return (X - self.mean.astype(np.float32)) / self.scale.astype(np.float32)
+
+    def to_dict(self) -> dict:
+        """Converte as estatísticas em um dicionário serializável em JSON."""
+        return {
+            "feature_names": self.feature_names,
+            "count": self.count.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FeatureStatistics":
+        """Reconstrói as estatísticas a partir de ``to_dict``."""
+        statistics = cls(data.get("feature_names"), num_features=len(data["count"]))
+        statistics.count = np.asarray(data["count"], dtype=np.float64)
+        statistics.mean = np.asarray(data["mean"], dtype=np.float64)
+        statistics.m2 = np.asarray(data["m2"], dtype=np.float64)
+        return statistics
+
+    def save(self, path: str) -> None:
+        """
+        Salva as estatísticas em JSON, substituindo o arquivo de forma atômica.
+
+        Args:
+            path (str): Caminho do arquivo.
+
+        Returns:
+            None
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        os.replace(temporary, path)
+
+
+def load_statistics(path: str, num_features: int = None) -> FeatureStatistics:
+    """
+    Carrega estatísticas salvas com ``FeatureStatistics.save``.
+
+    Args:
+        path (str): Caminho do arquivo JSON.
+        num_features (int, opcional): Número de features esperado (por exemplo, a entrada do modelo).
+
+    Returns:
+        FeatureStatistics: Estatísticas carregadas.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não for encontrado.
+        ValueError: Se o número de features for diferente de ``num_features``.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Estatísticas não encontradas: {path}")
+    with open(path, encoding="utf-8") as file:
+        statistics = FeatureStatistics.from_dict(json.load(file))
+    if num_features is not None and statistics.num_features != num_features:
+        raise ValueError(f"Estatísticas com {statistics.num_features} features; esperadas {num_features}.")
+    return statistics
+
+
+def shard_statistics(path: str, chunk_rows: int = 4096, feature_columns: list = None) -> FeatureStatistics:
+    """
+    Calcula as estatísticas de um shard CSV, lido em blocos (ver ``iter_shard_chunks``).
+
+    Args:
+        path (str): Caminho do CSV de marcos ou de distâncias.
+        chunk_rows (int): Linhas lidas por bloco.
+        feature_columns (list, opcional): Colunas de features dos CSVs de distâncias.
+
+    Returns:
+        FeatureStatistics: Estatísticas do shard.
+    """
+    # Importação tardia: training_data_loader usa FeatureStatistics
+    from training_data_loader import iter_shard_chunks, shard_feature_names
+
+    statistics = FeatureStatistics(shard_feature_names(path, feature_columns))
+    for X, _, _ in iter_shard_chunks(path, chunk_rows, feature_columns):
+        statistics.update(X)
+    return statistics
+
+
+def compute_statistics(
+    shards: list,
+    workers: int = 1,
+    chunk_rows: int = 4096,
+    feature_columns: list = None,
+    statistics: FeatureStatistics = None,
+    debug: bool = False,
+) -> FeatureStatistics:
+    """
+    Calcula as estatísticas de vários shards, um processo por shard, e combina os resultados.
+
+    Args:
+        shards (list): Arquivos, pastas ou padrões glob (ver ``list_shards``).
+        workers (int): Número de processos (1 calcula no processo atual).
+        chunk_rows (int): Linhas lidas por bloco.
+        feature_columns (list, opcional): Colunas de features dos CSVs de distâncias.
+        statistics (FeatureStatistics, opcional): Estatísticas existentes, atualizadas com os shards.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        FeatureStatistics: Estatísticas combinadas.
+    """
+    from training_data_loader import list_shards
+
+    paths = list_shards(shards)
+    if workers > 1:
+        # spawn: os processos filhos não herdam o estado (TensorFlow, MediaPipe) do processo pai
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            partials = list(executor.map(shard_statistics, paths, [chunk_rows] * len(paths),
+                                         [feature_columns] * len(paths)))
+    else:
+        partials = [shard_statistics(path, chunk_rows, feature_columns) for path in paths]
+
+    for path, partial in zip(paths, partials):
+        if statistics is None:
+            statistics = FeatureStatistics(partial.feature_names)
+        statistics.merge(partial)
+        if debug:
+            print(f"{path}: {int(partial.count.max())} amostras.")
+    return statistics
+
+
+def main(argv: list = None) -> None:
+    """
+    Calcula (ou atualiza) as estatísticas de padronização a partir de shards e as salva.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Calcula as estatísticas de padronização das features.")
+    parser.add_argument("shards", nargs="+", help="CSVs de marcos ou de distâncias, pastas ou padrões glob.")
+    parser.add_argument("--output", default="feature_statistics.json")
+    parser.add_argument("--update", action="store_true", help="Acrescenta os shards às estatísticas de --output.")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-rows", type=int, default=4096)
+    args = parser.parse_args(argv)
+
+    existing = load_statistics(args.output) if args.update else None
+    statistics = compute_statistics(args.shards, args.workers, args.chunk_rows, statistics=existing, debug=True)
+    statistics.save(args.output)
+    print(f"Estatísticas de {int(statistics.count.max())} amostras salvas em {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -36,7 +36,8 @@ const PhotoUpload: React.FC = () => {
         if (data.success) {
           console.log('Face Mesh Data:', data.faceMesh); // Mostra os dados da face mesh
           // Redireciona para a página de processamento
-          navigate('/processing', { state: { faceMeshData: data.faceMesh } });
+          // A largura da imagem acompanha a malha: a API a usa como escala do Z normalizado
+          navigate('/processing', { state: { faceMeshData: data.faceMesh, imageWidth: data.imageWidth } });
         } else {
           setErrorMessage('Não foi possível detectar um rosto na imagem. Tente novamente.');
         }
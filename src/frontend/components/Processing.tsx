@@ -10,6 +10,7 @@ const Processing: React.FC = () => {
   useEffect(() => {
     // Obtém os dados de faceMesh do estado da navegação
     const faceMeshData = location.state?.faceMeshData;
+    const imageWidth = location.state?.imageWidth;
 
     // Verificação se faceMeshData existe
     if (!faceMeshData) {
@@ -28,7 +29,7 @@ const Processing: React.FC = () => {
           headers: {
             'Content-Type': 'application/json',
           },
-          body: JSON.stringify({ faceMesh: faceMeshData }), // Envia os dados de faceMesh para a API
+          body: JSON.stringify({ faceMesh: faceMeshData, imageWidth }), // Envia os dados de faceMesh para a API
         });
 
         // Verifica se a resposta foi bem-sucedida
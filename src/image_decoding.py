@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Decodificação de Imagens com Cópia Mínima
+=========================================
+Este módulo fornece um decodificador único para uploads da API e arquivos locais que:
+- Lê o arquivo enviado para um único buffer de bytes,
+- Decodifica com ``cv2.imdecode`` sobre uma visão (sem cópia) desse buffer,
+- Aplica a orientação EXIF (comportamento padrão do ``cv2.IMREAD_COLOR``),
+- Converte BGR para RGB no próprio array decodificado, no formato contíguo exigido pelo FaceMesh.
+
+O caminho antigo da API (``Image.open`` + ``convert('RGB')`` + ``np.array``) mantinha até três
+cópias da imagem inteira em memória e ignorava a orientação EXIF.
+
+@author: George Flores
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+
+def decode_image_bytes(buffer, debug: bool = False, allocate=None) -> np.ndarray:
+    """
+    Decodifica uma imagem codificada (JPEG, PNG, ...) diretamente para um array RGB.
+
+    Args:
+        buffer (bytes | bytearray | memoryview | np.ndarray): Conteúdo do arquivo da imagem.
+        debug (bool): Se True, exibe informações de debug.
+        allocate (callable, opcional): Função que recebe o formato (altura, largura, 3) e retorna o
+            array uint8 de destino (por exemplo, uma visão de memória compartilhada). A conversão
+            para RGB é escrita diretamente nele. Se None, o próprio buffer decodificado é usado.
+
+    Returns:
+        np.ndarray: Imagem RGB contígua com formato (altura, largura, 3) e tipo uint8.
+
+    Raises:
+        ValueError: Se o conteúdo não puder ser decodificado como imagem.
+    """
+    # np.frombuffer apenas cria uma visão sobre os bytes, sem copiá-los
+    encoded = np.frombuffer(buffer, dtype=np.uint8)
+    image = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Não foi possível decodificar a imagem.")
+
+    # Conversão no próprio buffer decodificado (ou no destino fornecido), sem alocar outra imagem
+    destination = image if allocate is None else allocate(image.shape)
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=destination)
+
+    if debug:
+        print(f"Imagem decodificada com formato {image.shape} a partir de {encoded.nbytes} bytes.")
+
+    return image
+
+
+def decode_image_upload(image_file, debug: bool = False) -> np.ndarray:
+    """
+    Lê um arquivo enviado ao Flask (``request.files``) e o decodifica para RGB.
+
+    Args:
+        image_file (werkzeug.datastructures.FileStorage): Arquivo enviado na requisição.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        np.ndarray: Imagem RGB contígua.
+
+    Raises:
+        ValueError: Se o conteúdo não puder ser decodificado como imagem.
+    """
+    return decode_image_bytes(image_file.stream.read(), debug=debug)
+
+
+def decode_image_file(image_path: str, debug: bool = False) -> np.ndarray:
+    """
+    Lê e decodifica um arquivo de imagem local para RGB pelo mesmo caminho dos uploads.
+
+    Args:
+        image_path (str): Caminho do arquivo da imagem.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        np.ndarray: Imagem RGB contígua.
+
+    Raises:
+        FileNotFoundError: Se o arquivo da imagem não for encontrado.
+        ValueError: Se o conteúdo não puder ser decodificado como imagem.
+    """
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"Imagem não encontrada: {image_path}")
+
+    # np.fromfile lê o arquivo diretamente para um único buffer uint8
+    return decode_image_bytes(np.fromfile(image_path, dtype=np.uint8), debug=debug)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de Deduplicação de Imagens por Hash Perceptual
+=====================================================
+As pastas ``data/raw/*`` e ``data/raw_processed/*_2.0`` / ``*_3.0`` têm fotos repetidas e quase
+repetidas, e todas são extraídas de novo. Este módulo:
+- Calcula o hash perceptual (pHash: DCT de uma versão 32 x 32 em tons de cinza, 64 bits) de todas
+  as imagens em paralelo (o OpenCV libera o GIL na decodificação e no redimensionamento),
+- Indexa os hashes em uma tabela de múltiplos índices: o hash é dividido em ``max_distance + 1``
+  partes e, pelo princípio da casa dos pombos, dois hashes a uma distância de Hamming de até
+  ``max_distance`` coincidem exatamente em pelo menos uma parte. A busca só compara os candidatos
+  dos baldes coincidentes, em vez de todas as imagens,
+- Permite pular duplicatas em ``process_images_in_folder`` e marca duplicatas entre classes
+  (a mesma foto rotulada com e sem autismo).
+
+Uso:
+    python image_dedup.py 0:../data/raw/no_autistic 1:../data/raw/with_autistic --output duplicates.csv
+
+@author: George Flores
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pandas as pd
+
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg")
+HASH_BITS = 64
+
+# Contagem de bits: ``int.bit_count`` só existe a partir do Python 3.10
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:
+    def popcount(value: int) -> int:
+        """Retorna o número de bits 1 de um inteiro não negativo."""
+        return bin(value).count("1")
+
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """
+    Calcula o pHash de 64 bits de uma imagem.
+
+    Os coeficientes 8 x 8 de mais baixa frequência da DCT da imagem reduzida a 32 x 32 são
+    comparados com a sua mediana; cada bit indica se o coeficiente está acima dela.
+
+    Args:
+        image (np.ndarray): Imagem em tons de cinza (H, W) ou colorida (H, W, 3) em RGB.
+
+    Returns:
+        int: Hash de 64 bits.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8]
+    bits = (low > np.median(low)).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hash_image_file(image_path: str) -> int:
+    """
+    Lê uma imagem em tons de cinza e calcula o seu pHash.
+
+    Args:
+        image_path (str): Caminho da imagem.
+
+    Returns:
+        int: Hash de 64 bits, ou None se a imagem não puder ser lida.
+    """
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    return None if image is None else perceptual_hash(image)
+
+
+def list_images(folder_path: str) -> list:
+    """Lista as imagens de uma pasta, em ordem, com os mesmos filtros de ``process_images_in_folder``."""
+    return [
+        os.path.join(folder_path, f) for f in sorted(os.listdir(folder_path)) if f.endswith(IMAGE_EXTENSIONS)
+    ]
+
+
+def hash_images(image_paths: list, workers: int = None, debug: bool = False) -> list:
+    """
+    Calcula o pHash de várias imagens em paralelo.
+
+    Args:
+        image_paths (list): Caminhos das imagens.
+        workers (int, opcional): Número de threads. Padrão: número de CPUs.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        list: Hashes na mesma ordem (None para imagens ilegíveis).
+    """
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        hashes = list(executor.map(hash_image_file, image_paths))
+    if debug:
+        print(f"{len(hashes)} imagens com hash ({sum(h is None for h in hashes)} ilegíveis).")
+    return hashes
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Retorna a distância de Hamming entre dois hashes."""
+    return popcount(hash_a ^ hash_b)
+
+
+class HashIndex:
+    """
+    Tabela de múltiplos índices para busca de hashes próximos (distância de Hamming).
+
+    Args:
+        max_distance (int): Maior distância de Hamming buscada (define o número de partes do hash).
+        bits (int): Número de bits dos hashes.
+    """
+
+    def __init__(self, max_distance: int = 6, bits: int = HASH_BITS):
+        self.max_distance = max_distance
+        self.bits = bits
+        bounds = np.linspace(0, bits, max_distance + 2).astype(int)
+        # (deslocamento, máscara) de cada parte do hash
+        self.chunks = [(int(low), (1 << int(high - low)) - 1) for low, high in zip(bounds[:-1], bounds[1:])]
+        self.tables = [{} for _ in self.chunks]
+        self.hashes = []
+        self.keys = []
+        self.cross_class = []
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def add(self, image_hash: int, key) -> None:
+        """
+        Acrescenta um hash ao índice.
+
+        Args:
+            image_hash (int): Hash da imagem.
+            key: Identificador devolvido nas buscas (por exemplo, (caminho, classe)).
+        """
+        item = len(self.hashes)
+        self.hashes.append(image_hash)
+        self.keys.append(key)
+        for table, (shift, mask) in zip(self.tables, self.chunks):
+            table.setdefault((image_hash >> shift) & mask, []).append(item)
+
+    def query(self, image_hash: int, max_distance: int = None) -> list:
+        """
+        Busca os hashes indexados a até ``max_distance`` do hash informado.
+
+        Args:
+            image_hash (int): Hash buscado.
+            max_distance (int, opcional): Distância máxima (até a do índice). Padrão: a do índice.
+
+        Returns:
+            list: Pares (chave, distância), do mais próximo para o mais distante.
+
+        Raises:
+            ValueError: Se ``max_distance`` for maior que a distância do índice.
+        """
+        max_distance = self.max_distance if max_distance is None else max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(f"O índice só garante buscas até a distância {self.max_distance}.")
+        candidates = set()
+        for table, (shift, mask) in zip(self.tables, self.chunks):
+            candidates.update(table.get((image_hash >> shift) & mask, ()))
+        matches = []
+        for item in candidates:
+            distance = popcount(self.hashes[item] ^ image_hash)
+            if distance <= max_distance:
+                matches.append((self.keys[item], distance))
+        return sorted(matches, key=lambda match: match[1])
+
+    def check_duplicate(self, image_hash: int, key, class_label: int = None, debug: bool = False) -> bool:
+        """
+        Verifica se uma imagem repete outra já indexada; se não repetir, indexa a imagem.
+
+        Duplicatas de outra classe são guardadas em ``cross_class`` (a mesma foto com rótulos diferentes).
+
+        Args:
+            image_hash (int): Hash da imagem.
+            key: Identificador da imagem (por exemplo, o caminho).
+            class_label (int, opcional): Classe da imagem.
+            debug (bool): Se True, exibe informações de debug.
+
+        Returns:
+            bool: True se a imagem for duplicata (e deve ser pulada).
+        """
+        matches = self.query(image_hash)
+        if not matches:
+            self.add(image_hash, (key, class_label))
+            return False
+        (original, original_class), distance = matches[0]
+        if class_label is not None and original_class is not None and original_class != class_label:
+            self.cross_class.append((key, class_label, original, original_class, distance))
+            print(f"Duplicata entre classes: {key} (classe {class_label}) ~ {original} (classe {original_class}).")
+        elif debug:
+            print(f"{key} repete {original} (distância {distance}). Pulando.")
+        return True
+
+
+def find_duplicates(
+    folders: dict, max_distance: int = 6, workers: int = None, debug: bool = False
+) -> pd.DataFrame:
+    """
+    Indexa as imagens das pastas em ordem e lista as que repetem uma imagem anterior.
+
+    Args:
+        folders (dict): Pasta -> classe (ou None).
+        max_distance (int): Distância de Hamming máxima para considerar duplicata.
+        workers (int, opcional): Número de threads do cálculo dos hashes.
+        debug (bool): Se True, exibe os tempos de cada etapa.
+
+    Returns:
+        pd.DataFrame: Colunas ``image``, ``class``, ``duplicate_of``, ``duplicate_class``,
+        ``distance`` e ``cross_class``.
+    """
+    items = [(path, label) for folder, label in folders.items() for path in list_images(folder)]
+    start = time.perf_counter()
+    hashes = hash_images([path for path, _ in items], workers=workers)
+    hashed = time.perf_counter()
+
+    index = HashIndex(max_distance)
+    rows = []
+    for (path, label), image_hash in zip(items, hashes):
+        if image_hash is None:
+            continue
+        matches = index.query(image_hash)
+        if matches:
+            (original, original_label), distance = matches[0]
+            rows.append({
+                "image": path, "class": label, "duplicate_of": original, "duplicate_class": original_label,
+                "distance": distance, "cross_class": label != original_label,
+            })
+        else:
+            index.add(image_hash, (path, label))
+    indexed = time.perf_counter()
+
+    if debug:
+        print(f"{len(items)} imagens: hashes em {hashed - start:.2f} s, índice e buscas em "
+              f"{indexed - hashed:.3f} s; {len(index)} únicas, {len(rows)} duplicatas.")
+    columns = ["image", "class", "duplicate_of", "duplicate_class", "distance", "cross_class"]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def main(argv: list = None) -> None:
+    """
+    Procura duplicatas nas pastas informadas e salva o relatório.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Encontra imagens repetidas e quase repetidas por pHash.")
+    parser.add_argument("folders", nargs="+", help="Pastas no formato classe:pasta (ou apenas pasta).")
+    parser.add_argument("--max-distance", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="duplicates.csv")
+    args = parser.parse_args(argv)
+
+    folders = {}
+    for spec in args.folders:
+        # A classe vem antes do primeiro ':'; sem uma classe inteira, o argumento todo é a pasta
+        # (inclusive caminhos do Windows com letra de unidade, como C:\fotos)
+        label, separator, folder = spec.partition(":")
+        if separator and label.isdigit():
+            folders[folder] = int(label)
+        else:
+            folders[spec] = None
+
+    duplicates = find_duplicates(folders, args.max_distance, args.workers, debug=True)
+    print(f"{int(duplicates['cross_class'].sum())} duplicatas entre classes.")
+    duplicates.to_csv(args.output, index=False)
+    print(f"Relatório salvo em {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
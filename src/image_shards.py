@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Shards Empacotados de Imagens para os Conjuntos de Treinamento
+==============================================================
+A extração do conjunto de treinamento lê milhares de JPEGs pequenos de ``data/raw*`` com
+``os.listdir`` e uma abertura de arquivo por imagem, o que é lento em sistemas de arquivos de rede
+e com o cache frio. Este módulo:
+- Empacota pastas de imagens em poucos arquivos grandes (``shard-NNNNN.bin``), com os bytes
+  codificados originais (sem recompressão) concatenados,
+- Grava um índice (``index.json``) com nome, rótulo, shard, deslocamento, tamanho e CRC32 de cada
+  imagem; o índice é escrito por último, então um empacotamento interrompido não é lido como válido,
+- Lê registros por índice com ``mmap`` (acesso aleatório) ou em fluxo sequencial, shard a shard,
+- Serve de fonte alternativa para ``process_images_in_folder`` (``Face_Mesh_Extractor`` e
+  ``feature_extraction``): basta informar a pasta dos shards no lugar da pasta de imagens.
+
+Uso (a partir da pasta ``src``):
+    python image_shards.py pack ../data/packed_3.0 \\
+        --folder ../data/raw_processed/processed_no_autistic_3.0:0 \\
+        --folder ../data/raw_processed/processed_with_autistic_3.0:1
+    python image_shards.py info ../data/packed_3.0
+
+@author: George Flores
+"""
+
+import argparse
+import json
+import mmap
+import os
+import zlib
+
+import numpy as np
+
+from image_decoding import decode_image_bytes
+
+INDEX_FILE = "index.json"
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg")
+
+
+def is_shard_dir(path: str) -> bool:
+    """Indica se ``path`` é uma pasta de shards empacotados (contém o índice)."""
+    return os.path.isfile(os.path.join(path, INDEX_FILE))
+
+
+def pack_images(folders: dict, output_dir: str, shard_bytes: int = 256 << 20, debug: bool = False) -> dict:
+    """
+    Empacota pastas de imagens em shards com um índice de deslocamentos e rótulos.
+
+    Args:
+        folders (dict): Pasta de imagens -> rótulo da classe (0 ou 1).
+        output_dir (str): Pasta de saída dos shards e do índice (não pode conter um índice).
+        shard_bytes (int): Tamanho aproximado de cada shard; uma imagem nunca é dividida entre shards.
+        debug (bool): Se True, exibe informações de debug.
+
+    Returns:
+        dict: O índice gravado.
+
+    Raises:
+        FileExistsError: Se ``output_dir`` já contiver shards empacotados.
+    """
+    if is_shard_dir(output_dir):
+        raise FileExistsError(f"{output_dir} já contém shards empacotados.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    records = {"name": [], "label": [], "shard": [], "offset": [], "length": [], "crc32": []}
+    shards = []
+    shard = None
+    for folder, label in folders.items():
+        prefix = os.path.basename(os.path.normpath(folder))
+        for image_file in sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS)):
+            with open(os.path.join(folder, image_file), "rb") as file:
+                data = file.read()
+            if shard is None or (shard.tell() > 0 and shard.tell() + len(data) > shard_bytes):
+                if shard is not None:
+                    shard.close()
+                shards.append(f"shard-{len(shards):05d}.bin")
+                shard = open(os.path.join(output_dir, shards[-1]), "wb")
+            records["name"].append(f"{prefix}/{image_file}")
+            records["label"].append(int(label))
+            records["shard"].append(len(shards) - 1)
+            records["offset"].append(shard.tell())
+            records["length"].append(len(data))
+            records["crc32"].append(zlib.crc32(data))
+            shard.write(data)
+    if shard is not None:
+        shard.close()
+
+    index = {"format": "image-shards", "version": 1, "shards": shards, "records": records}
+    temporary = os.path.join(output_dir, f"{INDEX_FILE}.tmp")
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    os.replace(temporary, os.path.join(output_dir, INDEX_FILE))
+
+    if debug:
+        total = sum(records["length"])
+        print(f"{len(records['name'])} imagens ({total / 2**20:.1f} MB) empacotadas em {len(shards)} shards.")
+    return index
+
+
+class ShardReader:
+    """
+    Leitor de shards empacotados por ``pack_images``.
+
+    Os shards são mapeados em memória sob demanda; ``read`` retorna os bytes de um registro e
+    ``iter_records`` lê uma sequência de registros em fluxo, shard a shard, em ordem de deslocamento.
+
+    Args:
+        shard_dir (str): Pasta dos shards e do índice.
+    """
+
+    def __init__(self, shard_dir: str):
+        self.shard_dir = shard_dir
+        with open(os.path.join(shard_dir, INDEX_FILE), encoding="utf-8") as file:
+            index = json.load(file)
+        self.shards = index["shards"]
+        records = index["records"]
+        self.names = records["name"]
+        self.labels = np.asarray(records["label"], dtype=np.int8)
+        self.shard = np.asarray(records["shard"], dtype=np.int32)
+        self.offset = np.asarray(records["offset"], dtype=np.int64)
+        self.length = np.asarray(records["length"], dtype=np.int64)
+        self.crc32 = np.asarray(records["crc32"], dtype=np.uint32)
+        self._maps = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __enter__(self) -> "ShardReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Desfaz os mapeamentos de memória dos shards."""
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps = {}
+
+    def records(self, label: int = None) -> np.ndarray:
+        """
+        Índices dos registros, em ordem de leitura (shard e deslocamento).
+
+        Args:
+            label (int, opcional): Se informado, apenas os registros deste rótulo.
+
+        Returns:
+            np.ndarray: Índices dos registros.
+        """
+        order = np.lexsort((self.offset, self.shard))
+        return order if label is None else order[self.labels[order] == label]
+
+    def _map(self, shard: int) -> mmap.mmap:
+        if shard not in self._maps:
+            with open(os.path.join(self.shard_dir, self.shards[shard]), "rb") as file:
+                self._maps[shard] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._maps[shard]
+
+    def _check(self, record: int, data: bytes) -> bytes:
+        if zlib.crc32(data) != self.crc32[record]:
+            raise ValueError(f"CRC32 inválido no registro {record} ({self.names[record]}).")
+        return data
+
+    def read(self, record: int, verify: bool = False) -> bytes:
+        """
+        Lê os bytes codificados de um registro (acesso aleatório via ``mmap``).
+
+        Args:
+            record (int): Índice do registro.
+            verify (bool): Se True, confere o CRC32 do registro.
+
+        Returns:
+            bytes: Conteúdo original do arquivo da imagem.
+
+        Raises:
+            ValueError: Se ``verify`` for True e o CRC32 não conferir.
+        """
+        offset = int(self.offset[record])
+        data = self._map(int(self.shard[record]))[offset:offset + int(self.length[record])]
+        return self._check(record, data) if verify else data
+
+    def decode(self, record: int, debug: bool = False) -> np.ndarray:
+        """Lê e decodifica um registro para RGB (ver ``image_decoding.decode_image_bytes``)."""
+        return decode_image_bytes(self.read(record), debug=debug)
+
+    def iter_records(self, records=None, verify: bool = False, buffer_size: int = 8 << 20):
+        """
+        Lê registros em fluxo, com leituras sequenciais e bufferizadas de cada shard.
+
+        Indicado para uma passada completa em sistemas de arquivos de rede, onde leituras grandes
+        e sequenciais rendem mais que as falhas de página do ``mmap``.
+
+        Args:
+            records (array, opcional): Índices dos registros; padrão ``self.records()``. São lidos
+                em ordem de shard e deslocamento.
+            verify (bool): Se True, confere o CRC32 de cada registro.
+            buffer_size (int): Tamanho do buffer de leitura.
+
+        Yields:
+            tuple: (índice do registro, bytes codificados).
+        """
+        records = self.records() if records is None else np.asarray(records)
+        records = records[np.lexsort((self.offset[records], self.shard[records]))]
+        file, current = None, None
+        try:
+            for record in records:
+                shard = int(self.shard[record])
+                if shard != current:
+                    if file is not None:
+                        file.close()
+                    file = open(os.path.join(self.shard_dir, self.shards[shard]), "rb", buffering=buffer_size)
+                    current = shard
+                file.seek(int(self.offset[record]))
+                data = file.read(int(self.length[record]))
+                yield int(record), (self._check(record, data) if verify else data)
+        finally:
+            if file is not None:
+                file.close()
+
+
+def main(argv: list = None) -> None:
+    """
+    Empacota pastas de imagens ou descreve uma pasta de shards pela linha de comando.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Shards empacotados de imagens.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="Empacota pastas de imagens.")
+    pack.add_argument("output_dir")
+    pack.add_argument("--folder", action="append", required=True, help="pasta:rótulo (repetível).")
+    pack.add_argument("--shard-mb", type=int, default=256)
+    info = commands.add_parser("info", help="Resume uma pasta de shards.")
+    info.add_argument("shard_dir")
+    info.add_argument("--verify", action="store_true", help="Confere o CRC32 de todos os registros.")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        folders = {}
+        for value in args.folder:
+            folder, label = value.rsplit(":", 1)
+            folders[folder] = int(label)
+        pack_images(folders, args.output_dir, shard_bytes=args.shard_mb << 20, debug=True)
+        return
+
+    with ShardReader(args.shard_dir) as reader:
+        labels, counts = np.unique(reader.labels, return_counts=True)
+        print(f"{len(reader)} imagens em {len(reader.shards)} shards ({reader.length.sum() / 2**20:.1f} MB)")
+        for label, count in zip(labels, counts):
+            print(f"  classe {label}: {count} imagens")
+        if args.verify:
+            for _ in reader.iter_records(verify=True):
+                pass
+            print("CRC32 conferido em todos os registros.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Aumento de Dados Vetorizado no Espaço dos Marcos Faciais
+========================================================
+O conjunto tem cerca de 1,4 mil imagens por classe e o notebook treina sobre features fixas. Este
+módulo gera, a cada época, malhas aumentadas diretamente a partir dos marcos (N x 468 x 3), sem
+rodar o FaceMesh de novo sobre as imagens:
+- Espelhamento horizontal, com a troca dos índices esquerdo/direito da malha (a permutação é
+  obtida do gabarito canônico de ``face_mesh_alignment``, pelo plano de simetria da face),
+- Pequenas rotações (no plano da imagem e em profundidade), escala e ruído gaussiano,
+- Todas as transformações de um lote em poucas operações de array: o espelhamento é uma indexação
+  das malhas sorteadas, e rotação, escala, centralização e conversão de Z viram uma matriz 3 x 3 e
+  um deslocamento por malha, aplicados com um ``matmul`` em lote.
+
+As malhas aumentadas alimentam ``calculate_anthropometric_features`` (ver ``LandmarkAugmenter.features``)
+e o ``ShardedDataset`` do treinamento (parâmetro ``augmenter``).
+
+As coordenadas seguem a extração: X e Y em pixels e Z normalizado pelo MediaPipe; ``z_scale``
+converte Z para pixels antes das rotações em profundidade.
+
+@author: George Flores
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from face_mesh_alignment import load_template
+from face_mesh_features import NUM_LANDMARKS, calculate_anthropometric_features
+
+
+def mirror_permutation(template: np.ndarray, max_iterations: int = 20) -> np.ndarray:
+    """
+    Calcula a permutação que troca os marcos esquerdos e direitos de uma malha.
+
+    O plano de simetria é estimado iterativamente: os pontos são refletidos no plano atual,
+    pareados com o ponto mais próximo do reflexo (atribuição ótima, que garante uma permutação) e
+    a normal do plano é reestimada como a direção principal das diferenças entre os pares.
+
+    Args:
+        template (np.ndarray): Malha de referência (468, 3), aproximadamente frontal.
+        max_iterations (int): Número máximo de iterações.
+
+    Returns:
+        np.ndarray: Índices (468,) tais que ``mesh[permutation]`` troca esquerda e direita; os
+        pontos da linha média são mapeados para si mesmos.
+
+    Raises:
+        ValueError: Se o pareamento encontrado não for uma involução (malha não simétrica).
+    """
+    points = np.asarray(template, dtype=np.float64)
+    points = points - points.mean(axis=0)
+    normal = np.array([1.0, 0.0, 0.0])
+    permutation = None
+    for _ in range(max_iterations):
+        reflected = points - 2 * np.outer(points @ normal, normal)
+        cost = np.linalg.norm(points[:, None] - reflected[None], axis=2)
+        _, matched = linear_sum_assignment(cost)
+        differences = points - points[matched]
+        _, vectors = np.linalg.eigh(differences.T @ differences)
+        new_normal = vectors[:, -1] * np.sign(vectors[0, -1])
+        converged = permutation is not None and np.array_equal(matched, permutation)
+        permutation, normal = matched, new_normal
+        if converged:
+            break
+    if not np.array_equal(permutation[permutation], np.arange(len(points))):
+        raise ValueError("O pareamento esquerda/direita não é uma involução; o gabarito não é simétrico.")
+    return permutation
+
+
+@lru_cache(maxsize=None)
+def default_mirror_permutation() -> np.ndarray:
+    """Permutação esquerda/direita do gabarito canônico padrão (calculada uma vez por processo)."""
+    permutation = mirror_permutation(load_template())
+    permutation.setflags(write=False)
+    return permutation
+
+
+def rotation_matrices(roll: np.ndarray, yaw: np.ndarray, pitch: np.ndarray) -> np.ndarray:
+    """
+    Monta as matrizes de rotação de um lote de ângulos, em radianos.
+
+    Args:
+        roll (np.ndarray): Rotação no plano da imagem (em torno de Z), formato (N,).
+        yaw (np.ndarray): Rotação em torno do eixo vertical (Y), formato (N,).
+        pitch (np.ndarray): Rotação em torno do eixo horizontal (X), formato (N,).
+
+    Returns:
+        np.ndarray: Matrizes (N, 3, 3) iguais a ``Rz(roll) @ Ry(yaw) @ Rx(pitch)``.
+    """
+    cr, sr = np.cos(roll), np.sin(roll)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    return np.stack([
+        np.stack([cr * cy, cr * sy * sp - sr * cp, cr * sy * cp + sr * sp], axis=-1),
+        np.stack([sr * cy, sr * sy * sp + cr * cp, sr * sy * cp - cr * sp], axis=-1),
+        np.stack([-sy, cy * sp, cy * cp], axis=-1),
+    ], axis=-2)
+
+
+class LandmarkAugmenter:
+    """
+    Gera lotes de malhas faciais aumentadas com operações vetorizadas.
+
+    Args:
+        mirror_probability (float): Probabilidade de espelhar cada malha.
+        max_roll (float): Rotação máxima no plano da imagem, em graus (uniforme em ±max_roll).
+        max_yaw (float): Rotação máxima em torno do eixo vertical, em graus.
+        max_pitch (float): Rotação máxima em torno do eixo horizontal, em graus.
+        scale_range (tuple): Intervalo (mínimo, máximo) do fator de escala uniforme.
+        jitter (float): Desvio padrão do ruído gaussiano por coordenada, em pixels.
+        z_scale (float): Escala que converte o Z normalizado do MediaPipe em pixels (a largura da
+            imagem; 224 no conjunto 3.0).
+        permutation (np.ndarray, opcional): Permutação esquerda/direita. Padrão: a do gabarito canônico.
+        seed (int, opcional): Semente do gerador usado quando ``augment`` não recebe um.
+    """
+
+    def __init__(
+        self,
+        mirror_probability: float = 0.5,
+        max_roll: float = 10.0,
+        max_yaw: float = 5.0,
+        max_pitch: float = 5.0,
+        scale_range: tuple = (0.9, 1.1),
+        jitter: float = 0.5,
+        z_scale: float = 224.0,
+        permutation: np.ndarray = None,
+        seed: int = None,
+    ):
+        self.mirror_probability = mirror_probability
+        self.max_roll = max_roll
+        self.max_yaw = max_yaw
+        self.max_pitch = max_pitch
+        self.scale_range = tuple(scale_range)
+        self.jitter = jitter
+        self.z_scale = z_scale
+        self.permutation = default_mirror_permutation() if permutation is None else np.asarray(permutation)
+        self.rng = np.random.default_rng(seed)
+
+    def augment(self, meshes: np.ndarray, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Aplica uma transformação aleatória a cada malha do lote.
+
+        Args:
+            meshes (np.ndarray): Malhas (N, 468, 3) ou (N, 1404) na ordem X0, Y0, Z0, X1, ...
+            rng (np.random.Generator, opcional): Gerador de números aleatórios. Padrão: ``self.rng``.
+
+        Returns:
+            np.ndarray: Malhas aumentadas (N, 468, 3) em float32, no mesmo sistema de coordenadas.
+        """
+        rng = self.rng if rng is None else rng
+        points = np.asarray(meshes, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+        count = len(points)
+
+        # Espelhamento: troca os índices esquerdo/direito das malhas sorteadas (o sinal de X entra na matriz)
+        mirrored = rng.random(count) < self.mirror_probability
+        rows = np.flatnonzero(mirrored)
+        if rows.size:
+            points = points.copy()
+            points[rows] = np.take(points[rows], self.permutation, axis=1)
+
+        # Rotação e escala em pixels (Z convertido por z_scale), em torno do centro de cada malha
+        roll, yaw, pitch = np.radians(
+            rng.uniform(-1, 1, (3, count)) * np.array([[self.max_roll], [self.max_yaw], [self.max_pitch]])
+        )
+        scale = rng.uniform(*self.scale_range, count)
+        transforms = rotation_matrices(roll, yaw, pitch) * scale[:, None, None]
+        transforms[mirrored, :, 0] *= -1
+
+        # Uma única matriz por malha nas coordenadas originais: D @ T^T @ D^-1, com D = diag(1, 1, z_scale)
+        to_pixels = np.array([1.0, 1.0, self.z_scale])
+        transforms = transforms.transpose(0, 2, 1) * (to_pixels[:, None] / to_pixels[None, :])
+        transforms = transforms.astype(np.float32)
+        center = np.matmul(np.full((1, NUM_LANDMARKS), 1 / NUM_LANDMARKS, dtype=np.float32), points)
+        offset = center - np.matmul(center, transforms)
+
+        augmented = np.matmul(points, transforms)
+        if self.jitter > 0:
+            noise = rng.standard_normal(augmented.shape, dtype=np.float32)
+            noise *= (self.jitter / to_pixels).astype(np.float32)
+            noise += offset
+            augmented += noise
+        else:
+            augmented += offset
+        return augmented
+
+    def features(self, meshes: np.ndarray, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Aumenta um lote de malhas e calcula as 39 distâncias antropométricas.
+
+        Args:
+            meshes (np.ndarray): Malhas (N, 468, 3) ou (N, 1404).
+            rng (np.random.Generator, opcional): Gerador de números aleatórios. Padrão: ``self.rng``.
+
+        Returns:
+            np.ndarray: Features (N, 39) em float32, na ordem de ``FEATURE_NAMES``.
+        """
+        return calculate_anthropometric_features(self.augment(meshes, rng)).astype(np.float32)
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Contabilidade de Memória por Etapa do Pipeline de Extração
+==========================================================
+``process_images_in_folder`` não mostra quanto cada etapa consome. Este módulo mede, de forma
+opcional, cada etapa (decodificação, detecção, plotagem e escrita) de uma execução:
+- Alocações líquidas e pico de cada chamada com ``tracemalloc``,
+- RSS do processo antes e depois de cada etapa (inclui memória nativa do OpenCV e do MediaPipe,
+  que o ``tracemalloc`` não enxerga),
+- Os locais de alocação que mais cresceram entre o início e o fim da execução (possíveis
+  vazamentos em execuções longas).
+
+O relatório agregado (pico, totais por etapa e principais locais de alocação) ajuda a dimensionar
+workers em lote. Desligado, ``stage`` não faz nada e não custa nada. O ``tracemalloc`` deixa código
+que aloca muitos objetos Python (como o pandas) algumas vezes mais lento; com
+``trace_allocations=False`` só o RSS e o tempo são medidos, com custo desprezível.
+
+@author: George Flores
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Tamanho da página usado para converter /proc/self/statm em bytes
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """
+    Retorna o RSS atual do processo, em bytes.
+
+    Usa ``/proc/self/statm`` (Linux); em outros sistemas, usa o pico de ``getrusage`` e, sem o
+    módulo ``resource`` (Windows), retorna 0.
+
+    Returns:
+        int: RSS em bytes (0 se não puder ser medido).
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return peak_rss()
+
+
+def peak_rss() -> int:
+    """
+    Retorna o pico de RSS do processo, em bytes (``ru_maxrss``).
+
+    O ``ru_maxrss`` vem em KB no Linux e em bytes no macOS. O módulo ``resource`` só existe em
+    sistemas Unix; sem ele (Windows), retorna 0.
+
+    Returns:
+        int: Pico de RSS em bytes (0 se não puder ser medido).
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageMemoryTracker:
+    """
+    Acumula tempo e memória por etapa de uma execução.
+
+    Args:
+        enabled (bool): Se False, ``stage`` não mede nada.
+        trace_allocations (bool): Se False, não usa o ``tracemalloc`` (mede só RSS e tempo).
+        top_n (int): Número de locais de alocação no relatório.
+        frames (int): Profundidade da pilha guardada pelo ``tracemalloc`` em cada alocação.
+    """
+
+    def __init__(self, enabled: bool = True, trace_allocations: bool = True, top_n: int = 10, frames: int = 1):
+        self.enabled = enabled
+        self.trace_allocations = trace_allocations
+        self.top_n = top_n
+        self.frames = frames
+        self.stages = {}
+        self._started = False
+        self._started_tracing = False
+
+    def _traced_memory(self) -> tuple:
+        """Retorna (atual, pico) do ``tracemalloc``, ou zeros sem rastreamento."""
+        return tracemalloc.get_traced_memory() if self.trace_allocations else (0, 0)
+
+    def start(self) -> "StageMemoryTracker":
+        """Inicia o ``tracemalloc`` (se ainda não estiver ativo) e guarda o estado inicial."""
+        if not self.enabled:
+            return self
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._start_time = time.perf_counter()
+        self._start_rss = current_rss()
+        self._start_traced = self._traced_memory()[0]
+        self._peak_traced = self._start_traced
+        self._start_snapshot = tracemalloc.take_snapshot() if self.trace_allocations else None
+        self._started = True
+        return self
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Mede uma etapa: alocações líquidas, pico durante a etapa, variação de RSS e tempo.
+
+        Args:
+            name (str): Nome da etapa (as chamadas com o mesmo nome são somadas).
+        """
+        if not self._started:
+            yield
+            return
+        before, _ = self._traced_memory()
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+        rss_before = current_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            after, peak = self._traced_memory()
+            rss_after = current_rss()
+            self._peak_traced = max(self._peak_traced, peak)
+            totals = self.stages.setdefault(name, {
+                "calls": 0, "seconds": 0.0, "netBytes": 0, "maxPeakBytes": 0, "rssDeltaBytes": 0,
+            })
+            totals["calls"] += 1
+            totals["seconds"] += elapsed
+            totals["netBytes"] += after - before
+            totals["maxPeakBytes"] = max(totals["maxPeakBytes"], peak - before)
+            totals["rssDeltaBytes"] += rss_after - rss_before
+
+    def stop(self) -> dict:
+        """
+        Encerra a medição e monta o relatório.
+
+        Returns:
+            dict: Relatório (ver ``format_report``).
+        """
+        if not self._started:
+            return {}
+        traced, _ = self._traced_memory()
+        top_sites = []
+        if self.trace_allocations:
+            growth = tracemalloc.take_snapshot().compare_to(self._start_snapshot, "lineno")
+            ignored = (tracemalloc.__file__, __file__)
+            top_sites = [
+                {"site": str(diff.traceback), "sizeDiffBytes": diff.size_diff, "countDiff": diff.count_diff}
+                for diff in growth
+                if diff.size_diff > 0 and diff.traceback[0].filename not in ignored
+            ][:self.top_n]
+        report = {
+            "seconds": time.perf_counter() - self._start_time,
+            "tracedPeakBytes": self._peak_traced - self._start_traced,
+            "tracedNetBytes": traced - self._start_traced,
+            "rssStartBytes": self._start_rss,
+            "rssEndBytes": current_rss(),
+            "rssPeakBytes": peak_rss(),
+            "stages": self.stages,
+            "topAllocationSites": top_sites,
+        }
+        self._started = False
+        self._start_snapshot = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return report
+
+
+def format_report(report: dict) -> str:
+    """
+    Formata o relatório de ``StageMemoryTracker.stop`` como texto.
+
+    Args:
+        report (dict): Relatório da execução.
+
+    Returns:
+        str: Tabela por etapa, totais e principais locais de alocação.
+    """
+    mb = 2 ** 20
+    lines = [
+        f"Tempo: {report['seconds']:.1f} s | pico Python (tracemalloc): {report['tracedPeakBytes'] / mb:.1f} MB | "
+        f"líquido Python: {report['tracedNetBytes'] / mb:+.2f} MB",
+        f"RSS: {report['rssStartBytes'] / mb:.0f} -> {report['rssEndBytes'] / mb:.0f} MB "
+        f"(pico do processo {report['rssPeakBytes'] / mb:.0f} MB)",
+        f"{'etapa':>12} {'chamadas':>9} {'tempo s':>8} {'líquido MB':>11} {'pico MB':>8} {'RSS Δ MB':>9}",
+    ]
+    for name, stage in report["stages"].items():
+        lines.append(
+            f"{name:>12} {stage['calls']:>9} {stage['seconds']:>8.2f} {stage['netBytes'] / mb:>+11.2f} "
+            f"{stage['maxPeakBytes'] / mb:>8.2f} {stage['rssDeltaBytes'] / mb:>+9.1f}"
+        )
+    if report["topAllocationSites"]:
+        lines.append("Locais de alocação que mais cresceram:")
+        for site in report["topAllocationSites"]:
+            lines.append(f"  {site['sizeDiffBytes'] / 1024:>+10.1f} KB {site['countDiff']:>+7} blocos  {site['site']}")
+    return "\n".join(lines)
+
+
+def save_report(report: dict, path: str) -> None:
+    """
+    Salva o relatório em JSON.
+
+    Args:
+        report (dict): Relatório da execução.
+        path (str): Caminho do arquivo.
+
+    Returns:
+        None
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+"""
+Avaliação Vetorizada de Modelos com Intervalos de Confiança por Bootstrap
+=========================================================================
+O notebook avalia cada modelo com um único ``model.evaluate``/``score`` sobre um
+``train_test_split(random_state=42)``, sem medida da incerteza. Este módulo recebe as predições
+(probabilidades da classe 1) de vários modelos candidatos sobre o mesmo conjunto e calcula, para
+todos de uma vez:
+- Curvas ROC e precisão-revocação exatas e a varredura de limiares (acurácia, sensibilidade,
+  especificidade, precisão, F1 e índice de Youden),
+- Milhares de reamostragens bootstrap de AUC, acurácia, sensibilidade, especificidade e Brier, sem
+  laço Python por reamostragem: cada reamostragem é um vetor de contagens (multinomial
+  estratificado por classe), as métricas de contagem são produtos de matrizes e a AUC é a
+  estatística de Mann-Whitney ponderada, calculada com uma única ordenação por modelo e somas
+  acumuladas,
+- Diferenças pareadas em relação a um modelo de referência, com as mesmas reamostragens para
+  todos os modelos (o que elimina a variação devida à amostra e estreita os intervalos).
+
+As predições vêm de um CSV (coluna ``class`` e uma coluna por modelo) ou dos artefatos servidos
+pela API (``.h5``/``.keras``, ``.knn``, ``.forest``), avaliados no subconjunto de validação
+determinístico do ``ShardedDataset`` (o mesmo separado no treinamento de ``training_data_loader``).
+
+Uso:
+    python model_evaluation.py predicoes.csv --output-dir relatorio
+    python model_evaluation.py face_mesh_no_autism.csv face_mesh_with_autism.csv --model-dir models \\
+        --statistics statistics.json --output-dir relatorio
+
+@author: George Flores
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from training_data_loader import ShardedDataset
+from feature_statistics import load_statistics
+
+BOOTSTRAP_METRICS = ("auc", "accuracy", "sensitivity", "specificity", "brier")
+
+
+def stack_predictions(predictions: dict) -> tuple:
+    """
+    Empilha as predições dos modelos em uma matriz.
+
+    Args:
+        predictions (dict): Nome do modelo -> probabilidades da classe 1 (N,).
+
+    Returns:
+        tuple: (nomes (list), predições (M, N) em float64).
+
+    Raises:
+        ValueError: Se não houver modelos ou se os tamanhos forem diferentes.
+    """
+    if not predictions:
+        raise ValueError("Nenhuma predição informada.")
+    names = list(predictions)
+    try:
+        scores = np.stack([np.asarray(predictions[name], dtype=np.float64).ravel() for name in names])
+    except ValueError:
+        raise ValueError("Todos os modelos devem ter uma predição por amostra.") from None
+    return names, scores
+
+
+def _check_labels(y_true, num_samples: int) -> np.ndarray:
+    """Valida as classes (0/1, uma por amostra, ambas presentes) e as retorna como inteiros."""
+    y_true = np.asarray(y_true).ravel().astype(int)
+    if len(y_true) != num_samples:
+        raise ValueError(f"{len(y_true)} classes para {num_samples} predições.")
+    if not np.isin(y_true, (0, 1)).all() or len(np.unique(y_true)) != 2:
+        raise ValueError("As classes devem conter apenas 0 e 1, com as duas presentes.")
+    return y_true
+
+
+def bootstrap_weights(y_true: np.ndarray, n_bootstrap: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Sorteia reamostragens bootstrap estratificadas, representadas por contagens.
+
+    Cada classe é reamostrada com reposição no seu próprio tamanho, então toda reamostragem tem
+    as duas classes (a AUC é sempre definida) e a mesma prevalência da amostra original.
+
+    Args:
+        y_true (np.ndarray): Classes (N,).
+        n_bootstrap (int): Número de reamostragens.
+        rng (np.random.Generator): Gerador de números aleatórios.
+
+    Returns:
+        np.ndarray: Contagens (B, N): quantas vezes cada amostra aparece em cada reamostragem.
+    """
+    weights = np.zeros((n_bootstrap, len(y_true)))
+    for label in (0, 1):
+        rows = np.flatnonzero(y_true == label)
+        # Sorteio dos índices e contagem de todas as reamostragens em um único bincount
+        drawn = rng.integers(0, len(rows), (n_bootstrap, len(rows)))
+        drawn += (np.arange(n_bootstrap) * len(rows))[:, None]
+        counts = np.bincount(drawn.ravel(), minlength=n_bootstrap * len(rows))
+        weights[:, rows] = counts.reshape(n_bootstrap, len(rows))
+    return weights
+
+
+def _rank_structure(y_true: np.ndarray, scores: np.ndarray) -> tuple:
+    """
+    Ordena as predições dos negativos de cada modelo e posiciona cada positivo entre eles.
+
+    Args:
+        y_true (np.ndarray): Classes (N,).
+        scores (np.ndarray): Predições (M, N).
+
+    Returns:
+        tuple: (índices dos positivos (P,), índices dos negativos em ordem crescente de predição
+        por modelo (M, Q), número de negativos abaixo (M, P) e até o fim dos empates (M, P) de
+        cada positivo).
+    """
+    positive_rows = np.flatnonzero(y_true == 1)
+    negative_rows = np.flatnonzero(y_true == 0)
+    negative_scores = scores[:, negative_rows]
+    order = np.argsort(negative_scores, axis=1, kind="stable")
+    ordered = np.take_along_axis(negative_scores, order, axis=1)
+    below = np.empty((len(scores), len(positive_rows)), dtype=np.int64)
+    through = np.empty_like(below)
+    for m in range(len(scores)):  # uma busca por modelo, feita uma vez para todas as reamostragens
+        below[m] = np.searchsorted(ordered[m], scores[m, positive_rows], side="left")
+        through[m] = np.searchsorted(ordered[m], scores[m, positive_rows], side="right")
+    return positive_rows, negative_rows[order], below, through
+
+
+def weighted_metrics(y_true: np.ndarray, scores: np.ndarray, weights: np.ndarray, threshold: float = 0.5,
+                     rank_structure: tuple = None) -> dict:
+    """
+    Calcula as métricas de todos os modelos para um lote de ponderações das amostras.
+
+    Com ``weights`` igual a uma linha de uns, são as métricas da amostra original; com as
+    contagens de ``bootstrap_weights``, são as métricas de cada reamostragem.
+
+    Args:
+        y_true (np.ndarray): Classes (N,).
+        scores (np.ndarray): Predições (M, N).
+        weights (np.ndarray): Ponderações (B, N).
+        threshold (float): Limiar da classe 1 (predição >= limiar).
+        rank_structure (tuple, opcional): Resultado de ``_rank_structure(y_true, scores)``, para
+            reutilizar a ordenação entre lotes.
+
+    Returns:
+        dict: Métrica (``BOOTSTRAP_METRICS``) -> valores (B, M).
+    """
+    positive = y_true == 1
+    weights_positive = weights * positive
+    weights_negative = weights - weights_positive
+    total_positive = weights_positive.sum(axis=1, keepdims=True)
+    total_negative = weights_negative.sum(axis=1, keepdims=True)
+
+    # Métricas de contagem: um produto de matrizes (B, N) x (N, M) cada
+    predicted = (scores >= threshold).astype(np.float64)
+    true_positive = weights_positive @ predicted.T
+    true_negative = weights_negative @ (1 - predicted).T
+    squared_error = weights @ ((scores - positive) ** 2).T
+
+    # AUC de Mann-Whitney ponderada: para cada positivo, o peso dos negativos abaixo mais metade
+    # dos empatados, lidos das somas acumuladas dos pesos dos negativos na ordem de cada modelo
+    positive_rows, negative_order, below, through = (
+        rank_structure if rank_structure is not None else _rank_structure(y_true, scores)
+    )
+    num_models, num_negatives = negative_order.shape
+    cumulative = np.zeros((len(weights), num_models, num_negatives + 1))
+    np.cumsum(weights[:, negative_order], axis=2, out=cumulative[..., 1:])
+    cumulative = cumulative.reshape(len(weights), -1)
+    offsets = (np.arange(num_models) * (num_negatives + 1))[:, None]
+    # abaixo + metade dos empatados = (abaixo + até o fim dos empates) / 2
+    ranked = np.take(cumulative, (below + offsets).ravel(), axis=1)
+    ranked += np.take(cumulative, (through + offsets).ravel(), axis=1)
+    ranked = ranked.reshape(len(weights), num_models, -1)
+    auc = 0.5 * np.einsum("bp,bmp->bm", weights[:, positive_rows], ranked) / (total_positive * total_negative)
+
+    return {
+        "auc": auc,
+        "accuracy": (true_positive + true_negative) / (total_positive + total_negative),
+        "sensitivity": true_positive / total_positive,
+        "specificity": true_negative / total_negative,
+        "brier": squared_error / (total_positive + total_negative),
+    }
+
+
+def bootstrap_metrics(y_true, scores: np.ndarray, n_bootstrap: int = 2000, threshold: float = 0.5,
+                      seed: int = 0, chunk_size: int = 250) -> dict:
+    """
+    Calcula as métricas de todos os modelos em ``n_bootstrap`` reamostragens estratificadas.
+
+    As reamostragens são processadas em blocos de ``chunk_size`` (limita a memória a cerca de
+    ``chunk_size * M * N`` valores); dentro de cada bloco, todas as reamostragens e todos os
+    modelos são calculados de uma vez.
+
+    Args:
+        y_true (np.ndarray): Classes (N,).
+        scores (np.ndarray): Predições (M, N).
+        n_bootstrap (int): Número de reamostragens.
+        threshold (float): Limiar da classe 1.
+        seed (int): Semente das reamostragens (as mesmas para todos os modelos).
+        chunk_size (int): Reamostragens por bloco.
+
+    Returns:
+        dict: Métrica -> valores (B, M).
+    """
+    scores = np.atleast_2d(np.asarray(scores, dtype=np.float64))
+    y_true = _check_labels(y_true, scores.shape[1])
+    rng = np.random.default_rng(seed)
+    structure = _rank_structure(y_true, scores)
+    blocks = []
+    for start in range(0, n_bootstrap, chunk_size):
+        weights = bootstrap_weights(y_true, min(chunk_size, n_bootstrap - start), rng)
+        blocks.append(weighted_metrics(y_true, scores, weights, threshold, structure))
+    return {metric: np.concatenate([block[metric] for block in blocks]) for metric in BOOTSTRAP_METRICS}
+
+
+def curve_table(y_true, predictions: dict) -> pd.DataFrame:
+    """
+    Calcula as curvas ROC e precisão-revocação exatas de todos os modelos.
+
+    Há um ponto por valor distinto de predição de cada modelo (do maior limiar ao menor), como
+    em ``sklearn.metrics.roc_curve`` sem descarte de pontos intermediários.
+
+    Args:
+        y_true (np.ndarray): Classes (N,).
+        predictions (dict): Nome do modelo -> probabilidades da classe 1 (N,).
+
+    Returns:
+        pd.DataFrame: Colunas ``model``, ``threshold``, ``fpr``, ``tpr`` (revocação) e ``precision``.
+    """
+    names, scores = stack_predictions(predictions)
+    y_true = _check_labels(y_true, scores.shape[1])
+    order = np.argsort(-scores, axis=1, kind="stable")
+    ordered = np.take_along_axis(scores, order, axis=1)
+    true_positive = np.cumsum(y_true[order], axis=1)
+    predicted_positive = np.arange(1, scores.shape[1] + 1)
+    # Último elemento de cada grupo de empate: o ponto da curva daquele limiar
+    last = np.ones(scores.shape, dtype=bool)
+    last[:, :-1] = ordered[:, :-1] != ordered[:, 1:]
+    model, position = np.nonzero(last)
+    tp = true_positive[model, position]
+    return pd.DataFrame({
+        "model": np.asarray(names)[model],
+        "threshold": ordered[model, position],
+        "fpr": (predicted_positive[position] - tp) / (y_true == 0).sum(),
+        "tpr": tp / (y_true == 1).sum(),
+        "precision": tp / predicted_positive[position],
+    })
+
+
+def average_precision(curves: pd.DataFrame) -> pd.Series:
+    """
+    Calcula a precisão média (área sob a curva precisão-revocação em degraus) de cada modelo.
+
+    Args:
+        curves (pd.DataFrame): Resultado de ``curve_table``.
+
+    Returns:
+        pd.Series: Precisão média por modelo, igual a ``sklearn.metrics.average_precision_score``.
+    """
+    recall_gain = curves.groupby("model", sort=False)["tpr"].diff().fillna(curves["tpr"])
+    return (recall_gain * curves["precision"]).groupby(curves["model"], sort=False).sum()
+
+
+def threshold_sweep(y_true, predictions: dict, thresholds: np.ndarray = None) -> pd.DataFrame:
+    """
+    Calcula as métricas de classificação de todos os modelos em uma grade de limiares.
+
+    Args:
+        y_true (np.ndarray): Classes (N,).
+        predictions (dict): Nome do modelo -> probabilidades da classe 1 (N,).
+        thresholds (np.ndarray, opcional): Limiares. Padrão: 0 a 1 em passos de 0,01.
+
+    Returns:
+        pd.DataFrame: Colunas ``model``, ``threshold``, ``accuracy``, ``sensitivity``,
+        ``specificity``, ``precision``, ``f1`` e ``youden``.
+    """
+    names, scores = stack_predictions(predictions)
+    y_true = _check_labels(y_true, scores.shape[1])
+    thresholds = np.linspace(0, 1, 101) if thresholds is None else np.asarray(thresholds, dtype=np.float64)
+    predicted = scores[:, None, :] >= thresholds[None, :, None]  # (M, T, N)
+    true_positive = predicted @ (y_true == 1).astype(np.int64)
+    predicted_positive = predicted.sum(axis=2)
+    positives = (y_true == 1).sum()
+    negatives = len(y_true) - positives
+    true_negative = negatives - (predicted_positive - true_positive)
+    sensitivity = true_positive / positives
+    specificity = true_negative / negatives
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.where(predicted_positive > 0, true_positive / predicted_positive, np.nan)
+        f1 = 2 * true_positive / (predicted_positive + positives)
+    return pd.DataFrame({
+        "model": np.repeat(names, len(thresholds)),
+        "threshold": np.tile(thresholds, len(names)),
+        "accuracy": ((true_positive + true_negative) / len(y_true)).ravel(),
+        "sensitivity": sensitivity.ravel(),
+        "specificity": specificity.ravel(),
+        "precision": precision.ravel(),
+        "f1": f1.ravel(),
+        "youden": (sensitivity + specificity - 1).ravel(),
+    })
+
+
+def evaluate_models(
+    y_true,
+    predictions: dict,
+    n_bootstrap: int = 2000,
+    threshold: float = 0.5,
+    confidence: float = 0.95,
+    reference: str = None,
+    seed: int = 0,
+    debug: bool = False,
+) -> tuple:
+    """
+    Avalia todos os modelos candidatos com intervalos de confiança por bootstrap.
+
+    Args:
+        y_true (np.ndarray): Classes (N,).
+        predictions (dict): Nome do modelo -> probabilidades da classe 1 (N,).
+        n_bootstrap (int): Número de reamostragens.
+        threshold (float): Limiar da classe 1 nas métricas de contagem.
+        confidence (float): Nível dos intervalos (percentis do bootstrap).
+        reference (str, opcional): Modelo de referência das diferenças pareadas. Padrão: o primeiro.
+        seed (int): Semente das reamostragens.
+        debug (bool): Se True, exibe o tempo do bootstrap.
+
+    Returns:
+        tuple: (resumo por modelo, diferenças pareadas em relação à referência), como DataFrames.
+        O resumo tem, para cada métrica, o valor na amostra original e as colunas ``_low`` e
+        ``_high`` do intervalo, além de ``average_precision``. As diferenças têm ``model``,
+        ``metric``, ``difference``, ``low``, ``high`` e ``p_value`` (bilateral, pela fração das
+        reamostragens de cada lado do zero).
+    """
+    names, scores = stack_predictions(predictions)
+    y_true = _check_labels(y_true, scores.shape[1])
+    reference = names[0] if reference is None else reference
+    if reference not in names:
+        raise ValueError(f"Modelo de referência desconhecido: {reference}")
+
+    start = time.perf_counter()
+    point = weighted_metrics(y_true, scores, np.ones((1, len(y_true))), threshold)
+    samples = bootstrap_metrics(y_true, scores, n_bootstrap, threshold, seed)
+    if debug:
+        print(f"{n_bootstrap} reamostragens de {len(names)} modelos x {len(y_true)} amostras "
+              f"em {time.perf_counter() - start:.2f} s.")
+
+    tail = 100 * (1 - confidence) / 2
+    summary = pd.DataFrame({"model": names, "samples": len(y_true)})
+    for metric in BOOTSTRAP_METRICS:
+        summary[metric] = point[metric][0]
+        summary[f"{metric}_low"], summary[f"{metric}_high"] = np.percentile(samples[metric], [tail, 100 - tail], axis=0)
+    summary["average_precision"] = average_precision(curve_table(y_true, predictions)).to_numpy()
+
+    index = names.index(reference)
+    rows = []
+    for metric in BOOTSTRAP_METRICS:
+        differences = samples[metric] - samples[metric][:, [index]]
+        low, high = np.percentile(differences, [tail, 100 - tail], axis=0)
+        p_value = np.minimum(1, 2 * np.minimum((differences <= 0).mean(axis=0), (differences >= 0).mean(axis=0)))
+        for m, name in enumerate(names):
+            if m != index:
+                rows.append((name, metric, point[metric][0, m] - point[metric][0, index], low[m], high[m], p_value[m]))
+    comparison = pd.DataFrame(rows, columns=["model", "metric", "difference", "low", "high", "p_value"])
+    comparison.insert(1, "reference", reference)
+    return summary, comparison
+
+
+def predict_models(model_dir: str, shards: list, statistics_path: str = None, subset: str = "validation",
+                   validation_fraction: float = 0.2) -> tuple:
+    """
+    Calcula as predições de todos os artefatos de um diretório de modelos, como a API.
+
+    Args:
+        model_dir (str): Diretório com os artefatos (``.h5``/``.keras``, ``.knn``, ``.forest``).
+        shards (list): Shards CSV de marcos ou distâncias (ver ``training_data_loader.list_shards``).
+        statistics_path (str, opcional): Padronização aplicada aos modelos densos (``FEATURE_STATISTICS``
+            da API). KNN e floresta recebem as distâncias originais.
+        subset (str, opcional): ``validation`` (padrão), ``train`` ou None (todas as linhas).
+        validation_fraction (float): Fração de validação usada no treinamento.
+
+    Returns:
+        tuple: (classes (N,), predições {nome do modelo: probabilidades (N,)}).
+
+    Raises:
+        FileNotFoundError: Se o diretório não tiver artefatos.
+        ValueError: Se, na validação, um KNN ou floresta não tiver sido treinado sem essa mesma fração de
+            validação (``validation_fraction`` do artefato), ou seja, se puder ter visto as linhas avaliadas.
+    """
+    # O carregamento dos modelos é o mesmo da API, em src/backend
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+    from dense_model import load_dense_model
+    from model_registry import MODEL_EXTENSIONS, SELF_CONTAINED_MODELS, artifact_loader
+
+    dataset = ShardedDataset(shards, batch_size=65536, subset=subset, validation_fraction=validation_fraction,
+                             shuffle=False)
+    batches = list(dataset.epoch())
+    X = np.concatenate([X for X, _ in batches]).astype(np.float64)
+    y_true = np.concatenate([y for _, y in batches])
+    statistics = load_statistics(statistics_path, num_features=X.shape[1]) if statistics_path else None
+
+    load = artifact_loader(load_dense_model)
+    predictions = {}
+    for file_name in sorted(os.listdir(model_dir)):
+        if not file_name.endswith(MODEL_EXTENSIONS):
+            continue
+        model = load(os.path.join(model_dir, file_name))
+        if subset == "validation" and isinstance(model, SELF_CONTAINED_MODELS) \
+                and model.validation_fraction != validation_fraction:
+            raise ValueError(
+                f"{file_name} não foi treinado sem a validação (fração {validation_fraction}); "
+                f"fração do artefato: {model.validation_fraction}. Exporte-o de novo com --validation-fraction."
+            )
+        standardize = statistics is not None and not isinstance(model, SELF_CONTAINED_MODELS)
+        inputs = statistics.transform(X) if standardize else X
+        predictions[os.path.splitext(file_name)[0]] = np.asarray(model.predict(inputs))[:, 0]
+    if not predictions:
+        raise FileNotFoundError(f"Nenhum modelo encontrado em: {model_dir}")
+    return y_true, predictions
+
+
+def main(argv: list = None) -> None:
+    """
+    Avalia os modelos e grava o resumo, as diferenças pareadas, a varredura de limiares e as curvas.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Avalia modelos com intervalos de confiança por bootstrap.")
+    parser.add_argument("inputs", nargs="+", help="CSV de predições (coluna class e uma coluna por modelo) ou, "
+                        "com --model-dir, shards CSV de marcos ou distâncias.")
+    parser.add_argument("--model-dir", help="Avalia os artefatos do diretório no subconjunto de validação dos shards.")
+    parser.add_argument("--statistics", help="Padronização dos modelos densos (JSON de feature_statistics.py).")
+    parser.add_argument("--validation-fraction", type=float, default=0.2)
+    parser.add_argument("--bootstrap", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--reference", help="Modelo de referência das diferenças pareadas. Padrão: o primeiro.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="evaluation")
+    args = parser.parse_args(argv)
+
+    if args.model_dir:
+        y_true, predictions = predict_models(args.model_dir, args.inputs, args.statistics,
+                                             validation_fraction=args.validation_fraction)
+    else:
+        frame = pd.read_csv(args.inputs[0])
+        y_true = frame.pop("class").to_numpy()
+        predictions = {name: frame[name].to_numpy() for name in frame.columns if name not in ("samples", "amostra")}
+
+    summary, comparison = evaluate_models(y_true, predictions, args.bootstrap, args.threshold, args.confidence,
+                                          args.reference, args.seed, debug=True)
+    os.makedirs(args.output_dir, exist_ok=True)
+    summary.to_csv(os.path.join(args.output_dir, "summary.csv"), index=False)
+    comparison.to_csv(os.path.join(args.output_dir, "comparison.csv"), index=False)
+    threshold_sweep(y_true, predictions).to_csv(os.path.join(args.output_dir, "thresholds.csv"), index=False)
+    curve_table(y_true, predictions).to_csv(os.path.join(args.output_dir, "curves.csv"), index=False)
+
+    columns = ["model"] + [f"{metric}{suffix}" for metric in ("auc", "accuracy") for suffix in ("", "_low", "_high")]
+    print(summary[columns].to_string(index=False, float_format="%.4f"))
+    print(comparison[comparison["metric"].isin(["auc", "accuracy"])].to_string(index=False, float_format="%.4f"))
+    print(f"Relatório gravado em {args.output_dir}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+"""
+Carregamento de Dados de Treinamento Fora da Memória
+====================================================
+O notebook de classificação lê todos os CSVs com ``pd.read_csv``, concatena, padroniza e mantém
+tudo na RAM antes do ``model.fit``. Este módulo lê os dados em blocos, direto dos arquivos:
+- Cada shard é um CSV de marcos (``amostra``, ``class``, ``X0``, ``Y0``, ``Z0``, ...) ou de
+  distâncias (``class`` e as colunas de features),
+- As features dos CSVs de marcos são calculadas bloco a bloco com ``calculate_anthropometric_features``,
+  nos mesmos índices e em 3D, como na API,
+- A padronização usa ``FeatureStatistics`` (``feature_statistics``), ajustada em uma passada pelos
+  blocos ou carregada de um arquivo salvo, o mesmo que a API usa,
+- Opcionalmente, as malhas dos CSVs de marcos são aumentadas a cada época (``LandmarkAugmenter``,
+  de ``landmark_augmentation``) antes do cálculo das features,
+- Os shards são intercalados e embaralhados em um buffer de tamanho fixo, então os lotes misturam
+  as classes mesmo com um shard por classe,
+- Uma thread em segundo plano lê e prepara os próximos lotes enquanto o Keras treina o atual.
+
+A memória usada é limitada por ``shuffle_buffer`` e ``chunk_rows``, independentemente do tamanho do
+conjunto de dados.
+
+Uso:
+    python training_data_loader.py face_mesh_no_autism.csv face_mesh_with_autism.csv --epochs 30 --output model.h5
+
+@author: George Flores
+"""
+
+import argparse
+import glob
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from face_mesh_features import FEATURE_NAMES, NUM_LANDMARKS, calculate_anthropometric_features
+from feature_statistics import FeatureStatistics, load_statistics
+from feature_ranking import NON_FEATURE_COLUMNS
+
+LANDMARK_COLUMNS = [f"{axis}{i}" for i in range(NUM_LANDMARKS) for axis in ("X", "Y", "Z")]
+
+
+def list_shards(paths: list) -> list:
+    """
+    Expande pastas e padrões glob em uma lista ordenada de shards CSV.
+
+    Args:
+        paths (list): Arquivos, pastas ou padrões glob.
+
+    Returns:
+        list: Caminhos dos CSVs.
+
+    Raises:
+        FileNotFoundError: Se nenhum CSV for encontrado.
+    """
+    shards = []
+    for path in paths:
+        if os.path.isdir(path):
+            shards.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+        else:
+            shards.extend(sorted(glob.glob(path)))
+    if not shards:
+        raise FileNotFoundError(f"Nenhum shard CSV encontrado em {paths}")
+    return shards
+
+
+def shard_feature_names(path: str, feature_columns: list = None) -> list:
+    """
+    Retorna os nomes das features de um shard.
+
+    Args:
+        path (str): Caminho do CSV.
+        feature_columns (list, opcional): Colunas de features dos CSVs de distâncias. Padrão: todas,
+            exceto ``NON_FEATURE_COLUMNS``.
+
+    Returns:
+        list: ``FEATURE_NAMES`` para CSVs de marcos ou as colunas de features dos CSVs de distâncias.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    if "X0" in header:
+        return list(FEATURE_NAMES)
+    return list(feature_columns or [c for c in header if c not in NON_FEATURE_COLUMNS])
+
+
+def iter_shard_chunks(path: str, chunk_rows: int = 4096, feature_columns: list = None, augmenter=None,
+                      rng: np.random.Generator = None):
+    """
+    Lê um shard em blocos e devolve as features e as classes de cada bloco.
+
+    Linhas com features ausentes (NaN) são descartadas, como em ``data_total.dropna()`` no notebook.
+
+    Args:
+        path (str): Caminho do CSV.
+        chunk_rows (int): Linhas lidas por bloco.
+        feature_columns (list, opcional): Colunas de features dos CSVs de distâncias (ver ``shard_feature_names``).
+        augmenter (LandmarkAugmenter, opcional): Aumento aplicado às malhas de cada bloco antes do
+            cálculo das features (apenas CSVs de marcos).
+        rng (np.random.Generator, opcional): Gerador usado pelo ``augmenter``.
+
+    Yields:
+        tuple: (features (n, F) em float32, classes (n,) em int, índices das linhas no shard (n,)).
+
+    Raises:
+        ValueError: Se o CSV não tiver a coluna ``class`` ou as colunas de features, ou se
+            ``augmenter`` for usado com um CSV de distâncias.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    landmarks = "X0" in header
+    if augmenter is not None and not landmarks:
+        raise ValueError(f"O aumento de dados exige CSVs de marcos: {path}")
+    columns = LANDMARK_COLUMNS if landmarks else shard_feature_names(path, feature_columns)
+    missing = [c for c in ["class"] + columns if c not in header]
+    if missing:
+        raise ValueError(f"Colunas ausentes em {path}: {missing[:5]}")
+
+    offset = 0
+    dtypes = dict.fromkeys(columns, np.float32)
+    for chunk in pd.read_csv(path, usecols=["class"] + columns, dtype=dtypes, chunksize=chunk_rows):
+        values = chunk[columns].to_numpy()
+        if augmenter is not None:
+            values = augmenter.features(values, rng)
+        elif landmarks:
+            values = calculate_anthropometric_features(values.reshape(-1, NUM_LANDMARKS, 3)).astype(np.float32)
+        rows = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        valid = ~np.isnan(values).any(axis=1)
+        yield values[valid], chunk["class"].to_numpy(dtype=int)[valid], rows[valid]
+
+
+def prefetch(iterable, size: int = 8):
+    """
+    Consome um iterável em uma thread em segundo plano, mantendo até ``size`` itens prontos.
+
+    Exceções da thread são repassadas ao consumidor. Se o consumidor parar de iterar, a thread é
+    encerrada na próxima tentativa de colocar um item na fila.
+
+    Args:
+        iterable: Iterável produtor (por exemplo, um gerador de lotes).
+        size (int): Número máximo de itens prontos na fila.
+
+    Yields:
+        Os itens de ``iterable``, na mesma ordem.
+    """
+    items = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    done = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                while not stop.is_set():
+                    try:
+                        items.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            items.put(done)
+        except BaseException as error:  # repassada ao consumidor
+            items.put(error)
+
+    thread = threading.Thread(target=produce, name="training-data-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+class ShardedDataset:
+    """
+    Conjunto de dados lido em blocos de shards CSV, com embaralhamento e pré-carregamento.
+
+    A divisão entre treino e validação é determinística por linha (hash do shard e do número da
+    linha), então não exige carregar nem embaralhar o conjunto inteiro e é estável entre épocas.
+
+    Args:
+        shards (list): Arquivos, pastas ou padrões glob (ver ``list_shards``).
+        batch_size (int): Tamanho dos lotes.
+        subset (str, opcional): ``train``, ``validation`` ou None (todas as linhas).
+        validation_fraction (float): Fração das linhas na validação.
+        statistics (FeatureStatistics, opcional): Padronização aplicada aos lotes (ver ``fit_statistics``).
+        feature_columns (list, opcional): Colunas de features dos CSVs de distâncias.
+        chunk_rows (int): Linhas lidas por bloco de cada shard.
+        shuffle (bool): Se True, embaralha shards e linhas a cada época.
+        shuffle_buffer (int): Linhas mantidas no buffer de embaralhamento.
+        cycle_length (int): Shards lidos de forma intercalada ao mesmo tempo.
+        prefetch_batches (int): Lotes preparados antecipadamente pela thread de leitura.
+        augmenter (LandmarkAugmenter, opcional): Aumento das malhas aplicado aos lotes de cada época
+            (apenas CSVs de marcos). A padronização e a contagem de amostras usam as malhas originais.
+        seed (int): Semente do embaralhamento e do aumento de dados.
+        debug (bool): Se True, exibe informações de debug.
+    """
+
+    def __init__(
+        self,
+        shards: list,
+        batch_size: int = 32,
+        subset: str = None,
+        validation_fraction: float = 0.2,
+        statistics: FeatureStatistics = None,
+        feature_columns: list = None,
+        chunk_rows: int = 4096,
+        shuffle: bool = True,
+        shuffle_buffer: int = 16384,
+        cycle_length: int = 4,
+        prefetch_batches: int = 8,
+        augmenter=None,
+        seed: int = 0,
+        debug: bool = False,
+    ):
+        if subset not in (None, "train", "validation"):
+            raise ValueError(f"Subconjunto desconhecido: {subset}")
+        self.shards = list_shards(shards)
+        if augmenter is not None:
+            distances = [s for s in self.shards if "X0" not in pd.read_csv(s, nrows=0).columns]
+            if distances:
+                raise ValueError(f"O aumento de dados exige CSVs de marcos: {distances[:3]}")
+        self.batch_size = batch_size
+        self.subset = subset
+        self.validation_fraction = validation_fraction
+        self.statistics = statistics
+        self.feature_columns = feature_columns
+        self.chunk_rows = chunk_rows
+        self.shuffle = shuffle
+        self.shuffle_buffer = max(shuffle_buffer, batch_size)
+        self.cycle_length = cycle_length
+        self.prefetch_batches = prefetch_batches
+        self.augmenter = augmenter
+        self.seed = seed
+        self.debug = debug
+        self._num_samples = None
+
+    def _subset_mask(self, shard: str, rows: np.ndarray) -> np.ndarray:
+        """Seleciona as linhas do subconjunto por um hash multiplicativo do shard e da linha."""
+        if self.subset is None:
+            return np.ones(len(rows), dtype=bool)
+        key = zlib.crc32(os.path.basename(shard).encode())
+        hashed = ((rows.astype(np.uint64) + np.uint64(key)) * np.uint64(2654435761)) % np.uint64(2 ** 32)
+        in_validation = hashed < np.uint64(self.validation_fraction * 2 ** 32)
+        return in_validation if self.subset == "validation" else ~in_validation
+
+    def _chunks(self, shards: list, rng: np.random.Generator = None):
+        """
+        Lê os blocos dos shards, intercalando até ``cycle_length`` shards abertos.
+
+        Com ``rng``, as malhas passam pelo ``augmenter`` (se houver); sem ele, os blocos são os originais.
+        """
+        augmenter = self.augmenter if rng is not None else None
+        pending = deque(shards)
+        active = deque()
+        while pending or active:
+            while pending and len(active) < self.cycle_length:
+                shard = pending.popleft()
+                active.append((shard, iter_shard_chunks(shard, self.chunk_rows, self.feature_columns,
+                                                          augmenter, rng)))
+            shard, reader = active.popleft()
+            try:
+                X, y, rows = next(reader)
+            except StopIteration:
+                continue
+            active.append((shard, reader))
+            mask = self._subset_mask(shard, rows)
+            yield X[mask], y[mask]
+
+    def _batches(self, epoch: int):
+        """Gera os lotes de uma época (sem pré-carregamento)."""
+        rng = np.random.default_rng((self.seed, epoch))
+        shards = list(self.shards)
+        if self.shuffle:
+            rng.shuffle(shards)
+
+        buffer_X, buffer_y, buffered = [], [], 0
+        for X, y in self._chunks(shards, rng):
+            buffer_X.append(self._transform(X))
+            buffer_y.append(y)
+            buffered += len(y)
+            if buffered < self.shuffle_buffer:
+                continue
+            X, y = np.concatenate(buffer_X), np.concatenate(buffer_y)
+            if self.shuffle:
+                order = rng.permutation(len(y))
+                X, y = X[order], y[order]
+            # Emite os lotes completos e mantém o resto no buffer
+            full = len(y) - len(y) % self.batch_size
+            for start in range(0, full, self.batch_size):
+                yield X[start:start + self.batch_size], y[start:start + self.batch_size]
+            buffer_X, buffer_y, buffered = [X[full:]], [y[full:]], len(y) - full
+
+        if buffered:
+            X, y = np.concatenate(buffer_X), np.concatenate(buffer_y)
+            if self.shuffle:
+                order = rng.permutation(len(y))
+                X, y = X[order], y[order]
+            for start in range(0, len(y), self.batch_size):
+                yield X[start:start + self.batch_size], y[start:start + self.batch_size]
+
+    def _transform(self, X: np.ndarray) -> np.ndarray:
+        """Aplica a padronização a um bloco inteiro, em float32 (mais rápido que por lote)."""
+        if self.statistics is None:
+            return X
+        return self.statistics.transform(X)
+
+    def fit_statistics(self) -> FeatureStatistics:
+        """
+        Ajusta a padronização com uma passada pelos blocos do subconjunto e conta as amostras.
+
+        Returns:
+            FeatureStatistics: Estatísticas ajustadas (também guardadas em ``self.statistics``).
+        """
+        statistics = FeatureStatistics(shard_feature_names(self.shards[0], self.feature_columns))
+        for X, _ in self._chunks(self.shards):
+            statistics.update(X)
+        self.statistics = statistics
+        self._num_samples = int(statistics.count.max())
+        if self.debug:
+            print(f"Padronização ajustada com {self._num_samples} amostras de {len(self.shards)} shards.")
+        return statistics
+
+    @property
+    def num_samples(self) -> int:
+        """Número de amostras do subconjunto (contado em uma passada, na primeira consulta)."""
+        if self._num_samples is None:
+            self._num_samples = sum(len(y) for _, y in self._chunks(self.shards))
+        return self._num_samples
+
+    @property
+    def steps_per_epoch(self) -> int:
+        """Número de lotes por época."""
+        return -(-self.num_samples // self.batch_size)
+
+    def epoch(self, epoch: int = 0):
+        """
+        Gera os lotes de uma época, preparados por uma thread em segundo plano.
+
+        Args:
+            epoch (int): Número da época (define o embaralhamento).
+
+        Yields:
+            tuple: (features (n, F) em float32, classes (n,)).
+        """
+        return prefetch(self._batches(epoch), self.prefetch_batches)
+
+    def __iter__(self):
+        return self.epoch(0)
+
+    def keras_generator(self):
+        """
+        Gera lotes indefinidamente, época após época, para ``model.fit`` com ``steps_per_epoch``.
+
+        Yields:
+            tuple: (features (n, F) em float32, classes (n,)).
+        """
+
+        def epochs():
+            epoch = 0
+            while True:
+                yield from self._batches(epoch)
+                epoch += 1
+
+        return prefetch(epochs(), self.prefetch_batches)
+
+
+def build_model(num_features: int, learning_rate: float = 0.001):
+    """
+    Cria a rede densa do notebook de classificação (64 e 32 neurônios ReLU, saída sigmoide).
+
+    Args:
+        num_features (int): Número de features de entrada.
+        learning_rate (float): Taxa de aprendizado do Adam.
+
+    Returns:
+        tf.keras.Model: Modelo compilado.
+    """
+    import tensorflow as tf
+
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(num_features,)),
+        tf.keras.layers.Dense(64, activation="relu"),
+        tf.keras.layers.Dense(32, activation="relu"),
+        tf.keras.layers.Dense(1, activation="sigmoid"),
+    ])
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+                  loss="binary_crossentropy", metrics=["accuracy"])
+    return model
+
+
+def train_streaming(model, train: ShardedDataset, validation: ShardedDataset = None, epochs: int = 30,
+                    debug: bool = False):
+    """
+    Treina um modelo Keras a partir de ``ShardedDataset``, sem carregar o conjunto na memória.
+
+    Args:
+        model (tf.keras.Model): Modelo compilado.
+        train (ShardedDataset): Dados de treino (com ``statistics`` definido).
+        validation (ShardedDataset, opcional): Dados de validação.
+        epochs (int): Número de épocas.
+        debug (bool): Se True, exibe a vazão de cada época em amostras por segundo.
+
+    Returns:
+        tf.keras.callbacks.History: Histórico do treinamento, com ``samples_per_second`` por época.
+    """
+    import tensorflow as tf
+
+    class ThroughputLogger(tf.keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            logs["samples_per_second"] = train.num_samples / (time.perf_counter() - self.start)
+            if debug:
+                print(f"Época {epoch + 1}: {logs['samples_per_second']:.0f} amostras/s.")
+
+    validation_args = {}
+    if validation is not None:
+        validation_args = dict(validation_data=validation.keras_generator(),
+                               validation_steps=validation.steps_per_epoch)
+    return model.fit(train.keras_generator(), steps_per_epoch=train.steps_per_epoch, epochs=epochs,
+                     callbacks=[ThroughputLogger()], verbose=2 if debug else 0, **validation_args)
+
+
+def main(argv: list = None) -> None:
+    """
+    Treina a rede densa do notebook a partir de shards CSV e salva o modelo.
+
+    Args:
+        argv (list, opcional): Argumentos da linha de comando. Padrão: ``sys.argv[1:]``.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Treina o modelo denso lendo os shards em blocos.")
+    parser.add_argument("shards", nargs="+", help="CSVs de marcos ou de distâncias, pastas ou padrões glob.")
+    parser.add_argument("--output", default="model_streaming.h5")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--learning-rate", type=float, default=0.001)
+    parser.add_argument("--validation-fraction", type=float, default=0.2)
+    parser.add_argument("--chunk-rows", type=int, default=4096)
+    parser.add_argument("--shuffle-buffer", type=int, default=16384)
+    parser.add_argument("--statistics", help="Estatísticas de padronização (JSON). Se o arquivo existir, é "
+                        "usado sem nova passada pelos dados; senão, é ajustado no treino e salvo. "
+                        "Padrão: <output>_statistics.json.")
+    parser.add_argument("--augment", action="store_true", help="Aumenta as malhas de treino a cada época "
+                        "(espelhamento, rotações, escala e ruído; apenas CSVs de marcos).")
+    args = parser.parse_args(argv)
+    statistics_path = args.statistics or os.path.splitext(args.output)[0] + "_statistics.json"
+
+    options = dict(batch_size=args.batch_size, validation_fraction=args.validation_fraction,
+                   chunk_rows=args.chunk_rows, shuffle_buffer=args.shuffle_buffer)
+    augmenter = None
+    if args.augment:
+        from landmark_augmentation import LandmarkAugmenter
+
+        augmenter = LandmarkAugmenter()
+    train = ShardedDataset(args.shards, subset="train", augmenter=augmenter, debug=True, **options)
+    if os.path.exists(statistics_path):
+        train.statistics = load_statistics(statistics_path)
+    else:
+        train.fit_statistics().save(statistics_path)
+    validation = ShardedDataset(args.shards, subset="validation", statistics=train.statistics, shuffle=False,
+                                **options)
+
+    model = build_model(train.statistics.num_features, args.learning_rate)
+    train_streaming(model, train, validation, epochs=args.epochs, debug=True)
+    model.save(args.output)
+    print(f"Modelo salvo em {args.output}; padronização em {statistics_path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import unittest
+import os
+import sys
+import io
+import json
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+import zipfile
+from unittest import mock
+from flask import Flask
+
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+from batch_jobs import BatchJobManager
+
+
+def score_by_size(paths, model_version):
+    # Pontuação determinística pelo tamanho do arquivo; arquivos vazios simulam imagens sem face
+    results = []
+    for path in paths:
+        size = os.path.getsize(path)
+        if size == 0:
+            results.append({"face_detected": False})
+        else:
+            confidence = (size % 100) / 100
+            results.append({"face_detected": True, "prediction": int(round(confidence)),
+                            "confidence": confidence, "model_version": model_version or "padrao"})
+    return results
+
+
+def make_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+class TestBatchJobs(unittest.TestCase):
+    """Classe de testes para os trabalhos em lote de arquivos compactados."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.folder.name, 'jobs.db')
+        self.upload_dir = os.path.join(self.folder.name, 'uploads')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def wait_done(self, client, job_id, timeout=10):
+        end = time.time() + timeout
+        while time.time() < end:
+            job = client.get(f'/batch-jobs/{job_id}').get_json()
+            if job['status'] == 'done':
+                return job
+            time.sleep(0.05)
+        self.fail('O trabalho não terminou a tempo.')
+
+    def test_submit_poll_and_stream_results(self):
+        """Testa o envio de um zip, o progresso, a transmissão dos resultados e a extração segura."""
+        app = Flask(__name__)
+        manager = BatchJobManager(score_by_size, self.db_path, self.upload_dir, workers=2, chunk_size=2,
+                                  poll_interval=0.05).install(app)
+        client = app.test_client()
+        files = {
+            'fotos/a.jpg': b'x' * 130,
+            'fotos/b.PNG': b'x' * 42,
+            '../../fora.jpg': b'x' * 7,
+            'vazia.jpeg': b'',
+            'leia-me.txt': b'texto',
+            '__MACOSX/fotos/._a.jpg': b'x',
+        }
+        response = client.post('/batch-jobs', data={'archive': (make_zip(files), 'fotos.zip')},
+                               headers={'X-Model-Version': 'v2'})
+        self.assertEqual(response.status_code, 202)
+        job = response.get_json()
+        self.assertEqual(job['total'], 4)
+
+        lines = client.get(f"/batch-jobs/{job['jobId']}/results").get_data(as_text=True).splitlines()
+        results = {row['image']: row for row in map(json.loads, lines)}
+        self.assertEqual(set(results), {'fotos/a.jpg', 'fotos/b.PNG', '../../fora.jpg', 'vazia.jpeg'})
+        self.assertAlmostEqual(results['fotos/a.jpg']['confidence'], 0.30)
+        self.assertEqual(results['fotos/b.PNG']['modelVersion'], 'v2')
+        self.assertFalse(results['vazia.jpeg']['faceDetected'])
+
+        job = self.wait_done(client, job['jobId'])
+        self.assertEqual((job['processed'], job['faces'], job['errors']), (4, 3, 0))
+        # Nenhum arquivo fora da pasta de envio; as imagens pontuadas são apagadas
+        self.assertFalse(os.path.exists(os.path.join(self.folder.name, 'fora.jpg')))
+        self.assertEqual(os.listdir(self.upload_dir), [])
+
+        # Cursor: retoma a transmissão após o último resultado já lido
+        last = json.loads(lines[-1])['cursor']
+        remaining = client.get(f"/batch-jobs/{job['jobId']}/results?after={last}").get_data(as_text=True)
+        self.assertEqual(remaining, '')
+
+        self.assertEqual(client.post('/batch-jobs', data={'archive': (io.BytesIO(b'nada'), 'x.zip')}).status_code, 400)
+        self.assertEqual(client.get('/batch-jobs/inexistente').status_code, 404)
+        manager.stop()
+
+    def test_resumes_pending_images_after_restart(self):
+        """Testa se as imagens sem resultado voltam para a fila quando o servidor reinicia."""
+        stopped = BatchJobManager(score_by_size, self.db_path, self.upload_dir, workers=0)
+        with tempfile.NamedTemporaryFile(suffix='.zip', dir=self.folder.name, delete=False) as archive:
+            archive.write(make_zip({f'{i}.jpg': b'x' * (i + 1) for i in range(5)}).getvalue())
+        job = stopped.submit(archive.name)
+        self.assertEqual(stopped.status(job['jobId'])['status'], 'queued')
+
+        app = Flask(__name__)
+        restarted = BatchJobManager(score_by_size, self.db_path, self.upload_dir, workers=1).install(app)
+        job = self.wait_done(app.test_client(), job['jobId'])
+        self.assertEqual(job['processed'], 5)
+        self.assertEqual([row['image'] for row in restarted.results(job['jobId'])],
+                         [f'{i}.jpg' for i in range(5)])
+        restarted.stop()
+
+    def test_recovers_each_job_once(self):
+        """Testa se só os trabalhos de donos encerrados são retomados, e por um único processo."""
+        submitter = BatchJobManager(score_by_size, self.db_path, self.upload_dir, workers=0, chunk_size=10)
+        job_ids = []
+        for name in ('vivo', 'morto'):
+            with tempfile.NamedTemporaryFile(suffix='.zip', dir=self.folder.name, delete=False) as archive:
+                archive.write(make_zip({f'{name}.jpg': b'x'}).getvalue())
+            job_ids.append(submitter.submit(archive.name)['jobId'])
+
+        # Um dono vivo e um dono que já terminou
+        alive = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+        finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+        finished.wait()
+        self.addCleanup(alive.wait)
+        self.addCleanup(alive.kill)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute("UPDATE jobs SET owner = ? WHERE id = ?", (alive.pid, job_ids[0]))
+            connection.execute("UPDATE jobs SET owner = ? WHERE id = ?", (finished.pid, job_ids[1]))
+
+        first = BatchJobManager(score_by_size, self.db_path, self.upload_dir, workers=0).start()
+        # Outro trabalhador do servidor pre-fork (o processo pai faz as vezes do seu PID)
+        with mock.patch('os.getpid', return_value=os.getppid()):
+            second = BatchJobManager(score_by_size, self.db_path, self.upload_dir, workers=0).start()
+        self.assertEqual([chunk[0] for chunk in list(first._queue.queue)], [job_ids[1]])
+        self.assertTrue(second._queue.empty())
+        with sqlite3.connect(self.db_path) as connection:
+            owners = dict(connection.execute("SELECT id, owner FROM jobs"))
+        self.assertEqual(owners, {job_ids[0]: alive.pid, job_ids[1]: os.getpid()})
+
+    def test_record_after_folder_was_removed(self):
+        """Testa o registro de um bloco cuja pasta já foi apagada por outra thread."""
+        manager = BatchJobManager(score_by_size, self.db_path, self.upload_dir, workers=0, chunk_size=1)
+        with tempfile.NamedTemporaryFile(suffix='.zip', dir=self.folder.name, delete=False) as archive:
+            archive.write(make_zip({'a.jpg': b'a', 'b.jpg': b'bb'}).getvalue())
+        job_id = manager.submit(archive.name)['jobId']
+        chunks = [manager._queue.get_nowait() for _ in range(2)]
+
+        # Outra thread concluiu o trabalho e apagou a pasta enquanto este bloco era pontuado
+        shutil.rmtree(os.path.join(self.upload_dir, job_id))
+        for _, _, rows in chunks:
+            manager._record(job_id, rows, [{'face_detected': False}])
+        self.assertEqual(manager.status(job_id)['status'], 'done')
+
+
+if __name__ == '__main__':
+    unittest.main()
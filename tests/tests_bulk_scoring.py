@@ -0,0 +1,97 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from bulk_scoring import detect_image, list_parts, load_scores, score_directory
+from face_mesh_alignment import align_meshes_for_features, load_template
+from face_mesh_features import FEATURE_NAMES, calculate_anthropometric_features
+
+MODEL = os.path.abspath('../src/models/best_model_3.0_layers_2_neurons_32_lr_0.001_epochs_30.h5')
+
+
+class TestBulkScoring(unittest.TestCase):
+    """Classe de testes para a pontuação em lote de diretórios de imagens."""
+
+    def test_scores_tree_and_resumes(self):
+        """Testa a pontuação recursiva, a gravação em partes e a retomada sem repontuar imagens."""
+        with tempfile.TemporaryDirectory() as folder:
+            root = os.path.join(folder, 'imagens')
+            shutil.copytree('test_images', os.path.join(root, 'a'))
+            shutil.copytree('test_images', os.path.join(root, 'b', 'c'))
+            with open(os.path.join(root, 'b', 'corrompida.jpg'), 'wb') as file:
+                file.write(b'nao e uma imagem')
+            output = os.path.join(folder, 'saida')
+
+            summary = score_directory(root, output, MODEL, flush_every=4, save_features=True)
+            self.assertEqual((summary['images'], summary['errors']), (7, 1))
+            self.assertEqual(len(list_parts(output)), 2)
+            scores = load_scores(output)
+            self.assertEqual(len(scores), 7)
+            faces = scores[scores['face_detected']]
+            self.assertEqual(len(faces), summary['faces'])
+            self.assertTrue(((faces['confidence'] >= 0) & (faces['confidence'] <= 1)).all())
+            np.testing.assert_array_equal(faces['prediction'], np.round(faces['confidence']))
+            self.assertTrue((scores.loc[~scores['face_detected'], 'prediction'] == -1).all())
+
+            # Imagens de a/ e b/c/ são as mesmas: mesmas features e confianças
+            first = scores[scores['image'].str.startswith('a')].reset_index(drop=True)
+            second = scores[scores['image'].str.startswith(os.path.join('b', 'c', ''))].reset_index(drop=True)
+            np.testing.assert_array_equal(first['confidence'], second['confidence'])
+
+            resumed = score_directory(root, output, MODEL)
+            self.assertEqual((resumed['images'], resumed['skipped']), (0, 7))
+
+    def test_rejects_other_configuration(self):
+        """Testa se a retomada recusa uma pasta de saída criada com outra configuração."""
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, 'saida')
+            score_directory('test_images', output, MODEL)
+            with self.assertRaises(ValueError):
+                score_directory('test_images', output, MODEL, alignment='3d')
+
+
+    def test_scores_with_2d_alignment(self):
+        """Testa a pontuação com alinhamento 2D (X e Y alinhados e o Z na mesma escala nas features)."""
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, 'saida')
+            summary = score_directory('test_images', output, MODEL, alignment='2d', save_features=True)
+            self.assertEqual(summary['errors'], 0)
+            scores = load_scores(output)
+            faces = scores[scores['face_detected']]
+            self.assertEqual(len(faces), summary['faces'])
+            self.assertGreater(len(faces), 0)
+            self.assertTrue(((faces['confidence'] >= 0) & (faces['confidence'] <= 1)).all())
+
+            # Malhas alinhadas ficam na escala do gabarito: distâncias bem menores que em pixels
+            pixels = os.path.join(folder, 'pixels')
+            score_directory('test_images', pixels, MODEL, save_features=True)
+            unaligned = load_scores(pixels)
+            unaligned = unaligned[unaligned['face_detected']]
+            self.assertLess(faces['face_width'].max(), unaligned['face_width'].min())
+
+    def test_3d_alignment_uses_image_width(self):
+        """Testa se o alinhamento 3D converte o Z pela largura de cada imagem, como a API."""
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, 'saida')
+            score_directory('test_images', output, MODEL, alignment='3d', save_features=True)
+            scores = load_scores(output).set_index('image')
+
+        template = load_template()
+        for image in ('test_face_valid_0.jpg', 'test_face_valid_2.jpg'):
+            landmarks, width, error = detect_image(os.path.join('test_images', image))
+            self.assertEqual(error, '')
+            self.assertNotEqual(width, 224)
+            expected = calculate_anthropometric_features(
+                align_meshes_for_features(landmarks, template, dims=3, z_scale=width)
+            )[0]
+            np.testing.assert_allclose(scores.loc[image, FEATURE_NAMES].to_numpy(dtype=np.float64), expected,
+                                       rtol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import os
+import sys
+import numpy as np
+import tensorflow as tf
+
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+from dense_model import load_dense_model
+
+MODEL_PATH = '../src/models/best_model_3.0_layers_2_neurons_32_lr_0.001_epochs_30.h5'
+
+
+class TestDenseModel(unittest.TestCase):
+    """Classe de testes para a inferência em NumPy dos modelos Keras densos."""
+
+    def test_matches_keras(self):
+        """Testa se a predição em NumPy coincide com a do Keras para o modelo da API."""
+        model = load_dense_model(MODEL_PATH)
+        keras_model = tf.keras.models.load_model(MODEL_PATH)
+        features = np.random.default_rng(0).uniform(0, 200, size=(32, 39))
+
+        self.assertEqual(model.num_features, 39)
+        np.testing.assert_allclose(
+            model.predict(features), keras_model.predict(features, verbose=0), atol=1e-5
+        )
+
+    def test_rejects_wrong_number_of_features(self):
+        """Testa se entradas com número de features diferente são rejeitadas."""
+        model = load_dense_model(MODEL_PATH)
+        with self.assertRaises(ValueError):
+            model.predict(np.zeros((1, 32)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+import numpy as np
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from detector_profiles import PROFILES, DetectorProfile, get_profile
+import Face_Mesh_Extractor
+from Face_Mesh_Extractor import detect_face_mesh, detect_face_mesh_cascade
+from image_decoding import decode_image_file
+
+HAARCASCADE = os.path.abspath('../data/pretrained_models/haarcascade_frontalface_alt2.xml')
+
+
+class TestDetectorProfiles(unittest.TestCase):
+    """Classe de testes para os perfis de velocidade dos detectores."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.image = decode_image_file('test_images/test_face_valid_2.jpg')
+
+    def test_profiles_return_mesh_in_original_coordinates(self):
+        """Testa se todos os perfis, inclusive com redução da entrada, devolvem 468 marcos na imagem original."""
+        self.assertIs(get_profile(None), PROFILES['balanced'])
+        self.assertIs(get_profile('FAST'), PROFILES['fast'])
+        with self.assertRaises(ValueError):
+            get_profile('turbo')
+
+        reference = np.array(detect_face_mesh(self.image, profile='accurate'))
+        self.assertEqual(reference.shape, (468, 3))
+        height, width, _ = self.image.shape
+        reduced = DetectorProfile('reduzido', max_width=width // 3)
+        self.assertEqual(reduced.resize(self.image).shape[1], width // 3)
+        # O fast difere do balanced no FaceMesh: reduz a entrada
+        self.assertEqual(PROFILES['fast'].resize(self.image).shape[1], 480)
+        self.assertIs(PROFILES['balanced'].resize(self.image), self.image)
+        for profile in [*PROFILES, reduced]:
+            landmarks = np.array(detect_face_mesh(self.image, profile=profile))
+            self.assertEqual(landmarks.shape, (468, 3))
+            # Mesma face, nas mesmas coordenadas: desvio pequeno em relação à largura da imagem
+            deviation = np.linalg.norm(landmarks[:, :2] - reference[:, :2], axis=1)
+            self.assertLess(deviation.mean(), 0.02 * width)
+
+    def test_cascade_uses_profile_parameters(self):
+        """Testa se a detecção em duas etapas usa os parâmetros do Haarcascade do perfil."""
+        for name in PROFILES:
+            landmarks = detect_face_mesh_cascade(self.image, HAARCASCADE, profile=name)
+            self.assertEqual(len(landmarks), 468)
+
+        # minNeighbors impossível de satisfazer: a imagem é rejeitada antes do FaceMesh
+        strict = DetectorProfile('estrito', haar_min_neighbors=10 ** 6)
+        self.assertEqual(detect_face_mesh_cascade(self.image, HAARCASCADE, profile=strict), [])
+
+    def test_face_mesh_closed_when_folder_fails(self):
+        """Testa se o FaceMesh do perfil é fechado quando uma exceção inesperada interrompe a pasta."""
+        face_mesh = mock.MagicMock()
+        with mock.patch.object(DetectorProfile, 'face_mesh', return_value=face_mesh), \
+                mock.patch.object(Face_Mesh_Extractor, 'load_image', side_effect=RuntimeError('falha')):
+            with self.assertRaises(RuntimeError):
+                Face_Mesh_Extractor.process_images_in_folder('test_images', os.devnull, 0, profile='fast')
+        face_mesh.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
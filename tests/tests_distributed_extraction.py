@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from distributed_extraction import (
+    extraction_status,
+    init_work_dir,
+    merge_shards,
+    renew_lease,
+    run_local,
+    try_claim,
+)
+
+
+class TestDistributedExtraction(unittest.TestCase):
+    """Classe de testes para a extração distribuída com concessões em diretório."""
+
+    def test_lease_claim_and_recovery(self):
+        """Testa a exclusividade da concessão e a recuperação de concessões expiradas."""
+        with tempfile.TemporaryDirectory() as work_dir:
+            lease = os.path.join(work_dir, '0-00000.lease')
+            self.assertTrue(try_claim(lease, 'worker-a', lease_seconds=60))
+            self.assertFalse(try_claim(lease, 'worker-b', lease_seconds=60))
+            self.assertTrue(renew_lease(lease, 'worker-a'))
+
+            # worker-a para de renovar (caiu): a concessão expira e é recuperada por worker-b
+            os.utime(lease, (time.time() - 120, time.time() - 120))
+            self.assertTrue(try_claim(lease, 'worker-b', lease_seconds=60))
+            self.assertFalse(renew_lease(lease, 'worker-a'))
+            self.assertTrue(renew_lease(lease, 'worker-b'))
+            self.assertEqual(os.listdir(work_dir), ['0-00000.lease'])
+
+    def test_local_workers_and_merge(self):
+        """Testa vários workers locais, a recuperação do lote de um worker que caiu e a junção dos shards."""
+        with tempfile.TemporaryDirectory() as work_dir:
+            manifest = init_work_dir(work_dir, {'test_images': 1}, batch_size=1)
+            self.assertEqual(len(manifest['batches']), 3)
+            with self.assertRaises(FileExistsError):
+                init_work_dir(work_dir, {'test_images': 1})
+
+            # Concessão abandonada por um worker que caiu no meio do primeiro lote
+            crashed = os.path.join(work_dir, 'leases', '1-00000.lease')
+            with open(crashed, 'w') as file:
+                json.dump({'worker': 'crashed', 'host': 'outro', 'pid': 1, 'claimed': 0}, file)
+            os.utime(crashed, (time.time() - 600, time.time() - 600))
+            with self.assertRaises(RuntimeError):
+                merge_shards(work_dir, {1: os.path.join(work_dir, 'with.csv')})
+
+            self.assertEqual(run_local(work_dir, workers=2, lease_seconds=60, poll_interval=0.2), [0, 0])
+            status = extraction_status(work_dir)
+            self.assertEqual((status['done'], status['leased'], status['expired']), (3, 0, 0))
+            self.assertEqual(os.listdir(os.path.join(work_dir, 'leases')), [])
+
+            output = os.path.join(work_dir, 'with.csv')
+            self.assertEqual(merge_shards(work_dir, {1: output}), {1: status['faces']})
+            merged = pd.read_csv(output)
+            self.assertGreater(len(merged), 0)
+            self.assertTrue(merged['amostra'].is_monotonic_increasing)
+            self.assertEqual(list(merged.columns[:5]), ['amostra', 'class', 'X0', 'Y0', 'Z0'])
+            self.assertEqual(merged.shape[1], 2 + 468 * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
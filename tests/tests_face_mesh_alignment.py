@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+from scipy.spatial.transform import Rotation
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from face_mesh_alignment import (align_meshes, align_meshes_for_features, align_landmark_dataframe, fit_template,
+                                 load_template)
+from Face_Mesh_Extractor import detect_face_mesh, load_image
+
+
+class TestFaceMeshAlignment(unittest.TestCase):
+    """Classe de testes para a normalização de pose por Procrustes em lote."""
+
+    def setUp(self):
+        self.template = load_template()
+        rng = np.random.default_rng(0)
+        self.rotations = Rotation.random(8, random_state=1).as_matrix()
+        self.scales = rng.uniform(20, 100, 8)
+        self.meshes = self.scales[:, None, None] * np.einsum('kd,ned->nke', self.template, self.rotations)
+        self.meshes += rng.uniform(0, 224, (8, 1, 3))
+
+    def test_recovers_similarity_transform(self):
+        """Testa se malhas transformadas (rotação, escala e translação) voltam ao gabarito."""
+        aligned = align_meshes(self.meshes, self.template)
+        self.assertEqual(aligned.shape, (8, 468, 3))
+        np.testing.assert_allclose(aligned, np.broadcast_to(self.template, aligned.shape), atol=1e-9)
+
+        # Uma única malha (468, 3) dá o mesmo resultado que o lote
+        np.testing.assert_allclose(align_meshes(self.meshes[3], self.template)[0], aligned[3], atol=1e-12)
+
+    def test_fit_template_and_dataframe(self):
+        """Testa o ajuste do gabarito e o alinhamento de um DataFrame de marcos."""
+        noisy = self.meshes + np.random.default_rng(2).normal(0, 0.1, self.meshes.shape)
+        template = fit_template(noisy)
+        self.assertAlmostEqual(np.sqrt((template ** 2).sum() / 468), 1.0, places=10)
+        np.testing.assert_allclose(template.mean(axis=0), 0.0, atol=1e-12)
+
+        columns = [f'{axis}{i}' for i in range(468) for axis in ('X', 'Y', 'Z')]
+        df = pd.DataFrame(noisy.reshape(8, -1), columns=columns)
+        df.insert(0, 'amostra', [f'img_{i}.jpg' for i in range(8)])
+        aligned = align_landmark_dataframe(df, template)
+        self.assertEqual(list(aligned.columns), list(df.columns))
+        np.testing.assert_allclose(aligned[columns].to_numpy().reshape(8, 468, 3).mean(axis=0), template, atol=1e-3)
+
+    def test_2d_alignment_scales_z_like_3d(self):
+        """Testa se, em 2D, o Z convertido por z_scale recebe a mesma escala de X e Y."""
+        # Rotação apenas no plano da imagem e Z normalizado pela largura: 2D e 3D diferem só pela
+        # normalização do gabarito (em 2D, o tamanho é o de X e Y)
+        in_plane = Rotation.from_euler('z', np.random.default_rng(3).uniform(-0.5, 0.5, (8, 1))).as_matrix()
+        meshes = self.scales[:, None, None] * np.einsum('kd,ned->nke', self.template, in_plane)
+        meshes[..., 2] /= 600
+        template = self.template - self.template.mean(axis=0)
+        units = np.sqrt((template ** 2).sum() / (template[:, :2] ** 2).sum())
+        expected = align_meshes(meshes, self.template, z_scale=600) * units
+        np.testing.assert_allclose(align_meshes_for_features(meshes, self.template, dims=2, z_scale=600),
+                                   expected, atol=1e-9)
+
+        # Face real: a amplitude do Z alinhado em 2D é comparável à do alinhamento 3D
+        mesh = np.array(detect_face_mesh(load_image('test_images/test_face_valid_0.jpg')), dtype=np.float64)
+        aligned_3d = align_meshes(mesh, self.template, z_scale=600)[0]
+        aligned_2d = align_meshes_for_features(mesh, self.template, dims=2, z_scale=600)[0]
+        ratio = np.ptp(aligned_2d[:, 2]) / np.ptp(aligned_3d[:, 2])
+        self.assertGreater(ratio, 0.8)
+        self.assertLess(ratio, 1.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
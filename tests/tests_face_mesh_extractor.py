@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+import numpy as np
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+import Face_Mesh_Extractor
+from Face_Mesh_Extractor import (
+    load_image,
+    detect_face_mesh,
+    detect_face_roi,
+    detect_face_mesh_cascade,
+    detect_face_meshes,
+)
+
+HAARCASCADE = '../data/pretrained_models/haarcascade_frontalface_alt2.xml'
+
+
+class TestFaceMeshCascade(unittest.TestCase):
+    """Classe de testes para a detecção em duas etapas (Haarcascade + FaceMesh)."""
+
+    def test_detect_face_roi_valid(self):
+        """Testa se a região de interesse encontrada está dentro dos limites da imagem."""
+        image = load_image('test_images/test_face_valid_0.jpg')
+        roi = detect_face_roi(image, HAARCASCADE)
+
+        self.assertIsNotNone(roi)
+        x0, y0, x1, y1 = roi
+        self.assertTrue(0 <= x0 < x1 <= image.shape[1])
+        self.assertTrue(0 <= y0 < y1 <= image.shape[0])
+
+    def test_detect_face_mesh_cascade_rejects_blank_image(self):
+        """Testa se uma imagem sem face é rejeitada antes do FaceMesh."""
+        image = np.zeros((400, 400, 3), dtype=np.uint8)
+        self.assertIsNone(detect_face_roi(image, HAARCASCADE))
+        self.assertEqual(detect_face_mesh_cascade(image, HAARCASCADE), [])
+
+    def test_detect_face_mesh_cascade_matches_full_image(self):
+        """Testa se os marcos do recorte, mapeados para a imagem inteira, coincidem com o FaceMesh completo.
+
+        Verifica se são 468 marcos e se a diferença média em pixels é pequena em relação à face.
+        """
+        image = load_image('test_images/test_face_valid_1.jpg')
+        full = np.array(detect_face_mesh(image))
+        cascade = np.array(detect_face_mesh_cascade(image, HAARCASCADE))
+
+        self.assertEqual(cascade.shape, (468, 3))
+        face_width = full[:, 0].max() - full[:, 0].min()
+        mean_error = np.abs(full[:, :2] - cascade[:, :2]).mean()
+        self.assertLess(mean_error, 0.05 * face_width)
+
+
+class TestFaceMeshMultiFace(unittest.TestCase):
+    """Classe de testes para a extração de múltiplas faces em uma passada."""
+
+    def test_detect_face_meshes_group_image(self):
+        """Testa a extração de duas faces em uma imagem composta lado a lado.
+
+        Verifica o formato (F x 468 x 3), as caixas delimitadoras e as confianças.
+        """
+        image = load_image('test_images/test_face_valid_0.jpg')
+        group = np.ascontiguousarray(np.concatenate([image, image], axis=1))
+
+        meshes, boxes, confidences = detect_face_meshes(group, max_num_faces=4)
+
+        self.assertEqual(meshes.shape, (2, 468, 3))
+        self.assertEqual(boxes.shape, (2, 4))
+        self.assertEqual(confidences.shape, (2,))
+        # Uma face em cada metade da imagem
+        centers = np.sort((boxes[:, 0] + boxes[:, 2]) / 2)
+        self.assertLess(centers[0], image.shape[1])
+        self.assertGreater(centers[1], image.shape[1])
+
+    def test_detect_face_meshes_blank_image(self):
+        """Testa se uma imagem sem faces retorna arrays vazios."""
+        meshes, boxes, confidences = detect_face_meshes(np.zeros((200, 200, 3), dtype=np.uint8))
+        self.assertEqual(meshes.shape, (0, 468, 3))
+        self.assertEqual(len(boxes), 0)
+        self.assertEqual(len(confidences), 0)
+
+    def test_main_dedup_is_opt_in(self):
+        """Testa se a deduplicação só é usada com --dedup, com um índice compartilhado pelas classes."""
+        with mock.patch.object(Face_Mesh_Extractor, 'process_images_in_folder') as process, \
+                mock.patch('os.path.isfile', return_value=False):
+            Face_Mesh_Extractor.main([])
+            self.assertEqual([call.kwargs['dedup_index'] for call in process.call_args_list], [None, None])
+
+            process.reset_mock()
+            Face_Mesh_Extractor.main(['--dedup', '--dedup-distance', '4'])
+            first, second = [call.kwargs['dedup_index'] for call in process.call_args_list]
+            self.assertIs(first, second)
+            self.assertEqual(first.max_distance, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from face_mesh_features import (
+    FEATURE_NAMES,
+    landmarks_to_array,
+    calculate_anthropometric_features,
+)
+
+
+class TestFaceMeshFeatures(unittest.TestCase):
+    """Classe de testes para o motor vetorizado de medidas antropométricas."""
+
+    def test_calculate_features_batch(self):
+        """Testa se o lote gera uma linha de 39 features por face, igual ao cálculo individual."""
+        rng = np.random.default_rng(0)
+        meshes = rng.uniform(0, 500, size=(5, 468, 3))
+
+        features = calculate_anthropometric_features(meshes)
+
+        self.assertEqual(features.shape, (5, len(FEATURE_NAMES)))
+        self.assertEqual(len(FEATURE_NAMES), 39)
+        np.testing.assert_allclose(features[2], calculate_anthropometric_features(meshes[2])[0])
+
+    def test_calculate_features_known_distance(self):
+        """Testa uma distância conhecida (trichion-glabella) em uma malha construída."""
+        mesh = np.zeros((468, 3))
+        mesh[9] = [3, 4, 0]  # trichion
+        features = calculate_anthropometric_features(mesh)
+        self.assertAlmostEqual(features[0, FEATURE_NAMES.index("upper_facial_height")], 5.0)
+
+    def test_landmarks_to_array_invalid_shape(self):
+        """Testa se um formato incompatível com o FaceMesh levanta ValueError."""
+        with self.assertRaises(ValueError):
+            landmarks_to_array([[1, 2], [3, 4]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('../src'))
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+from Face_Mesh_Extractor import detect_face_mesh, load_image
+from face_mesh_pool import FaceMeshPool
+
+IMAGES = [f'test_images/test_face_valid_{i}.jpg' for i in range(3)]
+
+
+class TestFaceMeshPool(unittest.TestCase):
+    """Classe de testes para o pool de processos do FaceMesh com memória compartilhada."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Slots de até 960 x 600: a terceira imagem (1000 x 844) não cabe e segue por pickle
+        cls.pool = FaceMeshPool(num_workers=1, num_slots=2, max_frame_shape=(960, 600))
+        cls.expected = {path: detect_face_mesh(load_image(path)) for path in IMAGES}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def assertSlotsReturned(self):
+        slots = [self.pool._free_slots.get_nowait() for _ in range(self.pool._free_slots.qsize())]
+        for slot in slots:
+            self.pool._free_slots.put(slot)
+        self.assertEqual(sorted(slots), [0, 1])
+
+    def test_detect_matches_detect_face_mesh(self):
+        """Testa se os quadros nos slots e os maiores que o slot dão os mesmos marcos de detect_face_mesh."""
+        self.assertFalse(self.pool._fits(load_image(IMAGES[2]).shape))
+        for path in IMAGES:
+            landmarks = self.pool.detect(load_image(path))
+            self.assertEqual(len(landmarks), 468)
+            self.assertEqual(landmarks, self.expected[path])
+        self.assertSlotsReturned()
+
+    def test_detect_encoded_returns_slots(self):
+        """Testa a decodificação direto no slot, o formato devolvido e a devolução dos slots, inclusive em erros."""
+        for path in IMAGES:
+            with open(path, 'rb') as file:
+                landmarks, shape = self.pool.detect_encoded(file.read(), with_shape=True)
+            self.assertEqual(shape, load_image(path).shape[:2])
+            self.assertEqual(landmarks, self.expected[path])
+        with self.assertRaises(ValueError):
+            self.pool.detect_encoded(b'nao e uma imagem')
+        self.assertSlotsReturned()
+
+
+if __name__ == '__main__':
+    unittest.main()
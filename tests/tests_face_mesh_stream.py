@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+import numpy as np
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from face_mesh_features import calculate_anthropometric_features
+from face_mesh_stream import aggregate_stream_features, predict_stream, stream_face_mesh
+
+
+def synthetic_frames(count):
+    # Quadros pretos pequenos: o FaceMesh roda de verdade, e os marcos vêm de landmarks_from_results
+    for _ in range(count):
+        yield np.zeros((64, 64, 3), dtype=np.uint8)
+
+
+def synthetic_mesh(offset, seed=0):
+    mesh = np.random.default_rng(seed).uniform(0, 200, (468, 3))
+    return mesh + offset
+
+
+class ConstantModel:
+    """Modelo falso que guarda a entrada e devolve a mesma probabilidade."""
+
+    def __init__(self, probability):
+        self.probability = probability
+        self.inputs = []
+
+    def predict(self, x, verbose=0):
+        self.inputs.append(x)
+        return np.full((len(x), 1), self.probability)
+
+
+class TestFaceMeshStream(unittest.TestCase):
+    """Classe de testes para a extração de Face Mesh em vídeo."""
+
+    def test_smoothing_and_reset_after_lost_face(self):
+        """Testa a média móvel exponencial e o reinício quando a face é perdida."""
+        detections = [synthetic_mesh(0), synthetic_mesh(10), [], synthetic_mesh(20), synthetic_mesh(40)]
+        with mock.patch('face_mesh_stream.landmarks_from_results', side_effect=detections):
+            stream = list(stream_face_mesh(synthetic_frames(5), smoothing=0.75))
+
+        self.assertEqual([index for index, _ in stream], [0, 1, 3, 4])
+        np.testing.assert_allclose(stream[0][1], synthetic_mesh(0))
+        np.testing.assert_allclose(stream[1][1], synthetic_mesh(2.5))
+        # Após o quadro sem face, a suavização recomeça do quadro atual
+        np.testing.assert_allclose(stream[2][1], synthetic_mesh(20))
+        np.testing.assert_allclose(stream[3][1], synthetic_mesh(25))
+
+    def test_median_aggregation_and_prediction_shape(self):
+        """Testa a agregação pela mediana dos quadros e o formato da entrada e da saída da predição."""
+        meshes = [synthetic_mesh(0, seed) for seed in range(4)] + [synthetic_mesh(0, 9) * 5]  # quadro discrepante
+        features, per_frame = aggregate_stream_features(enumerate(meshes))
+        self.assertEqual(per_frame.shape, (5, 39))
+        np.testing.assert_allclose(features, np.median(calculate_anthropometric_features(np.stack(meshes)), axis=0))
+        self.assertLess(features.max(), per_frame[4].max())
+
+        features, per_frame = aggregate_stream_features(iter([]))
+        self.assertIsNone(features)
+        self.assertEqual(per_frame.shape, (0, 39))
+
+        model = ConstantModel(0.8)
+        with mock.patch('face_mesh_stream.landmarks_from_results', side_effect=meshes[:3]):
+            result = predict_stream(synthetic_frames(3), model, smoothing=0.0)
+        self.assertEqual(model.inputs[0].shape, (1, 39))
+        self.assertEqual(result, {'success': True, 'frames_with_face': 3, 'prediction': 1, 'confidence': 0.8})
+
+        with mock.patch('face_mesh_stream.landmarks_from_results', return_value=[]):
+            self.assertEqual(predict_stream(synthetic_frames(2), model), {'success': False, 'frames_with_face': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from feature_discovery import known_feature_pairs, rank_pair_distances
+
+
+class TestFeatureDiscovery(unittest.TestCase):
+    """Classe de testes para a exploração de todas as distâncias entre marcos."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.meshes = rng.uniform(0, 200, size=(50, 468, 3)).astype(np.float32)
+        self.labels = np.array([0] * 20 + [1] * 30)
+        # Par com separação forte entre as classes
+        self.meshes[self.labels == 1, 5, :2] += 400
+
+    def test_chunked_statistics_match_direct_computation(self):
+        """Testa se as estatísticas acumuladas em blocos coincidem com o cálculo direto."""
+        ranking = rank_pair_distances(
+            self.meshes, self.labels, chunk_pairs=10000, chunk_rows=7, workers=3
+        ).set_index(['landmark_a', 'landmark_b'])
+        for a, b in [(0, 1), (5, 100), (466, 467)]:
+            d = np.linalg.norm(self.meshes[:, a, :2] - self.meshes[:, b, :2], axis=1).astype(np.float64)
+            x0, x1 = d[self.labels == 0], d[self.labels == 1]
+            pooled = np.sqrt((19 * x0.var(ddof=1) + 29 * x1.var(ddof=1)) / 48)
+            row = ranking.loc[(a, b)]
+            self.assertAlmostEqual(row['mean_with_autism'], x1.mean(), places=3)
+            self.assertAlmostEqual(row['cohen_d'], (x1.mean() - x0.mean()) / pooled, places=4)
+
+    def test_ranking_top_pairs_and_float16(self):
+        """Testa se os pares do marco deslocado lideram a lista, também em float16 com escala."""
+        ranking = rank_pair_distances(self.meshes, self.labels, top_k=20)
+        self.assertEqual(len(ranking), 20)
+        self.assertTrue(((ranking['landmark_a'] == 5) | (ranking['landmark_b'] == 5)).all())
+
+        # Referência de escala com distância fixa
+        self.meshes[:, 1] = self.meshes[:, 0] + np.float32([100, 0, 0])
+        ranking16 = rank_pair_distances(
+            self.meshes, self.labels, dtype=np.float16, reference=(0, 1), top_k=1
+        )
+        self.assertIn(5, ranking16.iloc[0][['landmark_a', 'landmark_b']].tolist())
+
+    def test_known_feature_pairs(self):
+        """Testa o mapeamento das features atuais para os índices dos CSVs."""
+        pairs = known_feature_pairs()
+        self.assertEqual(pairs[(127, 356)], 'face_width')
+
+    def test_known_feature_pairs_lower_philtrum(self):
+        """Testa que o lower_philtrum é mapeado para a coluna X0 dos CSVs."""
+        names = {name for pair, name in known_feature_pairs().items() if 0 in pair}
+        self.assertEqual(names, {
+            'philtrum_height', 'alare_left_lower_philtrum', 'glabella_lower_philtrum',
+            'christa_philtri_left_lower_philtrum', 'cheilion_left_lower_philtrum',
+            'cheilion_right_lower_philtrum',
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
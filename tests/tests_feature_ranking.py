@@ -0,0 +1,62 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from feature_ranking import FeatureRanker, rank_features, select_features
+
+
+class TestFeatureRanking(unittest.TestCase):
+    """Classe de testes para a ordenação vetorizada de features."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        y = rng.integers(0, 2, 600)
+        self.data = pd.DataFrame({
+            'samples': np.arange(600),
+            'class': y,
+            'strong': rng.normal(size=600) + 1.5 * y,
+            'weak': rng.normal(size=600) - 0.3 * y,
+            'noise': rng.normal(size=600),
+        })
+        self.features = ['strong', 'weak', 'noise']
+
+    def test_metrics_match_reference_implementations(self):
+        """Testa a correlação contra ``corr()['class']`` e a AUC contra o scikit-learn."""
+        ranking = rank_features(self.data).set_index('feature')
+        correlation = self.data.drop(columns=['samples']).corr()['class']
+        for feature in self.features:
+            self.assertAlmostEqual(ranking.loc[feature, 'point_biserial'], correlation[feature], places=10)
+            exact_auc = roc_auc_score(self.data['class'], self.data[feature])
+            self.assertAlmostEqual(ranking.loc[feature, 'auc'], exact_auc, delta=0.01)
+        self.assertEqual(list(ranking.index), ['strong', 'weak', 'noise'])
+        self.assertGreater(ranking.loc['strong', 'mutual_information'], ranking.loc['noise', 'mutual_information'])
+
+    def test_incremental_updates(self):
+        """Testa se atualizações em lotes (com NaN) produzem a mesma correlação que um lote único."""
+        data = self.data.copy()
+        data.loc[::7, 'weak'] = np.nan
+        single = FeatureRanker(self.features).update(data[self.features], data['class'])
+        incremental = FeatureRanker(self.features)
+        for part in np.array_split(np.arange(len(data)), 4):
+            incremental.update(data.iloc[part][self.features], data.iloc[part]['class'])
+
+        np.testing.assert_allclose(incremental.point_biserial(), single.point_biserial(), atol=1e-12)
+        np.testing.assert_allclose(incremental.auc(), single.auc(), atol=0.02)
+        self.assertEqual(incremental.histogram[:, 1].sum(), data['weak'].notna().sum())
+
+    def test_select_features_from_csv(self):
+        """Testa a leitura da ordenação salva pelo módulo para escolher as features do treinamento."""
+        path = os.path.join(tempfile.mkdtemp(), 'ranking.csv')
+        rank_features(self.data).to_csv(path, index=False)
+        self.assertEqual(select_features(path, top_k=2), ['strong', 'weak'])
+        self.assertEqual(select_features(path, min_auc_distance=0.2), ['strong'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from feature_statistics import FeatureStatistics, load_statistics
+
+
+class TestFeatureStatistics(unittest.TestCase):
+    """Classe de testes para as estatísticas de padronização incrementais."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal([10.0, -3.0, 1e4], [2.0, 0.5, 30.0], size=(1000, 3))
+        self.names = ['a', 'b', 'c']
+
+    def test_chunked_and_merged_match_standard_scaler(self):
+        """Testa atualizações em blocos e a combinação de parciais contra o ``StandardScaler``."""
+        reference = StandardScaler().fit(self.X)
+        chunked = FeatureStatistics(self.names)
+        for start in range(0, 1000, 77):
+            chunked.update(self.X[start:start + 77])
+
+        # Parciais de "processos" diferentes combinados, incluindo um vazio
+        merged = FeatureStatistics(self.names)
+        for part in np.array_split(self.X, [100, 100, 650]):
+            merged.merge(FeatureStatistics(self.names).update(part) if len(part) else FeatureStatistics(self.names))
+
+        for statistics in (chunked, merged):
+            np.testing.assert_allclose(statistics.mean, reference.mean_, rtol=1e-12)
+            np.testing.assert_allclose(statistics.scale, reference.scale_, rtol=1e-10)
+        np.testing.assert_allclose(chunked.transform(self.X[:5]), reference.transform(self.X[:5]), atol=1e-4)
+
+        # NaN é ignorado por feature
+        with_nan = self.X.copy()
+        with_nan[:10, 0] = np.nan
+        statistics = FeatureStatistics(self.names).update(with_nan)
+        self.assertEqual(statistics.count.tolist(), [990, 1000, 1000])
+        self.assertAlmostEqual(statistics.mean[0], self.X[10:, 0].mean(), places=10)
+
+        with self.assertRaises(ValueError):
+            chunked.merge(FeatureStatistics(['a', 'b', 'x']))
+
+    def test_save_load_and_update(self):
+        """Testa a persistência e a atualização das estatísticas salvas com novas amostras."""
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'feature_statistics.json')
+            FeatureStatistics(self.names).update(self.X[:600]).save(path)
+            loaded = load_statistics(path, num_features=3)
+            self.assertEqual(loaded.feature_names, self.names)
+            loaded.update(self.X[600:])
+            np.testing.assert_allclose(loaded.mean, self.X.mean(axis=0), rtol=1e-12)
+            np.testing.assert_allclose(loaded.variance, self.X.var(axis=0), rtol=1e-10)
+
+            with self.assertRaises(ValueError):
+                load_statistics(path, num_features=39)
+            with self.assertRaises(FileNotFoundError):
+                load_statistics(os.path.join(folder, 'ausente.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+from forest_model import flatten_forest, load_forest_model, save_forest_model
+
+
+class TestForestModel(unittest.TestCase):
+    """Classe de testes para a Random Forest achatada."""
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.X = rng.normal(size=(300, 39)) * rng.uniform(1, 100, 39)
+        cls.y = (cls.X[:, 0] + 0.5 * cls.X[:, 1] + rng.normal(0, 20, 300) > 0).astype(int)
+        cls.forest = RandomForestClassifier(n_estimators=20, random_state=42).fit(cls.X, cls.y)
+
+    def test_matches_predict_proba(self):
+        """Testa se probabilidades e folhas coincidem com as do scikit-learn, inclusive nos limiares."""
+        model = flatten_forest(self.forest)
+        queries = np.vstack([np.random.default_rng(1).normal(size=(50, 39)) * 50, self.X[:10]])
+        # Amostras exatamente sobre os limiares da raiz de cada árvore
+        for estimator in self.forest.estimators_[:5]:
+            edge = self.X[:1].copy()
+            edge[0, estimator.tree_.feature[0]] = estimator.tree_.threshold[0]
+            queries = np.vstack([queries, edge])
+
+        np.testing.assert_allclose(model.predict(queries)[:, 0], self.forest.predict_proba(queries)[:, 1], atol=1e-6)
+        expected_leaves = self.forest.apply(queries)
+        leaves = model.apply(queries) - model.roots
+        for tree, estimator in enumerate(self.forest.estimators_):
+            # Os nós são renumerados em largura; compara as probabilidades das folhas de cada árvore
+            value = estimator.tree_.value[expected_leaves[:, tree], 0, 1]
+            np.testing.assert_allclose(model.value[leaves[:, tree] + model.roots[tree]], value, atol=1e-6)
+        with self.assertRaises(ValueError):
+            model.predict(np.zeros((1, 3)))
+
+    def test_memory_mapped_artifact(self):
+        """Testa se o artefato salvo é carregado mapeado em memória e prediz em lote."""
+        model = flatten_forest(self.forest)
+        with tempfile.TemporaryDirectory() as model_dir:
+            path = os.path.join(model_dir, 'random_forest_3.0.forest')
+            save_forest_model(model, path)
+            loaded = load_forest_model(path)
+            self.assertIsInstance(loaded.child, np.memmap)
+            self.assertEqual(loaded.num_trees, 20)
+            np.testing.assert_array_equal(loaded.predict(self.X), model.predict(self.X))
+            self.assertEqual(loaded.predict(self.X[:1]).shape, (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
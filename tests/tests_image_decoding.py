@@ -0,0 +1,60 @@
+import unittest
+import io
+import os
+import sys
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from image_decoding import (
+    decode_image_bytes,
+    decode_image_file,
+)
+
+
+def encode_jpeg(image: np.ndarray, orientation: int = None) -> bytes:
+    """Codifica uma imagem RGB em JPEG, opcionalmente com a tag EXIF de orientação."""
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[0x0112] = orientation
+    Image.fromarray(image).save(buffer, 'JPEG', quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+class TestImageDecoding(unittest.TestCase):
+    """Classe de testes para o decodificador de imagens com cópia mínima."""
+
+    def test_decode_image_bytes_rgb(self):
+        """Testa se a imagem é decodificada em RGB (e não BGR), contígua e em uint8."""
+        image = np.zeros((32, 48, 3), dtype=np.uint8)
+        image[..., 0] = 255  # vermelho
+
+        decoded = decode_image_bytes(encode_jpeg(image))
+
+        self.assertEqual(decoded.shape, (32, 48, 3))
+        self.assertEqual(decoded.dtype, np.uint8)
+        self.assertTrue(decoded.flags['C_CONTIGUOUS'])
+        self.assertGreater(decoded[..., 0].mean(), 200)
+        self.assertLess(decoded[..., 2].mean(), 50)
+
+    def test_decode_image_bytes_exif_orientation(self):
+        """Testa se a orientação EXIF (rotação de 90 graus) é aplicada."""
+        image = np.zeros((32, 48, 3), dtype=np.uint8)
+        decoded = decode_image_bytes(encode_jpeg(image, orientation=6))
+        self.assertEqual(decoded.shape, (48, 32, 3))
+
+    def test_decode_image_bytes_invalid(self):
+        """Testa se um conteúdo que não é imagem levanta ValueError."""
+        with self.assertRaises(ValueError):
+            decode_image_bytes(b'isto nao e uma imagem')
+
+    def test_decode_image_file_invalid_path(self):
+        """Testa se um caminho inexistente levanta FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            decode_image_file('invalid_path.jpg')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+import cv2
+import numpy as np
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from image_dedup import HashIndex, hamming_distance, hash_image_file, main, perceptual_hash
+
+
+class TestImageDedup(unittest.TestCase):
+    """Classe de testes para o índice de deduplicação por hash perceptual."""
+
+    def test_perceptual_hash_near_duplicates(self):
+        """Testa se cópias redimensionadas e recomprimidas ficam próximas e imagens diferentes, distantes."""
+        image = cv2.cvtColor(cv2.imread('test_images/test_face_valid_0.jpg'), cv2.COLOR_BGR2RGB)
+        other = cv2.cvtColor(cv2.imread('test_images/test_face_valid_1.jpg'), cv2.COLOR_BGR2RGB)
+        resized = cv2.resize(image, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+        _, jpeg = cv2.imencode('.jpg', resized, [cv2.IMWRITE_JPEG_QUALITY, 60])
+        recompressed = cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+
+        original = perceptual_hash(image)
+        self.assertLess(original, 2 ** 64)
+        self.assertLessEqual(hamming_distance(original, perceptual_hash(recompressed)), 6)
+        self.assertGreater(hamming_distance(original, perceptual_hash(other)), 6)
+        self.assertLessEqual(hamming_distance(original, hash_image_file('test_images/test_face_valid_0.jpg')), 2)
+        self.assertIsNone(hash_image_file('test_images/missing.jpg'))
+
+    def test_index_matches_brute_force_and_flags_cross_class(self):
+        """Testa se o índice encontra os mesmos vizinhos da força bruta e acusa duplicatas entre classes."""
+        rng = np.random.default_rng(0)
+        hashes = [int(h) for h in rng.integers(0, 2 ** 63, 300)]
+        # Quase duplicatas: até 6 bits trocados em posições aleatórias
+        hashes += [h ^ sum(1 << int(b) for b in rng.choice(64, rng.integers(0, 7), replace=False))
+                   for h in hashes[:100]]
+        index = HashIndex(max_distance=6)
+        for i, image_hash in enumerate(hashes[:300]):
+            index.add(image_hash, i)
+        for image_hash in hashes[300:]:
+            expected = sorted(i for i, h in enumerate(hashes[:300]) if hamming_distance(h, image_hash) <= 6)
+            self.assertEqual(sorted(key for key, _ in index.query(image_hash)), expected)
+        with self.assertRaises(ValueError):
+            index.query(hashes[0], max_distance=7)
+
+        index = HashIndex(max_distance=4)
+        self.assertFalse(index.check_duplicate(hashes[0], 'a.jpg', class_label=0))
+        self.assertTrue(index.check_duplicate(hashes[0] ^ 1, 'b.jpg', class_label=0))
+        self.assertTrue(index.check_duplicate(hashes[0] ^ 3, 'c.jpg', class_label=1))
+        self.assertFalse(index.check_duplicate(hashes[1], 'd.jpg', class_label=1))
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.cross_class, [('c.jpg', 1, 'a.jpg', 0, 2)])
+
+    def test_main_parses_class_and_folder(self):
+        """Testa os argumentos classe:pasta, pastas sem classe e caminhos do Windows com letra de unidade."""
+        with mock.patch('image_dedup.find_duplicates') as find_duplicates:
+            main(['0:fotos/a', '1:C:\\fotos\\b', 'D:\\fotos\\c', 'fotos/d', '--output', os.devnull])
+        self.assertEqual(find_duplicates.call_args[0][0],
+                         {'fotos/a': 0, 'C:\\fotos\\b': 1, 'D:\\fotos\\c': None, 'fotos/d': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from Face_Mesh_Extractor import process_images_in_folder
+from image_decoding import decode_image_file
+from image_shards import ShardReader, is_shard_dir, pack_images
+
+
+class TestImageShards(unittest.TestCase):
+    """Classe de testes para os shards empacotados de imagens."""
+
+    def test_pack_and_read_records(self):
+        """Testa o empacotamento em vários shards, a leitura por índice e em fluxo e a verificação do CRC32."""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            # Shards pequenos: cada imagem vai para um shard próprio
+            pack_images({'test_images': 1}, shard_dir, shard_bytes=1)
+            self.assertTrue(is_shard_dir(shard_dir))
+            with self.assertRaises(FileExistsError):
+                pack_images({'test_images': 1}, shard_dir)
+
+            with ShardReader(shard_dir) as reader:
+                self.assertEqual(len(reader), 3)
+                self.assertEqual(len(reader.shards), 3)
+                self.assertEqual(list(reader.records(label=0)), [])
+                for record, name in enumerate(reader.names):
+                    path = os.path.join('test_images', name.split('/', 1)[1])
+                    with open(path, 'rb') as file:
+                        self.assertEqual(reader.read(record, verify=True), file.read())
+                    np.testing.assert_array_equal(reader.decode(record), decode_image_file(path))
+                streamed = dict(reader.iter_records(reader.records()[::-1], verify=True))
+                self.assertEqual(streamed, {record: reader.read(record) for record in range(3)})
+
+            # Um byte corrompido no shard é acusado pelo CRC32
+            with open(os.path.join(shard_dir, 'shard-00001.bin'), 'r+b') as file:
+                file.seek(100)
+                byte = file.read(1)
+                file.seek(100)
+                file.write(bytes([byte[0] ^ 0xFF]))
+            with ShardReader(shard_dir) as reader:
+                with self.assertRaises(ValueError):
+                    reader.read(1, verify=True)
+
+    def test_process_images_from_shards(self):
+        """Testa se a extração a partir dos shards gera os mesmos marcos que a extração da pasta."""
+        with tempfile.TemporaryDirectory() as folder:
+            # A mesma pasta com o rótulo 1: apenas os registros da classe pedida são processados
+            other = shutil.copytree('test_images', os.path.join(folder, 'outras'))
+            shard_dir = os.path.join(folder, 'shards')
+            pack_images({'test_images': 0, other: 1}, shard_dir)
+            from_folder = os.path.join(folder, 'pasta.csv')
+            from_shards = os.path.join(folder, 'shards.csv')
+            process_images_in_folder('test_images', from_folder, class_label=0)
+            process_images_in_folder(shard_dir, from_shards, class_label=0)
+
+            expected = pd.read_csv(from_folder).drop(columns='amostra')
+            result = pd.read_csv(from_shards).drop(columns='amostra')
+            self.assertEqual(len(result), len(expected))
+            sort = lambda frame: frame.sort_values(list(frame.columns)).reset_index(drop=True)
+            pd.testing.assert_frame_equal(sort(result), sort(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
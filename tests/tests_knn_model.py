@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+from knn_model import build_knn_model, load_knn_model, save_knn_model
+from model_registry import ModelRegistry
+from prediction_cache import model_artifact_version
+
+
+def make_data(n: int = 400, features: int = 39, seed: int = 0) -> tuple:
+    """Gera features sintéticas em escalas diferentes, com a classe dependente das primeiras colunas."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, features)) * rng.uniform(1, 100, features)
+    y = (X[:, 0] / X[:, 0].std() + X[:, 1] / X[:, 1].std() > 0).astype(int)
+    return X, y
+
+
+class TestKNNModel(unittest.TestCase):
+    """Classe de testes para o classificador KNN servido por árvore mapeada em memória."""
+
+    def test_matches_scikit_learn(self):
+        """Testa se as probabilidades coincidem com as do KNeighborsClassifier sobre features padronizadas."""
+        X, y = make_data()
+        queries = np.vstack([make_data(50, seed=1)[0], X[:5]])  # inclui vizinhos à distância zero
+        scaler = StandardScaler().fit(X)
+        for weights, metric, algorithm in [('uniform', 'euclidean', 'ball_tree'), ('distance', 'manhattan', 'kd_tree')]:
+            model = build_knn_model(X, y, n_neighbors=7, weights=weights, metric=metric, algorithm=algorithm)
+            reference = KNeighborsClassifier(n_neighbors=7, weights=weights, metric=metric).fit(scaler.transform(X), y)
+            expected = reference.predict_proba(scaler.transform(queries))[:, 1:]
+            np.testing.assert_allclose(model.predict(queries), expected, atol=1e-6)
+        with self.assertRaises(ValueError):
+            model.predict(np.zeros((1, 3)))
+
+    def test_memory_mapped_artifact_in_registry(self):
+        """Testa se o artefato salvo é mapeado em memória e servido pelo registro de modelos."""
+        X, y = make_data()
+        model = build_knn_model(X, y, n_neighbors=5)
+        with tempfile.TemporaryDirectory() as model_dir:
+            path = os.path.join(model_dir, 'knn_3.0.knn')
+            save_knn_model(model, path)
+            loaded = load_knn_model(path)
+            self.assertIsInstance(loaded.tree.get_arrays()[0], np.memmap)
+            np.testing.assert_array_equal(loaded.predict(X[:20]), model.predict(X[:20]))
+
+            registry = ModelRegistry(model_dir, loader=load_knn_model, version_of=model_artifact_version)
+            selected = registry.select()
+            self.assertEqual(selected.name, 'knn_3.0')
+            self.assertEqual(selected.model.predict(X[:3]).shape, (3, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from face_mesh_alignment import load_template
+from face_mesh_features import FEATURE_NAMES, calculate_anthropometric_features
+from landmark_augmentation import LandmarkAugmenter, default_mirror_permutation
+from training_data_loader import LANDMARK_COLUMNS, ShardedDataset
+
+
+def synthetic_meshes(count: int, seed: int = 0) -> np.ndarray:
+    """Malhas do gabarito canônico em pixels, com pequenas variações de posição, escala e forma."""
+    rng = np.random.default_rng(seed)
+    template = load_template()
+    template = (template - template.mean(axis=0)) / np.ptp(template[:, 0])
+    scale = rng.uniform(90, 130, (count, 1, 1))
+    meshes = template * scale + rng.normal(0, 0.5, (count, 468, 3))
+    meshes[..., :2] += rng.uniform(90, 130, (count, 1, 2))
+    meshes[..., 2] /= 224
+    return meshes
+
+
+class TestLandmarkAugmentation(unittest.TestCase):
+    """Classe de testes para o aumento de dados vetorizado das malhas faciais."""
+
+    def test_mirror_swaps_left_and_right(self):
+        """Testa a permutação esquerda/direita, o espelhamento e a transformação identidade."""
+        permutation = default_mirror_permutation()
+        np.testing.assert_array_equal(permutation[permutation], np.arange(468))
+        for left, right in [(33, 263), (133, 362), (61, 291), (234, 454)]:
+            self.assertEqual(permutation[left], right)
+        for midline in (1, 4, 10, 152, 168):
+            self.assertEqual(permutation[midline], midline)
+
+        meshes = synthetic_meshes(20)
+        fixed = dict(max_roll=0, max_yaw=0, max_pitch=0, scale_range=(1, 1), jitter=0)
+        identity = LandmarkAugmenter(mirror_probability=0, **fixed).augment(meshes)
+        np.testing.assert_allclose(identity, meshes, atol=1e-3)
+
+        mirror = LandmarkAugmenter(mirror_probability=1, **fixed)
+        np.testing.assert_allclose(mirror.augment(mirror.augment(meshes)), meshes, atol=1e-2)
+        features = calculate_anthropometric_features(meshes)
+        mirrored = mirror.features(meshes)
+        for name in ('eye_left_width', 'eye_to_mouth_left', 'endo_canthus_glabella_left'):
+            left, right = FEATURE_NAMES.index(name), FEATURE_NAMES.index(name.replace('left', 'right'))
+            np.testing.assert_allclose(mirrored[:, left], features[:, right], rtol=1e-4)
+
+        # Rotação no plano da imagem e escala multiplicam todas as distâncias pelo mesmo fator
+        in_plane = LandmarkAugmenter(mirror_probability=0, max_yaw=0, max_pitch=0, jitter=0, seed=1)
+        augmented = in_plane.features(meshes)
+        ratio = augmented / features
+        np.testing.assert_allclose(ratio, np.repeat(ratio[:, :1], ratio.shape[1], axis=1), rtol=2e-3)
+        self.assertFalse(np.allclose(augmented, features))
+
+    def test_sharded_dataset_augments_each_epoch(self):
+        """Testa se o ShardedDataset aumenta as malhas a cada época, mantendo as estatísticas originais."""
+        with tempfile.TemporaryDirectory() as folder:
+            for label in (0, 1):
+                frame = pd.DataFrame(synthetic_meshes(60, seed=label).reshape(60, -1), columns=LANDMARK_COLUMNS)
+                frame.insert(0, 'class', label)
+                frame.to_csv(os.path.join(folder, f'face_mesh_{label}.csv'), index=False)
+            pd.DataFrame({'class': [0], 'a': [1.0]}).to_csv(os.path.join(folder, 'distances.csv'), index=False)
+
+            shard_pattern = os.path.join(folder, 'face_mesh_*.csv')
+            with self.assertRaises(ValueError):
+                ShardedDataset([folder], augmenter=LandmarkAugmenter())
+            options = dict(batch_size=16, shuffle=False, prefetch_batches=2)
+            plain = ShardedDataset([shard_pattern], **options)
+            dataset = ShardedDataset([shard_pattern], augmenter=LandmarkAugmenter(), **options)
+            np.testing.assert_allclose(dataset.fit_statistics().mean, plain.fit_statistics().mean, rtol=1e-5)
+            self.assertEqual(dataset.num_samples, 120)
+
+            epochs = [np.concatenate([X for X, _ in dataset.epoch(epoch)]) for epoch in (0, 1, 0)]
+            original = np.concatenate([X for X, _ in plain.epoch(0)])
+            self.assertEqual(epochs[0].shape, (120, len(FEATURE_NAMES)))
+            self.assertFalse(np.allclose(epochs[0], original))
+            self.assertFalse(np.allclose(epochs[0], epochs[1]))
+            np.testing.assert_array_equal(epochs[0], epochs[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import tracemalloc
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from memory_profiling import StageMemoryTracker, current_rss, format_report, peak_rss
+
+
+class TestMemoryProfiling(unittest.TestCase):
+    """Classe de testes para a contabilidade de memória por etapa."""
+
+    def test_stages_and_allocation_sites(self):
+        """Testa alocações retidas, picos transitórios e os locais de alocação do relatório."""
+        tracker = StageMemoryTracker().start()
+        retained = []
+        for _ in range(3):
+            with tracker.stage('decode'):
+                retained.append(bytearray(2 * 2 ** 20))
+            with tracker.stage('writing'):
+                temporary = bytearray(4 * 2 ** 20)
+                del temporary
+        report = tracker.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+
+        decode, writing = report['stages']['decode'], report['stages']['writing']
+        self.assertEqual(decode['calls'], 3)
+        self.assertAlmostEqual(decode['netBytes'] / 2 ** 20, 6, delta=0.1)
+        self.assertAlmostEqual(writing['netBytes'] / 2 ** 20, 0, delta=0.1)
+        self.assertAlmostEqual(writing['maxPeakBytes'] / 2 ** 20, 4, delta=0.1)
+        self.assertGreaterEqual(report['tracedPeakBytes'], 10 * 2 ** 20)
+        self.assertIn('tests_memory_profiling.py', report['topAllocationSites'][0]['site'])
+        self.assertIn('decode', format_report(report))
+
+    def test_disabled_and_rss_only(self):
+        """Testa o rastreador desligado e o modo que mede apenas RSS e tempo."""
+        tracker = StageMemoryTracker(enabled=False).start()
+        with tracker.stage('decode'):
+            pass
+        self.assertEqual(tracker.stop(), {})
+
+        tracker = StageMemoryTracker(trace_allocations=False).start()
+        with tracker.stage('detection'):
+            self.assertFalse(tracemalloc.is_tracing())
+        report = tracker.stop()
+        self.assertEqual(report['stages']['detection']['calls'], 1)
+        self.assertEqual(report['topAllocationSites'], [])
+        self.assertGreater(report['rssEndBytes'], 0)
+
+    def test_rss_without_resource_and_on_macos(self):
+        """Testa o RSS sem o módulo resource (Windows) e a unidade do ru_maxrss no macOS."""
+        linux_peak = peak_rss()
+        with mock.patch('sys.platform', 'darwin'):
+            self.assertEqual(peak_rss() * 1024, linux_peak)
+
+        with mock.patch.dict(sys.modules, {'resource': None}), \
+                mock.patch('builtins.open', side_effect=OSError):
+            self.assertEqual(peak_rss(), 0)
+            self.assertEqual(current_rss(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
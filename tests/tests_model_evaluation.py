@@ -0,0 +1,109 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score, roc_auc_score, roc_curve
+
+sys.path.insert(0, os.path.abspath('../src'))
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+import forest_model
+import knn_model
+from model_evaluation import (bootstrap_metrics, bootstrap_weights, curve_table, evaluate_models, main,
+                              predict_models, stack_predictions, threshold_sweep, weighted_metrics)
+
+
+class TestModelEvaluation(unittest.TestCase):
+    """Classe de testes para a avaliação vetorizada de modelos com bootstrap."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.y = rng.integers(0, 2, 300)
+        self.predictions = {
+            'bom': 1 / (1 + np.exp(-(rng.normal(size=300) + 2 * (self.y - 0.5)))),
+            'empates': np.round(rng.random(300) * 10) / 10,  # frações de votos, com muitos empates
+            'constante': np.full(300, 0.5),
+        }
+
+    def test_metrics_match_sklearn_on_each_resample(self):
+        """Testa as métricas e curvas contra o scikit-learn, na amostra original e em reamostragens explícitas."""
+        names, scores = stack_predictions(self.predictions)
+        point = weighted_metrics(self.y, scores, np.ones((1, 300)))
+        weights = bootstrap_weights(self.y, 5, np.random.default_rng(1))
+        np.testing.assert_array_equal(weights[:, self.y == 1].sum(axis=1), (self.y == 1).sum())
+        resampled = weighted_metrics(self.y, scores, weights)
+        curves = curve_table(self.y, self.predictions)
+        for m, name in enumerate(names):
+            self.assertAlmostEqual(point['auc'][0, m], roc_auc_score(self.y, scores[m]))
+            self.assertAlmostEqual(point['accuracy'][0, m], np.mean((scores[m] >= 0.5) == self.y))
+            for b, counts in enumerate(weights):
+                rows = np.repeat(np.arange(300), counts.astype(int))
+                self.assertAlmostEqual(resampled['auc'][b, m], roc_auc_score(self.y[rows], scores[m, rows]))
+            fpr, tpr, _ = roc_curve(self.y, scores[m], drop_intermediate=False)
+            curve = curves[curves['model'] == name]
+            np.testing.assert_allclose(curve['fpr'], fpr[1:])
+            np.testing.assert_allclose(curve['tpr'], tpr[1:])
+
+        summary, _ = evaluate_models(self.y, self.predictions, n_bootstrap=200)
+        expected = [average_precision_score(self.y, scores[m]) for m in range(3)]
+        np.testing.assert_allclose(summary['average_precision'], expected)
+
+        sweep = threshold_sweep(self.y, self.predictions, thresholds=[0.5])
+        np.testing.assert_allclose(sweep['accuracy'], point['accuracy'][0])
+        with self.assertRaises(ValueError):
+            bootstrap_metrics(np.zeros(300), scores)
+
+    def test_evaluate_models_reports_intervals_and_paired_differences(self):
+        """Testa os intervalos, as diferenças pareadas e os arquivos gravados pela linha de comando."""
+        summary, comparison = evaluate_models(self.y, self.predictions, n_bootstrap=1000, reference='constante')
+        self.assertEqual(list(summary['model']), list(self.predictions))
+        for metric in ('auc', 'accuracy', 'brier'):
+            self.assertTrue((summary[f'{metric}_low'] <= summary[metric]).all())
+            self.assertTrue((summary[metric] <= summary[f'{metric}_high']).all())
+        constant = summary[summary['model'] == 'constante'].iloc[0]
+        self.assertEqual((constant['auc_low'], constant['auc_high']), (0.5, 0.5))
+
+        # O modelo bom supera a referência constante; o aleatório com empates não
+        auc = comparison[comparison['metric'] == 'auc'].set_index('model')
+        self.assertGreater(auc.loc['bom', 'low'], 0)
+        self.assertLess(auc.loc['bom', 'p_value'], 0.01)
+        self.assertLess(auc.loc['empates', 'low'], 0)
+        self.assertGreater(auc.loc['empates', 'high'], 0)
+        with self.assertRaises(ValueError):
+            evaluate_models(self.y, self.predictions, reference='inexistente')
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'predicoes.csv')
+            pd.DataFrame({'class': self.y, **self.predictions}).to_csv(path, index=False)
+            main([path, '--bootstrap', '100', '--output-dir', folder])
+            for name in ('summary', 'comparison', 'thresholds', 'curves'):
+                self.assertTrue(os.path.exists(os.path.join(folder, f'{name}.csv')))
+            self.assertEqual(len(pd.read_csv(os.path.join(folder, 'thresholds.csv'))), 3 * 101)
+
+    def test_predict_models_excludes_training_rows(self):
+        """Testa se os exportadores treinam sem a validação e se artefatos que a viram são recusados."""
+        rng = np.random.default_rng(1)
+        with tempfile.TemporaryDirectory() as folder:
+            shard = os.path.join(folder, 'distances.csv')
+            df = pd.DataFrame(rng.normal(size=(400, 3)), columns=['a', 'b', 'c'])
+            df['class'] = (df['a'] > 0).astype(int)
+            df.to_csv(shard, index=False)
+            model_dir = os.path.join(folder, 'models')
+            os.makedirs(model_dir)
+
+            knn_path = os.path.join(model_dir, 'knn.knn')
+            knn_model.main([shard, '--output', knn_path])
+            y_true, predictions = predict_models(model_dir, [shard])
+            self.assertEqual(len(knn_model.load_knn_model(knn_path).labels) + len(y_true), 400)
+            self.assertEqual(predictions['knn'].shape, y_true.shape)
+
+            forest_model.main([shard, '--output', os.path.join(model_dir, 'rf.forest'), '--n-estimators', '5',
+                               '--validation-fraction', '0'])
+            with self.assertRaises(ValueError):
+                predict_models(model_dir, [shard])
+
+
+if __name__ == '__main__':
+    unittest.main()
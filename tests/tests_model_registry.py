@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+from model_registry import ModelRegistry, parse_splits
+from prediction_cache import model_artifact_version
+
+
+class FakeModel:
+    """Modelo falso que rejeita entradas com número de features diferente do esperado."""
+
+    def __init__(self, num_features):
+        self.num_features = num_features
+
+    def predict(self, x, verbose=0):
+        if x.shape[1] != self.num_features:
+            raise ValueError('Número de features incompatível.')
+        return np.zeros((len(x), 1))
+
+
+def fake_loader(path):
+    """Carrega um 'artefato' cujo conteúdo é o número de features do modelo."""
+    with open(path) as f:
+        return FakeModel(int(f.read()))
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Classe de testes para o registro de modelos com troca a quente."""
+
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+        self.write('a', 39)
+        self.write('b', 39)
+
+    def write(self, name, num_features):
+        with open(os.path.join(self.model_dir, name + '.h5'), 'w') as f:
+            f.write(str(num_features))
+
+    def test_routing(self):
+        """Testa o roteamento por cabeçalho, divisão determinística e versão padrão."""
+        registry = ModelRegistry(self.model_dir, fake_loader, model_artifact_version, default_model='b')
+        self.assertEqual(registry.select().name, 'b')
+        self.assertEqual(registry.select('a').name, 'a')
+        with self.assertRaises(KeyError):
+            registry.select('c')
+
+        registry.splits = parse_splits('a:50, b:50')
+        self.assertEqual(registry.splits, {'a': 50.0, 'b': 50.0})
+        names = {registry.select(routing_key=str(i)).name for i in range(50)}
+        self.assertEqual(names, {'a', 'b'})
+        self.assertEqual(registry.select(routing_key='x').name, registry.select(routing_key='x').name)
+
+    def test_refresh_swaps_stable_artifacts_and_skips_incompatible(self):
+        """Testa que artefatos novos só são publicados após estabilizar e que incompatíveis são ignorados."""
+        registry = ModelRegistry(self.model_dir, fake_loader, model_artifact_version)
+        self.write('c', 39)
+        self.write('d', 32)  # incompatível com as 39 features da API
+        self.assertFalse(registry.refresh())  # primeira verificação: aguardando estabilizar
+        self.assertTrue(registry.refresh())
+        self.assertEqual(sorted(registry.versions()), ['a', 'b', 'c'])
+        self.assertFalse(registry.refresh())  # 'd' não é recarregado sem mudar
+
+        os.remove(os.path.join(self.model_dir, 'a.h5'))
+        self.assertTrue(registry.refresh())
+        self.assertEqual(sorted(registry.versions()), ['b', 'c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.abspath('../src'))
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+# A API lê a configuração do ambiente ao ser importada: alinhamento 2D e modelo denso em NumPy
+TEMP_DIR = tempfile.TemporaryDirectory()
+os.environ.update({
+    'MODEL_DIR': os.path.abspath('../src/models'),
+    'MODEL_LOADER': 'numpy',
+    'MESH_ALIGNMENT': '2d',
+    'BATCH_JOBS_DB': os.path.join(TEMP_DIR.name, 'jobs.db'),
+    'BATCH_UPLOAD_DIR': os.path.join(TEMP_DIR.name, 'uploads'),
+    'PROFILE_DIR': os.path.join(TEMP_DIR.name, 'profiles'),
+})
+
+import AutismPredictionAPI as api  # noqa: E402
+from face_mesh_alignment import align_meshes_for_features  # noqa: E402
+from face_mesh_features import calculate_anthropometric_features  # noqa: E402
+
+
+class TestPredictionAPI(unittest.TestCase):
+    """Classe de testes para as rotas de extração e predição da API."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = api.app.test_client()
+        with open('test_images/test_face_valid_2.jpg', 'rb') as file:
+            response = cls.client.post('/extract-face-mesh', data={'image': (file, 'face.jpg')})
+        cls.extracted = response.get_json()
+
+    @classmethod
+    def tearDownClass(cls):
+        api.model_registry.stop_watching()
+        api.batch_jobs.stop()
+
+    def tearDown(self):
+        api.mesh_alignment = '2d'
+
+    def test_predict_with_2d_alignment(self):
+        """Testa a predição com MESH_ALIGNMENT=2d, da extração à resposta da rota."""
+        self.assertTrue(self.extracted['success'])
+        self.assertGreater(self.extracted['imageWidth'], 0)
+        response = self.client.post('/predict-autism', json={'faceMesh': self.extracted['faceMesh'],
+                                                             'imageWidth': self.extracted['imageWidth']})
+        self.assertEqual(response.status_code, 200)
+        result = response.get_json()
+        self.assertTrue(result['success'])
+        self.assertIn(result['prediction'], (0, 1))
+        self.assertTrue(0 <= result['confidence'] <= 1)
+
+        # As features são as de X e Y alinhados com o Z convertido pela largura da imagem e na mesma
+        # escala, como nos CSVs alinhados em 2D
+        mesh = np.array(self.extracted['faceMesh'], dtype=np.float64)
+        width = self.extracted['imageWidth']
+        aligned = api.normalize_pose(mesh[None], [width])
+        self.assertEqual(aligned.shape, (1, 468, 3))
+        self.assertGreater(np.ptp(aligned[0, :, 2]), 0.25 * np.ptp(aligned[0, :, 0]))
+        expected = calculate_anthropometric_features(
+            align_meshes_for_features(mesh, api.mesh_template, dims=2, z_scale=width)
+        )
+        np.testing.assert_allclose(calculate_anthropometric_features(aligned), expected)
+
+    def test_image_width_scales_z_in_3d_alignment(self):
+        """Testa se a largura da imagem enviada muda a escala do Z no alinhamento 3D."""
+        api.mesh_alignment = '3d'
+        mesh = self.extracted['faceMesh']
+        for width in (224, 2240):
+            response = self.client.post('/predict-autism', json={'faceMeshes': [mesh], 'imageWidth': width})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.get_json()['success'])
+        features = [calculate_anthropometric_features(api.normalize_pose(np.array([mesh]), [width]))
+                    for width in (224, 2240)]
+        self.assertFalse(np.allclose(features[0], features[1]))
+
+        response = self.client.post('/predict-autism', json={'faceMesh': mesh, 'imageWidth': -1})
+        self.assertEqual(response.status_code, 400)
+
+    def test_extract_face_meshes_validates_and_reuses_detectors(self):
+        """Testa a rejeição de maxFaces fora do intervalo e o reaproveitamento do FaceMesh e do Face Detection."""
+        for max_faces in ('0', '-1', str(api.max_faces_limit + 1), 'muitas'):
+            with open('test_images/test_face_valid_2.jpg', 'rb') as file:
+                response = self.client.post('/extract-face-meshes',
+                                            data={'image': (file, 'face.jpg'), 'maxFaces': max_faces})
+            self.assertEqual(response.status_code, 400)
+
+        detectors, responses = [], []
+        for _ in range(2):
+            with open('test_images/test_face_valid_2.jpg', 'rb') as file:
+                responses.append(self.client.post('/extract-face-meshes',
+                                                  data={'image': (file, 'face.jpg'), 'maxFaces': '3'}))
+            detectors.append((api.get_face_mesh(api.detector_profile, 3), api.get_face_detection()))
+        self.assertEqual(detectors[0], detectors[1])
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.get_json()['faceMeshes']), 1)
+        self.assertEqual(responses[0].get_json(), responses[1].get_json())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+from prediction_cache import (
+    PredictionCache,
+    mesh_key,
+    model_artifact_version,
+)
+
+
+class TestPredictionCache(unittest.TestCase):
+    """Classe de testes para o cache de features e predições por hash da malha."""
+
+    def test_mesh_key_quantization(self):
+        """Testa se malhas iguais após a quantização geram a mesma chave, e versões diferentes não."""
+        # Valores sobre a grade de quantização, longe dos limites de arredondamento
+        mesh = np.round(np.random.default_rng(0).uniform(-1, 1, size=(468, 3)), 4)
+        noisy = mesh + 1e-7
+        self.assertEqual(mesh_key(mesh, 'v1'), mesh_key(noisy, 'v1'))
+        self.assertEqual(mesh_key(np.zeros((468, 3)), 'v1'), mesh_key(-np.zeros((468, 3)), 'v1'))
+        self.assertNotEqual(mesh_key(mesh, 'v1'), mesh_key(mesh, 'v2'))
+        self.assertNotEqual(mesh_key(mesh, 'v1'), mesh_key(mesh + 0.01, 'v1'))
+
+    def test_lru_eviction_and_stats(self):
+        """Testa o descarte da entrada menos usada e a taxa de acerto."""
+        cache = PredictionCache(max_entries=2)
+        cache.put('a', np.zeros(39), 0.1)
+        cache.put('b', np.zeros(39), 0.2)
+        self.assertEqual(cache.get('a')[1], 0.1)  # 'a' passa a ser a mais recente
+        cache.put('c', np.zeros(39), 0.3)  # descarta 'b'
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c')[1], 0.3)
+        stats = cache.stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertAlmostEqual(stats['hitRatio'], 2 / 3)
+
+    def test_model_artifact_version_changes(self):
+        """Testa se a versão do artefato muda quando o arquivo do modelo é substituído."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model.h5')
+            with open(path, 'wb') as f:
+                f.write(b'modelo 1')
+            version = model_artifact_version(path)
+            with open(path, 'wb') as f:
+                f.write(b'modelo 2 maior')
+            self.assertNotEqual(version, model_artifact_version(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+from prefork_server import memory_report, process_memory
+
+SMAPS_ROLLUP = """00400000-7ffc4a1c2000 ---p 00000000 00:00 0                      [rollup]
+Rss:              204800 kB
+Pss:              102400 kB
+Shared_Clean:      81920 kB
+Shared_Dirty:      20480 kB
+Private_Clean:     51200 kB
+Private_Dirty:     51200 kB
+Swap:                  0 kB
+"""
+
+
+class TestPreforkServer(unittest.TestCase):
+    """Classe de testes para a contabilidade de memória do servidor pre-fork."""
+
+    def test_process_memory(self):
+        """Testa a leitura do smaps_rollup, a soma dos campos compartilhados e privados e processos inexistentes."""
+        with mock.patch('builtins.open', mock.mock_open(read_data=SMAPS_ROLLUP)) as opened:
+            memory = process_memory(1234)
+        opened.assert_called_once_with('/proc/1234/smaps_rollup')
+        self.assertEqual(memory, {'rssMb': 200.0, 'pssMb': 100.0, 'sharedMb': 100.0, 'privateMb': 100.0})
+
+        with mock.patch('builtins.open', side_effect=FileNotFoundError):
+            self.assertEqual(process_memory(1234), {})
+
+        # O próprio processo, quando o /proc está disponível
+        current = process_memory(os.getpid())
+        if current:
+            self.assertGreater(current['rssMb'], 0)
+            self.assertLessEqual(current['pssMb'], current['rssMb'])
+
+    def test_memory_report(self):
+        """Testa a tabela por trabalhador, a omissão dos que terminaram e o total de PSS."""
+        memories = {
+            101: {'rssMb': 200.0, 'pssMb': 100.0, 'sharedMb': 100.0, 'privateMb': 100.0},
+            102: {'rssMb': 210.0, 'pssMb': 110.5, 'sharedMb': 99.5, 'privateMb': 110.5},
+            103: {},
+        }
+        with mock.patch('prefork_server.process_memory', side_effect=memories.get):
+            report = memory_report({102: 1, 101: 0, 103: 2}).splitlines()
+        self.assertEqual(len(report), 4)
+        self.assertEqual(report[1].split(), ['0', '101', '200.0', '100.0', '100.0', '100.0'])
+        self.assertEqual(report[2].split()[:2], ['1', '102'])
+        self.assertEqual(report[-1], 'PSS total dos trabalhadores: 210.5 MB')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+from flask import Flask, jsonify
+
+sys.path.insert(0, os.path.abspath('../src/backend'))
+
+from request_profiler import RequestProfiler
+
+
+def slow_work():
+    end = time.perf_counter() + 0.03
+    while time.perf_counter() < end:
+        pass
+    return 1
+
+
+class TestRequestProfiler(unittest.TestCase):
+    """Classe de testes para o perfilamento amostrado por requisição."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+
+        @self.app.route('/work')
+        def work():
+            return jsonify({"value": slow_work()})
+
+        self.profiler = RequestProfiler(self.folder.name, sample_rate=2, interval=0.002).install(self.app)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_samples_one_in_n_requests(self):
+        """Testa se 1 a cada N requisições gera um arquivo de pilhas colapsadas com a rota e a latência."""
+        headers = [self.client.get('/work').headers.get('X-Profile-File') for _ in range(4)]
+        self.assertIsNone(headers[0])
+        self.assertIsNone(headers[2])
+        self.assertEqual(sorted(os.listdir(self.folder.name)), sorted([headers[1], headers[3]]))
+        self.assertIn('_work_', headers[1])
+        self.assertRegex(headers[1], r'_\d+ms_200_')
+
+        with open(os.path.join(self.folder.name, headers[1]), encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertIn('work (tests_request_profiler.py', stack)
+        self.assertTrue(stack.endswith(f'slow_work (tests_request_profiler.py:{slow_work.__code__.co_firstlineno})'))
+        self.assertGreaterEqual(sum(int(line.rsplit(' ', 1)[1]) for line in lines), 2)
+
+    def test_admin_toggle(self):
+        """Testa a alteração da configuração em execução e a proteção do endpoint administrativo."""
+        response = self.client.post('/admin/profiling', json={'enabled': False})
+        self.assertFalse(response.get_json()['enabled'])
+        for _ in range(4):
+            self.assertIsNone(self.client.get('/work').headers.get('X-Profile-File'))
+
+        response = self.client.post('/admin/profiling', json={'sampleRate': 1})
+        self.assertEqual(response.get_json()['sampleRate'], 1)
+        self.assertIsNotNone(self.client.get('/work').headers.get('X-Profile-File'))
+        self.assertEqual(self.client.post('/admin/profiling', json={'interval': 5}).status_code, 400)
+
+        remote = self.client.get('/admin/profiling', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+        self.assertEqual(remote.status_code, 403)
+        self.profiler.admin_token = 'segredo'
+        self.assertEqual(self.client.get('/admin/profiling').status_code, 403)
+        self.assertEqual(self.client.get('/admin/profiling', headers={'X-Admin-Token': 'segredo'}).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
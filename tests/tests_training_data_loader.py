@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath('../src'))
+
+from face_mesh_features import calculate_anthropometric_features
+from training_data_loader import ShardedDataset, iter_shard_chunks, prefetch
+
+
+class TestTrainingDataLoader(unittest.TestCase):
+    """Classe de testes para o carregamento de dados de treinamento em blocos."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        for label in (0, 1):
+            df = pd.DataFrame(rng.normal(label, 1, (250, 3)), columns=['a', 'b', 'c'])
+            df.insert(0, 'class', label)
+            df.insert(0, 'samples', np.arange(250) + 1000 * label)
+            df.to_csv(os.path.join(self.folder.name, f'distances_{label}.csv'), index=False)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_epoch_covers_subsets_once_with_mixed_batches(self):
+        """Testa se cada época entrega todas as linhas do subconjunto uma vez, padronizadas e misturadas."""
+        options = dict(batch_size=16, chunk_rows=40, shuffle_buffer=100, prefetch_batches=2)
+        train = ShardedDataset([self.folder.name], subset='train', **options)
+        statistics = train.fit_statistics()
+        validation = ShardedDataset([self.folder.name], subset='validation', statistics=statistics, **options)
+        self.assertEqual(train.num_samples + validation.num_samples, 500)
+        self.assertAlmostEqual(validation.num_samples / 500, 0.2, delta=0.06)
+
+        # A padronização ajustada em blocos deixa o treino com média 0 e desvio 1
+        batches = list(train.epoch(1))
+        X = np.concatenate([X for X, _ in batches])
+        y = np.concatenate([y for _, y in batches])
+        self.assertEqual(len(batches), train.steps_per_epoch)
+        self.assertEqual(len(y), train.num_samples)
+        np.testing.assert_allclose(X.mean(axis=0), 0.0, atol=1e-5)
+        np.testing.assert_allclose(X.std(axis=0), 1.0, atol=1e-5)
+        self.assertTrue(any(0 < batch_y.mean() < 1 for _, batch_y in batches))
+
+        # Treino e validação não se sobrepõem entre épocas
+        train_unscaled = ShardedDataset([self.folder.name], subset='train', shuffle=False)
+        validation_unscaled = ShardedDataset([self.folder.name], subset='validation', shuffle=False)
+        seen = {tuple(row) for X, _ in train_unscaled for row in X}
+        self.assertFalse(seen & {tuple(row) for X, _ in validation_unscaled for row in X})
+
+    def test_landmark_shards_and_prefetch_errors(self):
+        """Testa o cálculo das features em CSVs de marcos e o repasse de erros da thread."""
+        meshes = np.random.default_rng(1).uniform(0, 224, (10, 468, 3)).astype(np.float32)
+        columns = [f'{axis}{i}' for i in range(468) for axis in ('X', 'Y', 'Z')]
+        df = pd.DataFrame(meshes.reshape(10, -1), columns=columns)
+        df.insert(0, 'class', 1)
+        df.insert(0, 'amostra', [f'img_{i}.jpg' for i in range(10)])
+        path = os.path.join(self.folder.name, 'landmarks.csv')
+        df.to_csv(path, index=False)
+
+        X = np.concatenate([X for X, _, _ in iter_shard_chunks(path, chunk_rows=4)])
+        np.testing.assert_allclose(X, calculate_anthropometric_features(meshes), rtol=1e-5)
+
+        def failing():
+            yield 1
+            raise ValueError('falha na leitura')
+
+        with self.assertRaises(ValueError):
+            list(prefetch(failing()))
+
+
+if __name__ == '__main__':
+    unittest.main()